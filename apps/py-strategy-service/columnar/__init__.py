@@ -0,0 +1,14 @@
+from .columns import COLUMN_BUILDERS, Columns, build_columns
+from .engine import group_key, run_columns, run_requests
+from .kernels import KERNELS, KernelResult
+
+__all__ = [
+    "COLUMN_BUILDERS",
+    "Columns",
+    "KERNELS",
+    "KernelResult",
+    "build_columns",
+    "group_key",
+    "run_columns",
+    "run_requests",
+]
@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Sequence
+
+import numpy as np
+
+from models import RunContext
+from strategies.smart_money_concept import (
+    _estimate_bar_ms,
+    _event_direction,
+    _safe_count,
+    _to_ts_ms,
+    _trend_state,
+)
+from strategies.ta_trend_vol_gate_v2 import resolve_indicators
+
+Columns = Dict[str, np.ndarray]
+Contexts = Sequence[RunContext | None]
+ColumnBuilder = Callable[[Sequence[dict[str, Any]], Sequence[str | None], Contexts], Columns]
+
+DIVERGENCE_BRANCHES = ("wt", "rsi", "stoch")
+DIVERGENCE_FLAGS = ("bullish", "bullishAdd", "bullishHidden", "bearish", "bearishAdd", "bearishHidden")
+
+
+def _as_dict(value: Any) -> dict[str, Any]:
+    return value if isinstance(value, dict) else {}
+
+
+def _as_float(value: Any) -> float | None:
+    try:
+        parsed = float(value)
+    except Exception:
+        return None
+    if parsed != parsed or parsed in (float("inf"), float("-inf")):
+        return None
+    return parsed
+
+
+def _as_bool(value: Any) -> bool:
+    return value if isinstance(value, bool) else False
+
+
+def _label(value: Any) -> str:
+    return str(value or "unknown").strip() or "unknown"
+
+
+def _safe_age(value: Any) -> float:
+    parsed = _as_float(value)
+    if parsed is None:
+        return np.nan
+    return float(max(0, int(parsed)))
+
+
+def _nan(value: float | None) -> float:
+    return np.nan if value is None else value
+
+
+def _signal(value: str | None) -> str:
+    return value if value in ("up", "down", "neutral") else "neutral"
+
+
+def _floats(values: list[float]) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _bools(values: list[bool]) -> np.ndarray:
+    return np.asarray(values, dtype=bool)
+
+
+def _strings(values: list[str]) -> np.ndarray:
+    return np.asarray(values, dtype=str) if values else np.empty(0, dtype=str)
+
+
+def _history(snapshot: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any]]:
+    history = _as_dict(snapshot.get("historyContext"))
+    return _as_dict(history.get("reg")), _as_dict(history.get("ema")), _as_dict(history.get("vol"))
+
+
+def build_regime_columns(
+    snapshots: Sequence[dict[str, Any]], signals: Sequence[str | None], contexts: Contexts
+) -> Columns:
+    states: list[str] = []
+    confs: list[float] = []
+    stacks: list[str] = []
+    for snapshot in snapshots:
+        reg, ema, _vol = _history(_as_dict(snapshot))
+        states.append(_label(reg.get("state")))
+        confs.append(_nan(_as_float(reg.get("conf"))))
+        stacks.append(_label(ema.get("stk")))
+    return {
+        "signal": _strings([_signal(item) for item in signals]),
+        "reg_state": _strings(states),
+        "reg_conf": _floats(confs),
+        "ema_stk": _strings(stacks),
+    }
+
+
+def build_signal_filter_columns(
+    snapshots: Sequence[dict[str, Any]], signals: Sequence[str | None], contexts: Contexts
+) -> Columns:
+    states: list[str] = []
+    vol_zs: list[float] = []
+    tag_rows: list[set[str]] = []
+    for snapshot in snapshots:
+        snapshot = _as_dict(snapshot)
+        reg, _ema, vol = _history(snapshot)
+        states.append(_label(reg.get("state")))
+        vol_zs.append(_nan(_as_float(vol.get("z"))))
+        raw_tags = snapshot.get("tags", [])
+        raw_tags = raw_tags if isinstance(raw_tags, (list, tuple)) else []
+        tag_rows.append({tag.strip().lower() for tag in raw_tags if isinstance(tag, str)})
+
+    columns: Columns = {
+        "signal": _strings([_signal(item) for item in signals]),
+        "reg_state": _strings(states),
+        "vol_z": _floats(vol_zs),
+    }
+    # One-hot tag columns keep membership tests vectorized for arbitrary tag vocabularies.
+    for tag in sorted(set().union(*tag_rows)) if tag_rows else []:
+        columns[f"tag:{tag}"] = _bools([tag in row for row in tag_rows])
+    return columns
+
+
+def build_trend_vol_columns(
+    snapshots: Sequence[dict[str, Any]], signals: Sequence[str | None], contexts: Contexts
+) -> Columns:
+    rows: dict[str, list[Any]] = {
+        key: []
+        for key in ("reg_state", "reg_conf", "ema_stk", "ema_d50", "ema_d200", "ema_sl50", "vol_z", "vol_rv", "risk_data_gap")
+    }
+    for snapshot in snapshots:
+        snapshot = _as_dict(snapshot)
+        reg, ema, vol = _history(snapshot)
+        rows["reg_state"].append(_label(reg.get("state")))
+        rows["reg_conf"].append(_nan(_as_float(reg.get("conf"))))
+        rows["ema_stk"].append(_label(ema.get("stk")))
+        rows["ema_d50"].append(_nan(_as_float(ema.get("d50"))))
+        rows["ema_d200"].append(_nan(_as_float(ema.get("d200"))))
+        rows["ema_sl50"].append(_nan(_as_float(ema.get("sl50"))))
+        rows["vol_z"].append(_nan(_as_float(vol.get("z"))))
+        rows["vol_rv"].append(_nan(_as_float(vol.get("rv"))))
+        rows["risk_data_gap"].append(_as_dict(snapshot.get("riskFlags")).get("dataGap") is True)
+
+    return {
+        "signal": _strings([_signal(item) for item in signals]),
+        "reg_state": _strings(rows["reg_state"]),
+        "reg_conf": _floats(rows["reg_conf"]),
+        "ema_stk": _strings(rows["ema_stk"]),
+        "ema_d50": _floats(rows["ema_d50"]),
+        "ema_d200": _floats(rows["ema_d200"]),
+        "ema_sl50": _floats(rows["ema_sl50"]),
+        "vol_z": _floats(rows["vol_z"]),
+        "vol_rv": _floats(rows["vol_rv"]),
+        "risk_data_gap": _bools(rows["risk_data_gap"]),
+    }
+
+
+def build_ta_trend_vol_v2_columns(
+    snapshots: Sequence[dict[str, Any]], signals: Sequence[str | None], contexts: Contexts
+) -> Columns:
+    rows: dict[str, list[Any]] = {
+        key: []
+        for key in ("reg_state", "reg_conf", "rsi", "adx", "atr_pct", "ema_fast", "ema_slow", "ta_backend_unavailable")
+    }
+    for snapshot, context in zip(snapshots, contexts):
+        snapshot = _as_dict(snapshot)
+        reg, _ema, _vol = _history(snapshot)
+        ta_values, ta_error, _source = resolve_indicators(snapshot, context)
+        rows["reg_state"].append(_label(reg.get("state")))
+        rows["reg_conf"].append(_nan(_as_float(reg.get("conf"))))
+        for key in ("rsi", "adx", "atr_pct", "ema_fast", "ema_slow"):
+            rows[key].append(_nan(_as_float(ta_values.get(key))))
+        rows["ta_backend_unavailable"].append(ta_error == "ta_backend_unavailable")
+
+    return {
+        "signal": _strings([_signal(item) for item in signals]),
+        "reg_state": _strings(rows["reg_state"]),
+        "reg_conf": _floats(rows["reg_conf"]),
+        "rsi": _floats(rows["rsi"]),
+        "adx": _floats(rows["adx"]),
+        "atr_pct": _floats(rows["atr_pct"]),
+        "ema_fast": _floats(rows["ema_fast"]),
+        "ema_slow": _floats(rows["ema_slow"]),
+        "ta_backend_unavailable": _bools(rows["ta_backend_unavailable"]),
+    }
+
+
+SMC_ZONE_KEYS = (
+    ("discountTop", "zone_discount_top"),
+    ("discountBottom", "zone_discount_bottom"),
+    ("equilibriumTop", "zone_equilibrium_top"),
+    ("equilibriumBottom", "zone_equilibrium_bottom"),
+    ("premiumTop", "zone_premium_top"),
+    ("premiumBottom", "zone_premium_bottom"),
+)
+
+
+def build_smc_columns(
+    snapshots: Sequence[dict[str, Any]], signals: Sequence[str | None], contexts: Contexts
+) -> Columns:
+    float_keys = ["event_age_bars", "last_close", *[column for _, column in SMC_ZONE_KEYS]]
+    count_keys = ["ob_bullish", "ob_bearish", "fvg_bullish", "fvg_bearish"]
+    floats: dict[str, list[float]] = {key: [] for key in float_keys + count_keys}
+    present: list[bool] = []
+    data_gaps: list[bool] = []
+    trends: list[str] = []
+    directions: list[str] = []
+
+    for snapshot in snapshots:
+        snapshot = _as_dict(snapshot)
+        smc = _as_dict(_as_dict(snapshot.get("advancedIndicators")).get("smartMoneyConcepts"))
+        history = _as_dict(snapshot.get("historyContext"))
+        last_bars = _as_dict(history.get("lastBars"))
+        ohlc_rows = last_bars.get("ohlc") if isinstance(last_bars.get("ohlc"), list) else []
+        last_bar = _as_dict(ohlc_rows[-1]) if ohlc_rows else {}
+        last_bar_ts_ms = _to_ts_ms(last_bar.get("t"))
+        bar_ms = _estimate_bar_ms(ohlc_rows)
+
+        present.append(bool(smc))
+        data_gaps.append(_as_bool(smc.get("dataGap")) or _as_bool(_as_dict(snapshot.get("riskFlags")).get("dataGap")))
+
+        internal = _as_dict(smc.get("internal"))
+        swing = _as_dict(smc.get("swing"))
+        swing_trend = _trend_state(swing.get("trend"))
+        trends.append(swing_trend if swing_trend != "neutral" else _trend_state(internal.get("trend")))
+
+        swing_event = _as_dict(swing.get("lastEvent"))
+        event = swing_event if swing_event else _as_dict(internal.get("lastEvent"))
+        directions.append(_event_direction(event.get("direction")))
+        event_ts_ms = _to_ts_ms(event.get("ts"))
+        event_age_bars = np.nan
+        if event_ts_ms is not None and last_bar_ts_ms is not None and bar_ms is not None and bar_ms > 0:
+            event_age_bars = float(int(max(0, last_bar_ts_ms - event_ts_ms) // bar_ms))
+        floats["event_age_bars"].append(event_age_bars)
+        floats["last_close"].append(_nan(_as_float(last_bar.get("c"))))
+
+        zones = _as_dict(smc.get("zones"))
+        for key, column in SMC_ZONE_KEYS:
+            floats[column].append(_nan(_as_float(zones.get(key))))
+
+        order_blocks = _as_dict(smc.get("orderBlocks"))
+        ob_internal = _as_dict(order_blocks.get("internal"))
+        ob_swing = _as_dict(order_blocks.get("swing"))
+        fvgs = _as_dict(smc.get("fairValueGaps"))
+        floats["ob_bullish"].append(_safe_count(ob_internal.get("bullishCount")) + _safe_count(ob_swing.get("bullishCount")))
+        floats["ob_bearish"].append(_safe_count(ob_internal.get("bearishCount")) + _safe_count(ob_swing.get("bearishCount")))
+        floats["fvg_bullish"].append(_safe_count(fvgs.get("bullishCount")))
+        floats["fvg_bearish"].append(_safe_count(fvgs.get("bearishCount")))
+
+    columns: Columns = {
+        "signal": _strings([_signal(item) for item in signals]),
+        "smc_present": _bools(present),
+        "data_gap": _bools(data_gaps),
+        "trend_state": _strings(trends),
+        "event_direction": _strings(directions),
+    }
+    for key in float_keys:
+        columns[key] = _floats(floats[key])
+    for key in count_keys:
+        columns[key] = np.asarray(floats[key], dtype=np.int64)
+    return columns
+
+
+def _vmc_common(snapshot: dict[str, Any]) -> tuple[dict[str, Any], bool, bool, dict[str, Any], dict[str, Any]]:
+    vmc = _as_dict(_as_dict(snapshot.get("indicators")).get("vumanchu"))
+    data_gap = _as_bool(vmc.get("dataGap")) or _as_bool(_as_dict(snapshot.get("riskFlags")).get("dataGap"))
+    return vmc, not vmc, data_gap, _as_dict(vmc.get("signals")), _as_dict(vmc.get("waveTrend"))
+
+
+def build_vmc_cipher_columns(
+    snapshots: Sequence[dict[str, Any]], signals: Sequence[str | None], contexts: Contexts
+) -> Columns:
+    bool_keys = {
+        "vmc_missing": None,
+        "data_gap": None,
+        "buy": "buy",
+        "sell": "sell",
+        "buy_div": "buyDiv",
+        "sell_div": "sellDiv",
+        "gold_no_buy": "goldNoBuyLong",
+        "cross_up": "crossUp",
+        "cross_down": "crossDown",
+        "oversold": "oversold",
+        "overbought": "overbought",
+    }
+    age_keys = {"buy_age": "buy", "sell_age": "sell", "buy_div_age": "buyDiv", "sell_div_age": "sellDiv"}
+    bools: dict[str, list[bool]] = {key: [] for key in bool_keys}
+    ages: dict[str, list[float]] = {key: [] for key in age_keys}
+
+    for snapshot in snapshots:
+        _vmc, missing, data_gap, vmc_signals, wave = _vmc_common(_as_dict(snapshot))
+        bools["vmc_missing"].append(missing)
+        bools["data_gap"].append(data_gap)
+        for column in ("buy", "sell", "buy_div", "sell_div", "gold_no_buy"):
+            bools[column].append(_as_bool(vmc_signals.get(bool_keys[column])))
+        for column in ("cross_up", "cross_down", "oversold", "overbought"):
+            bools[column].append(_as_bool(wave.get(bool_keys[column])))
+        signal_ages = _as_dict(vmc_signals.get("ages"))
+        for column, key in age_keys.items():
+            ages[column].append(_safe_age(signal_ages.get(key)))
+
+    columns: Columns = {"signal": _strings([_signal(item) for item in signals])}
+    for key, values in bools.items():
+        columns[key] = _bools(values)
+    for key, values in ages.items():
+        columns[key] = _floats(values)
+    return columns
+
+
+def build_vmc_divergence_columns(
+    snapshots: Sequence[dict[str, Any]], signals: Sequence[str | None], contexts: Contexts
+) -> Columns:
+    bool_keys = ["vmc_missing", "data_gap", "gold_no_buy", "cross_up", "cross_down", "oversold", "overbought"]
+    bool_keys += [f"{branch}_{flag}" for branch in DIVERGENCE_BRANCHES for flag in DIVERGENCE_FLAGS]
+    age_keys = [f"{branch}_{side}_age" for branch in DIVERGENCE_BRANCHES for side in ("bullish", "bearish")]
+    bools: dict[str, list[bool]] = {key: [] for key in bool_keys}
+    ages: dict[str, list[float]] = {key: [] for key in age_keys}
+
+    for snapshot in snapshots:
+        vmc, missing, data_gap, vmc_signals, wave = _vmc_common(_as_dict(snapshot))
+        bools["vmc_missing"].append(missing)
+        bools["data_gap"].append(data_gap)
+        bools["gold_no_buy"].append(_as_bool(vmc_signals.get("goldNoBuyLong")))
+        bools["cross_up"].append(_as_bool(wave.get("crossUp")))
+        bools["cross_down"].append(_as_bool(wave.get("crossDown")))
+        bools["oversold"].append(_as_bool(wave.get("oversold")))
+        bools["overbought"].append(_as_bool(wave.get("overbought")))
+        divergences = _as_dict(vmc.get("divergences"))
+        for branch in DIVERGENCE_BRANCHES:
+            values = _as_dict(divergences.get(branch))
+            for flag in DIVERGENCE_FLAGS:
+                bools[f"{branch}_{flag}"].append(_as_bool(values.get(flag)))
+            ages[f"{branch}_bullish_age"].append(_safe_age(values.get("lastBullishAgeBars")))
+            ages[f"{branch}_bearish_age"].append(_safe_age(values.get("lastBearishAgeBars")))
+
+    columns: Columns = {"signal": _strings([_signal(item) for item in signals])}
+    for key, values in bools.items():
+        columns[key] = _bools(values)
+    for key, values in ages.items():
+        columns[key] = _floats(values)
+    return columns
+
+
+COLUMN_BUILDERS: dict[str, ColumnBuilder] = {
+    "regime_gate": build_regime_columns,
+    "signal_filter": build_signal_filter_columns,
+    "trend_vol_gate": build_trend_vol_columns,
+    "ta_trend_vol_gate_v2": build_ta_trend_vol_v2_columns,
+    "smart_money_concept": build_smc_columns,
+    "vmc_cipher_gate": build_vmc_cipher_columns,
+    "vmc_divergence_reversal": build_vmc_divergence_columns,
+}
+
+
+def build_columns(
+    strategy_type: str,
+    snapshots: Sequence[dict[str, Any]],
+    signals: Sequence[str | None],
+    contexts: Contexts | None = None,
+) -> Columns:
+    builder = COLUMN_BUILDERS.get(strategy_type)
+    if builder is None:
+        raise ValueError(f"columnar_strategy_not_supported:{strategy_type}")
+    contexts = contexts if contexts is not None else [None] * len(snapshots)
+    if len(snapshots) != len(signals) or len(snapshots) != len(contexts):
+        raise ValueError("columnar_length_mismatch")
+    return builder(snapshots, signals, contexts)
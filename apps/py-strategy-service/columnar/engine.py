@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Sequence
+
+from models import StrategyRunRequest, StrategyRunResponse
+
+from .columns import Columns, build_columns
+from .kernels import KERNELS, KernelResult
+
+
+def run_columns(strategy_type: str, columns: Columns, config: Dict[str, Any] | None = None) -> KernelResult:
+    kernel = KERNELS.get(strategy_type)
+    if kernel is None:
+        raise ValueError(f"columnar_strategy_not_supported:{strategy_type}")
+    return kernel(columns, dict(config or {}))
+
+
+def _config_key(config: Dict[str, Any]) -> str:
+    return json.dumps(config, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def group_key(request: StrategyRunRequest) -> tuple[str, str]:
+    """(strategyType, config) group a request is scored in; one kernel call per group."""
+    return request.strategyType.strip(), _config_key(request.config)
+
+
+def run_requests(requests: Sequence[StrategyRunRequest]) -> list[StrategyRunResponse]:
+    """Score requests through the vectorized kernels, one kernel call per (strategyType, config) group."""
+    groups: dict[tuple[str, str], list[int]] = {}
+    for idx, request in enumerate(requests):
+        groups.setdefault(group_key(request), []).append(idx)
+
+    responses: list[StrategyRunResponse | None] = [None] * len(requests)
+    for (strategy_type, _key), indexes in groups.items():
+        members = [requests[idx] for idx in indexes]
+        columns = build_columns(
+            strategy_type,
+            [item.featureSnapshot for item in members],
+            [item.context.signal for item in members],
+            [item.context for item in members],
+        )
+        result = run_columns(strategy_type, columns, members[0].config)
+        reason_codes = result.reason_codes()
+        for pos, idx in enumerate(indexes):
+            responses[idx] = StrategyRunResponse(
+                allow=bool(result.allow[pos]),
+                score=float(result.score[pos]),
+                reasonCodes=reason_codes[pos],
+                meta={"kernel": "columnar"},
+            )
+    return [item for item in responses if item is not None]
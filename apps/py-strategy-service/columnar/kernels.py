@@ -0,0 +1,559 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Sequence
+
+import numpy as np
+
+Columns = Dict[str, np.ndarray]
+
+
+@dataclass
+class KernelResult:
+    allow: np.ndarray
+    score: np.ndarray
+    reason: np.ndarray
+    codes: tuple[str, ...]
+
+    def reason_codes(self) -> list[list[str]]:
+        return [[self.codes[idx]] if idx >= 0 else [] for idx in self.reason.tolist()]
+
+
+Kernel = Callable[[Columns, Dict[str, Any]], KernelResult]
+
+
+def _as_float(value: Any) -> float | None:
+    try:
+        parsed = float(value)
+    except Exception:
+        return None
+    if parsed != parsed or parsed in (float("inf"), float("-inf")):
+        return None
+    return parsed
+
+
+def _as_bool(value: Any, default: bool) -> bool:
+    if isinstance(value, bool):
+        return value
+    return default
+
+
+def _cfg_float(config: dict[str, Any], key: str, default: float) -> float:
+    parsed = _as_float(config.get(key))
+    return parsed if parsed is not None else default
+
+
+def _cfg_age(config: dict[str, Any], key: str, default: int) -> int:
+    parsed = _as_float(config.get(key))
+    return max(0, int(parsed)) if parsed is not None else default
+
+
+def _str_list(value: Any) -> list[str]:
+    return [item for item in value if isinstance(item, str)] if isinstance(value, (list, tuple)) else []
+
+
+def _length(columns: Columns) -> int:
+    return len(columns["signal"])
+
+
+def _col(columns: Columns, key: str, n: int, dtype: Any = np.float64) -> np.ndarray:
+    value = columns.get(key)
+    if value is None:
+        return np.full(n, np.nan) if dtype is np.float64 else np.zeros(n, dtype=dtype)
+    return np.asarray(value, dtype=dtype)
+
+
+def _flag(value: bool, n: int) -> np.ndarray:
+    return np.full(n, value, dtype=bool)
+
+
+def _resolve(
+    n: int,
+    score: np.ndarray,
+    checks: Sequence[tuple[str, np.ndarray]],
+    pass_code: str | None,
+) -> KernelResult:
+    """Vectorized form of the handlers' `if allow and <cond>` chains: first failing check wins."""
+    codes = tuple(code for code, _ in checks) + ((pass_code,) if pass_code else ())
+    reason = np.full(n, -1, dtype=np.int16)
+    for idx, (_code, mask) in enumerate(checks):
+        reason[(reason < 0) & mask] = idx
+    allow = reason < 0
+    if pass_code:
+        reason[allow] = len(checks)
+    return KernelResult(allow=allow, score=score, reason=reason, codes=codes)
+
+
+def regime_gate_kernel(columns: Columns, config: dict[str, Any]) -> KernelResult:
+    defaults = {
+        "allowStates": ["trend_up", "trend_down", "transition"],
+        "minRegimeConfidencePct": 45,
+        "requireStackAlignment": True,
+        "allowUnknownRegime": False,
+    }
+    config = {**defaults, **config}
+    n = _length(columns)
+    signal = columns["signal"]
+    state = columns["reg_state"]
+    conf = _col(columns, "reg_conf", n)
+    stack = columns["ema_stk"]
+
+    allow_states = _str_list(config.get("allowStates"))
+    min_conf = _cfg_float(config, "minRegimeConfidencePct", 45.0)
+    require_stack_alignment = bool(config.get("requireStackAlignment", True))
+    allow_unknown = bool(config.get("allowUnknownRegime", False))
+
+    state_mismatch = ((state == "trend_up") & (stack == "bear")) | ((state == "trend_down") & (stack == "bull"))
+    signal_mismatch = ((signal == "up") & (stack == "bear")) | ((signal == "down") & (stack == "bull"))
+    result = _resolve(
+        n,
+        np.zeros(n),
+        [
+            ("regime_unknown", (state == "unknown") & (not allow_unknown)),
+            ("regime_state_not_allowed", ~np.isin(state, allow_states)),
+            ("regime_confidence_low", np.isfinite(conf) & (conf < min_conf)),
+            ("ema_stack_conflict", state_mismatch & require_stack_alignment),
+            ("signal_stack_conflict", signal_mismatch & require_stack_alignment),
+        ],
+        None,
+    )
+    score_base = np.where(np.isfinite(conf), conf, 50.0)
+    result.score = np.clip(np.where(result.allow, score_base, np.minimum(score_base, 35.0)), 0.0, 100.0)
+    return result
+
+
+def signal_filter_kernel(columns: Columns, config: dict[str, Any]) -> KernelResult:
+    defaults = {
+        "blockedTags": ["data_gap", "news_risk"],
+        "requiredTags": [],
+        "maxVolZ": 2.5,
+        "blockRangeStates": ["range"],
+        "allowRangeWhenTrendTag": False,
+    }
+    config = {**defaults, **config}
+    n = _length(columns)
+    state = columns["reg_state"]
+    vol_z = _col(columns, "vol_z", n)
+
+    blocked_tags = [item.strip().lower() for item in _str_list(config.get("blockedTags"))]
+    required_tags = [item.strip().lower() for item in _str_list(config.get("requiredTags"))]
+    block_range_states = [item.strip() for item in _str_list(config.get("blockRangeStates"))]
+    allow_range_when_trend_tag = bool(config.get("allowRangeWhenTrendTag", False))
+    max_vol_z = _cfg_float(config, "maxVolZ", 2.5)
+
+    def has_tag(tag: str) -> np.ndarray:
+        return _col(columns, f"tag:{tag}", n, bool)
+
+    blocked = np.zeros(n, dtype=bool)
+    for tag in blocked_tags:
+        blocked |= has_tag(tag)
+    required_missing = np.zeros(n, dtype=bool)
+    for tag in required_tags:
+        required_missing |= ~has_tag(tag)
+    has_trend_tag = has_tag("trend_up") | has_tag("trend_down")
+
+    result = _resolve(
+        n,
+        np.zeros(n),
+        [
+            ("blocked_tag_match", blocked),
+            ("required_tag_missing", required_missing),
+            ("volatility_guard", np.abs(vol_z) > max_vol_z),
+            ("range_state_block", np.isin(state, block_range_states) & ~(allow_range_when_trend_tag & has_trend_tag)),
+        ],
+        None,
+    )
+    score = np.where(
+        np.isfinite(vol_z),
+        np.clip(70.0 - np.maximum(0.0, np.abs(vol_z) - 1.0) * 10.0, 0.0, 100.0),
+        70.0,
+    )
+    result.score = np.where(result.allow, score, np.minimum(score, 30.0))
+    return result
+
+
+def trend_vol_gate_kernel(columns: Columns, config: dict[str, Any]) -> KernelResult:
+    defaults = {
+        "allowedStates": ["trend_up", "trend_down"],
+        "minRegimeConf": 55,
+        "requireStackAlignment": True,
+        "requireSlopeAlignment": True,
+        "minAbsD50Pct": 0.12,
+        "minAbsD200Pct": 0.20,
+        "maxVolZ": 2.5,
+        "maxRelVol": 1.8,
+        "minVolZ": -1.2,
+        "minRelVol": 0.6,
+        "minPassScore": 70,
+        "allowNeutralSignal": False,
+    }
+    config = {**defaults, **config}
+    n = _length(columns)
+    signal = columns["signal"]
+    state = columns["reg_state"]
+    conf = _col(columns, "reg_conf", n)
+    stack = columns["ema_stk"]
+    d50 = _col(columns, "ema_d50", n)
+    d200 = _col(columns, "ema_d200", n)
+    sl50 = _col(columns, "ema_sl50", n)
+    vol_z = _col(columns, "vol_z", n)
+    rel_vol = _col(columns, "vol_rv", n)
+
+    allowed_states = [item.strip() for item in _str_list(config.get("allowedStates"))]
+    min_regime_conf = _cfg_float(config, "minRegimeConf", 55.0)
+    require_stack_alignment = _as_bool(config.get("requireStackAlignment"), True)
+    require_slope_alignment = _as_bool(config.get("requireSlopeAlignment"), True)
+    min_abs_d50 = _cfg_float(config, "minAbsD50Pct", 0.12)
+    min_abs_d200 = _cfg_float(config, "minAbsD200Pct", 0.20)
+    max_vol_z = _cfg_float(config, "maxVolZ", 2.5)
+    max_rel_vol = _cfg_float(config, "maxRelVol", 1.8)
+    min_vol_z = _cfg_float(config, "minVolZ", -1.2)
+    min_rel_vol = _cfg_float(config, "minRelVol", 0.6)
+    min_pass_score = _cfg_float(config, "minPassScore", 70.0)
+    allow_neutral = _as_bool(config.get("allowNeutralSignal"), False)
+
+    up = signal == "up"
+    down = signal == "down"
+    stack_aligned = (up & (stack == "bull")) | (down & (stack == "bear"))
+    slope_aligned = (up & (sl50 >= 0.0)) | (down & (sl50 <= 0.0))
+    distance_ok = (np.abs(d50) >= min_abs_d50) & (np.abs(d200) >= min_abs_d200)
+    vol_spike_risk = (vol_z >= max_vol_z) & (rel_vol >= max_rel_vol)
+    low_liquidity_risk = (vol_z <= min_vol_z) | (rel_vol <= min_rel_vol)
+    vol_ok = ~vol_spike_risk & ~low_liquidity_risk & np.isfinite(vol_z) & np.isfinite(rel_vol)
+
+    score = np.round(
+        np.clip(
+            0.6 * np.where(np.isfinite(conf), conf, 0.0)
+            + 20.0 * stack_aligned
+            + 10.0 * slope_aligned
+            + 10.0 * distance_ok
+            + 10.0 * vol_ok,
+            0.0,
+            100.0,
+        )
+    )
+    return _resolve(
+        n,
+        score,
+        [
+            ("signal_missing_or_neutral", (signal == "neutral") & (not allow_neutral)),
+            ("regime_state_not_allowed", ~np.isin(state, allowed_states)),
+            ("regime_confidence_low", ~(conf >= min_regime_conf)),
+            ("ema_stack_conflict", ~stack_aligned & require_stack_alignment),
+            ("ema_slope_conflict", ~slope_aligned & require_slope_alignment),
+            ("distance_too_small", ~distance_ok),
+            ("vol_spike_risk", vol_spike_risk),
+            ("low_liquidity_risk", low_liquidity_risk),
+            ("score_below_threshold", score < min_pass_score),
+        ],
+        "trend_vol_gate_pass",
+    )
+
+
+def ta_trend_vol_gate_v2_kernel(columns: Columns, config: dict[str, Any]) -> KernelResult:
+    defaults = {
+        "allowedStates": ["trend_up", "trend_down"],
+        "minRegimeConf": 50,
+        "minAdx": 18,
+        "maxAtrPct": 2.0,
+        "rsiLongMin": 52,
+        "rsiShortMax": 48,
+        "requireEmaAlignment": True,
+        "minPassScore": 65,
+        "allowNeutralSignal": False,
+    }
+    config = {**defaults, **config}
+    n = _length(columns)
+    signal = columns["signal"]
+    state = columns["reg_state"]
+    conf = _col(columns, "reg_conf", n)
+    rsi = _col(columns, "rsi", n)
+    adx = _col(columns, "adx", n)
+    atr_pct = _col(columns, "atr_pct", n)
+    ema_fast = _col(columns, "ema_fast", n)
+    ema_slow = _col(columns, "ema_slow", n)
+    backend_unavailable = _col(columns, "ta_backend_unavailable", n, bool)
+
+    allowed_states = [item.strip() for item in _str_list(config.get("allowedStates"))]
+    min_reg_conf = _cfg_float(config, "minRegimeConf", defaults["minRegimeConf"])
+    min_adx = _cfg_float(config, "minAdx", defaults["minAdx"])
+    max_atr_pct = _cfg_float(config, "maxAtrPct", defaults["maxAtrPct"])
+    rsi_long_min = _cfg_float(config, "rsiLongMin", defaults["rsiLongMin"])
+    rsi_short_max = _cfg_float(config, "rsiShortMax", defaults["rsiShortMax"])
+    require_ema_alignment = _as_bool(config.get("requireEmaAlignment"), True)
+    min_pass_score = _cfg_float(config, "minPassScore", defaults["minPassScore"])
+    allow_neutral = _as_bool(config.get("allowNeutralSignal"), False)
+
+    up = signal == "up"
+    down = signal == "down"
+    ema_aligned = (up & (ema_fast >= ema_slow)) | (down & (ema_fast <= ema_slow))
+    rsi_aligned = (up & (rsi >= rsi_long_min)) | (down & (rsi <= rsi_short_max))
+    adx_ok = adx >= min_adx
+    atr_ok = atr_pct <= max_atr_pct
+
+    score = np.round(
+        np.clip(
+            0.4 * np.where(np.isfinite(conf), conf, 0.0)
+            + 20.0 * adx_ok
+            + 15.0 * rsi_aligned
+            + 15.0 * atr_ok
+            + 10.0 * ema_aligned,
+            0.0,
+            100.0,
+        )
+    )
+    return _resolve(
+        n,
+        score,
+        [
+            ("signal_missing_or_neutral", (signal == "neutral") & (not allow_neutral)),
+            ("regime_state_not_allowed", ~np.isin(state, allowed_states)),
+            ("regime_confidence_low", ~(conf >= min_reg_conf)),
+            ("ta_backend_unavailable", backend_unavailable),
+            ("ta_input_missing", ~(np.isfinite(adx) & np.isfinite(rsi) & np.isfinite(atr_pct))),
+            ("adx_too_low", ~adx_ok),
+            ("atr_too_high", ~atr_ok),
+            ("rsi_not_aligned", ~rsi_aligned),
+            ("ema_not_aligned", ~ema_aligned & require_ema_alignment),
+            ("score_below_threshold", score < min_pass_score),
+        ],
+        "ta_trend_vol_gate_v2_pass",
+    )
+
+
+def _in_band(value: np.ndarray, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    return (np.minimum(low, high) <= value) & (value <= np.maximum(low, high))
+
+
+def smart_money_concept_kernel(columns: Columns, config: dict[str, Any]) -> KernelResult:
+    defaults = {
+        "requireNonNeutralSignal": True,
+        "blockOnDataGap": True,
+        "requireTrendAlignment": True,
+        "requireStructureAlignment": True,
+        "requireZoneAlignment": True,
+        "allowEquilibriumZone": True,
+        "maxEventAgeBars": 120,
+        "minPassScore": 65,
+    }
+    config = {**defaults, **config}
+    n = _length(columns)
+    signal = columns["signal"]
+    trend_state = columns["trend_state"]
+    event_direction = columns["event_direction"]
+    event_age = _col(columns, "event_age_bars", n)
+    last_close = _col(columns, "last_close", n)
+
+    require_non_neutral = _as_bool(config.get("requireNonNeutralSignal"), True)
+    block_on_data_gap = _as_bool(config.get("blockOnDataGap"), True)
+    require_trend_alignment = _as_bool(config.get("requireTrendAlignment"), True)
+    require_structure_alignment = _as_bool(config.get("requireStructureAlignment"), True)
+    require_zone_alignment = _as_bool(config.get("requireZoneAlignment"), True)
+    allow_equilibrium = _as_bool(config.get("allowEquilibriumZone"), True)
+    max_event_age_bars = _cfg_age(config, "maxEventAgeBars", 0) or 120
+    min_pass_score = _cfg_float(config, "minPassScore", 65.0)
+
+    up = signal == "up"
+    down = signal == "down"
+    trend_aligned = (up & (trend_state == "bullish")) | (down & (trend_state == "bearish"))
+    event_fresh = event_age <= max_event_age_bars
+    structure_aligned = ((up & (event_direction == "bullish")) | (down & (event_direction == "bearish"))) & event_fresh
+
+    discount = _in_band(last_close, _col(columns, "zone_discount_bottom", n), _col(columns, "zone_discount_top", n))
+    equilibrium = _in_band(
+        last_close, _col(columns, "zone_equilibrium_bottom", n), _col(columns, "zone_equilibrium_top", n)
+    )
+    premium = _in_band(last_close, _col(columns, "zone_premium_bottom", n), _col(columns, "zone_premium_top", n))
+    equilibrium = equilibrium & ~discount
+    premium = premium & ~discount & ~equilibrium
+    zone_favorable = (up & discount) | (down & premium) | (allow_equilibrium & equilibrium)
+
+    ob_bullish = _col(columns, "ob_bullish", n, np.int64)
+    ob_bearish = _col(columns, "ob_bearish", n, np.int64)
+    fvg_bullish = _col(columns, "fvg_bullish", n, np.int64)
+    fvg_bearish = _col(columns, "fvg_bearish", n, np.int64)
+    ob_aligned = (up & (ob_bullish > 0) & (ob_bullish >= ob_bearish)) | (down & (ob_bearish > 0) & (ob_bearish >= ob_bullish))
+    fvg_aligned = (up & (fvg_bullish > 0) & (fvg_bullish >= fvg_bearish)) | (
+        down & (fvg_bearish > 0) & (fvg_bearish >= fvg_bullish)
+    )
+    bonus = np.where(ob_aligned, 5.0, 0.0) + np.where(fvg_aligned, 5.0, 0.0)
+
+    score = np.round(
+        np.clip(
+            0.4 * np.where(trend_aligned, 100.0, 0.0)
+            + 0.35 * np.where(structure_aligned, 100.0, 0.0)
+            + 0.25 * np.where(zone_favorable, 100.0, 0.0)
+            + bonus,
+            0.0,
+            100.0,
+        )
+    )
+    return _resolve(
+        n,
+        score,
+        [
+            ("signal_missing_or_neutral", (signal == "neutral") & require_non_neutral),
+            ("smc_context_missing", ~_col(columns, "smc_present", n, bool)),
+            ("smc_data_gap", _col(columns, "data_gap", n, bool) & block_on_data_gap),
+            ("smc_trend_conflict", ~trend_aligned & require_trend_alignment),
+            ("smc_structure_conflict", ~structure_aligned & require_structure_alignment),
+            ("smc_zone_not_favorable", ~zone_favorable & require_zone_alignment),
+            ("score_below_threshold", score < min_pass_score),
+        ],
+        "smc_structure_zone_pass",
+    )
+
+
+def vmc_cipher_gate_kernel(columns: Columns, config: dict[str, Any]) -> KernelResult:
+    defaults = {
+        "requireNonNeutralSignal": True,
+        "blockOnDataGap": True,
+        "maxSignalAgeBars": 4,
+        "allowDivSignalAsPrimary": True,
+        "minPassScore": 60,
+    }
+    config = {**defaults, **config}
+    n = _length(columns)
+    signal = columns["signal"]
+
+    require_non_neutral = _as_bool(config.get("requireNonNeutralSignal"), True)
+    block_on_data_gap = _as_bool(config.get("blockOnDataGap"), True)
+    allow_div_primary = _as_bool(config.get("allowDivSignalAsPrimary"), True)
+    max_signal_age = _cfg_age(config, "maxSignalAgeBars", 4)
+    min_pass_score = _cfg_float(config, "minPassScore", 60.0)
+
+    def flag(key: str) -> np.ndarray:
+        return _col(columns, key, n, bool)
+
+    up = signal == "up"
+    down = signal == "down"
+    directional_primary = (up & flag("buy")) | (down & flag("sell"))
+    directional_div = (up & flag("buy_div")) | (down & flag("sell_div"))
+    directional_ok = directional_primary | (allow_div_primary & directional_div)
+
+    nan = np.full(n, np.nan)
+    directional_age = np.where(up, _col(columns, "buy_age", n), np.where(down, _col(columns, "sell_age", n), nan))
+    div_age = np.where(up, _col(columns, "buy_div_age", n), np.where(down, _col(columns, "sell_div_age", n), nan))
+    effective_age = np.where(np.isfinite(directional_age), directional_age, div_age)
+    age_fresh = effective_age <= max_signal_age
+
+    cross_aligned = (up & flag("cross_up")) | (down & flag("cross_down"))
+    zone_aligned = (up & flag("oversold")) | (down & flag("overbought"))
+
+    score = np.round(
+        np.clip(
+            25.0
+            + 30.0 * directional_ok
+            + 20.0 * directional_div
+            + 10.0 * cross_aligned
+            + 10.0 * zone_aligned
+            + 5.0 * age_fresh,
+            0.0,
+            100.0,
+        )
+    )
+    return _resolve(
+        n,
+        score,
+        [
+            ("signal_missing_or_neutral", (signal == "neutral") & require_non_neutral),
+            ("vmc_context_missing", flag("vmc_missing")),
+            ("vmc_data_gap", flag("data_gap") & block_on_data_gap),
+            ("vmc_gold_dot_no_long", up & flag("gold_no_buy")),
+            ("vmc_directional_signal_missing", ~directional_ok),
+            ("vmc_signal_too_old", ~age_fresh),
+            ("score_below_threshold", score < min_pass_score),
+        ],
+        "vmc_cipher_gate_pass",
+    )
+
+
+def vmc_divergence_reversal_kernel(columns: Columns, config: dict[str, Any]) -> KernelResult:
+    defaults = {
+        "requireNonNeutralSignal": True,
+        "blockOnDataGap": True,
+        "requireRegularDiv": True,
+        "allowHiddenDiv": False,
+        "requireCrossAlignment": True,
+        "requireExtremeZone": True,
+        "maxDivergenceAgeBars": 8,
+        "minPassScore": 65,
+    }
+    config = {**defaults, **config}
+    n = _length(columns)
+    signal = columns["signal"]
+
+    require_non_neutral = _as_bool(config.get("requireNonNeutralSignal"), True)
+    block_on_data_gap = _as_bool(config.get("blockOnDataGap"), True)
+    require_regular_div = _as_bool(config.get("requireRegularDiv"), True)
+    allow_hidden_div = _as_bool(config.get("allowHiddenDiv"), False)
+    require_cross_alignment = _as_bool(config.get("requireCrossAlignment"), True)
+    require_extreme_zone = _as_bool(config.get("requireExtremeZone"), True)
+    max_div_age = _cfg_age(config, "maxDivergenceAgeBars", 8)
+    min_pass_score = _cfg_float(config, "minPassScore", 65.0)
+
+    def flag(key: str) -> np.ndarray:
+        return _col(columns, key, n, bool)
+
+    up = signal == "up"
+    down = signal == "down"
+    regular_div = np.zeros(n, dtype=bool)
+    any_div = np.zeros(n, dtype=bool)
+    divergence_age = np.full(n, np.nan)
+    for branch in ("wt", "rsi", "stoch"):
+        regular = (up & (flag(f"{branch}_bullish") | flag(f"{branch}_bullishAdd"))) | (
+            down & (flag(f"{branch}_bearish") | flag(f"{branch}_bearishAdd"))
+        )
+        hidden = (up & flag(f"{branch}_bullishHidden")) | (down & flag(f"{branch}_bearishHidden"))
+        regular_div |= regular
+        any_div |= regular | (allow_hidden_div & hidden)
+        branch_age = np.where(
+            up,
+            _col(columns, f"{branch}_bullish_age", n),
+            np.where(down, _col(columns, f"{branch}_bearish_age", n), np.nan),
+        )
+        divergence_age = np.fmin(divergence_age, branch_age)
+    divergence_fresh = divergence_age <= max_div_age
+
+    cross_aligned = (up & flag("cross_up")) | (down & flag("cross_down"))
+    zone_aligned = (up & flag("oversold")) | (down & flag("overbought"))
+
+    score = np.round(
+        np.clip(
+            20.0
+            + 35.0 * any_div
+            + 15.0 * regular_div
+            + 15.0 * cross_aligned
+            + 10.0 * zone_aligned
+            + 5.0 * divergence_fresh,
+            0.0,
+            100.0,
+        )
+    )
+    return _resolve(
+        n,
+        score,
+        [
+            ("signal_missing_or_neutral", (signal == "neutral") & require_non_neutral),
+            ("vmc_context_missing", flag("vmc_missing")),
+            ("vmc_data_gap", flag("data_gap") & block_on_data_gap),
+            ("vmc_gold_dot_no_long", up & flag("gold_no_buy")),
+            ("vmc_divergence_missing", (require_regular_div & ~regular_div) | ~any_div),
+            ("vmc_divergence_stale", ~divergence_fresh),
+            ("vmc_cross_conflict", ~cross_aligned & require_cross_alignment),
+            ("vmc_zone_not_extreme", ~zone_aligned & require_extreme_zone),
+            ("score_below_threshold", score < min_pass_score),
+        ],
+        "vmc_divergence_reversal_pass",
+    )
+
+
+KERNELS: dict[str, Kernel] = {
+    "regime_gate": regime_gate_kernel,
+    "signal_filter": signal_filter_kernel,
+    "trend_vol_gate": trend_vol_gate_kernel,
+    "ta_trend_vol_gate_v2": ta_trend_vol_gate_v2_kernel,
+    "smart_money_concept": smart_money_concept_kernel,
+    "vmc_cipher_gate": vmc_cipher_gate_kernel,
+    "vmc_divergence_reversal": vmc_divergence_reversal_kernel,
+}
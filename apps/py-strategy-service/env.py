@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import os
+
+
+def env_int(name: str, default: int, min_value: int) -> int:
+    try:
+        parsed = int(os.getenv(name, str(default)))
+    except Exception:
+        parsed = default
+    return max(min_value, parsed)
+
+
+def env_float(name: str, default: float, min_value: float | None = None, max_value: float | None = None) -> float:
+    try:
+        parsed = float(os.getenv(name, str(default)))
+    except Exception:
+        parsed = default
+    if min_value is not None:
+        parsed = max(min_value, parsed)
+    if max_value is not None:
+        parsed = min(max_value, parsed)
+    return parsed
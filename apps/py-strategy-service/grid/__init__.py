@@ -1,11 +1,67 @@
-from .models import GridPlanRequest, GridPlanResponse, GridPreviewRequest, GridPreviewResponse
-from .planner import plan, preview
+from typing import Any
+
+from .batch import batch_chunks, parallel_min_items, plan_batch_item, validate_batch_item
+from .models import (
+    GridCacheStatsResponse,
+    GridPlanBatchItem,
+    GridPlanBatchRequest,
+    GridPlanBatchResponse,
+    GridPlanRequest,
+    GridPlanResponse,
+    GridPreviewRequest,
+    GridPreviewResponse,
+    GridSessionDeltaRequest,
+    GridSessionDropResponse,
+    GridSessionPlanResponse,
+)
+from .planner import SIZING_CACHE, GridSizing, SizingCache, cache_stats, compute_sizing, plan, preview
+from .sessions import (
+    SESSION_STORE,
+    GridSessionNotFound,
+    GridSessionStore,
+    GridSessionVersionMismatch,
+    restore_sessions,
+    snapshot_sessions,
+)
 
 __all__ = [
+    "GridCacheStatsResponse",
+    "GridPlanBatchItem",
+    "GridPlanBatchRequest",
+    "GridPlanBatchResponse",
     "GridPlanRequest",
     "GridPlanResponse",
     "GridPreviewRequest",
     "GridPreviewResponse",
+    "GridSessionDeltaRequest",
+    "GridSessionDropResponse",
+    "GridSessionNotFound",
+    "GridSessionPlanResponse",
+    "GridSessionStore",
+    "GridSessionVersionMismatch",
+    "GridSimulationResult",
+    "SESSION_STORE",
+    "GridSizing",
+    "SIZING_CACHE",
+    "SizingCache",
+    "batch_chunks",
+    "cache_stats",
+    "compute_sizing",
+    "parallel_min_items",
+    "plan_batch_item",
+    "restore_sessions",
+    "simulate_grid",
+    "snapshot_sessions",
+    "validate_batch_item",
     "preview",
     "plan",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # The simulator imports NumPy at module top; load it on first use so `import grid` stays NumPy-free.
+    if name in ("GridSimulationResult", "simulate_grid"):
+        from . import simulator
+
+        return getattr(simulator, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
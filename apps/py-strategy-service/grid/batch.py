@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Tuple
+
+from pydantic import ValidationError
+
+from env import env_int
+
+from .models import GridPlanBatchItem, GridPlanRequest
+from .planner import plan
+
+
+def parallel_min_items() -> int:
+    """PY_GRID_BATCH_PARALLEL_MIN: smallest batch that is split across the CPU pool (when it runs)."""
+    return env_int("PY_GRID_BATCH_PARALLEL_MIN", 16, 1)
+
+
+def validate_batch_item(index: int, raw: Any) -> GridPlanRequest | GridPlanBatchItem:
+    instance_id = raw.get("instanceId") if isinstance(raw, dict) and isinstance(raw.get("instanceId"), str) else None
+    try:
+        return GridPlanRequest.model_validate(raw)
+    except ValidationError:
+        return GridPlanBatchItem(index=index, ok=False, instanceId=instance_id, error="invalid_request")
+
+
+def plan_batch_item(index: int, payload: GridPlanRequest) -> GridPlanBatchItem:
+    try:
+        result = plan(payload)
+    except Exception:
+        return GridPlanBatchItem(index=index, ok=False, instanceId=payload.instanceId, error="grid_plan_failed")
+    return GridPlanBatchItem(index=index, ok=True, instanceId=payload.instanceId, result=result)
+
+
+def _level_key(payload: GridPlanRequest) -> Tuple[float, float, int, str]:
+    return (float(payload.lowerPrice), float(payload.upperPrice), int(payload.gridCount), payload.gridMode)
+
+
+def batch_chunks(pending: Dict[int, GridPlanRequest], parts: int) -> List[List[int]]:
+    """Split batch indexes into at most `parts` chunks of similar size.
+
+    Instances sharing a level grid (same symbol range, count and mode) stay in one chunk
+    while the group fits in `ceil(len(pending) / parts)`, so each worker computes those
+    levels and static sizing once and hits its caches for the rest of the group. Larger
+    groups are split across chunks; each worker then misses the caches once for its piece.
+    """
+    if not pending:
+        return []
+    parts = max(1, parts)
+    cap = -(-len(pending) // parts)
+    groups: Dict[Tuple[float, float, int, str], List[int]] = {}
+    for index, payload in pending.items():
+        groups.setdefault(_level_key(payload), []).append(index)
+
+    pieces = [group[start : start + cap] for group in groups.values() for start in range(0, len(group), cap)]
+    chunks: List[List[int]] = [[] for _ in range(min(parts, len(pieces)))]
+    for piece in sorted(pieces, key=len, reverse=True):
+        min(chunks, key=len).extend(piece)
+    return [sorted(chunk) for chunk in chunks]
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import bisect
 import math
-from typing import List
+import threading
+from collections import OrderedDict
+from typing import Any, List, Sequence
+
+from env import env_int
 
 
 def round6(value: float) -> float:
@@ -20,32 +25,100 @@ def ceil_to_step(value: float, step: float) -> float:
     return math.ceil(value / step) * step
 
 
-def grid_levels(lower: float, upper: float, count: int, mode: str) -> List[float]:
+def _compute_grid_levels(lower: float, upper: float, count: int, mode: str) -> tuple[float, ...]:
     if count < 2:
-        return [round6(lower), round6(upper)]
+        return (round6(lower), round6(upper))
     if mode == "geometric":
         ratio = math.pow(upper / lower, 1.0 / count)
-        return [round6(lower * math.pow(ratio, idx)) for idx in range(count + 1)]
+        return tuple(round6(lower * math.pow(ratio, idx)) for idx in range(count + 1))
     step = (upper - lower) / count
-    return [round6(lower + step * idx) for idx in range(count + 1)]
+    return tuple(round6(lower + step * idx) for idx in range(count + 1))
+
+
+class LevelCache:
+    """Bounded LRU of computed grid levels keyed by (lower, upper, count, mode).
+
+    Levels are stored as tuples; a read-only NumPy view is built on first request so the
+    planner's import path stays free of NumPy.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[tuple[float, float, int, str], list[Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _entry(self, lower: float, upper: float, count: int, mode: str) -> list[Any]:
+        key = (float(lower), float(upper), int(count), str(mode))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = [_compute_grid_levels(*key), None]
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def levels(self, lower: float, upper: float, count: int, mode: str) -> tuple[float, ...]:
+        return self._entry(lower, upper, count, mode)[0]
+
+    def array(self, lower: float, upper: float, count: int, mode: str) -> Any:
+        entry = self._entry(lower, upper, count, mode)
+        if entry[1] is None:
+            import numpy as np
+
+            values = np.asarray(entry[0], dtype=np.float64)
+            values.setflags(write=False)
+            entry[1] = values
+        return entry[1]
+
+
+LEVEL_CACHE = LevelCache(max_entries=env_int("PY_GRID_LEVEL_CACHE_SIZE", 256, 1))
+
+
+def grid_levels(lower: float, upper: float, count: int, mode: str) -> List[float]:
+    return list(LEVEL_CACHE.levels(lower, upper, count, mode))
 
 
-def nearest_level_indexes(levels: List[float], price: float) -> tuple[int, int]:
-    if not levels:
+def grid_level_array(lower: float, upper: float, count: int, mode: str) -> Any:
+    """Cached read-only float64 NumPy array of `grid_levels` (shared, do not mutate)."""
+    return LEVEL_CACHE.array(lower, upper, count, mode)
+
+
+def nearest_level_indexes(levels: Sequence[float], price: float) -> tuple[int, int]:
+    """Indexes of the level pair bracketing `price` in ascending `levels`; O(log n) via bisect."""
+    if len(levels) == 0:
         return (0, 0)
     if price <= levels[0]:
         return (0, 1 if len(levels) > 1 else 0)
     if price >= levels[-1]:
         idx = len(levels) - 1
         return (idx - 1 if idx > 0 else idx, idx)
-    lower_idx = 0
-    upper_idx = len(levels) - 1
-    for idx in range(len(levels) - 1):
-        if levels[idx] <= price <= levels[idx + 1]:
-            lower_idx = idx
-            upper_idx = idx + 1
-            break
-    return (lower_idx, upper_idx)
+    # First level >= price; levels[upper - 1] < price <= levels[upper], which is the first
+    # bracketing pair a left-to-right scan would find.
+    upper_idx = bisect.bisect_left(levels, price)
+    return (upper_idx - 1, upper_idx)
 
 
 def estimate_liq_price(mode: str, mark: float, leverage: float, slippage_pct: float) -> float | None:
@@ -120,6 +193,47 @@ def compute_qty_for_constraints(
     return (round6(qty), checks)
 
 
+def compute_qty_array_for_constraints(
+    qty_raw: Any,
+    min_qty: float | None,
+    qty_step: float | None,
+    min_notional: float | None,
+    prices: Any,
+) -> tuple[Any, dict]:
+    """`compute_qty_for_constraints` over NumPy arrays, with each qty checked at its own level price."""
+    import numpy as np
+
+    checks = {
+        "minQtyHit": False,
+        "minNotionalHit": False,
+        "roundedByStep": False,
+    }
+    qty = np.maximum(np.asarray(qty_raw, dtype=np.float64), 0.0)
+    prices = np.asarray(prices, dtype=np.float64)
+    if min_qty is not None and min_qty > 0:
+        below = qty < min_qty
+        if below.any():
+            qty = np.where(below, min_qty, qty)
+            checks["minQtyHit"] = True
+
+    if qty_step is not None and qty_step > 0:
+        rounded = np.ceil(qty / qty_step) * qty_step
+        checks["roundedByStep"] = bool((np.abs(rounded - qty) > 1e-12).any())
+        qty = rounded
+
+    if min_notional is not None and min_notional > 0:
+        short = (prices > 0) & (qty * prices < min_notional)
+        if short.any():
+            needed = np.maximum(qty, min_notional / np.where(prices > 0, prices, 1.0))
+            if qty_step is not None and qty_step > 0:
+                needed = np.ceil(needed / qty_step) * qty_step
+                checks["roundedByStep"] = True
+            qty = np.where(short, needed, qty)
+            checks["minNotionalHit"] = True
+
+    return (np.round(qty, 6), checks)
+
+
 def effective_grid_slots(mode: str, grid_count: int) -> int:
     if mode in ("neutral", "cross"):
         return max(2, grid_count * 2)
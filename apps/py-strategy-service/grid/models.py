@@ -161,6 +161,24 @@ class GridPlanRequest(BaseModel):
         return value
 
 
+class GridCacheStatsResponse(BaseModel):
+    levels: Dict[str, int] = Field(default_factory=dict)
+    sizing: Dict[str, Any] = Field(default_factory=dict)
+    sessions: Dict[str, Any] = Field(default_factory=dict)
+
+
+class GridSessionDeltaRequest(BaseModel):
+    """One tick against a stored session: only what changed since `baseVersion`."""
+
+    baseVersion: int = Field(ge=1)
+    markPrice: float = Field(gt=0)
+    fillEvents: List[Dict[str, Any]] = Field(default_factory=list)
+    cancels: List[str] = Field(default_factory=list)
+    orderUpdates: List[GridOrderSnapshot] = Field(default_factory=list)
+    position: Optional[GridPositionSnapshot] = None
+    stateJson: Dict[str, Any] = Field(default_factory=dict)
+
+
 class GridIntent(BaseModel):
     type: GridIntentType
     side: Optional[str] = None
@@ -183,3 +201,32 @@ class GridPlanResponse(BaseModel):
     windowMeta: Dict[str, Any] = Field(default_factory=dict)
     risk: Dict[str, Any] = Field(default_factory=dict)
     reasonCodes: List[str] = Field(default_factory=list)
+
+
+class GridPlanBatchRequest(BaseModel):
+    # Items stay untyped here so one malformed entry is reported per item instead of failing the batch.
+    items: List[Any] = Field(default_factory=list, max_length=1000)
+
+
+class GridPlanBatchItem(BaseModel):
+    index: int
+    ok: bool
+    instanceId: Optional[str] = None
+    result: Optional[GridPlanResponse] = None
+    error: Optional[str] = None
+
+
+class GridPlanBatchResponse(BaseModel):
+    items: List[GridPlanBatchItem] = Field(default_factory=list)
+    okCount: int = 0
+    errorCount: int = 0
+
+
+class GridSessionPlanResponse(GridPlanResponse):
+    instanceId: str
+    sessionVersion: int
+
+
+class GridSessionDropResponse(BaseModel):
+    instanceId: str
+    dropped: bool
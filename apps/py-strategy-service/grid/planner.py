@@ -1,19 +1,27 @@
 from __future__ import annotations
 
-import os
-from typing import Any, Dict, List, Tuple
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+from env import env_float, env_int
 
 from .math import (
+    LEVEL_CACHE,
+    compute_qty_array_for_constraints,
     compute_qty_for_constraints,
     effective_grid_slots,
     estimate_liq_with_mmr,
     estimate_liq_price,
-    grid_levels,
+    grid_level_array,
     min_notional_from_constraints,
     nearest_level_indexes,
     round6,
 )
 from .models import GridIntent, GridLevel, GridPlanRequest, GridPlanResponse, GridPreviewRequest, GridPreviewResponse
+from .reconcile import DesiredOrder, reconcile_orders
 
 
 def _reference_price(mark_price: float | None, levels: List[float]) -> float:
@@ -24,12 +32,6 @@ def _reference_price(mark_price: float | None, levels: List[float]) -> float:
     return (levels[0] + levels[-1]) / 2.0
 
 
-def _per_grid_values(invest_usd: float, leverage: float, grid_count: int, reference_price: float) -> Tuple[float, float]:
-    per_grid_notional = (invest_usd * leverage) / max(1, grid_count)
-    per_grid_qty = per_grid_notional / max(reference_price, 1e-9)
-    return (round6(per_grid_notional), round6(per_grid_qty))
-
-
 def _side_slots(mode: str, grid_count: int) -> Tuple[int, int]:
     if mode == "long":
         return (max(1, grid_count), 0)
@@ -54,6 +56,31 @@ def _side_budget_split(mode: str, policy: str, long_pct: float, short_pct: float
     return (50.0, 50.0)
 
 
+# WEIGHTED_NEAR_PRICE: a level's weight halves every `gridCount * share` levels away from the mark,
+# down to a floor (relative to the nearest level) that keeps far levels tradable.
+WEIGHTED_HALF_LIFE_SHARE = 0.25
+WEIGHTED_MIN_WEIGHT = 0.25
+# DYNAMIC_BY_PRICE_POSITION never starves either cross leg below this share of the budget.
+DYNAMIC_SPLIT_MIN_PCT = 10.0
+
+
+def _dynamic_budget_split(lower_price: float, upper_price: float, reference_price: float) -> Tuple[float, float]:
+    # Low in the range the long leg gets more budget, high in the range the short leg.
+    span = max(upper_price - lower_price, 1e-9)
+    position = max(0.0, min(1.0, (reference_price - lower_price) / span))
+    long_pct = max(DYNAMIC_SPLIT_MIN_PCT, min(100.0 - DYNAMIC_SPLIT_MIN_PCT, (1.0 - position) * 100.0))
+    return (long_pct, 100.0 - long_pct)
+
+
+def _near_price_weights(count: int, center: int) -> Any:
+    """Per-level weights with mean 1, largest at the `center` level (NumPy array)."""
+    import numpy as np
+
+    half_life = max(1.0, count * WEIGHTED_HALF_LIFE_SHARE)
+    weights = np.maximum(np.exp2(-np.abs(np.arange(count) - center) / half_life), WEIGHTED_MIN_WEIGHT)
+    return weights / weights.mean()
+
+
 def _seed_side(mode: str, mark_price: float, lower_price: float, upper_price: float) -> str:
     if mode == "long":
         return "buy"
@@ -111,42 +138,6 @@ def _profit_per_grid(levels: List[float], reference_price: float, taker_pct: flo
     return (round6(net_pct), round6(net_pct / 100.0))
 
 
-def _env_float(name: str, default: float, min_value: float | None = None, max_value: float | None = None) -> float:
-    try:
-        parsed = float(os.getenv(name, str(default)))
-    except Exception:
-        parsed = default
-    if min_value is not None:
-        parsed = max(min_value, parsed)
-    if max_value is not None:
-        parsed = min(max_value, parsed)
-    return parsed
-
-
-def _resolve_venue_inputs(payload: GridPreviewRequest | GridPlanRequest, reference_price: float) -> Tuple[float | None, float | None, float | None, float, bool]:
-    constraints = payload.venueConstraints
-    min_qty = float(constraints.minQty) if constraints and constraints.minQty and constraints.minQty > 0 else None
-    qty_step = float(constraints.qtyStep) if constraints and constraints.qtyStep and constraints.qtyStep > 0 else None
-    raw_min_notional = (
-        float(constraints.minNotional)
-        if constraints and constraints.minNotional and constraints.minNotional > 0
-        else None
-    )
-    if raw_min_notional is None:
-        fallback = _env_float("GRID_MIN_NOTIONAL_FALLBACK_USDT", 5.0, 0.0, None)
-        raw_min_notional = fallback if fallback > 0 else None
-    min_notional, fallback_used = min_notional_from_constraints(raw_min_notional, min_qty, reference_price)
-    if min_notional is None:
-        min_notional = 0.0
-
-    fee_rate = (
-        float(constraints.feeRate)
-        if constraints and constraints.feeRate is not None and constraints.feeRate >= 0
-        else _env_float("GRID_FEE_RATE_FALLBACK_PCT", payload.feeModel.takerPct, 0.0, 20.0)
-    )
-    return (min_qty, qty_step, min_notional, fee_rate, fallback_used)
-
-
 def _build_risk_snapshot(
     *,
     mode: str,
@@ -165,12 +156,12 @@ def _build_risk_snapshot(
     mmr_pct = (
         mmr_pct_override
         if mmr_pct_override is not None
-        else _env_float("GRID_LIQ_MMR_DEFAULT_PCT", 0.75, 0.01, 20.0)
+        else env_float("GRID_LIQ_MMR_DEFAULT_PCT", 0.75, 0.01, 20.0)
     )
     liq_distance_min_pct = (
         liq_distance_min_pct_override
         if liq_distance_min_pct_override is not None
-        else _env_float("GRID_LIQ_DISTANCE_MIN_PCT", 8.0, 0.0, 100.0)
+        else env_float("GRID_LIQ_DISTANCE_MIN_PCT", 8.0, 0.0, 100.0)
     )
     entry_price = entry_price_override if entry_price_override and entry_price_override > 0 else mark_price
     collateral = invest_usd + (extra_margin_usd or 0.0)
@@ -218,26 +209,138 @@ def _build_risk_snapshot(
     }
 
 
-def preview(payload: GridPreviewRequest) -> GridPreviewResponse:
-    levels = grid_levels(payload.lowerPrice, payload.upperPrice, payload.gridCount, payload.gridMode)
-    reference_price = _reference_price(payload.markPrice, levels)
-    min_qty, qty_step, min_notional, fee_rate_pct, fallback_used = _resolve_venue_inputs(payload, reference_price)
+@dataclass
+class GridSizing:
+    """Pure sizing result shared by `preview` and `plan`; no pydantic models involved."""
+
+    levels: List[float]
+    reference_price: float
+    min_qty: float | None
+    qty_step: float | None
+    min_notional: float
+    fee_rate_pct: float
+    fallback_used: bool
+    validation_errors: List[str]
+    allocation_mode: str
+    slots_long: int
+    slots_short: int
+    slots: int
+    long_budget_pct: float
+    short_budget_pct: float
+    effective_grid_invest_usd: float
+    seed_ratio: float
+    qty_long: float
+    qty_short: float
+    checks: Dict[str, bool]
+    per_grid_qty: float
+    per_grid_notional: float
+    side_notional_per_order_long: float
+    side_notional_per_order_short: float
+    net_pct: float
+    net_fraction: float
+    min_notional_adjusted: float
+    min_invest_long: float
+    min_invest_short: float
+    min_invest_for_seed_fraction: float
+    min_investment_usdt: float
+    initial_seed: Dict[str, Any]
+    # WEIGHTED_NEAR_PRICE only: rounded per-level qty; qty_long/qty_short hold their mean.
+    level_qty_long: Tuple[float, ...] | None = None
+    level_qty_short: Tuple[float, ...] | None = None
+
+    @property
+    def profit_per_grid_usd(self) -> float:
+        return round6(self.per_grid_notional * self.net_fraction)
+
+    def min_investment_breakdown(self) -> Dict[str, float]:
+        return {
+            "long": round6(self.min_invest_long),
+            "short": round6(self.min_invest_short),
+            "seed": round6(self.min_invest_for_seed_fraction),
+            "total": round6(self.min_investment_usdt),
+        }
+
+    def allocation_breakdown(self, mode: str) -> Dict[str, Any]:
+        return {
+            "mode": "NEUTRAL_FULL_BUDGET_ONE_WAY" if mode == "neutral" else self.allocation_mode,
+            "slotsLong": self.slots_long,
+            "slotsShort": self.slots_short,
+            "longBudgetPct": round6(self.long_budget_pct) if mode == "cross" else None,
+            "shortBudgetPct": round6(self.short_budget_pct) if mode == "cross" else None,
+            "sideNotionalPerOrderLong": self.side_notional_per_order_long,
+            "sideNotionalPerOrderShort": self.side_notional_per_order_short,
+            "qtyPerOrderLong": self.qty_long,
+            "qtyPerOrderShort": self.qty_short,
+            "effectiveGridInvestUsd": round6(self.effective_grid_invest_usd),
+        }
+
+    def qty_model(self, per_level: bool = False) -> Dict[str, Any]:
+        # The per-level arrays are only listed for preview; plan metrics stay O(1) per tick.
+        model: Dict[str, Any] = {
+            "mode": self.allocation_mode,
+            "qtyPerOrder": round6(self.per_grid_qty) if self.allocation_mode == "EQUAL_NOTIONAL_PER_GRID" else None,
+            "qtyBase": round6(self.per_grid_qty) if self.allocation_mode == "EQUAL_BASE_QTY_PER_GRID" else None,
+        }
+        if per_level:
+            model["qtyPerLevelLong"] = list(self.level_qty_long) if self.level_qty_long is not None else None
+            model["qtyPerLevelShort"] = list(self.level_qty_short) if self.level_qty_short is not None else None
+        return model
+
+
+@dataclass(frozen=True)
+class _StaticSizing:
+    # Everything in GridSizing that does not depend on the mark price.
+    levels: Tuple[float, ...]
+    min_qty: float | None
+    qty_step: float | None
+    venue_min_notional: float | None
+    worst_min_notional: float
+    fee_rate_pct: float
+    fee_buffer_pct: float
+    validation_errors: Tuple[str, ...]
+    allocation_mode: str
+    split_policy: str
+    slots_long: int
+    slots_short: int
+    long_budget_pct: float
+    short_budget_pct: float
+    seed_ratio: float
+    effective_grid_invest_usd: float
+    per_grid_notional_raw: float
+    total_notional: float
+    budget_notional_long: float
+    budget_notional_short: float
+    # WEIGHTED_NEAR_PRICE per-level qty only changes with the weight centre (a dynamic split is
+    # taken at the centre's level too), so every tick between two recentres reuses it.
+    weighted_qty: Dict[int, Tuple[Any, ...]] = field(default_factory=dict, compare=False, repr=False)
+
+
+def _static_sizing(payload: GridPreviewRequest | GridPlanRequest) -> _StaticSizing:
+    constraints = payload.venueConstraints
+    min_qty = float(constraints.minQty) if constraints and constraints.minQty and constraints.minQty > 0 else None
+    qty_step = float(constraints.qtyStep) if constraints and constraints.qtyStep and constraints.qtyStep > 0 else None
+    venue_min_notional = (
+        float(constraints.minNotional)
+        if constraints and constraints.minNotional and constraints.minNotional > 0
+        else None
+    )
+    fallback_min_notional = env_float("GRID_MIN_NOTIONAL_FALLBACK_USDT", 5.0, 0.0, None)
+    fee_rate_pct = (
+        float(constraints.feeRate)
+        if constraints and constraints.feeRate is not None and constraints.feeRate >= 0
+        else env_float("GRID_FEE_RATE_FALLBACK_PCT", payload.feeModel.takerPct, 0.0, 20.0)
+    )
+    fee_buffer_pct = payload.feeBufferPct if payload.feeBufferPct is not None else env_float(
+        "GRID_MIN_INVEST_FEE_BUFFER_PCT", 1.0, 0.0, 25.0
+    )
+
     seed_pct = max(0.0, min(60.0, float(payload.initialSeedPct or 0.0)))
     seed_ratio = (seed_pct / 100.0) if payload.initialSeedEnabled and seed_pct > 0 else 0.0
     effective_grid_invest_usd = max(0.0, float(payload.investUsd) * (1.0 - seed_ratio))
-    _, per_grid_qty_raw = _per_grid_values(
-        effective_grid_invest_usd, payload.leverage, payload.gridCount, reference_price
-    )
 
     validation_errors: List[str] = []
     allocation_mode = payload.allocationMode
-    if allocation_mode == "WEIGHTED_NEAR_PRICE":
-        validation_errors.append("allocation_mode_not_implemented")
-        allocation_mode = "EQUAL_NOTIONAL_PER_GRID"
     split_policy = payload.budgetSplitPolicy
-    if split_policy == "DYNAMIC_BY_PRICE_POSITION":
-        validation_errors.append("budget_split_policy_not_implemented")
-        split_policy = "FIXED_50_50"
 
     slots_long, slots_short = _side_slots(payload.mode, payload.gridCount)
     long_budget_pct, short_budget_pct = _side_budget_split(
@@ -260,7 +363,212 @@ def preview(payload: GridPreviewRequest) -> GridPreviewResponse:
         budget_notional_long = total_notional * (long_budget_pct / 100.0)
         budget_notional_short = total_notional * (short_budget_pct / 100.0)
 
-    if allocation_mode == "EQUAL_BASE_QTY_PER_GRID":
+    return _StaticSizing(
+        levels=LEVEL_CACHE.levels(payload.lowerPrice, payload.upperPrice, payload.gridCount, payload.gridMode),
+        min_qty=min_qty,
+        qty_step=qty_step,
+        venue_min_notional=venue_min_notional if venue_min_notional is not None else (fallback_min_notional or None),
+        worst_min_notional=venue_min_notional if venue_min_notional is not None else fallback_min_notional,
+        fee_rate_pct=fee_rate_pct,
+        fee_buffer_pct=fee_buffer_pct,
+        validation_errors=tuple(validation_errors),
+        allocation_mode=allocation_mode,
+        split_policy=split_policy,
+        slots_long=slots_long,
+        slots_short=slots_short,
+        long_budget_pct=long_budget_pct,
+        short_budget_pct=short_budget_pct,
+        seed_ratio=seed_ratio,
+        effective_grid_invest_usd=effective_grid_invest_usd,
+        per_grid_notional_raw=(effective_grid_invest_usd * payload.leverage) / max(1, payload.gridCount),
+        total_notional=total_notional,
+        budget_notional_long=budget_notional_long,
+        budget_notional_short=budget_notional_short,
+    )
+
+
+def _sizing_key(payload: GridPreviewRequest | GridPlanRequest) -> Tuple[Any, ...]:
+    constraints = payload.venueConstraints
+    return (
+        payload.mode,
+        payload.gridMode,
+        payload.allocationMode,
+        payload.budgetSplitPolicy,
+        float(payload.longBudgetPct),
+        float(payload.shortBudgetPct),
+        float(payload.lowerPrice),
+        float(payload.upperPrice),
+        int(payload.gridCount),
+        float(payload.investUsd),
+        float(payload.leverage),
+        float(payload.feeModel.takerPct),
+        payload.feeBufferPct,
+        bool(payload.initialSeedEnabled),
+        payload.initialSeedPct,
+        (constraints.minQty, constraints.qtyStep, constraints.minNotional, constraints.feeRate) if constraints else None,
+    )
+
+
+class SizingCache:
+    """Bounded LRU with TTL of mark-independent sizing, keyed by the static grid parameters.
+
+    Per-tick plans for one instance only change markPrice, openOrders and fillEvents, so
+    everything up to the mark-dependent qty rounding is reused. The TTL bounds how long
+    environment fallbacks (GRID_*_FALLBACK_*) read on a miss can stay in effect.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_sec: float = 300.0) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_sec = max(0.0, ttl_sec)
+        self._entries: OrderedDict[Tuple[Any, ...], Tuple[float, _StaticSizing]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "ttlSec": self.ttl_sec,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def get(self, payload: GridPreviewRequest | GridPlanRequest) -> _StaticSizing:
+        key = _sizing_key(payload)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                if cached[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return cached[1]
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        static = _static_sizing(payload)
+        if self.ttl_sec <= 0:
+            return static
+        with self._lock:
+            self._entries[key] = (now + self.ttl_sec, static)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return static
+
+
+SIZING_CACHE = SizingCache(
+    max_entries=env_int("PY_GRID_SIZING_CACHE_SIZE", 512, 1),
+    ttl_sec=env_float("PY_GRID_SIZING_CACHE_TTL_SEC", 300.0, 0.0, None),
+)
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Counters of the per-process grid caches (levels and static sizing)."""
+    return {"levels": LEVEL_CACHE.stats(), "sizing": SIZING_CACHE.stats()}
+
+
+def _weighted_level_qty(
+    payload: GridPreviewRequest | GridPlanRequest,
+    static: _StaticSizing,
+    center: int,
+    side_notional_long: float,
+    side_notional_short: float,
+) -> Tuple[Any, ...]:
+    # The side notionals are fixed by `static` and `center` (see compute_sizing), so the centre is the key.
+    cached = static.weighted_qty.get(center)
+    if cached is not None:
+        return cached
+    level_prices = grid_level_array(payload.lowerPrice, payload.upperPrice, payload.gridCount, payload.gridMode)
+    weights = _near_price_weights(len(static.levels), center)
+    out: List[Any] = []
+    for side_notional in (side_notional_long, side_notional_short):
+        level_qty, checks = compute_qty_array_for_constraints(
+            side_notional * weights / level_prices, static.min_qty, static.qty_step, static.venue_min_notional, level_prices
+        )
+        # Rounded once per centre so plan ticks index plain floats.
+        out.extend((tuple(round6(max(0.0, qty)) for qty in level_qty.tolist()), checks, round6(float(level_qty.mean()))))
+    out.append(float(weights.min()))
+    if len(static.weighted_qty) >= 64:
+        static.weighted_qty.clear()
+    static.weighted_qty[center] = result = tuple(out)
+    return result
+
+
+def compute_sizing(
+    payload: GridPreviewRequest | GridPlanRequest,
+    weight_center: int | None = None,
+    static: _StaticSizing | None = None,
+) -> GridSizing:
+    """Levels, per-side qty, venue checks, min-investment and seed for one grid configuration.
+
+    ``weight_center`` is the level WEIGHTED_NEAR_PRICE peaks at; it defaults to the level
+    nearest the mark. plan passes its window centre so qty only moves when the window does.
+    Weighted cross grids also take a DYNAMIC_BY_PRICE_POSITION split at that level's price.
+    ``static`` is the SIZING_CACHE entry for ``payload`` when the caller already looked it up.
+    """
+    if static is None:
+        static = SIZING_CACHE.get(payload)
+    levels = list(static.levels)
+    reference_price = _reference_price(payload.markPrice, levels)
+    min_qty = static.min_qty
+    qty_step = static.qty_step
+    min_notional, fallback_used = min_notional_from_constraints(static.venue_min_notional, min_qty, reference_price)
+    if min_notional is None:
+        min_notional = 0.0
+    fee_rate_pct = static.fee_rate_pct
+    seed_ratio = static.seed_ratio
+    effective_grid_invest_usd = static.effective_grid_invest_usd
+    per_grid_qty_raw = round6(static.per_grid_notional_raw / max(reference_price, 1e-9))
+    allocation_mode = static.allocation_mode
+    slots_long, slots_short = static.slots_long, static.slots_short
+    long_budget_pct, short_budget_pct = static.long_budget_pct, static.short_budget_pct
+    budget_notional_long = static.budget_notional_long
+    budget_notional_short = static.budget_notional_short
+    center = None
+    if allocation_mode == "WEIGHTED_NEAR_PRICE" and levels:
+        center = weight_center if weight_center is not None else _nearest_center_index(levels, reference_price)
+    if static.split_policy == "DYNAMIC_BY_PRICE_POSITION" and payload.mode == "cross":
+        split_price = levels[center] if center is not None else reference_price
+        long_budget_pct, short_budget_pct = _dynamic_budget_split(payload.lowerPrice, payload.upperPrice, split_price)
+        budget_notional_long = static.total_notional * (long_budget_pct / 100.0)
+        budget_notional_short = static.total_notional * (short_budget_pct / 100.0)
+
+    level_qty_long = None
+    level_qty_short = None
+    min_weight = 1.0
+    if center is not None:
+        # Same side budget as EQUAL_NOTIONAL_PER_GRID, shifted towards the levels near the mark;
+        # every level is rounded and checked against the venue minimums at its own price.
+        side_notional_long = budget_notional_long / max(1, slots_long) if slots_long > 0 else 0.0
+        side_notional_short = budget_notional_short / max(1, slots_short) if slots_short > 0 else 0.0
+        (level_qty_long, checks_long, qty_long, level_qty_short, checks_short, qty_short, min_weight) = _weighted_level_qty(
+            payload,
+            static,
+            center,
+            side_notional_long,
+            side_notional_short,
+        )
+    elif allocation_mode == "EQUAL_BASE_QTY_PER_GRID":
         qty_long_raw = (
             budget_notional_long / max(1, slots_long) / max(reference_price, 1e-9)
             if slots_long > 0
@@ -277,8 +585,9 @@ def preview(payload: GridPreviewRequest) -> GridPreviewResponse:
         qty_long_raw = side_notional_long / max(reference_price, 1e-9) if slots_long > 0 else 0.0
         qty_short_raw = side_notional_short / max(reference_price, 1e-9) if slots_short > 0 else 0.0
 
-    qty_long, checks_long = compute_qty_for_constraints(qty_long_raw, min_qty, qty_step, min_notional, reference_price)
-    qty_short, checks_short = compute_qty_for_constraints(qty_short_raw, min_qty, qty_step, min_notional, reference_price)
+    if level_qty_long is None:
+        qty_long, checks_long = compute_qty_for_constraints(qty_long_raw, min_qty, qty_step, min_notional, reference_price)
+        qty_short, checks_short = compute_qty_for_constraints(qty_short_raw, min_qty, qty_step, min_notional, reference_price)
     per_grid_qty = max(per_grid_qty_raw, qty_long, qty_short)
     per_grid_notional = round6(per_grid_qty * reference_price)
     side_notional_per_order_long = round6((qty_long * reference_price) if slots_long > 0 else 0.0)
@@ -286,17 +595,9 @@ def preview(payload: GridPreviewRequest) -> GridPreviewResponse:
 
     net_pct, net_fraction = _profit_per_grid(levels, reference_price, fee_rate_pct)
     slots = max(0, slots_long) + max(0, slots_short)
-    fee_buffer_pct = payload.feeBufferPct if payload.feeBufferPct is not None else _env_float(
-        "GRID_MIN_INVEST_FEE_BUFFER_PCT", 1.0, 0.0, 25.0
-    )
-    raw_min_notional = (
-        float(payload.venueConstraints.minNotional)
-        if payload.venueConstraints and payload.venueConstraints.minNotional and payload.venueConstraints.minNotional > 0
-        else _env_float("GRID_MIN_NOTIONAL_FALLBACK_USDT", 5.0, 0.0, None)
-    )
     worst_price = min(payload.lowerPrice, payload.upperPrice, reference_price)
-    worst_side_min_notional, _ = min_notional_from_constraints(raw_min_notional, min_qty, worst_price)
-    min_notional_adjusted = max(min_notional, worst_side_min_notional or min_notional) * (1.0 + fee_buffer_pct / 100.0)
+    worst_side_min_notional, _ = min_notional_from_constraints(static.worst_min_notional, min_qty, worst_price)
+    min_notional_adjusted = max(min_notional, worst_side_min_notional or min_notional) * (1.0 + static.fee_buffer_pct / 100.0)
 
     if payload.mode == "neutral":
         long_ratio = 1.0 if slots_long > 0 else 0.0
@@ -304,13 +605,14 @@ def preview(payload: GridPreviewRequest) -> GridPreviewResponse:
     else:
         long_ratio = long_budget_pct / 100.0
         short_ratio = short_budget_pct / 100.0
+    # Weighted grids need enough budget for the lightest level to clear the minimum notional.
     min_invest_long = (
-        (min_notional_adjusted * max(0, slots_long)) / max(payload.leverage, 1e-9) / max(long_ratio, 1e-9)
+        (min_notional_adjusted * max(0, slots_long)) / max(payload.leverage, 1e-9) / max(long_ratio, 1e-9) / min_weight
         if slots_long > 0 and long_ratio > 0
         else 0.0
     )
     min_invest_short = (
-        (min_notional_adjusted * max(0, slots_short)) / max(payload.leverage, 1e-9) / max(short_ratio, 1e-9)
+        (min_notional_adjusted * max(0, slots_short)) / max(payload.leverage, 1e-9) / max(short_ratio, 1e-9) / min_weight
         if slots_short > 0 and short_ratio > 0
         else 0.0
     )
@@ -343,12 +645,61 @@ def preview(payload: GridPreviewRequest) -> GridPreviewResponse:
     )
     min_investment_usdt = max(min_invest_for_grid_fraction, min_invest_for_seed_fraction)
 
+    return GridSizing(
+        levels=levels,
+        reference_price=reference_price,
+        min_qty=min_qty,
+        qty_step=qty_step,
+        min_notional=min_notional,
+        fee_rate_pct=fee_rate_pct,
+        fallback_used=fallback_used,
+        validation_errors=list(static.validation_errors),
+        allocation_mode=allocation_mode,
+        slots_long=slots_long,
+        slots_short=slots_short,
+        slots=slots,
+        long_budget_pct=long_budget_pct,
+        short_budget_pct=short_budget_pct,
+        effective_grid_invest_usd=effective_grid_invest_usd,
+        seed_ratio=seed_ratio,
+        qty_long=qty_long,
+        qty_short=qty_short,
+        checks={
+            "minQtyHit": checks_long["minQtyHit"] or checks_short["minQtyHit"],
+            "minNotionalHit": checks_long["minNotionalHit"] or checks_short["minNotionalHit"],
+            "roundedByStep": checks_long["roundedByStep"] or checks_short["roundedByStep"],
+        },
+        per_grid_qty=per_grid_qty,
+        per_grid_notional=per_grid_notional,
+        side_notional_per_order_long=side_notional_per_order_long,
+        side_notional_per_order_short=side_notional_per_order_short,
+        net_pct=net_pct,
+        net_fraction=net_fraction,
+        min_notional_adjusted=min_notional_adjusted,
+        min_invest_long=min_invest_long,
+        min_invest_short=min_invest_short,
+        min_invest_for_seed_fraction=min_invest_for_seed_fraction,
+        # Rounded once here: plan and preview both work from the reported figure.
+        min_investment_usdt=round6(min_investment_usdt),
+        initial_seed=initial_seed,
+        level_qty_long=level_qty_long,
+        level_qty_short=level_qty_short,
+    )
+
+
+def preview(payload: GridPreviewRequest) -> GridPreviewResponse:
+    sizing = compute_sizing(payload)
+    levels = sizing.levels
+    reference_price = sizing.reference_price
+    min_investment_usdt = sizing.min_investment_usdt
+    initial_seed = sizing.initial_seed
+
     risk = _build_risk_snapshot(
         mode=payload.mode,
         grid_count=payload.gridCount,
-        per_grid_qty=per_grid_qty,
-        per_grid_qty_long=qty_long,
-        per_grid_qty_short=qty_short,
+        per_grid_qty=sizing.per_grid_qty,
+        per_grid_qty_long=sizing.qty_long,
+        per_grid_qty_short=sizing.qty_short,
         min_investment_usdt=min_investment_usdt,
         mark_price=reference_price,
         invest_usd=payload.investUsd,
@@ -359,9 +710,9 @@ def preview(payload: GridPreviewRequest) -> GridPreviewResponse:
     warnings: List[str] = []
     if payload.markPrice is not None and (payload.markPrice < payload.lowerPrice or payload.markPrice > payload.upperPrice):
         warnings.append("mark_outside_grid_range")
-    if net_pct <= 0:
+    if sizing.net_pct <= 0:
         warnings.append("net_grid_profit_non_positive")
-    if fallback_used or min_qty is None or qty_step is None:
+    if sizing.fallback_used or sizing.min_qty is None or sizing.qty_step is None:
         warnings.append("constraints_missing_or_fallback_used")
     if payload.investUsd < min_investment_usdt:
         warnings.append("min_investment_above_current_invest")
@@ -370,16 +721,12 @@ def preview(payload: GridPreviewRequest) -> GridPreviewResponse:
     if payload.mode == "neutral":
         warnings.append("neutral_full_budget_mode")
     if initial_seed.get("enabled"):
-        if float(initial_seed.get("seedNotionalUsd", 0.0) or 0.0) + 1e-9 < min_notional_adjusted:
+        if float(initial_seed.get("seedNotionalUsd", 0.0) or 0.0) + 1e-9 < sizing.min_notional_adjusted:
             warnings.append("seed_below_venue_min_notional")
-        if effective_grid_invest_usd <= 0:
+        if sizing.effective_grid_invest_usd <= 0:
             warnings.append("seed_consumes_all_grid_invest")
 
-    checks = {
-        "minQtyHit": checks_long["minQtyHit"] or checks_short["minQtyHit"],
-        "minNotionalHit": checks_long["minNotionalHit"] or checks_short["minNotionalHit"],
-        "roundedByStep": checks_long["roundedByStep"] or checks_short["roundedByStep"],
-    }
+    checks = sizing.checks
     preview_center_idx = _nearest_center_index(levels, reference_price)
     preview_window_size = max(1, min(int(payload.activeOrderWindowSize), 120))
     preview_buy_target, preview_sell_target = _window_targets(payload.mode, preview_window_size, None)
@@ -397,11 +744,11 @@ def preview(payload: GridPreviewRequest) -> GridPreviewResponse:
 
     return GridPreviewResponse(
         levels=[GridLevel(index=idx, price=price) for idx, price in enumerate(levels)],
-        perGridQty=per_grid_qty,
-        perGridNotional=per_grid_notional,
-        profitPerGridNetPct=net_pct,
-        profitPerGridNetUsd=round6(per_grid_notional * net_fraction),
-        profitPerGridEstimateUSDT=round6(per_grid_notional * net_fraction),
+        perGridQty=sizing.per_grid_qty,
+        perGridNotional=sizing.per_grid_notional,
+        profitPerGridNetPct=sizing.net_pct,
+        profitPerGridNetUsd=sizing.profit_per_grid_usd,
+        profitPerGridEstimateUSDT=sizing.profit_per_grid_usd,
         liqEstimate=estimate_liq_price(payload.mode, reference_price, payload.leverage, payload.slippagePct),
         liqEstimateLong=risk.get("liqEstimateLong"),
         liqEstimateShort=risk.get("liqEstimateShort"),
@@ -409,40 +756,20 @@ def preview(payload: GridPreviewRequest) -> GridPreviewResponse:
         worstCaseLiqDistancePct=risk.get("worstCaseLiqDistancePct"),
         liqDistanceMinPct=risk.get("liqDistanceMinPct"),
         entryBlockedByLiq=bool(risk.get("entryBlockedByLiq")),
-        minInvestmentUSDT=round6(min_investment_usdt),
-        minInvestmentBreakdown={
-            "long": round6(min_invest_long),
-            "short": round6(min_invest_short),
-            "seed": round6(min_invest_for_seed_fraction),
-            "total": round6(min_investment_usdt),
-        },
+        minInvestmentUSDT=min_investment_usdt,
+        minInvestmentBreakdown=sizing.min_investment_breakdown(),
         initialSeed=initial_seed,
-        effectiveGridSlots=slots,
-        allocationBreakdown={
-            "mode": "NEUTRAL_FULL_BUDGET_ONE_WAY" if payload.mode == "neutral" else allocation_mode,
-            "slotsLong": slots_long,
-            "slotsShort": slots_short,
-            "longBudgetPct": round6(long_budget_pct) if payload.mode == "cross" else None,
-            "shortBudgetPct": round6(short_budget_pct) if payload.mode == "cross" else None,
-            "sideNotionalPerOrderLong": side_notional_per_order_long,
-            "sideNotionalPerOrderShort": side_notional_per_order_short,
-            "qtyPerOrderLong": qty_long,
-            "qtyPerOrderShort": qty_short,
-            "effectiveGridInvestUsd": round6(effective_grid_invest_usd),
-        },
-        qtyModel={
-            "mode": allocation_mode,
-            "qtyPerOrder": round6(per_grid_qty) if allocation_mode == "EQUAL_NOTIONAL_PER_GRID" else None,
-            "qtyBase": round6(per_grid_qty) if allocation_mode == "EQUAL_BASE_QTY_PER_GRID" else None,
-        },
-        qtyPerOrderRounded=per_grid_qty,
+        effectiveGridSlots=sizing.slots,
+        allocationBreakdown=sizing.allocation_breakdown(payload.mode),
+        qtyModel=sizing.qty_model(per_level=True),
+        qtyPerOrderRounded=sizing.per_grid_qty,
         venueChecks={
             "minQtyHit": checks["minQtyHit"],
             "minNotionalHit": checks["minNotionalHit"],
             "roundedByStep": checks["roundedByStep"],
-            "fallbackUsed": fallback_used,
-            "minQtyUsed": round6(min_qty) if min_qty is not None else None,
-            "minNotionalUsed": round6(min_notional) if min_notional is not None else None,
+            "fallbackUsed": sizing.fallback_used,
+            "minQtyUsed": round6(sizing.min_qty) if sizing.min_qty is not None else None,
+            "minNotionalUsed": round6(sizing.min_notional) if sizing.min_notional is not None else None,
         },
         windowMeta={
             "activeOrdersTotal": len(preview_buy_indexes) + len(preview_sell_indexes),
@@ -464,7 +791,7 @@ def preview(payload: GridPreviewRequest) -> GridPreviewResponse:
             "positionQty": 0.0,
         },
         warnings=warnings,
-        validationErrors=validation_errors,
+        validationErrors=list(sizing.validation_errors),
     )
 
 
@@ -477,6 +804,27 @@ def _nearest_center_index(levels: List[float], mark_price: float) -> int:
     return max(0, min(len(levels) - 1, upper_idx))
 
 
+def _fill_center_index(fill_events: List[Dict[str, Any]], instance_id: str, level_count: int) -> int | None:
+    """Grid index of the last fill that names one (`gridIndex`, else the grid clientOrderId suffix)."""
+    prefix = f"grid-{instance_id}-"
+    for event in reversed(fill_events or []):
+        if not isinstance(event, dict):
+            continue
+        raw = event.get("gridIndex")
+        if raw is None:
+            client_id = str(event.get("clientOrderId") or "").strip()
+            if not client_id.startswith(prefix):
+                continue
+            raw = client_id.rsplit("-", 1)[-1]
+        try:
+            idx = int(raw)
+        except (TypeError, ValueError):
+            continue
+        if 0 <= idx < level_count:
+            return idx
+    return None
+
+
 def _window_targets(mode: str, window_size: int, position_side: str | None) -> Tuple[int, int]:
     half_up = (window_size + 1) // 2
     half_down = window_size // 2
@@ -501,8 +849,9 @@ def _resolve_window_indexes(
     target_sells: int,
     window_size: int,
 ) -> Tuple[List[int], List[int], int, int]:
-    lower_indexes = list(range(center_idx - 1, -1, -1))
-    upper_indexes = list(range(center_idx + 1, level_count))
+    # Ranges keep this O(window) on wide grids; only the used slices become lists.
+    lower_indexes = range(center_idx - 1, -1, -1)
+    upper_indexes = range(center_idx + 1, level_count)
     buys = min(target_buys, len(lower_indexes))
     sells = min(target_sells, len(upper_indexes))
     allocated = buys + sells
@@ -517,7 +866,7 @@ def _resolve_window_indexes(
         elif upper_spare > 0:
             sells += 1
         remaining -= 1
-    return lower_indexes[:buys], upper_indexes[:sells], buys, sells
+    return list(lower_indexes[:buys]), list(upper_indexes[:sells]), buys, sells
 
 
 def _desired_orders(
@@ -526,9 +875,9 @@ def _desired_orders(
     per_grid_qty_long: float,
     per_grid_qty_short: float,
     center_idx: int,
-) -> Tuple[List[GridIntent], Dict[str, Any]]:
-    desired: List[GridIntent] = []
-
+    level_qty_long: Sequence[float] | None = None,
+    level_qty_short: Sequence[float] | None = None,
+) -> Tuple[List[DesiredOrder], Dict[str, Any]]:
     position_side = None
     position_qty = 0.0
     if payload.position and payload.position.side in ("long", "short"):
@@ -549,41 +898,49 @@ def _desired_orders(
         window_size=window_size,
     )
 
-    def add_intent(side: str, idx: int, leg: str, qty: float, reduce_only: bool = False):
-        if idx < 0 or idx >= len(levels):
-            return
-        desired.append(
-            GridIntent(
-                type="place_order",
-                side=side,
-                price=round6(levels[idx]),
-                qty=round6(max(0.0, qty)),
-                reduceOnly=reduce_only,
-                clientOrderId=f"grid-{payload.instanceId}-{leg}-{idx}",
-                gridLeg=leg,
-                gridIndex=idx,
+    if payload.mode == "short":
+        buy_leg, buy_qty, buy_reduce = "short", per_grid_qty_short, True
+    elif payload.mode == "neutral":
+        buy_leg, buy_qty, buy_reduce = "long", per_grid_qty_long, position_side == "short"
+    else:
+        # long/cross
+        buy_leg, buy_qty, buy_reduce = "long", per_grid_qty_long, False
+    if payload.mode == "long":
+        sell_leg, sell_qty, sell_reduce = "long", per_grid_qty_long, True
+    elif payload.mode == "neutral":
+        sell_leg, sell_qty, sell_reduce = "short", per_grid_qty_short, position_side == "long"
+    else:
+        # short/cross
+        sell_leg, sell_qty, sell_reduce = "short", per_grid_qty_short, False
+
+    # Plain tuples: reconcile_orders only builds intents for the few orders a tick changes.
+    prefix = f"grid-{payload.instanceId}-"
+    leg_levels = {"long": level_qty_long, "short": level_qty_short}
+    desired: List[DesiredOrder] = []
+    for side, indexes, leg, qty, reduce_only in (
+        ("buy", buy_indexes, buy_leg, buy_qty, buy_reduce),
+        ("sell", sell_indexes, sell_leg, sell_qty, sell_reduce),
+    ):
+        per_level = leg_levels[leg]
+        if per_level is None:
+            qty = round6(max(0.0, qty))
+            desired.extend(
+                DesiredOrder(f"{prefix}{leg}-{idx}", side, round6(levels[idx]), qty, reduce_only, leg, idx) for idx in indexes
+            )
+        elif reduce_only:
+            # A reduce-only order closes the entry one level nearer the centre (a long bought below
+            # a sell, a short sold above a buy), so it takes that entry's qty and round trips net out.
+            entry_qty = leg_levels["long" if side == "sell" else "short"] or per_level
+            step = -1 if side == "sell" else 1
+            desired.extend(
+                DesiredOrder(f"{prefix}{leg}-{idx}", side, round6(levels[idx]), entry_qty[idx + step], True, leg, idx)
+                for idx in indexes
             )
-        )
-
-    for idx in buy_indexes:
-        if payload.mode == "short":
-            add_intent("buy", idx, "short", per_grid_qty_short, True)
-        elif payload.mode == "neutral":
-            reduce_only = position_side == "short"
-            add_intent("buy", idx, "long", per_grid_qty_long, reduce_only)
-        else:
-            # long/cross
-            add_intent("buy", idx, "long", per_grid_qty_long, False)
-
-    for idx in sell_indexes:
-        if payload.mode == "long":
-            add_intent("sell", idx, "long", per_grid_qty_long, True)
-        elif payload.mode == "neutral":
-            reduce_only = position_side == "long"
-            add_intent("sell", idx, "short", per_grid_qty_short, reduce_only)
         else:
-            # short/cross
-            add_intent("sell", idx, "short", per_grid_qty_short, False)
+            desired.extend(
+                DesiredOrder(f"{prefix}{leg}-{idx}", side, round6(levels[idx]), per_level[idx], False, leg, idx)
+                for idx in indexes
+            )
 
     active_indexes = buy_indexes + sell_indexes
     buy_prices = [levels[idx] for idx in buy_indexes if 0 <= idx < len(levels)]
@@ -609,61 +966,69 @@ def _desired_orders(
     return desired, window_meta
 
 
-def _normalize_open_order_price(value: Any) -> float | None:
-    try:
-        parsed = float(value)
-    except Exception:
-        return None
-    if parsed <= 0:
-        return None
-    return round6(parsed)
+def _qty_drift_pct() -> float | None:
+    # GRID_QTY_DRIFT_PCT: replace an open order whose qty is off by more than this share of the
+    # desired qty (and more than one qtyStep). Off (0) by default: equal-notional qty follows the
+    # mark, so any setting below the expected mark move replaces the whole window.
+    pct = env_float("GRID_QTY_DRIFT_PCT", 0.0, 0.0, 100.0)
+    return pct if pct > 0 else None
 
 
 def plan(payload: GridPlanRequest) -> GridPlanResponse:
-    preview_result = preview(
-        GridPreviewRequest(
-            mode=payload.mode,
-            gridMode=payload.gridMode,
-            allocationMode=payload.allocationMode,
-            budgetSplitPolicy=payload.budgetSplitPolicy,
-            longBudgetPct=payload.longBudgetPct,
-            shortBudgetPct=payload.shortBudgetPct,
-            lowerPrice=payload.lowerPrice,
-            upperPrice=payload.upperPrice,
-            gridCount=payload.gridCount,
-            activeOrderWindowSize=payload.activeOrderWindowSize,
-            recenterDriftLevels=payload.recenterDriftLevels,
-            investUsd=payload.investUsd,
-            leverage=payload.leverage,
-            markPrice=payload.markPrice,
-            slippagePct=payload.slippagePct,
-            tpPct=payload.tpPct,
-            slPct=payload.slPct,
-            triggerPrice=payload.triggerPrice,
-            trailingEnabled=payload.trailingEnabled,
-            feeModel=payload.feeModel,
-            venueConstraints=payload.venueConstraints,
-            feeBufferPct=payload.feeBufferPct,
-            mmrPct=payload.mmrPct,
-            extraMarginUsd=payload.extraMarginUsd,
-            initialSeedEnabled=payload.initialSeedEnabled,
-            initialSeedPct=payload.initialSeedPct,
-        )
-    )
+    # The window centre only needs the cached levels; sizing is computed around it below.
+    static = SIZING_CACHE.get(payload)
+    static_levels = static.levels
+    state_json_in = payload.stateJson if isinstance(payload.stateJson, dict) else {}
+    prior_center_idx = None
+    try:
+        parsed_center = int(state_json_in.get("windowCenterIndex"))  # type: ignore[arg-type]
+        if 0 <= parsed_center < len(static_levels):
+            prior_center_idx = parsed_center
+    except Exception:
+        prior_center_idx = None
+    nearest_center_idx = _nearest_center_index(static_levels, payload.markPrice)
+    has_fill_events = len(payload.fillEvents or []) > 0
+    drift_levels = abs(nearest_center_idx - prior_center_idx) if prior_center_idx is not None else None
+    max_drift_levels = max(1, int(payload.recenterDriftLevels))
+    recenter_reason = "no_change"
+    window_center_idx = nearest_center_idx
+    fill_center_idx = None
+    if prior_center_idx is None:
+        recenter_reason = "seed"
+    elif has_fill_events:
+        # The window follows the last filled level: its counter-order becomes the adjacent
+        # order and one order moves across the window edge, instead of re-deriving the
+        # window from wherever the mark sits between levels.
+        fill_center_idx = _fill_center_index(payload.fillEvents, payload.instanceId, len(static_levels))
+        if fill_center_idx is None:
+            recenter_reason = "fill"
+        elif abs(nearest_center_idx - fill_center_idx) > max_drift_levels:
+            recenter_reason = "drift"
+        else:
+            recenter_reason = "fill"
+            window_center_idx = fill_center_idx
+    elif drift_levels is not None and drift_levels > max_drift_levels:
+        recenter_reason = "drift"
+    else:
+        window_center_idx = prior_center_idx
 
-    levels = [row.price for row in preview_result.levels]
+    # The sizing core reads the same fields from either request model; no preview response is built.
+    # WEIGHTED_NEAR_PRICE peaks at the window centre kept in stateJson rather than the mark's
+    # nearest level, so per-level qty stays put between recentres.
+    sizing = compute_sizing(payload, weight_center=window_center_idx, static=static)
+
+    levels = sizing.levels
     reason_codes: List[str] = []
     intents: List[GridIntent] = []
-    allocation_breakdown = preview_result.allocationBreakdown if isinstance(preview_result.allocationBreakdown, dict) else {}
-    qty_long = float(allocation_breakdown.get("qtyPerOrderLong", preview_result.qtyPerOrderRounded) or 0.0)
-    qty_short = float(allocation_breakdown.get("qtyPerOrderShort", preview_result.qtyPerOrderRounded) or 0.0)
+    qty_long = sizing.qty_long
+    qty_short = sizing.qty_short
     risk = _build_risk_snapshot(
         mode=payload.mode,
         grid_count=payload.gridCount,
-        per_grid_qty=preview_result.qtyPerOrderRounded,
+        per_grid_qty=sizing.per_grid_qty,
         per_grid_qty_long=qty_long,
         per_grid_qty_short=qty_short,
-        min_investment_usdt=preview_result.minInvestmentUSDT,
+        min_investment_usdt=sizing.min_investment_usdt,
         mark_price=payload.markPrice,
         invest_usd=payload.investUsd,
         extra_margin_usd=payload.extraMarginUsd or 0.0,
@@ -677,37 +1042,24 @@ def plan(payload: GridPlanRequest) -> GridPlanResponse:
     if risk.get("entryBlockedByMinInvestment"):
         reason_codes.append("min_investment_above_current_invest")
 
-    state_json_in = payload.stateJson if isinstance(payload.stateJson, dict) else {}
-    prior_center_idx = None
-    try:
-        parsed_center = int(state_json_in.get("windowCenterIndex"))  # type: ignore[arg-type]
-        if 0 <= parsed_center < len(levels):
-            prior_center_idx = parsed_center
-    except Exception:
-        prior_center_idx = None
-    nearest_center_idx = _nearest_center_index(levels, payload.markPrice)
-    has_fill_events = len(payload.fillEvents or []) > 0
-    drift_levels = abs(nearest_center_idx - prior_center_idx) if prior_center_idx is not None else None
-    recenter_reason = "no_change"
-    window_center_idx = nearest_center_idx
-    if prior_center_idx is None:
-        recenter_reason = "seed"
-    elif has_fill_events:
-        recenter_reason = "fill"
-    elif drift_levels is not None and drift_levels > max(1, int(payload.recenterDriftLevels)):
-        recenter_reason = "drift"
-    else:
-        window_center_idx = prior_center_idx
-
     window_recentered = recenter_reason in ("seed", "fill", "drift")
     if window_recentered:
         reason_codes.append(f"window_recentered:{recenter_reason}")
     else:
         reason_codes.append("window_no_change")
 
-    desired_orders, window_meta = _desired_orders(payload, levels, qty_long, qty_short, window_center_idx)
+    desired_orders, window_meta = _desired_orders(
+        payload,
+        levels,
+        qty_long,
+        qty_short,
+        window_center_idx,
+        level_qty_long=sizing.level_qty_long,
+        level_qty_short=sizing.level_qty_short,
+    )
     window_meta["recenterReason"] = recenter_reason
     window_meta["driftLevels"] = drift_levels
+    window_meta["fillCenterIdx"] = fill_center_idx
 
     if payload.triggerPrice is not None:
         if payload.mode in ("long", "neutral", "cross") and payload.markPrice < payload.triggerPrice:
@@ -729,44 +1081,13 @@ def plan(payload: GridPlanRequest) -> GridPlanResponse:
                 risk=risk,
                 reasonCodes=reason_codes,
             )
-    desired_by_client_id = {intent.clientOrderId: intent for intent in desired_orders if intent.clientOrderId}
-
-    existing_client_ids = set()
-    for open_order in payload.openOrders:
-        client_id = (open_order.clientOrderId or "").strip()
-        if not client_id:
-            continue
-        existing_client_ids.add(client_id)
-        desired = desired_by_client_id.get(client_id)
-        if desired is None:
-            intents.append(
-                GridIntent(
-                    type="cancel_order",
-                    clientOrderId=client_id,
-                    exchangeOrderId=open_order.exchangeOrderId,
-                )
-            )
-            continue
-        existing_price = _normalize_open_order_price(open_order.price)
-        desired_price = round6(float(desired.price or 0)) if desired.price else None
-        if desired_price is not None and existing_price is not None and abs(existing_price - desired_price) > 1e-6:
-            intents.append(
-                GridIntent(
-                    type="replace_order",
-                    clientOrderId=client_id,
-                    exchangeOrderId=open_order.exchangeOrderId,
-                    side=desired.side,
-                    price=desired.price,
-                    qty=desired.qty,
-                    reduceOnly=desired.reduceOnly,
-                    gridLeg=desired.gridLeg,
-                    gridIndex=desired.gridIndex,
-                )
-            )
-
-    for client_id, desired in desired_by_client_id.items():
-        if client_id not in existing_client_ids:
-            intents.append(desired)
+    reconciliation = reconcile_orders(
+        desired_orders,
+        payload.openOrders,
+        qty_drift_pct=_qty_drift_pct(),
+        qty_step=sizing.qty_step,
+    )
+    intents.extend(reconciliation.intents)
 
     if payload.tpPct is not None or payload.slPct is not None:
         tp_price = None
@@ -808,20 +1129,21 @@ def plan(payload: GridPlanRequest) -> GridPlanResponse:
     }
 
     metrics_delta = {
-        "plannedOrders": len([row for row in intents if row.type == "place_order"]),
-        "cancelledOrders": len([row for row in intents if row.type == "cancel_order"]),
-        "replacedOrders": len([row for row in intents if row.type == "replace_order"]),
-        "profitPerGridNetPct": preview_result.profitPerGridNetPct,
-        "perGridNotional": preview_result.perGridNotional,
+        "plannedOrders": reconciliation.placed,
+        "cancelledOrders": reconciliation.cancelled,
+        "replacedOrders": reconciliation.replaced,
+        "qtyDriftReplacedOrders": reconciliation.qty_drift_replaced,
+        "profitPerGridNetPct": sizing.net_pct,
+        "perGridNotional": sizing.per_grid_notional,
         "allocationMode": payload.allocationMode,
         "budgetSplitPolicy": payload.budgetSplitPolicy,
-        "minInvestmentBreakdown": preview_result.minInvestmentBreakdown,
-        "initialSeed": preview_result.initialSeed,
-        "allocationBreakdown": preview_result.allocationBreakdown,
-        "qtyModel": preview_result.qtyModel,
-        "profitPerGridEstimateUSDT": preview_result.profitPerGridEstimateUSDT,
-        "minInvestmentUSDT": preview_result.minInvestmentUSDT,
-        "qtyPerOrderRounded": preview_result.qtyPerOrderRounded,
+        "minInvestmentBreakdown": sizing.min_investment_breakdown(),
+        "initialSeed": dict(sizing.initial_seed),
+        "allocationBreakdown": sizing.allocation_breakdown(payload.mode),
+        "qtyModel": sizing.qty_model(),
+        "profitPerGridEstimateUSDT": sizing.profit_per_grid_usd,
+        "minInvestmentUSDT": sizing.min_investment_usdt,
+        "qtyPerOrderRounded": sizing.per_grid_qty,
         "liqEstimateLong": risk.get("liqEstimateLong"),
         "liqEstimateShort": risk.get("liqEstimateShort"),
         "worstCaseLiqDistancePct": risk.get("worstCaseLiqDistancePct"),
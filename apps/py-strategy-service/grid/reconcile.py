@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, NamedTuple, Sequence
+
+from .models import GridIntent, GridOrderSnapshot
+
+
+class DesiredOrder(NamedTuple):
+    """A window order the planner wants open; it only becomes a `GridIntent` when placed or replaced."""
+
+    clientOrderId: str
+    side: str
+    price: float
+    qty: float
+    reduceOnly: bool
+    gridLeg: str
+    gridIndex: int
+
+    def place_intent(self) -> GridIntent:
+        return GridIntent(type="place_order", **self._asdict())
+
+
+@dataclass
+class Reconciliation:
+    """Intents that turn the open orders into the desired window, with their counts."""
+
+    intents: List[GridIntent] = field(default_factory=list)
+    placed: int = 0
+    cancelled: int = 0
+    replaced: int = 0
+    qty_drift_replaced: int = 0
+
+
+def reconcile_orders(
+    desired: Sequence[GridIntent | DesiredOrder],
+    open_orders: Sequence[GridOrderSnapshot],
+    *,
+    qty_drift_pct: float | None = None,
+    qty_step: float | None = None,
+) -> Reconciliation:
+    """Diff desired place intents against open orders keyed by clientOrderId.
+
+    Open orders without a desired counterpart are cancelled, desired orders without an open
+    one are placed, and matches are replaced when the price moved or (with `qty_drift_pct`)
+    the qty drifted beyond tolerance. Cancels and replaces keep the open-order sequence,
+    places keep the desired sequence.
+    """
+    # clientOrderId encodes (instance, gridLeg, gridIndex), so the key sets carry the order identity.
+    wanted: Dict[str, GridIntent | DesiredOrder] = {intent.clientOrderId: intent for intent in desired if intent.clientOrderId}
+    keys = [(order.clientOrderId or "").strip() for order in open_orders]
+    missing = wanted.keys() - set(keys)
+    check_qty = qty_drift_pct is not None
+    step = qty_step or 0.0
+    tolerances: Dict[float, float] = {}
+
+    out = Reconciliation()
+    for order, client_id in zip(open_orders, keys):
+        if not client_id:
+            continue
+        intent = wanted.get(client_id)
+        if intent is None:
+            out.intents.append(
+                GridIntent(type="cancel_order", clientOrderId=client_id, exchangeOrderId=order.exchangeOrderId)
+            )
+            out.cancelled += 1
+            continue
+
+        # Prices compare at the planner's 6-decimal resolution; equal floats (the usual case) skip rounding.
+        desired_price = intent.price
+        existing_price = order.price
+        price_drift = bool(
+            existing_price != desired_price
+            and desired_price
+            and existing_price is not None
+            and existing_price > 0
+            and abs(round(existing_price, 6) - round(desired_price, 6)) > 1e-6
+        )
+        qty_drift = False
+        if check_qty and not price_drift and order.qty != intent.qty and order.qty is not None and intent.qty:
+            tolerance = tolerances.get(intent.qty)
+            if tolerance is None:
+                # Anything within one venue step (or the tolerance) is noise from a moving mark price.
+                tolerance = tolerances[intent.qty] = max(intent.qty * qty_drift_pct / 100.0, step) + 1e-12
+            qty_drift = abs(order.qty - intent.qty) > tolerance
+        if price_drift or qty_drift:
+            out.intents.append(
+                GridIntent(
+                    type="replace_order",
+                    clientOrderId=client_id,
+                    exchangeOrderId=order.exchangeOrderId,
+                    side=intent.side,
+                    price=intent.price,
+                    qty=intent.qty,
+                    reduceOnly=intent.reduceOnly,
+                    gridLeg=intent.gridLeg,
+                    gridIndex=intent.gridIndex,
+                )
+            )
+            out.replaced += 1
+            out.qty_drift_replaced += qty_drift
+
+    if missing:
+        for client_id, intent in wanted.items():
+            if client_id in missing:
+                out.intents.append(intent if isinstance(intent, GridIntent) else intent.place_intent())
+        out.placed = len(missing)
+    return out
+
+
+def apply_intents(orders: List[GridOrderSnapshot], intents: List[GridIntent]) -> List[GridOrderSnapshot]:
+    """Open orders as they will be once the client has executed `intents`."""
+    by_client_id: Dict[str, GridOrderSnapshot] = OrderedDict()
+    anonymous: List[GridOrderSnapshot] = []
+    for order in orders:
+        client_id = (order.clientOrderId or "").strip()
+        if client_id:
+            by_client_id[client_id] = order
+        else:
+            anonymous.append(order)
+
+    for intent in intents:
+        client_id = (intent.clientOrderId or "").strip()
+        if not client_id:
+            continue
+        if intent.type == "cancel_order":
+            by_client_id.pop(client_id, None)
+        elif intent.type == "replace_order":
+            current = by_client_id.get(client_id)
+            if current is not None:
+                by_client_id[client_id] = current.model_copy(
+                    update={"side": intent.side, "price": intent.price, "qty": intent.qty, "reduceOnly": intent.reduceOnly}
+                )
+        elif intent.type == "place_order":
+            by_client_id[client_id] = GridOrderSnapshot(
+                clientOrderId=client_id,
+                side=intent.side,
+                price=intent.price,
+                qty=intent.qty,
+                reduceOnly=intent.reduceOnly,
+                status="new",
+            )
+    return anonymous + list(by_client_id.values())
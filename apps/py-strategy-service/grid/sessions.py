@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from env import env_float, env_int
+
+from .models import (
+    GridOrderSnapshot,
+    GridPlanRequest,
+    GridSessionDeltaRequest,
+    GridSessionPlanResponse,
+)
+from .planner import plan
+from .reconcile import apply_intents
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+class GridSessionNotFound(LookupError):
+    """No live session for the instance (never opened, expired or evicted): resync with a full request."""
+
+
+class GridSessionVersionMismatch(ValueError):
+    """The client's `baseVersion` is not the stored version: its view has drifted, resync with a full request."""
+
+    def __init__(self, instance_id: str, expected: int, received: int) -> None:
+        super().__init__(f"{instance_id}: expected version {expected}, got {received}")
+        self.expected = expected
+        self.received = received
+
+
+def snapshot_path() -> str | None:
+    """PY_GRID_SESSION_SNAPSHOT_PATH: file written on shutdown and read on startup; unset disables it.
+
+    Ignored with PY_UVICORN_WORKERS > 1: every process would write the same file and restore
+    the last writer's sessions, which another process was serving.
+    """
+    raw = os.getenv("PY_GRID_SESSION_SNAPSHOT_PATH", "").strip()
+    if not raw or env_int("PY_UVICORN_WORKERS", 1, 1) > 1:
+        return None
+    return raw
+
+
+@dataclass
+class GridSession:
+    request: GridPlanRequest
+    version: int
+    expires_at: float
+    updated_at: float
+    filled: Dict[str, float] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+def _apply_fills(
+    orders: List[GridOrderSnapshot], fill_events: List[Dict[str, Any]], filled: Dict[str, float]
+) -> List[GridOrderSnapshot]:
+    """Drop fully filled orders; `filled` carries cumulative fill qty per clientOrderId across ticks.
+
+    Partially filled orders stay as placed, like the runner's order map reports them.
+    """
+    touched = set()
+    for event in fill_events:
+        client_id = str(event.get("clientOrderId") or "").strip()
+        if not client_id:
+            continue
+        try:
+            fill_qty = float(event.get("fillQty") or 0.0)
+        except (TypeError, ValueError):
+            fill_qty = 0.0
+        filled[client_id] = filled.get(client_id, 0.0) + max(0.0, fill_qty)
+        touched.add(client_id)
+    if not touched:
+        return orders
+
+    out: List[GridOrderSnapshot] = []
+    for order in orders:
+        client_id = (order.clientOrderId or "").strip()
+        # Unknown order or fill qty counts as a full fill.
+        if client_id in touched and (order.qty is None or filled[client_id] <= 0 or filled[client_id] >= float(order.qty) - 1e-12):
+            filled.pop(client_id, None)
+            continue
+        out.append(order)
+    return out
+
+
+def _apply_order_deltas(
+    orders: List[GridOrderSnapshot], cancels: List[str], updates: List[GridOrderSnapshot]
+) -> List[GridOrderSnapshot]:
+    removed = {client_id.strip() for client_id in cancels if client_id.strip()}
+    by_client_id = {(update.clientOrderId or "").strip(): update for update in updates if (update.clientOrderId or "").strip()}
+    out: List[GridOrderSnapshot] = []
+    for order in orders:
+        client_id = (order.clientOrderId or "").strip()
+        if client_id in removed:
+            continue
+        update = by_client_id.pop(client_id, None)
+        if update is not None:
+            order = order.model_copy(update=update.model_dump(exclude_unset=True))
+        out.append(order)
+    out.extend(update for client_id, update in by_client_id.items() if client_id not in removed)
+    return out
+
+
+class GridSessionStore:
+    """Per-`instanceId` grid state kept between ticks, bounded by an LRU and a TTL.
+
+    A session starts from a full `GridPlanRequest`. Each tick then sends a
+    `GridSessionDeltaRequest`. The store applies fills, cancels and order updates to the
+    stored open orders and plans. Once planned, it assumes the returned intents are
+    executed. Every plan bumps the version; a delta against any other version raises
+    `GridSessionVersionMismatch`, so the client resyncs instead of trading on drifted state.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_sec: float = 900.0) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_sec = max(1.0, ttl_sec)
+        self._sessions: OrderedDict[str, GridSession] = OrderedDict()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.deltas = 0
+        self.misses = 0
+        self.conflicts = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+            self.opened = 0
+            self.deltas = 0
+            self.misses = 0
+            self.conflicts = 0
+            self.evictions = 0
+            self.expirations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._sessions),
+                "maxEntries": self.max_entries,
+                "ttlSec": self.ttl_sec,
+                "opened": self.opened,
+                "deltas": self.deltas,
+                "misses": self.misses,
+                "conflicts": self.conflicts,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def version(self, instance_id: str) -> int | None:
+        with self._lock:
+            session = self._live(instance_id, time.monotonic())
+            return session.version if session is not None else None
+
+    def _live(self, instance_id: str, now: float) -> GridSession | None:
+        # Caller holds self._lock.
+        session = self._sessions.get(instance_id)
+        if session is not None and session.expires_at <= now:
+            del self._sessions[instance_id]
+            self.expirations += 1
+            return None
+        return session
+
+    def _store(self, instance_id: str, session: GridSession) -> None:
+        # Caller holds self._lock.
+        self._sessions[instance_id] = session
+        self._sessions.move_to_end(instance_id)
+        while len(self._sessions) > self.max_entries:
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+    def _respond(self, session: GridSession, request: GridPlanRequest) -> GridSessionPlanResponse:
+        # Caller holds session.lock.
+        result = plan(request)
+        orders = apply_intents(request.openOrders, result.intents)
+        session.request = request.model_copy(
+            update={
+                "openOrders": orders,
+                "stateJson": {**request.stateJson, **result.nextStateJson},
+                "fillEvents": [],
+            }
+        )
+        # Replaced orders start over on the venue; closed ones need no fill tally.
+        replaced = {intent.clientOrderId for intent in result.intents if intent.type == "replace_order"}
+        open_ids = {order.clientOrderId for order in orders}
+        session.filled = {
+            client_id: qty for client_id, qty in session.filled.items() if client_id in open_ids and client_id not in replaced
+        }
+        session.version += 1
+        session.updated_at = time.time()
+        session.expires_at = time.monotonic() + self.ttl_sec
+        return GridSessionPlanResponse(
+            **result.model_dump(), instanceId=request.instanceId, sessionVersion=session.version
+        )
+
+    def open(self, payload: GridPlanRequest) -> GridSessionPlanResponse:
+        """Full sync: (re)start the session from a complete request and plan it."""
+        with self._lock:
+            previous = self._live(payload.instanceId, time.monotonic())
+            # Versions keep counting across resyncs so a stale client never matches again. The
+            # skipped version is the one a delta still running on `previous` may hand out.
+            session = GridSession(
+                request=payload,
+                version=previous.version + 1 if previous is not None else 0,
+                expires_at=time.monotonic() + self.ttl_sec,
+                updated_at=time.time(),
+            )
+            # Locked before it is published: a delta racing the resync waits for the new version.
+            session.lock.acquire()
+            self._store(payload.instanceId, session)
+            self.opened += 1
+        try:
+            return self._respond(session, payload)
+        finally:
+            session.lock.release()
+
+    def plan_delta(self, instance_id: str, delta: GridSessionDeltaRequest) -> GridSessionPlanResponse:
+        with self._lock:
+            session = self._live(instance_id, time.monotonic())
+            if session is None:
+                self.misses += 1
+                raise GridSessionNotFound(instance_id)
+            self._sessions.move_to_end(instance_id)
+        with session.lock:
+            if delta.baseVersion != session.version:
+                with self._lock:
+                    self.conflicts += 1
+                raise GridSessionVersionMismatch(instance_id, session.version, delta.baseVersion)
+            base = session.request
+            orders = _apply_fills(base.openOrders, delta.fillEvents, session.filled)
+            orders = _apply_order_deltas(orders, delta.cancels, delta.orderUpdates)
+            request = base.model_copy(
+                update={
+                    "markPrice": delta.markPrice,
+                    "openOrders": orders,
+                    "position": delta.position if delta.position is not None else base.position,
+                    "stateJson": {**base.stateJson, **delta.stateJson},
+                    "fillEvents": delta.fillEvents,
+                }
+            )
+            response = self._respond(session, request)
+        with self._lock:
+            self.deltas += 1
+        return response
+
+    def drop(self, instance_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(instance_id, None) is not None
+
+    def snapshot(self, path: str) -> int:
+        """Write live sessions to `path` (atomically); returns how many were written."""
+        now = time.monotonic()
+        with self._lock:
+            sessions = [(instance_id, session) for instance_id, session in self._sessions.items() if session.expires_at > now]
+        rows: List[Dict[str, Any]] = []
+        for instance_id, session in sessions:
+            with session.lock:
+                rows.append(
+                    {
+                        "instanceId": instance_id,
+                        "sessionVersion": session.version,
+                        "updatedAt": session.updated_at,
+                        "request": session.request.model_dump(mode="json", exclude={"fillEvents"}),
+                        "filled": dict(session.filled),
+                    }
+                )
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Per process, so two writers never interleave in one temp file.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({"format": SNAPSHOT_FORMAT_VERSION, "savedAt": time.time(), "sessions": rows}, handle)
+        os.replace(tmp_path, path)
+        return len(rows)
+
+    def restore(self, path: str) -> int:
+        """Load sessions written by `snapshot`, skipping ones older than the TTL; returns how many were restored."""
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        if not isinstance(data, dict) or data.get("format") != SNAPSHOT_FORMAT_VERSION:
+            return 0
+        wall_now = time.time()
+        now = time.monotonic()
+        restored: List[Tuple[str, GridSession]] = []
+        for row in data.get("sessions") or []:
+            try:
+                age = max(0.0, wall_now - float(row["updatedAt"]))
+                if age >= self.ttl_sec:
+                    continue
+                request = GridPlanRequest.model_validate(row["request"])
+                restored.append(
+                    (
+                        request.instanceId,
+                        GridSession(
+                            request=request,
+                            version=int(row["sessionVersion"]),
+                            expires_at=now + self.ttl_sec - age,
+                            updated_at=float(row["updatedAt"]),
+                            filled={str(key): float(value) for key, value in (row.get("filled") or {}).items()},
+                        ),
+                    )
+                )
+            except Exception:
+                # A damaged row only costs that instance a resync.
+                continue
+        restored.sort(key=lambda item: item[1].updated_at)
+        with self._lock:
+            for instance_id, session in restored:
+                self._store(instance_id, session)
+        return len(restored)
+
+
+SESSION_STORE = GridSessionStore(
+    max_entries=env_int("PY_GRID_SESSION_MAX", 1000, 1),
+    ttl_sec=env_float("PY_GRID_SESSION_TTL_SEC", 900.0, 1.0),
+)
+
+
+def restore_sessions(path: str | None = None) -> int:
+    target = path or snapshot_path()
+    if not target:
+        return 0
+    try:
+        return SESSION_STORE.restore(target)
+    except Exception:
+        # Unreadable snapshot: start empty, clients resync on their next tick.
+        return 0
+
+
+def snapshot_sessions(path: str | None = None) -> int:
+    target = path or snapshot_path()
+    if not target:
+        return 0
+    try:
+        return SESSION_STORE.snapshot(target)
+    except OSError:
+        # Shutdown must not fail on an unwritable path; sessions are rebuilt by resyncs.
+        return 0
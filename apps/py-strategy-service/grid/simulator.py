@@ -0,0 +1,471 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from env import env_float
+
+from .math import LEVEL_CACHE, estimate_liq_with_mmr, round6
+from .models import GridOrderSnapshot, GridPlanRequest, GridPositionSnapshot
+from .planner import (
+    _fill_center_index,
+    _nearest_center_index,
+    _qty_drift_pct,
+    _resolve_window_indexes,
+    _window_targets,
+    compute_sizing,
+    plan,
+)
+from .reconcile import apply_intents
+
+FUNDING_INTERVAL_MS = 8 * 60 * 60 * 1000
+SIMULATION_ENGINES = {"fast", "planner"}
+
+# Book entries: (clientOrderId, side (+1 buy / -1 sell), price, qty, reduceOnly).
+_Order = Tuple[str, int, float, float, bool]
+
+
+@dataclass
+class GridSimulationResult:
+    """Outcome of one replay: per-bar equity plus fills and counters."""
+
+    ts: np.ndarray
+    equity: np.ndarray
+    fills: List[Tuple[int, str, int, float, float, float]]
+    invest_usd: float
+    turnover_usd: float = 0.0
+    fees_usd: float = 0.0
+    funding_usd: float = 0.0
+    realized_pnl_usd: float = 0.0
+    recenters: Dict[str, int] = field(default_factory=lambda: {"seed": 0, "fill": 0, "drift": 0})
+    plans: int = 0
+    liquidated_at: int | None = None
+    worst_liq_distance_pct: float | None = None
+    elapsed_ms: float = 0.0
+
+    def fill_rows(self) -> List[Dict[str, Any]]:
+        return [
+            {"ts": ts, "clientOrderId": client_id, "side": "buy" if side > 0 else "sell", "price": price, "qty": qty, "feeUsd": fee}
+            for ts, client_id, side, price, qty, fee in self.fills
+        ]
+
+    def max_drawdown_pct(self) -> float:
+        if self.equity.size == 0:
+            return 0.0
+        peak = np.maximum.accumulate(self.equity)
+        drawdown = (peak - self.equity) / np.where(peak > 0, peak, 1.0)
+        return round6(float(drawdown.max()) * 100.0)
+
+    def summary(self) -> Dict[str, Any]:
+        final_equity = float(self.equity[-1]) if self.equity.size else self.invest_usd
+        return {
+            "bars": int(self.equity.size),
+            "finalEquityUsd": round6(final_equity),
+            "returnPct": round6((final_equity / self.invest_usd - 1.0) * 100.0) if self.invest_usd > 0 else 0.0,
+            "maxDrawdownPct": self.max_drawdown_pct(),
+            "fills": len(self.fills),
+            "turnoverUsd": round6(self.turnover_usd),
+            "feesUsd": round6(self.fees_usd),
+            "fundingUsd": round6(self.funding_usd),
+            "realizedPnlUsd": round6(self.realized_pnl_usd),
+            "recenters": dict(self.recenters),
+            "plans": self.plans,
+            "liquidated": self.liquidated_at is not None,
+            "liquidatedAt": self.liquidated_at,
+            "worstLiqDistancePct": round6(self.worst_liq_distance_pct) if self.worst_liq_distance_pct is not None else None,
+            "elapsedMs": round(self.elapsed_ms, 1),
+        }
+
+
+class _Replay:
+    def __init__(
+        self,
+        template: GridPlanRequest,
+        ts: np.ndarray,
+        values: np.ndarray,
+        engine: str,
+        funding_rate_pct: float,
+        funding_interval_ms: int,
+    ) -> None:
+        self.template = template
+        self.engine = engine
+        self.ts = np.ascontiguousarray(ts, dtype=np.int64)
+        self.open = np.ascontiguousarray(values[:, 0], dtype=np.float64)
+        self.high = np.ascontiguousarray(values[:, 1], dtype=np.float64)
+        self.low = np.ascontiguousarray(values[:, 2], dtype=np.float64)
+        self.close = np.ascontiguousarray(values[:, 3], dtype=np.float64)
+        self.n = int(self.close.shape[0])
+
+        self.levels = list(LEVEL_CACHE.levels(template.lowerPrice, template.upperPrice, template.gridCount, template.gridMode))
+        self.level_count = len(self.levels)
+        self.window_size = max(1, min(int(template.activeOrderWindowSize), 120))
+        self.drift_levels = max(1, int(template.recenterDriftLevels))
+        self.qty_drift_pct = _qty_drift_pct()
+        self.mmr_pct = (
+            template.mmrPct if template.mmrPct is not None else env_float("GRID_LIQ_MMR_DEFAULT_PCT", 0.75, 0.01, 20.0)
+        )
+        sizing = compute_sizing(template.model_copy(update={"markPrice": float(self.open[0])}))
+        self.fee_pct = sizing.fee_rate_pct
+        self.qty_step = sizing.qty_step
+
+        # Funding is charged on bars that open a funding interval, on the position held through them.
+        funding_bars = (self.ts % max(1, funding_interval_ms)) == 0
+        self.funding_rate = funding_rate_pct / 100.0
+        self.funding_cum = np.concatenate(([0.0], np.cumsum(np.where(funding_bars, self.close, 0.0))))
+
+        self.book: Dict[str, _Order] = {}
+        self.best_buy = -np.inf
+        self.best_sell = np.inf
+        self._client_id_cache: Dict[str, List[str]] = {}
+        self.snapshots: List[GridOrderSnapshot] = []
+        self.state_json: Dict[str, Any] = {}
+        self.center: int | None = None
+        self.position = 0.0
+        self.entry = 0.0
+        self.wallet = float(template.investUsd) + float(template.extraMarginUsd or 0.0)
+        self.equity = np.empty(self.n, dtype=np.float64)
+        self.result = GridSimulationResult(
+            ts=self.ts, equity=self.equity, fills=[], invest_usd=float(template.investUsd) + float(template.extraMarginUsd or 0.0)
+        )
+
+    # -- accounting -------------------------------------------------------------------------
+
+    def _fill(self, bar: int, client_id: str, side: int, price: float, qty: float, reduce_only: bool) -> float:
+        """Book a fill into the one-way position; returns the filled qty (reduce-only fills are clipped)."""
+        position = self.position
+        if reduce_only:
+            if side > 0 and position < 0:
+                qty = min(qty, -position)
+            elif side < 0 and position > 0:
+                qty = min(qty, position)
+            else:
+                return 0.0
+        if qty <= 0:
+            return 0.0
+        signed = side * qty
+        if position == 0 or (position > 0) == (signed > 0):
+            total = abs(position) + qty
+            self.entry = (self.entry * abs(position) + price * qty) / total
+            self.position = position + signed
+        else:
+            closing = min(qty, abs(position))
+            pnl = (price - self.entry) * closing * (1.0 if position > 0 else -1.0)
+            self.wallet += pnl
+            self.result.realized_pnl_usd += pnl
+            self.position = position + signed
+            if abs(self.position) <= 1e-12:
+                self.position = 0.0
+                self.entry = 0.0
+            elif (self.position > 0) != (position > 0):
+                self.entry = price
+        notional = price * qty
+        fee = notional * self.fee_pct / 100.0
+        self.wallet -= fee
+        self.result.fees_usd += fee
+        self.result.turnover_usd += notional
+        self.result.fills.append((int(self.ts[bar]), client_id, side, price, qty, fee))
+        return qty
+
+    def _liquidation_price(self) -> float | None:
+        if self.position == 0:
+            return None
+        side = "long" if self.position > 0 else "short"
+        liq, _ = estimate_liq_with_mmr(side, self.entry, self.entry, abs(self.position), self.wallet, self.mmr_pct)
+        return liq
+
+    def _span(self, start: int, end: int) -> None:
+        """Equity and funding for bars [start, end), during which the position is constant."""
+        if end <= start:
+            return
+        position = self.position
+        funding = position * self.funding_rate * (self.funding_cum[start + 1 : end + 1] - self.funding_cum[start])
+        self.equity[start:end] = self.wallet - funding + position * (self.close[start:end] - self.entry)
+        liq = self._liquidation_price()
+        if liq is not None:
+            # Closest the bars came to the liquidation price, in percent of price.
+            if position > 0:
+                extreme = float(self.low[start:end].min())
+                distance = (extreme - liq) / extreme * 100.0
+            else:
+                extreme = float(self.high[start:end].max())
+                distance = (liq - extreme) / extreme * 100.0
+            distance = max(0.0, distance)
+            if self.result.worst_liq_distance_pct is None or distance < self.result.worst_liq_distance_pct:
+                self.result.worst_liq_distance_pct = distance
+        if funding.size and funding[-1] != 0.0:
+            self.wallet -= float(funding[-1])
+            self.result.funding_usd += float(funding[-1])
+
+    # -- planning ----------------------------------------------------------------------------
+
+    def _plan(self, bar: int, mark: float, fill_events: List[Dict[str, Any]]) -> None:
+        self.result.plans += 1
+        if self.engine == "planner":
+            self._plan_with_planner(mark, fill_events)
+        else:
+            self._plan_fast(mark, fill_events)
+
+    def _recenter(self, mark: float, fill_events: List[Dict[str, Any]]) -> int:
+        nearest = _nearest_center_index(self.levels, mark)
+        center = nearest
+        if self.center is None:
+            reason = "seed"
+        elif fill_events:
+            reason = "fill"
+            fill_center = _fill_center_index(fill_events, self.template.instanceId, self.level_count)
+            if fill_center is not None:
+                if abs(nearest - fill_center) > self.drift_levels:
+                    reason = "drift"
+                else:
+                    center = fill_center
+        elif abs(nearest - self.center) > self.drift_levels:
+            reason = "drift"
+        else:
+            return self.center
+        self.result.recenters[reason] += 1
+        self.center = center
+        return center
+
+    def _plan_fast(self, mark: float, fill_events: List[Dict[str, Any]]) -> None:
+        # Same window, side and qty rules as planner._desired_orders and reconcile_orders,
+        # without building request/intent models on every event.
+        center = self._recenter(mark, fill_events)
+        position_side = "long" if self.position > 0 else "short" if self.position < 0 else None
+        target_buys, target_sells = _window_targets(self.template.mode, self.window_size, position_side)
+        buy_indexes, sell_indexes, _, _ = _resolve_window_indexes(
+            center_idx=center,
+            level_count=self.level_count,
+            target_buys=target_buys,
+            target_sells=target_sells,
+            window_size=self.window_size,
+        )
+        sizing = compute_sizing(self.template.model_copy(update={"markPrice": mark}), weight_center=center)
+        qty_long = round6(max(0.0, sizing.qty_long))
+        qty_short = round6(max(0.0, sizing.qty_short))
+        mode = self.template.mode
+
+        if mode == "short":
+            buy_leg, buy_qty, buy_reduce = "short", qty_short, True
+        elif mode == "neutral":
+            buy_leg, buy_qty, buy_reduce = "long", qty_long, position_side == "short"
+        else:
+            buy_leg, buy_qty, buy_reduce = "long", qty_long, False
+        if mode == "long":
+            sell_leg, sell_qty, sell_reduce = "long", qty_long, True
+        elif mode == "neutral":
+            sell_leg, sell_qty, sell_reduce = "short", qty_short, position_side == "long"
+        else:
+            sell_leg, sell_qty, sell_reduce = "short", qty_short, False
+
+        previous = self.book
+        book: Dict[str, _Order] = {}
+        levels = self.levels
+        leg_levels = {"long": sizing.level_qty_long, "short": sizing.level_qty_short}
+        step = self.qty_step or 0.0
+        for indexes, side, leg, qty, reduce_only in (
+            (buy_indexes, 1, buy_leg, buy_qty, buy_reduce),
+            (sell_indexes, -1, sell_leg, sell_qty, sell_reduce),
+        ):
+            client_ids = self._client_ids(leg)
+            per_level = leg_levels[leg]
+            offset = 0
+            if per_level is not None and reduce_only:
+                # Reduce-only orders take the qty of the entry one level nearer the centre.
+                per_level = leg_levels["long" if side < 0 else "short"] or per_level
+                offset = -1 if side < 0 else 1
+            for idx in indexes:
+                if per_level is not None:
+                    qty = per_level[idx + offset]
+                tolerance = (
+                    max(qty * self.qty_drift_pct / 100.0, step) + 1e-12 if self.qty_drift_pct is not None and qty else None
+                )
+                client_id = client_ids[idx]
+                existing = previous.get(client_id)
+                if existing is not None and (tolerance is None or abs(existing[3] - qty) <= tolerance):
+                    # Open orders keep their qty/reduceOnly until a price or qty drift replaces them.
+                    book[client_id] = existing
+                else:
+                    book[client_id] = (client_id, side, levels[idx], qty, reduce_only)
+        self.book = book
+        self.best_buy = levels[max(buy_indexes)] if buy_indexes else -np.inf
+        self.best_sell = levels[min(sell_indexes)] if sell_indexes else np.inf
+
+    def _client_ids(self, leg: str) -> List[str]:
+        client_ids = self._client_id_cache.get(leg)
+        if client_ids is None:
+            prefix = f"grid-{self.template.instanceId}-{leg}-"
+            client_ids = self._client_id_cache[leg] = [f"{prefix}{idx}" for idx in range(self.level_count)]
+        return client_ids
+
+    def _plan_with_planner(self, mark: float, fill_events: List[Dict[str, Any]]) -> None:
+        position = None
+        if self.position != 0:
+            position = GridPositionSnapshot(
+                side="long" if self.position > 0 else "short", qty=abs(self.position), entryPrice=self.entry, markPrice=mark
+            )
+        request = self.template.model_copy(
+            update={
+                "markPrice": mark,
+                "openOrders": self.snapshots,
+                "position": position,
+                "stateJson": self.state_json,
+                "fillEvents": fill_events,
+            }
+        )
+        result = plan(request)
+        reason = result.nextStateJson.get("lastWindowRecenterReason")
+        if reason in self.result.recenters:
+            self.result.recenters[reason] += 1
+        self.center = result.nextStateJson.get("windowCenterIndex", self.center)
+        self.state_json = {**self.state_json, **result.nextStateJson}
+        self.snapshots = apply_intents(self.snapshots, result.intents)
+        self.book = {
+            order.clientOrderId: (
+                order.clientOrderId,
+                1 if order.side == "buy" else -1,
+                float(order.price or 0.0),
+                float(order.qty or 0.0),
+                bool(order.reduceOnly),
+            )
+            for order in self.snapshots
+            if order.clientOrderId and order.price
+        }
+        self.best_buy = max((order[2] for order in self.book.values() if order[1] > 0), default=-np.inf)
+        self.best_sell = min((order[2] for order in self.book.values() if order[1] < 0), default=np.inf)
+
+    # -- event loop --------------------------------------------------------------------------
+
+    def _thresholds(self) -> Tuple[float, float, float, float]:
+        low_trigger = self.best_buy
+        high_trigger = self.best_sell
+        liq = self._liquidation_price()
+        if liq is not None:
+            if self.position > 0:
+                low_trigger = max(low_trigger, liq)
+            else:
+                high_trigger = min(high_trigger, liq)
+
+        # Without fills the planner only recenters once the nearest level is more than
+        # recenterDriftLevels away from the window center.
+        close_low = -np.inf
+        close_high = np.inf
+        if self.center is not None:
+            upper = self.center + self.drift_levels
+            lower = self.center - self.drift_levels
+            if upper + 1 < self.level_count:
+                close_high = (self.levels[upper] + self.levels[upper + 1]) / 2.0
+            if lower - 1 >= 0:
+                close_low = (self.levels[lower - 1] + self.levels[lower]) / 2.0
+        return low_trigger, high_trigger, close_low, close_high
+
+    def _next_event(self, start: int) -> int:
+        low_trigger, high_trigger, close_low, close_high = self._thresholds()
+        size = 64
+        while start < self.n:
+            end = min(self.n, start + size)
+            mask = (self.low[start:end] <= low_trigger) | (self.high[start:end] >= high_trigger)
+            mask |= (self.close[start:end] <= close_low) | (self.close[start:end] > close_high)
+            hit = int(mask.argmax())
+            if mask[hit]:
+                return start + hit
+            start = end
+            size = min(size * 4, 1 << 16)
+        return self.n
+
+    def _event(self, bar: int) -> bool:
+        """Liquidation, fills and the re-plan at the close of `bar`; False once liquidated."""
+        liq = self._liquidation_price()
+        if liq is not None and (
+            (self.position > 0 and self.low[bar] <= liq) or (self.position < 0 and self.high[bar] >= liq)
+        ):
+            self._fill(bar, "liquidation", -1 if self.position > 0 else 1, liq, abs(self.position), True)
+            self.book = {}
+            self.snapshots = []
+            self.best_buy = -np.inf
+            self.best_sell = np.inf
+            self.result.liquidated_at = int(self.ts[bar])
+            self.result.worst_liq_distance_pct = 0.0
+            return False
+
+        low = float(self.low[bar])
+        high = float(self.high[bar])
+        buys: List[_Order] = []
+        sells: List[_Order] = []
+        if low <= self.best_buy or high >= self.best_sell:
+            for order in self.book.values():
+                if order[1] > 0 and order[2] >= low:
+                    buys.append(order)
+                elif order[1] < 0 and order[2] <= high:
+                    sells.append(order)
+            buys.sort(key=lambda row: -row[2])
+            sells.sort(key=lambda row: row[2])
+        # Intrabar path: open -> low -> high -> close on up bars, open -> high -> low -> close otherwise.
+        ordered = buys + sells if self.close[bar] >= self.open[bar] else sells + buys
+        fill_events: List[Dict[str, Any]] = []
+        for client_id, side, price, qty, reduce_only in ordered:
+            # A reduce-only order with nothing left to reduce is rejected by the venue instead.
+            filled_qty = self._fill(bar, client_id, side, price, qty, reduce_only)
+            if filled_qty > 0:
+                fill_events.append(
+                    {"clientOrderId": client_id, "side": "buy" if side > 0 else "sell", "fillPrice": price, "fillQty": filled_qty}
+                )
+            self.book.pop(client_id, None)
+        if ordered:
+            gone = {order[0] for order in ordered}
+            self.snapshots = [order for order in self.snapshots if order.clientOrderId not in gone]
+        self._plan(bar, float(self.close[bar]), fill_events)
+        return True
+
+    def run(self) -> GridSimulationResult:
+        started = time.perf_counter()
+        if self.n == 0:
+            return self.result
+        mark = float(self.open[0])
+        seed = compute_sizing(self.template.model_copy(update={"markPrice": mark})).initial_seed
+        if seed.get("enabled") and float(seed.get("seedQty") or 0.0) > 0:
+            self._fill(0, "initial-seed", 1 if seed.get("seedSide") == "buy" else -1, mark, float(seed["seedQty"]), False)
+        self._plan(0, mark, [])
+
+        bar = 0
+        while bar < self.n:
+            event = self._next_event(bar)
+            self._span(bar, event)
+            if event >= self.n:
+                break
+            alive = self._event(event)
+            self._span(event, event + 1)
+            if not alive:
+                self.equity[event + 1 :] = self.wallet
+                break
+            bar = event + 1
+        self.result.elapsed_ms = (time.perf_counter() - started) * 1000.0
+        return self.result
+
+
+def simulate_grid(
+    template: GridPlanRequest,
+    ts: np.ndarray,
+    values: np.ndarray,
+    *,
+    engine: str = "fast",
+    funding_rate_pct: float = 0.01,
+    funding_interval_ms: int = FUNDING_INTERVAL_MS,
+) -> GridSimulationResult:
+    """Replay one grid configuration over OHLC(V) bars (`values` columns: open, high, low, close[, volume]).
+
+    The grid is re-planned at the close of every bar with a fill or a drift recenter, and bars in
+    between are scanned with NumPy. Limit orders fill at their level when the bar's low/high
+    crosses it, paying the taker fee. Funding is charged per interval on the open position, and
+    the position is liquidated when the bar crosses `estimate_liq_with_mmr`. The account is
+    one-way (long and short legs net). `engine="planner"` calls `plan()` on each event instead
+    of the equivalent fast path, which is slower but runs the production code.
+    """
+    if engine not in SIMULATION_ENGINES:
+        raise ValueError(f"unknown simulation engine: {engine}")
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim != 2 or values.shape[1] < 4 or len(ts) != values.shape[0]:
+        raise ValueError("values must be an (n, 4+) open/high/low/close block aligned with ts")
+    return _Replay(template, np.asarray(ts), values, engine, funding_rate_pct, funding_interval_ms).run()
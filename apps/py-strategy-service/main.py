@@ -2,33 +2,98 @@ from __future__ import annotations
 
 import hmac
 import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
 
 from fastapi import Depends, FastAPI, Header, HTTPException
+from pydantic import ValidationError
 
 from grid import (
+    SESSION_STORE,
+    GridCacheStatsResponse,
+    GridPlanBatchItem,
+    GridPlanBatchRequest,
+    GridPlanBatchResponse,
     GridPlanRequest,
     GridPlanResponse,
     GridPreviewRequest,
     GridPreviewResponse,
+    GridSessionDeltaRequest,
+    GridSessionDropResponse,
+    GridSessionNotFound,
+    GridSessionPlanResponse,
+    GridSessionVersionMismatch,
+    batch_chunks,
+    cache_stats as cache_stats_grid,
+    parallel_min_items,
     plan as plan_grid,
+    plan_batch_item,
     preview as preview_grid,
+    restore_sessions,
+    snapshot_sessions,
+    validate_batch_item,
 )
-from models import HealthResponse, StrategyRegistryResponse, StrategyRunRequest, StrategyRunResponse
-from registry import registry
+from models import (
+    HealthResponse,
+    StrategyRegistryResponse,
+    StrategyRunBatchItem,
+    StrategyRunBatchRequest,
+    StrategyRunBatchResponse,
+    StrategyRunRequest,
+    StrategyRunResponse,
+)
+from registry import StrategyRegistration, lazy_handler, registry
+from serialization import json_response_class, json_route_class, resolve_json_mode
 from strategies import (
     regime_gate,
     signal_filter,
     smart_money_concept,
-    ta_trend_vol_gate_v2,
     trend_vol_gate,
     vmc_cipher_gate,
     vmc_divergence_reversal,
 )
+from warmup import start_background_warmup
+from workers import (
+    grid_plan_batch_task,
+    grid_plan_task,
+    grid_preview_task,
+    pool_active,
+    pool_workers,
+    run_offloaded,
+    run_offloaded_many,
+    should_offload_strategy,
+    shutdown_pool,
+    start_pool_in_background,
+    strategy_task,
+)
 
 SERVICE_VERSION = "1.0.0"
 AUTH_TOKEN = os.getenv("PY_STRATEGY_AUTH_TOKEN", "").strip()
+JSON_MODE = resolve_json_mode()
 
-app = FastAPI(title="py-strategy-service", version=SERVICE_VERSION)
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    # PY_CPU_WORKERS > 0 and the in-process TA stack both warm in the background, so /health
+    # answers right away; CPU-heavy routes run inline until the pool is up.
+    start_pool_in_background()
+    start_background_warmup()
+    # PY_GRID_SESSION_SNAPSHOT_PATH: grid sessions survive a restart instead of forcing resyncs.
+    restore_sessions()
+    try:
+        yield
+    finally:
+        shutdown_pool()
+        snapshot_sessions()
+
+
+app = FastAPI(
+    title="py-strategy-service",
+    version=SERVICE_VERSION,
+    default_response_class=json_response_class(JSON_MODE),
+    lifespan=lifespan,
+)
+app.router.route_class = json_route_class(JSON_MODE)
 
 
 def is_token_authorized(received_token: str | None, expected_token: str) -> bool:
@@ -163,7 +228,7 @@ def register_strategies() -> None:
                 "allowNeutralSignal": {"type": "boolean"},
             },
         },
-        handler=ta_trend_vol_gate_v2.run,
+        handler=lazy_handler("strategies.ta_trend_vol_gate_v2"),
     )
 
     registry.register(
@@ -267,13 +332,7 @@ def list_strategies(_: None = Depends(require_auth)) -> StrategyRegistryResponse
     return StrategyRegistryResponse(items=registry.list_public())
 
 
-@app.post("/v1/strategies/run", response_model=StrategyRunResponse)
-def run_strategy(payload: StrategyRunRequest, _: None = Depends(require_auth)) -> StrategyRunResponse:
-    registration = registry.get(payload.strategyType)
-    if not registration:
-        raise HTTPException(status_code=404, detail=f"strategy_not_found:{payload.strategyType}")
-
-    result = registration.handler(payload)
+def _with_registry_meta(registration: StrategyRegistration, result: StrategyRunResponse) -> StrategyRunResponse:
     merged_meta = {
         **(result.meta or {}),
         "engine": "python",
@@ -290,11 +349,171 @@ def run_strategy(payload: StrategyRunRequest, _: None = Depends(require_auth)) -
     )
 
 
+def execute_strategy(payload: StrategyRunRequest) -> StrategyRunResponse:
+    registration = registry.get(payload.strategyType)
+    if not registration:
+        raise HTTPException(status_code=404, detail=f"strategy_not_found:{payload.strategyType}")
+    return _with_registry_meta(registration, registration.handler(payload))
+
+
+def _validate_batch_item(index: int, raw: Any) -> StrategyRunRequest | StrategyRunBatchItem:
+    strategy_type = raw.get("strategyType") if isinstance(raw, dict) and isinstance(raw.get("strategyType"), str) else None
+    try:
+        return StrategyRunRequest.model_validate(raw)
+    except ValidationError:
+        return StrategyRunBatchItem(index=index, ok=False, strategyType=strategy_type, error="invalid_request")
+
+
+def _run_batch_item(index: int, payload: StrategyRunRequest) -> StrategyRunBatchItem:
+    try:
+        result = execute_strategy(payload)
+    except HTTPException as error:
+        return StrategyRunBatchItem(index=index, ok=False, strategyType=payload.strategyType, error=str(error.detail))
+    except Exception:
+        return StrategyRunBatchItem(index=index, ok=False, strategyType=payload.strategyType, error="strategy_failed")
+
+    return StrategyRunBatchItem(index=index, ok=True, strategyType=payload.strategyType, result=result)
+
+
+def _run_batch_columnar(pending: dict[int, StrategyRunRequest]) -> dict[int, StrategyRunBatchItem]:
+    # Imported on first use: the columnar engine pulls in NumPy and the TA backend.
+    from columnar import COLUMN_BUILDERS, group_key, run_requests as run_columnar_requests
+
+    out: dict[int, StrategyRunBatchItem] = {}
+    groups: dict[tuple[str, str], list[int]] = {}
+    for index, payload in pending.items():
+        if registry.get(payload.strategyType) is None or payload.strategyType.strip() not in COLUMN_BUILDERS:
+            # Unknown strategies and strategies without a kernel take the scalar path.
+            out[index] = _run_batch_item(index, payload)
+        else:
+            groups.setdefault(group_key(payload), []).append(index)
+
+    for indexes in groups.values():
+        try:
+            results = run_columnar_requests([pending[index] for index in indexes])
+        except Exception:
+            # One bad group (e.g. a config the kernel rejects) falls back to the scalar path,
+            # which reports errors per item; the other groups keep their kernel results.
+            for index in indexes:
+                out[index] = _run_batch_item(index, pending[index])
+            continue
+        for index, result in zip(indexes, results):
+            registration = registry.get(pending[index].strategyType)
+            assert registration is not None
+            out[index] = StrategyRunBatchItem(
+                index=index,
+                ok=True,
+                strategyType=registration.type,
+                result=_with_registry_meta(registration, result),
+            )
+    return out
+
+
+@app.post("/v1/strategies/run", response_model=StrategyRunResponse)
+def run_strategy(payload: StrategyRunRequest, _: None = Depends(require_auth)) -> StrategyRunResponse:
+    if should_offload_strategy(payload.strategyType) and registry.get(payload.strategyType) is not None:
+        return StrategyRunResponse.model_validate(run_offloaded(strategy_task, payload.model_dump()))
+    return execute_strategy(payload)
+
+
+@app.post("/v1/strategies/run-batch", response_model=StrategyRunBatchResponse)
+def run_strategy_batch(payload: StrategyRunBatchRequest, _: None = Depends(require_auth)) -> StrategyRunBatchResponse:
+    resolved: dict[int, StrategyRunBatchItem] = {}
+    pending: dict[int, StrategyRunRequest] = {}
+    for index, raw in enumerate(payload.items):
+        validated = _validate_batch_item(index, raw)
+        if isinstance(validated, StrategyRunBatchItem):
+            resolved[index] = validated
+        else:
+            pending[index] = validated
+
+    if payload.engine == "columnar":
+        resolved.update(_run_batch_columnar(pending))
+    else:
+        resolved.update({index: _run_batch_item(index, item) for index, item in pending.items()})
+
+    items = [resolved[index] for index in range(len(payload.items))]
+    ok_count = sum(1 for item in items if item.ok)
+    return StrategyRunBatchResponse(items=items, okCount=ok_count, errorCount=len(items) - ok_count)
+
+
 @app.post("/v1/grid/preview", response_model=GridPreviewResponse)
 def grid_preview(payload: GridPreviewRequest, _: None = Depends(require_auth)) -> GridPreviewResponse:
+    if pool_active():
+        return GridPreviewResponse.model_validate(run_offloaded(grid_preview_task, payload.model_dump()))
     return preview_grid(payload)
 
 
 @app.post("/v1/grid/plan", response_model=GridPlanResponse)
 def grid_plan(payload: GridPlanRequest, _: None = Depends(require_auth)) -> GridPlanResponse:
+    if pool_active():
+        return GridPlanResponse.model_validate(run_offloaded(grid_plan_task, payload.model_dump()))
     return plan_grid(payload)
+
+
+def _plan_batch_offloaded(pending: dict[int, GridPlanRequest]) -> dict[int, GridPlanBatchItem]:
+    chunks = batch_chunks(pending, pool_workers())
+    results = run_offloaded_many(
+        grid_plan_batch_task,
+        [{"items": [(index, pending[index].model_dump()) for index in chunk]} for chunk in chunks],
+    )
+    out: dict[int, GridPlanBatchItem] = {}
+    for result in results:
+        for row in result["items"]:
+            item = GridPlanBatchItem.model_validate(row)
+            out[item.index] = item
+    return out
+
+
+@app.post("/v1/grid/plan-batch", response_model=GridPlanBatchResponse)
+def grid_plan_batch(payload: GridPlanBatchRequest, _: None = Depends(require_auth)) -> GridPlanBatchResponse:
+    resolved: dict[int, GridPlanBatchItem] = {}
+    pending: dict[int, GridPlanRequest] = {}
+    for index, raw in enumerate(payload.items):
+        validated = validate_batch_item(index, raw)
+        if isinstance(validated, GridPlanBatchItem):
+            resolved[index] = validated
+        else:
+            pending[index] = validated
+
+    if pool_active() and len(pending) >= parallel_min_items():
+        resolved.update(_plan_batch_offloaded(pending))
+    else:
+        # Inline, instances on the same symbol range share the level and sizing caches.
+        resolved.update({index: plan_batch_item(index, item) for index, item in pending.items()})
+
+    items = [resolved[index] for index in range(len(payload.items))]
+    ok_count = sum(1 for item in items if item.ok)
+    return GridPlanBatchResponse(items=items, okCount=ok_count, errorCount=len(items) - ok_count)
+
+
+@app.get("/v1/grid/cache-stats", response_model=GridCacheStatsResponse)
+def grid_cache_stats(_: None = Depends(require_auth)) -> GridCacheStatsResponse:
+    # Per process: with PY_CPU_WORKERS > 0 plans run (and cache) in the pool workers instead.
+    return GridCacheStatsResponse(**cache_stats_grid(), sessions=SESSION_STORE.stats())
+
+
+# Grid sessions live in this process (never in the CPU pool): with PY_UVICORN_WORKERS > 1 a tick
+# may land on a process without the session, which answers 404 and the client resyncs.
+
+
+@app.post("/v1/grid/sessions", response_model=GridSessionPlanResponse)
+def grid_session_open(payload: GridPlanRequest, _: None = Depends(require_auth)) -> GridSessionPlanResponse:
+    return SESSION_STORE.open(payload)
+
+
+@app.post("/v1/grid/sessions/{instance_id}/plan", response_model=GridSessionPlanResponse)
+def grid_session_plan(
+    instance_id: str, payload: GridSessionDeltaRequest, _: None = Depends(require_auth)
+) -> GridSessionPlanResponse:
+    try:
+        return SESSION_STORE.plan_delta(instance_id, payload)
+    except GridSessionNotFound:
+        raise HTTPException(status_code=404, detail=f"grid_session_not_found:{instance_id}")
+    except GridSessionVersionMismatch as error:
+        raise HTTPException(status_code=409, detail=f"grid_session_version_mismatch:{error.expected}")
+
+
+@app.delete("/v1/grid/sessions/{instance_id}", response_model=GridSessionDropResponse)
+def grid_session_drop(instance_id: str, _: None = Depends(require_auth)) -> GridSessionDropResponse:
+    return GridSessionDropResponse(instanceId=instance_id, dropped=SESSION_STORE.drop(instance_id))
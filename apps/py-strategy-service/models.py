@@ -5,6 +5,7 @@ from typing import Any, Dict, List, Literal, Optional
 from pydantic import BaseModel, Field, field_validator
 
 Signal = Literal["up", "down", "neutral"]
+BatchEngine = Literal["scalar", "columnar"]
 
 
 class RunContext(BaseModel):
@@ -51,6 +52,27 @@ class StrategyRunResponse(BaseModel):
         return max(0.0, min(100.0, parsed))
 
 
+class StrategyRunBatchRequest(BaseModel):
+    # Items stay untyped here so one malformed entry is reported per item instead of failing the batch.
+    items: List[Any] = Field(default_factory=list, max_length=1000)
+    # "columnar" scores through the vectorized kernels: allow/score/reasonCodes only, no tags/explanation.
+    engine: BatchEngine = "scalar"
+
+
+class StrategyRunBatchItem(BaseModel):
+    index: int
+    ok: bool
+    strategyType: Optional[str] = None
+    result: Optional[StrategyRunResponse] = None
+    error: Optional[str] = None
+
+
+class StrategyRunBatchResponse(BaseModel):
+    items: List[StrategyRunBatchItem] = Field(default_factory=list)
+    okCount: int = 0
+    errorCount: int = 0
+
+
 class StrategyRegistryItem(BaseModel):
     type: str
     name: str
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import importlib
 from dataclasses import dataclass
 from typing import Any, Callable, Dict
 
@@ -8,6 +9,15 @@ from models import StrategyRegistryItem, StrategyRunRequest, StrategyRunResponse
 StrategyHandler = Callable[[StrategyRunRequest], StrategyRunResponse]
 
 
+def lazy_handler(module_name: str, attribute: str = "run") -> StrategyHandler:
+    """Handler that imports `module_name` on its first call, for strategies with heavy imports."""
+
+    def handler(request: StrategyRunRequest) -> StrategyRunResponse:
+        return getattr(importlib.import_module(module_name), attribute)(request)
+
+    return handler
+
+
 @dataclass
 class StrategyRegistration:
     type: str
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""Benchmarks for py-strategy-service. Run from apps/py-strategy-service:
+
+    python scripts/bench.py <name> [arg]
+
+Names and their optional argument:
+
+- ta-backend: median indicator latency per installed TA backend at 200 and 500 bars.
+- gate-parity [samples=5000]: rows/sec per evaluation path (scalar, columnar, research gates).
+- serialization [repeats=2000]: MB/s to encode responses and decode requests per JSON mode.
+- workers [max workers=cpu count]: requests/sec for grid plans and TA runs with 0..N pool workers.
+- startup [module=main]: `python -X importtime` digest of importing the module.
+- grid-batch [instances=60]: ms per tick as single /v1/grid/plan calls vs one plan-batch call.
+- grid-simulator [bars=525600]: time to simulate one year of 1m bars.
+
+Request fixtures come from tests/fixtures.py, so the benchmarks time the same payloads the
+tests check.
+"""
+from __future__ import annotations
+
+import pathlib
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def ta_backend_latency(count: int = 500, repeats: int = 200) -> dict[str, float]:
+    """Median per-call latency in microseconds for every installed backend."""
+    import numpy as np
+
+    from strategies import ta_backend
+    from tests.fixtures import random_ohlcv_frame
+
+    frame = ta_backend.OhlcvArrays.from_frame(random_ohlcv_frame(count))
+    runners = {"numpy": ta_backend._compute_with_numpy}
+    if ta_backend.talib is not None:
+        runners["talib"] = ta_backend._compute_with_talib
+    if ta_backend.pta is not None:
+        runners["pandas_ta"] = ta_backend._compute_with_pandas_ta
+    report: dict[str, float] = {}
+    for name, runner in runners.items():
+        samples = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            runner(frame)
+            samples.append(time.perf_counter() - started)
+        report[name] = float(np.median(samples) * 1_000_000)
+    return report
+
+
+def gate_throughput(samples: int = 2000) -> dict[str, dict[str, float]]:
+    """Rows per second for each evaluation path, keyed by strategy then path."""
+    import random
+
+    from columnar import build_columns, run_columns
+    from tests.fixtures import CONFIG_SPACE, SEED, generate_cases, load_research_gates, random_config, run_scalar
+
+    rng = random.Random(SEED)
+    gates = load_research_gates()
+    report: dict[str, dict[str, float]] = {}
+    for strategy_type in CONFIG_SPACE:
+        cases = generate_cases(strategy_type, samples, SEED)
+        config = random_config(rng, strategy_type)
+        snapshots = [snapshot for snapshot, _ in cases]
+        signals = [signal for _, signal in cases]
+        rates: dict[str, float] = {}
+
+        started = time.perf_counter()
+        run_scalar(strategy_type, cases, config)
+        rates["scalar"] = samples / max(time.perf_counter() - started, 1e-9)
+
+        started = time.perf_counter()
+        columns = build_columns(strategy_type, snapshots, signals)
+        built = time.perf_counter()
+        run_columns(strategy_type, columns, config)
+        finished = time.perf_counter()
+        rates["columnar"] = samples / max(finished - started, 1e-9)
+        rates["columnar_kernel_only"] = samples / max(finished - built, 1e-9)
+
+        if gates is not None and strategy_type == "trend_vol_gate":
+            import pandas as pd
+
+            frame = pd.DataFrame(columns)
+            started = time.perf_counter()
+            gates.strategy_gate(frame, config)
+            rates["research_vectorized"] = samples / max(time.perf_counter() - started, 1e-9)
+            started = time.perf_counter()
+            for _, row in frame.iterrows():
+                gates.gate_row_by_params(row, config)
+            rates["research_row"] = samples / max(time.perf_counter() - started, 1e-9)
+
+        report[strategy_type] = rates
+    return report
+
+
+def serialization_throughput(repeats: int = 2000) -> dict[str, dict[str, float]]:
+    """Bytes per second to encode each response and to parse+validate its request, per JSON mode."""
+    import json
+
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from pydantic_core import from_json, to_json
+
+    import main
+    import serialization
+    from grid import plan
+    from tests.fixtures import serialization_plan_request, serialization_strategy_request
+
+    encoders: dict[str, Callable[[Any], bytes]] = {
+        "stdlib": lambda model: JSONResponse(model.model_dump(mode="json")).body,
+        "pydantic": lambda model: to_json(model),
+    }
+    decoders: dict[str, Callable[[bytes], Any]] = {"stdlib": json.loads, "pydantic": from_json}
+    if serialization.orjson is not None:
+        encoders["orjson"] = lambda model: ORJSONResponse(model.model_dump(mode="json")).body
+        decoders["orjson"] = serialization.orjson.loads
+
+    # Representative (request, response) pairs for the two hot routes.
+    plan_request = serialization_plan_request()
+    strategy_request = serialization_strategy_request()
+    payloads = {
+        "GridPlanResponse": (plan_request, plan(plan_request)),
+        "StrategyRunResponse": (strategy_request, main.execute_strategy(strategy_request)),
+    }
+    report: dict[str, dict[str, float]] = {}
+    for name, (request, response) in payloads.items():
+        rates: dict[str, float] = {}
+        for mode, encode in encoders.items():
+            size = len(encode(response))
+            started = time.perf_counter()
+            for _ in range(repeats):
+                encode(response)
+            rates[f"encode_{mode}"] = size * repeats / max(time.perf_counter() - started, 1e-9)
+
+        body = to_json(request)
+        request_type = type(request)
+        for mode, decode in decoders.items():
+            started = time.perf_counter()
+            for _ in range(repeats):
+                request_type.model_validate(decode(body))
+            rates[f"decode_{mode}"] = len(body) * repeats / max(time.perf_counter() - started, 1e-9)
+        report[name] = rates
+    return report
+
+
+def worker_throughput(max_workers: int | None = None, requests: int = 64) -> dict[int, dict[str, float]]:
+    """Requests per second for 500-level grid plans and TA gate runs with 0 (inline) to N pool workers.
+
+    Requests are issued from a thread pool sized like Starlette's, as concurrent HTTP calls would be.
+    """
+    import os
+
+    import main
+    import workers
+    from tests.fixtures import worker_plan_request, worker_ta_request
+
+    top = max_workers or os.cpu_count() or 1
+    jobs = {
+        "grid_plan": (main.grid_plan, worker_plan_request()),
+        "ta_trend_vol_gate_v2": (main.run_strategy, worker_ta_request()),
+    }
+    report: dict[int, dict[str, float]] = {}
+    for count in range(0, top + 1):
+        if count:
+            workers.start_pool(count)
+        try:
+            rates: dict[str, float] = {}
+            with ThreadPoolExecutor(max_workers=max(4, 2 * count)) as clients:
+                for name, (route, payload) in jobs.items():
+                    list(clients.map(lambda _: route(payload, None), range(max(2, count))))
+                    started = time.perf_counter()
+                    list(clients.map(lambda _: route(payload, None), range(requests)))
+                    rates[name] = requests / max(time.perf_counter() - started, 1e-9)
+            report[count] = rates
+        finally:
+            workers.shutdown_pool()
+    return report
+
+
+def importtime_digest(module: str = "main", top: int = 15) -> dict[str, Any]:
+    """Digest of `python -X importtime -c "import <module>"`: total ms plus the slowest imports.
+
+    `top` lists the direct imports of `module` by cumulative time (nested imports are folded
+    into their parent), `self` the largest self times anywhere below `module`.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=120,
+    ).stderr
+    rows: list[tuple[str, float, float, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:") :].split("|")
+        self_us, cumulative_us, name = int(parts[0]), int(parts[1]), parts[2]
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((name.strip(), cumulative_us / 1000.0, self_us / 1000.0, depth))
+
+    # importtime prints children before their parent: the subtree of `module` is everything
+    # between the previous top-level line and its own line (startup imports come earlier).
+    end = max((idx for idx, row in enumerate(rows) if row[0] == module and row[3] == 0), default=-1)
+    start = max((idx for idx, row in enumerate(rows[:end]) if row[3] == 0), default=-1) + 1
+    subtree = rows[start:end]
+    total = rows[end][1] if end >= 0 else 0.0
+    packages = sorted((row for row in subtree if row[3] == 1), key=lambda row: -row[1])
+    return {
+        "module": module,
+        "totalMs": round(total, 1),
+        "top": [{"module": name, "cumulativeMs": round(cumulative, 1)} for name, cumulative, _, _ in packages[:top]],
+        "self": [
+            {"module": name, "selfMs": round(self_ms, 1)}
+            for name, _, self_ms, _ in sorted(subtree + rows[end:], key=lambda row: -row[2])[:top]
+        ],
+    }
+
+
+def grid_batch_tick(instances: int = 60, repeats: int = 5) -> dict[str, float]:
+    """Wall milliseconds per tick: one /v1/grid/plan call per instance vs one /v1/grid/plan-batch call."""
+    from fastapi.testclient import TestClient
+
+    import main
+    from tests.fixtures import batch_plan_requests
+
+    client = TestClient(main.app)
+    bodies = [item.model_dump(mode="json") for item in batch_plan_requests(instances)]
+    report: dict[str, float] = {}
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for body in bodies:
+            client.post("/v1/grid/plan", json=body)
+    report["perInstanceMs"] = (time.perf_counter() - started) * 1000.0 / repeats
+    started = time.perf_counter()
+    for _ in range(repeats):
+        client.post("/v1/grid/plan-batch", json={"items": bodies})
+    report["batchMs"] = (time.perf_counter() - started) * 1000.0 / repeats
+    return report
+
+
+def grid_simulator_year(bars: int = 525_600) -> dict[str, float]:
+    from grid.simulator import simulate_grid
+    from tests.fixtures import simulator_bars, simulator_template
+
+    ts, values = simulator_bars(bars, seed=11)
+    template = simulator_template(lower=float(values[:, 2].min() * 0.95), upper=float(values[:, 1].max() * 1.05))
+    summary = simulate_grid(template, ts, values).summary()
+    return {"bars": bars, "fills": summary["fills"], "plans": summary["plans"], "elapsedMs": summary["elapsedMs"]}
+
+
+def _print_ta_backend(_arg: str | None) -> None:
+    for bars in (200, 500):
+        summary = ", ".join(f"{name}={micros:,.0f}us" for name, micros in ta_backend_latency(bars).items())
+        print(f"{bars} bars: {summary}")
+
+
+def _print_gate_parity(arg: str | None) -> None:
+    for strategy_type, rates in gate_throughput(samples=int(arg or 5000)).items():
+        summary = ", ".join(f"{path}={rate:,.0f}/s" for path, rate in rates.items())
+        print(f"{strategy_type}: {summary}")
+
+
+def _print_serialization(arg: str | None) -> None:
+    for name, rates in serialization_throughput(repeats=int(arg or 2000)).items():
+        summary = ", ".join(f"{key}={rate / 1_000_000:,.1f}MB/s" for key, rate in rates.items())
+        print(f"{name}: {summary}")
+
+
+def _print_workers(arg: str | None) -> None:
+    for count, rates in worker_throughput(max_workers=int(arg) if arg else None).items():
+        summary = ", ".join(f"{name}={rate:,.1f}/s" for name, rate in rates.items())
+        print(f"workers={count}: {summary}")
+
+
+def _print_startup(arg: str | None) -> None:
+    digest = importtime_digest(arg or "main")
+    print(f"import {digest['module']}: {digest['totalMs']:.1f} ms")
+    print("slowest direct imports (cumulative):")
+    for item in digest["top"]:
+        print(f"  {item['cumulativeMs']:>8.1f} ms  {item['module']}")
+    print("slowest modules (self):")
+    for item in digest["self"]:
+        print(f"  {item['selfMs']:>8.1f} ms  {item['module']}")
+
+
+def _print_grid_batch(arg: str | None) -> None:
+    for name, value in grid_batch_tick(instances=int(arg or 60)).items():
+        print(f"{name}: {value:,.1f} ms")
+
+
+def _print_grid_simulator(arg: str | None) -> None:
+    for name, value in grid_simulator_year(bars=int(arg or 525_600)).items():
+        print(f"{name}: {value:,.1f}")
+
+
+BENCHMARKS: dict[str, Callable[[str | None], None]] = {
+    "ta-backend": _print_ta_backend,
+    "gate-parity": _print_gate_parity,
+    "serialization": _print_serialization,
+    "workers": _print_workers,
+    "startup": _print_startup,
+    "grid-batch": _print_grid_batch,
+    "grid-simulator": _print_grid_simulator,
+}
+
+
+def main(argv: list[str]) -> int:
+    if not argv or argv[0] not in BENCHMARKS:
+        print(f"usage: python scripts/bench.py {{{','.join(BENCHMARKS)}}} [arg]", file=sys.stderr)
+        return 2
+    BENCHMARKS[argv[0]](argv[1] if len(argv) > 1 else None)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import logging
+import os
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from pydantic_core import from_json, to_json
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
+# stdlib:   FastAPI defaults (json.loads / json.dumps).
+# orjson:   orjson for request bodies and ORJSONResponse for responses.
+# pydantic: pydantic-core parses request bodies and dumps response models straight to bytes.
+JSON_MODES = {"stdlib", "orjson", "pydantic"}
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_json_mode() -> str:
+    raw = str(os.getenv("PY_JSON_MODE", "stdlib")).strip().lower()
+    mode = raw if raw in JSON_MODES else "stdlib"
+    if mode == "orjson" and orjson is None:
+        logger.warning("PY_JSON_MODE=orjson but orjson is not installed; using pydantic")
+        return "pydantic"
+    return mode
+
+
+def _decode_error(body: bytes, error: Exception) -> json.JSONDecodeError:
+    # FastAPI maps json.JSONDecodeError to a 422 json_invalid error; keep that contract.
+    return json.JSONDecodeError(str(error), body.decode("utf-8", errors="replace"), 0)
+
+
+class _OrjsonRequest(Request):
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class _PydanticCoreRequest(Request):
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            try:
+                self._json = from_json(body)
+            except ValueError as error:
+                raise _decode_error(body, error) from error
+        return self._json
+
+
+def _model_response(result: Any) -> Any:
+    if isinstance(result, BaseModel):
+        return Response(content=to_json(result), media_type="application/json")
+    return result
+
+
+def _dump_json_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an endpoint so pydantic results are returned as pre-rendered JSON bytes.
+
+    FastAPI skips response_model serialization for Response return values; the declared
+    response_model still drives the OpenAPI schema.
+    """
+    # Resolve string annotations here: FastAPI evaluates them against the wrapper's globals.
+    signature = inspect.signature(endpoint, eval_str=True)
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            return _model_response(await endpoint(*args, **kwargs))
+
+        async_wrapper.__signature__ = signature  # type: ignore[attr-defined]
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return _model_response(endpoint(*args, **kwargs))
+
+    wrapper.__signature__ = signature  # type: ignore[attr-defined]
+    return wrapper
+
+
+def json_route_class(mode: str) -> type[APIRoute]:
+    if mode not in JSON_MODES or mode == "stdlib":
+        return APIRoute
+    request_class = _OrjsonRequest if mode == "orjson" else _PydanticCoreRequest
+
+    class JSONModeRoute(APIRoute):
+        def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+            if mode == "pydantic":
+                endpoint = _dump_json_endpoint(endpoint)
+            super().__init__(path, endpoint, **kwargs)
+
+        def get_route_handler(self) -> Callable[[Request], Any]:
+            handler = super().get_route_handler()
+
+            async def route_handler(request: Request) -> Response:
+                return await handler(request_class(request.scope, request.receive))
+
+            return route_handler
+
+    return JSONModeRoute
+
+
+def json_response_class(mode: str) -> type[Response]:
+    return ORJSONResponse if mode == "orjson" and orjson is not None else JSONResponse
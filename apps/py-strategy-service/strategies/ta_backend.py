@@ -1,23 +1,48 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import importlib
 import os
-from typing import Any
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
-import pandas as pd
 
-try:
-    import pandas_ta as pta  # type: ignore
-except Exception:
-    pta = None
+if TYPE_CHECKING:
+    import pandas as pd
 
-try:
-    import talib  # type: ignore
-except Exception:
-    talib = None
 
+TA_BACKENDS = {"auto", "talib", "numpy", "pandas_ta"}
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+MIN_TA_BARS = 35
+# ohlcvSeries.encoding for base64 column buffers: "ts" as little-endian int64 milliseconds,
+# the OHLCV_COLUMNS as little-endian float64, all of equal length.
+OHLCV_ENCODING_COLUMNAR = "columnar_b64_le"
 
-TA_BACKENDS = {"auto", "talib", "pandas_ta"}
+# TA-Lib treats |x| below this as zero (TA_IS_ZERO).
+_ZERO_EPS = 0.00000001
+
+# talib and pandas_ta (and pandas through them) cost hundreds of milliseconds to import,
+# so they load on first use; `ta_backend.talib` / `ta_backend.pta` are None when missing.
+_OPTIONAL_MODULES = {"talib": "talib", "pta": "pandas_ta"}
+
+
+def _load_optional(name: str) -> Any:
+    if name not in globals():
+        try:
+            module = importlib.import_module(_OPTIONAL_MODULES[name])
+        except Exception:
+            module = None
+        globals()[name] = module
+    return globals()[name]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _OPTIONAL_MODULES:
+        return _load_optional(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def resolve_backend() -> str:
@@ -27,6 +52,20 @@ def resolve_backend() -> str:
     return "auto"
 
 
+def active_backend() -> str | None:
+    """Concrete backend `compute_ta_indicators` will use, or None when it is unavailable."""
+    backend = resolve_backend()
+    if backend == "talib":
+        return backend if _load_optional("talib") is not None else None
+    if backend == "pandas_ta":
+        return backend if _load_optional("pta") is not None else None
+    if backend == "numpy":
+        return backend
+    if _load_optional("talib") is not None:
+        return "talib"
+    return "numpy"
+
+
 def _to_float(value: Any) -> float | None:
     try:
         parsed = float(value)
@@ -37,6 +76,74 @@ def _to_float(value: Any) -> float | None:
     return parsed
 
 
+def ts_to_ms(value: Any) -> int | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value) if value == value and value not in (float("inf"), float("-inf")) else None
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return None
+        try:
+            dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except Exception:
+            return None
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp() * 1000)
+    return None
+
+
+@dataclass
+class OhlcvArrays:
+    """OHLCV bars as an (n, 5) float64 block (column-major, so each column is contiguous) plus int64 ms timestamps."""
+
+    ts: np.ndarray
+    values: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.values.shape[0])
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.values[:, 0]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.values[:, 1]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.values[:, 2]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.values[:, 3]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.values[:, 4]
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> OhlcvArrays:
+        import pandas as pd
+
+        values = np.asfortranarray(frame.loc[:, list(OHLCV_COLUMNS)].to_numpy(dtype=np.float64))
+        if "ts" in frame.columns:
+            ts = pd.to_datetime(frame["ts"], utc=True, errors="coerce").to_numpy(dtype="datetime64[ms]").astype(np.int64)
+        else:
+            ts = np.arange(len(frame), dtype=np.int64)
+        return cls(ts=ts, values=values)
+
+    def to_frame(self) -> pd.DataFrame:
+        import pandas as pd
+
+        frame = pd.DataFrame(self.values, columns=list(OHLCV_COLUMNS))
+        frame.insert(0, "ts", pd.to_datetime(self.ts, unit="ms", utc=True))
+        return frame
+
+
 def _row_from_tuple(row: list[Any], fmt: list[str]) -> dict[str, Any] | None:
     if len(row) < 6:
         return None
@@ -67,50 +174,60 @@ def _row_from_tuple(row: list[Any], fmt: list[str]) -> dict[str, Any] | None:
     }
 
 
+def ohlcv_format(ohlcv: dict[str, Any]) -> list[str]:
+    fmt_raw = ohlcv.get("format")
+    if isinstance(fmt_raw, list) and len(fmt_raw) >= 6 and all(isinstance(item, str) for item in fmt_raw):
+        return [str(item) for item in fmt_raw]
+    return ["ts", "open", "high", "low", "close", "volume"]
+
+
+def parse_ohlcv_bar(raw: Any, fmt: list[str]) -> dict[str, Any] | None:
+    if isinstance(raw, dict):
+        open_ = _to_float(raw.get("open"))
+        high = _to_float(raw.get("high"))
+        low = _to_float(raw.get("low"))
+        close = _to_float(raw.get("close"))
+        volume = _to_float(raw.get("volume"))
+        if open_ is None or high is None or low is None or close is None or volume is None:
+            return None
+        return {
+            "ts": raw.get("ts"),
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+        }
+
+    if isinstance(raw, list):
+        return _row_from_tuple(raw, fmt)
+    return None
+
+
 def extract_ohlcv_frame(feature_snapshot: dict[str, Any]) -> tuple[pd.DataFrame | None, str | None]:
     ohlcv = feature_snapshot.get("ohlcvSeries")
     if not isinstance(ohlcv, dict):
         return None, "ta_input_missing"
+    if is_columnar_ohlcv(ohlcv):
+        arrays, error = extract_ohlcv_arrays(feature_snapshot)
+        return (arrays.to_frame(), None) if arrays is not None else (None, error)
 
     bars = ohlcv.get("bars")
     if not isinstance(bars, list) or len(bars) < 35:
         return None, "ta_input_missing"
 
-    fmt_raw = ohlcv.get("format")
-    fmt = ["ts", "open", "high", "low", "close", "volume"]
-    if isinstance(fmt_raw, list) and len(fmt_raw) >= 6 and all(isinstance(item, str) for item in fmt_raw):
-        fmt = [str(item) for item in fmt_raw]
-
+    fmt = ohlcv_format(ohlcv)
     rows: list[dict[str, Any]] = []
     for raw in bars:
-        if isinstance(raw, dict):
-            open_ = _to_float(raw.get("open"))
-            high = _to_float(raw.get("high"))
-            low = _to_float(raw.get("low"))
-            close = _to_float(raw.get("close"))
-            volume = _to_float(raw.get("volume"))
-            if open_ is None or high is None or low is None or close is None or volume is None:
-                continue
-            rows.append(
-                {
-                    "ts": raw.get("ts"),
-                    "open": open_,
-                    "high": high,
-                    "low": low,
-                    "close": close,
-                    "volume": volume,
-                }
-            )
-            continue
-
-        if isinstance(raw, list):
-            parsed = _row_from_tuple(raw, fmt)
-            if parsed:
-                rows.append(parsed)
+        parsed = parse_ohlcv_bar(raw, fmt)
+        if parsed:
+            rows.append(parsed)
 
     if len(rows) < 35:
         return None, "ta_input_missing"
 
+    import pandas as pd
+
     frame = pd.DataFrame(rows)
     if frame.empty:
         return None, "ta_input_missing"
@@ -130,10 +247,152 @@ def extract_ohlcv_frame(feature_snapshot: dict[str, Any]) -> tuple[pd.DataFrame
     return frame, None
 
 
-def _compute_with_talib(frame: pd.DataFrame) -> dict[str, float | None]:
-    highs = frame["high"].to_numpy(dtype=float)
-    lows = frame["low"].to_numpy(dtype=float)
-    closes = frame["close"].to_numpy(dtype=float)
+def _tuple_positions(fmt: list[str]) -> tuple[int | None, list[int]] | None:
+    # Later duplicates win, like the dict lookup in `_row_from_tuple`.
+    index = {str(key): pos for pos, key in enumerate(fmt)}
+    positions = [index.get(key) for key in OHLCV_COLUMNS]
+    if any(pos is None for pos in positions):
+        return None
+    return index.get("ts"), [int(pos) for pos in positions if pos is not None]
+
+
+def _parse_tuple_bars(bars: list[Any], fmt: list[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray] | None:
+    """One pass over list-shaped bars into (values, ts, ts_ok); None when a bar is not a list."""
+    layout = _tuple_positions(fmt)
+    n = len(bars)
+    values = np.full((n, len(OHLCV_COLUMNS)), np.nan, dtype=np.float64, order="F")
+    ts = np.zeros(n, dtype=np.int64)
+    ts_ok = np.zeros(n, dtype=bool)
+    if layout is None:
+        return (values, ts, ts_ok) if all(isinstance(raw, list) for raw in bars) else None
+    ts_pos, positions = layout
+
+    try:
+        matrix = np.asarray(bars, dtype=np.float64)
+    except (TypeError, ValueError):
+        matrix = None
+
+    if matrix is not None and matrix.ndim == 2:
+        # Homogeneous numeric rows: numpy converts the whole list in C, no per-element Python work.
+        width = matrix.shape[1]
+        if width < 6 or max(positions) >= width:
+            return values, ts, ts_ok
+        for col, pos in enumerate(positions):
+            values[:, col] = matrix[:, pos]
+        if ts_pos is not None and ts_pos < width:
+            raw_ts = matrix[:, ts_pos]
+            ts_ok = np.isfinite(raw_ts)
+            ts = np.where(ts_ok, raw_ts, 0.0).astype(np.int64)
+        return values, ts, ts_ok
+
+    for row_idx, raw in enumerate(bars):
+        if not isinstance(raw, list):
+            return None
+        width = len(raw)
+        if width < 6 or max(positions) >= width:
+            continue
+        row = values[row_idx]
+        for col, pos in enumerate(positions):
+            parsed = _to_float(raw[pos])
+            row[col] = parsed if parsed is not None else np.nan
+        if ts_pos is not None and ts_pos < width:
+            parsed_ts = ts_to_ms(raw[ts_pos])
+            if parsed_ts is not None:
+                ts[row_idx] = parsed_ts
+                ts_ok[row_idx] = True
+    return values, ts, ts_ok
+
+
+def is_columnar_ohlcv(ohlcv: Any) -> bool:
+    return isinstance(ohlcv, dict) and str(ohlcv.get("encoding") or "").strip().lower() == OHLCV_ENCODING_COLUMNAR
+
+
+def _decode_column(raw: Any, dtype: str) -> np.ndarray | None:
+    if not isinstance(raw, str):
+        return None
+    try:
+        buffer = base64.b64decode(raw, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    if len(buffer) % 8:
+        return None
+    return np.frombuffer(buffer, dtype=dtype)
+
+
+def _decode_columnar_bars(ohlcv: dict[str, Any]) -> tuple[np.ndarray, np.ndarray, np.ndarray] | None:
+    """Decode base64 column buffers into (values, ts, ts_ok) without per-bar Python objects."""
+    columns = ohlcv.get("columns")
+    if not isinstance(columns, dict):
+        return None
+    ts = _decode_column(columns.get("ts"), "<i8")
+    if ts is None:
+        return None
+    count = ohlcv.get("count")
+    if count is not None and (isinstance(count, bool) or not isinstance(count, int) or count != ts.size):
+        return None
+
+    values = np.empty((ts.size, len(OHLCV_COLUMNS)), dtype=np.float64, order="F")
+    for col, name in enumerate(OHLCV_COLUMNS):
+        decoded = _decode_column(columns.get(name), "<f8")
+        if decoded is None or decoded.size != ts.size:
+            return None
+        values[:, col] = decoded
+    return values, ts.astype(np.int64), np.ones(ts.size, dtype=bool)
+
+
+def encode_columnar_ohlcv(ts: Any, values: Any, timeframe: str | None = None) -> dict[str, Any]:
+    """Build a `columnar_b64_le` ohlcvSeries from ms timestamps and an (n, 5) OHLCV matrix."""
+    stamps = np.ascontiguousarray(ts, dtype="<i8")
+    matrix = np.asarray(values, dtype=np.float64)
+    columns = {"ts": base64.b64encode(stamps.tobytes()).decode("ascii")}
+    for col, name in enumerate(OHLCV_COLUMNS):
+        columns[name] = base64.b64encode(np.ascontiguousarray(matrix[:, col], dtype="<f8").tobytes()).decode("ascii")
+    series: dict[str, Any] = {"encoding": OHLCV_ENCODING_COLUMNAR, "count": int(stamps.size), "columns": columns}
+    if timeframe:
+        series["timeframe"] = timeframe
+    return series
+
+
+def extract_ohlcv_arrays(feature_snapshot: dict[str, Any]) -> tuple[OhlcvArrays | None, str | None]:
+    """Array counterpart of `extract_ohlcv_frame`; dict-shaped bars still go through the frame path."""
+    ohlcv = feature_snapshot.get("ohlcvSeries")
+    if not isinstance(ohlcv, dict):
+        return None, "ta_input_missing"
+
+    if is_columnar_ohlcv(ohlcv):
+        parsed = _decode_columnar_bars(ohlcv)
+        if parsed is None:
+            return None, "ta_input_missing"
+    else:
+        bars = ohlcv.get("bars")
+        if not isinstance(bars, list) or len(bars) < MIN_TA_BARS:
+            return None, "ta_input_missing"
+        parsed = _parse_tuple_bars(bars, ohlcv_format(ohlcv))
+
+    if parsed is None:
+        frame, error = extract_ohlcv_frame(feature_snapshot)
+        return (OhlcvArrays.from_frame(frame), None) if frame is not None else (None, error)
+
+    values, ts, ts_ok = parsed
+    keep = np.isfinite(values).all(axis=1)
+    if int(keep.sum()) < MIN_TA_BARS:
+        return None, "ta_input_missing"
+    if not keep.all():
+        values, ts, ts_ok = np.asfortranarray(values[keep]), ts[keep], ts_ok[keep]
+
+    if not (ts_ok.all() and bool(np.all(ts[1:] >= ts[:-1]))):
+        # Same order as the frame path: by timestamp, rows without one last, ties kept stable.
+        order = np.lexsort((ts, ~ts_ok))
+        values, ts = np.asfortranarray(values[order]), ts[order]
+
+    return OhlcvArrays(ts=ts, values=values), None
+
+
+def _compute_with_talib(data: OhlcvArrays) -> dict[str, float | None]:
+    highs = np.ascontiguousarray(data.high)
+    lows = np.ascontiguousarray(data.low)
+    closes = np.ascontiguousarray(data.close)
+    talib = _load_optional("talib")
 
     rsi = talib.RSI(closes, timeperiod=14)
     adx = talib.ADX(highs, lows, closes, timeperiod=14)
@@ -154,8 +413,9 @@ def _compute_with_talib(frame: pd.DataFrame) -> dict[str, float | None]:
     }
 
 
-def _compute_with_pandas_ta(frame: pd.DataFrame) -> dict[str, float | None]:
-    local = frame.copy()
+def _compute_with_pandas_ta(data: OhlcvArrays) -> dict[str, float | None]:
+    pta = _load_optional("pta")
+    local = data.to_frame()
     local["rsi_14"] = pta.rsi(local["close"], length=14)
     local["adx_14"] = pta.adx(local["high"], local["low"], local["close"], length=14)["ADX_14"]
     local["atr_14"] = pta.atr(local["high"], local["low"], local["close"], length=14)
@@ -176,22 +436,123 @@ def _compute_with_pandas_ta(frame: pd.DataFrame) -> dict[str, float | None]:
     }
 
 
-def compute_ta_indicators(frame: pd.DataFrame) -> tuple[dict[str, Any], str | None]:
+def _decay_tail(seed: float, values: np.ndarray, decay: float, gain: float) -> float:
+    """Last value of y = decay * y + gain * x seeded with `seed`, as one weighted dot product."""
+    if values.size == 0:
+        return seed
+    weights = decay ** np.arange(values.size - 1, -1, -1, dtype=np.float64)
+    return float(decay**values.size * seed + gain * np.dot(weights, values))
+
+
+def _wilder_sums(seed: float, values: np.ndarray, period: int, block: int = 64) -> np.ndarray:
+    """Full series of Wilder running sums (y = y - y / period + x).
+
+    Solved per block as decay^j * (y0 + cumsum(x * decay^-i)); blocks keep decay^-i small
+    enough that the closed form stays as precise as the scalar recursion.
+    """
+    decay = 1.0 - 1.0 / period
+    powers = decay ** np.arange(1, block + 1, dtype=np.float64)
+    out = np.empty(values.size, dtype=np.float64)
+    current = seed
+    for start in range(0, values.size, block):
+        chunk = values[start : start + block]
+        scale = powers[: chunk.size]
+        segment = scale * (current + np.cumsum(chunk / scale))
+        out[start : start + chunk.size] = segment
+        current = float(segment[-1])
+    return out
+
+
+def compute_numpy_indicators(
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    period: int = 14,
+    ema_fast_period: int = 20,
+    ema_slow_period: int = 50,
+) -> dict[str, float | None]:
+    """RSI/ADX/ATR/EMA last values on float64 arrays with TA-Lib seeding (unstable period 0)."""
+    n = closes.size
+    result: dict[str, float | None] = {"rsi": None, "adx": None, "atr_pct": None, "ema_fast": None, "ema_slow": None}
+    if n == 0:
+        return result
+
+    decay = 1.0 - 1.0 / period
+    for key, length in (("ema_fast", ema_fast_period), ("ema_slow", ema_slow_period)):
+        if n >= length:
+            k = 2.0 / (length + 1)
+            result[key] = _decay_tail(float(closes[:length].mean()), closes[length:], 1.0 - k, k)
+
+    if n <= period:
+        return result
+
+    diffs = np.diff(closes)
+    gains = np.where(diffs > 0, diffs, 0.0)
+    losses = np.where(diffs < 0, -diffs, 0.0)
+    avg_gain = _decay_tail(float(gains[:period].sum() / period), gains[period:], decay, 1.0 / period)
+    avg_loss = _decay_tail(float(losses[:period].sum() / period), losses[period:], decay, 1.0 / period)
+    total = avg_gain + avg_loss
+    result["rsi"] = 100.0 * (avg_gain / total) if abs(total) >= _ZERO_EPS else 0.0
+
+    prev_close = closes[:-1]
+    true_range = np.maximum(highs[1:] - lows[1:], np.maximum(np.abs(highs[1:] - prev_close), np.abs(lows[1:] - prev_close)))
+    atr = _decay_tail(float(true_range[:period].sum() / period), true_range[period:], decay, 1.0 / period)
+    last_close = float(closes[-1])
+    if last_close > 0:
+        result["atr_pct"] = (atr / last_close) * 100.0
+
+    if n < 2 * period:
+        return result
+
+    diff_plus = highs[1:] - highs[:-1]
+    diff_minus = lows[:-1] - lows[1:]
+    minus_mask = (diff_minus > 0) & (diff_plus < diff_minus)
+    plus_mask = ~minus_mask & (diff_plus > 0) & (diff_plus > diff_minus)
+    plus_dm = np.where(plus_mask, diff_plus, 0.0)
+    minus_dm = np.where(minus_mask, diff_minus, 0.0)
+
+    seed_len = period - 1
+    smoothed_plus = _wilder_sums(float(plus_dm[:seed_len].sum()), plus_dm[seed_len:], period)
+    smoothed_minus = _wilder_sums(float(minus_dm[:seed_len].sum()), minus_dm[seed_len:], period)
+    smoothed_tr = _wilder_sums(float(true_range[:seed_len].sum()), true_range[seed_len:], period)
+
+    tr_ok = np.abs(smoothed_tr) >= _ZERO_EPS
+    safe_tr = np.where(tr_ok, smoothed_tr, 1.0)
+    plus_di = 100.0 * (smoothed_plus / safe_tr)
+    minus_di = 100.0 * (smoothed_minus / safe_tr)
+    di_sum = plus_di + minus_di
+    valid = tr_ok & (np.abs(di_sum) >= _ZERO_EPS)
+    dx = np.where(valid, 100.0 * (np.abs(minus_di - plus_di) / np.where(valid, di_sum, 1.0)), 0.0)
+
+    # A DX step TA-Lib cannot compute adds zero to the seed and leaves ADX untouched afterwards.
+    seed_adx = float(dx[:period].sum() / period)
+    tail_valid = valid[period:]
+    result["adx"] = _decay_tail(seed_adx, dx[period:][tail_valid], decay, 1.0 / period)
+    return result
+
+
+def _compute_with_numpy(data: OhlcvArrays) -> dict[str, float | None]:
+    return compute_numpy_indicators(data.high, data.low, data.close)
+
+
+def compute_ta_indicators(data: OhlcvArrays | pd.DataFrame) -> tuple[dict[str, Any], str | None]:
+    arrays = data if isinstance(data, OhlcvArrays) else OhlcvArrays.from_frame(data)
     backend = resolve_backend()
 
     if backend == "talib":
-        if talib is None:
+        if _load_optional("talib") is None:
             return {"backend": backend}, "ta_backend_unavailable"
-        return {"backend": backend, **_compute_with_talib(frame)}, None
+        return {"backend": backend, **_compute_with_talib(arrays)}, None
 
     if backend == "pandas_ta":
-        if pta is None:
+        if _load_optional("pta") is None:
             return {"backend": backend}, "ta_backend_unavailable"
-        return {"backend": backend, **_compute_with_pandas_ta(frame)}, None
+        return {"backend": backend, **_compute_with_pandas_ta(arrays)}, None
 
-    if talib is not None:
-        return {"backend": "talib", **_compute_with_talib(frame)}, None
-    if pta is not None:
-        return {"backend": "pandas_ta", **_compute_with_pandas_ta(frame)}, None
+    if backend == "numpy":
+        return {"backend": backend, **_compute_with_numpy(arrays)}, None
 
-    return {"backend": "auto"}, "ta_backend_unavailable"
+    if _load_optional("talib") is not None:
+        return {"backend": "talib", **_compute_with_talib(arrays)}, None
+    # NumPy is always importable, so auto never falls through to pandas_ta.
+    return {"backend": "numpy", **_compute_with_numpy(arrays)}, None
@@ -0,0 +1,424 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Sequence
+
+import numpy as np
+
+from env import env_int
+from models import RunContext
+from strategies.ta_backend import (
+    MIN_TA_BARS,
+    OhlcvArrays,
+    active_backend,
+    extract_ohlcv_arrays,
+    is_columnar_ohlcv,
+    ohlcv_format,
+    parse_ohlcv_bar,
+    ts_to_ms,
+)
+
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+ADX_PERIOD = 14
+EMA_FAST_PERIOD = 20
+EMA_SLOW_PERIOD = 50
+MIN_BARS = MIN_TA_BARS
+
+# Backends whose outputs the recursion below reproduces (TA-Lib seeding, unstable period 0).
+STREAMING_BACKENDS = {"talib", "numpy"}
+
+StreamKey = tuple[str, str, str, str]
+Bar = tuple[float, float, float, float, float]
+
+
+def streaming_enabled() -> bool:
+    return str(os.getenv("PY_TA_STREAMING", "0")).strip().lower() in {"1", "true", "on", "yes"}
+
+
+def _is_zero(value: float) -> bool:
+    # Same epsilon as TA-Lib's TA_IS_ZERO.
+    return -0.00000001 < value < 0.00000001
+
+
+def _bar(parsed: dict[str, Any]) -> Bar:
+    return (parsed["open"], parsed["high"], parsed["low"], parsed["close"], parsed["volume"])
+
+
+@dataclass
+class IndicatorState:
+    """Wilder/EMA recursion state for RSI14, ATR14, ADX14, EMA20 and EMA50; one `push` per bar."""
+
+    count: int = 0
+    prev_high: float = 0.0
+    prev_low: float = 0.0
+    prev_close: float = 0.0
+    last_close: float = 0.0
+    # RSI: running sums while seeding, Wilder averages afterwards.
+    rsi_gain: float = 0.0
+    rsi_loss: float = 0.0
+    rsi: float | None = None
+    atr_sum: float = 0.0
+    atr: float | None = None
+    # ADX: Wilder-smoothed +DM/-DM/TR sums and the DX seed sum.
+    dm_plus: float = 0.0
+    dm_minus: float = 0.0
+    tr_sum: float = 0.0
+    dx_sum: float = 0.0
+    adx: float | None = None
+    ema_fast_sum: float = 0.0
+    ema_fast: float | None = None
+    ema_slow_sum: float = 0.0
+    ema_slow: float | None = None
+
+    def copy(self) -> IndicatorState:
+        return replace(self)
+
+    def _push_ema(self, close: float) -> None:
+        n = self.count + 1
+        if self.ema_fast is None:
+            self.ema_fast_sum += close
+            if n == EMA_FAST_PERIOD:
+                self.ema_fast = self.ema_fast_sum / EMA_FAST_PERIOD
+        else:
+            self.ema_fast = (close - self.ema_fast) * (2.0 / (EMA_FAST_PERIOD + 1)) + self.ema_fast
+        if self.ema_slow is None:
+            self.ema_slow_sum += close
+            if n == EMA_SLOW_PERIOD:
+                self.ema_slow = self.ema_slow_sum / EMA_SLOW_PERIOD
+        else:
+            self.ema_slow = (close - self.ema_slow) * (2.0 / (EMA_SLOW_PERIOD + 1)) + self.ema_slow
+
+    def _rsi_value(self) -> float:
+        total = self.rsi_gain + self.rsi_loss
+        return 100.0 * (self.rsi_gain / total) if not _is_zero(total) else 0.0
+
+    def push(self, high: float, low: float, close: float) -> None:
+        index = self.count
+        self._push_ema(close)
+        self.last_close = close
+        if index == 0:
+            self.prev_high, self.prev_low, self.prev_close = high, low, close
+            self.count = 1
+            return
+
+        diff = close - self.prev_close
+        gain = diff if diff > 0 else 0.0
+        loss = -diff if diff < 0 else 0.0
+        if index <= RSI_PERIOD:
+            self.rsi_gain += gain
+            self.rsi_loss += loss
+            if index == RSI_PERIOD:
+                self.rsi_gain /= RSI_PERIOD
+                self.rsi_loss /= RSI_PERIOD
+                self.rsi = self._rsi_value()
+        else:
+            self.rsi_gain = (self.rsi_gain * (RSI_PERIOD - 1) + gain) / RSI_PERIOD
+            self.rsi_loss = (self.rsi_loss * (RSI_PERIOD - 1) + loss) / RSI_PERIOD
+            self.rsi = self._rsi_value()
+
+        true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        if index <= ATR_PERIOD:
+            self.atr_sum += true_range
+            if index == ATR_PERIOD:
+                self.atr = self.atr_sum / ATR_PERIOD
+        else:
+            self.atr = ((self.atr or 0.0) * (ATR_PERIOD - 1) + true_range) / ATR_PERIOD
+
+        diff_plus = high - self.prev_high
+        diff_minus = self.prev_low - low
+        plus_dm = 0.0
+        minus_dm = 0.0
+        if diff_minus > 0 and diff_plus < diff_minus:
+            minus_dm = diff_minus
+        elif diff_plus > 0 and diff_plus > diff_minus:
+            plus_dm = diff_plus
+        if index < ADX_PERIOD:
+            self.dm_plus += plus_dm
+            self.dm_minus += minus_dm
+            self.tr_sum += true_range
+        else:
+            self.dm_plus = self.dm_plus - self.dm_plus / ADX_PERIOD + plus_dm
+            self.dm_minus = self.dm_minus - self.dm_minus / ADX_PERIOD + minus_dm
+            self.tr_sum = self.tr_sum - self.tr_sum / ADX_PERIOD + true_range
+            dx: float | None = None
+            if not _is_zero(self.tr_sum):
+                minus_di = 100.0 * (self.dm_minus / self.tr_sum)
+                plus_di = 100.0 * (self.dm_plus / self.tr_sum)
+                di_sum = minus_di + plus_di
+                if not _is_zero(di_sum):
+                    dx = 100.0 * (abs(minus_di - plus_di) / di_sum)
+            if index < 2 * ADX_PERIOD:
+                self.dx_sum += dx if dx is not None else 0.0
+                if index == 2 * ADX_PERIOD - 1:
+                    self.adx = self.dx_sum / ADX_PERIOD
+            elif dx is not None and self.adx is not None:
+                self.adx = (self.adx * (ADX_PERIOD - 1) + dx) / ADX_PERIOD
+
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+        self.count = index + 1
+
+    def values(self) -> dict[str, float | None]:
+        close = self.last_close
+        atr_pct = (self.atr / close) * 100.0 if self.atr is not None and close > 0 else None
+        return {
+            "rsi": self.rsi,
+            "adx": self.adx,
+            "atr_pct": atr_pct,
+            "ema_fast": self.ema_fast,
+            "ema_slow": self.ema_slow,
+        }
+
+
+@dataclass
+class _StreamEntry:
+    state: IndicatorState
+    # State before the last bar, so an in-place update of the still-forming candle costs O(1).
+    prev_state: IndicatorState
+    last_ts: int
+    last_bar: Bar
+    prev_ts: int
+    prev_bar: Bar
+    interval_ms: int
+    # First bar of the seeding series; a series starting elsewhere is a sliding window.
+    first_ts: int
+
+
+class IndicatorStore:
+    """LRU of indicator recursion states keyed by (exchange, symbol, timeframe, backend).
+
+    The first series seen for a key seeds the state, so its values equal a full recompute
+    of that series. A later series that ends k bars past the cached last bar is applied in
+    O(k); a revision of the last cached bar replays from the saved pre-bar state. A series
+    growing from the seed's first bar stays equal to a recompute. A sliding window follows
+    the continuous history instead: the Wilder and EMA averages keep the decaying weight
+    of bars that have left the window. That weight only becomes negligible for long
+    windows, so a sliding window shorter than `min_window` bars is left to the caller,
+    which recomputes it from the window alone. Gaps, jumps of more than `max_tail` bars,
+    deeper revisions or a missing anchor bar reseed from the incoming series; unordered
+    or short series are left to the caller (None).
+    """
+
+    def __init__(self, max_keys: int = 512, max_tail: int = 64, min_window: int = 200) -> None:
+        self.max_keys = max(1, max_keys)
+        self.max_tail = max(1, max_tail)
+        self.min_window = max(1, min_window)
+        self._entries: OrderedDict[StreamKey, _StreamEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.incremental_updates = 0
+        self.full_recomputes = 0
+        self.skipped = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.incremental_updates = 0
+            self.full_recomputes = 0
+            self.skipped = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "keys": len(self._entries),
+                "incrementalUpdates": self.incremental_updates,
+                "fullRecomputes": self.full_recomputes,
+                "skipped": self.skipped,
+            }
+
+    def update(self, key: StreamKey, bars: Sequence[Any], fmt: list[str]) -> dict[str, float | None] | None:
+        """Return indicator values for list-shaped `bars`, or None when the caller should compute them."""
+        head = parse_ohlcv_bar(bars[0], fmt) if bars else None
+        return self._update(
+            key,
+            (ts_to_ms(head["ts"]) if head else None, len(bars)),
+            lambda entry: self._tail_from_bars(entry, bars, fmt),
+            lambda: extract_ohlcv_arrays({"ohlcvSeries": {"format": fmt, "bars": list(bars)}})[0],
+        )
+
+    def update_arrays(self, key: StreamKey, arrays: OhlcvArrays) -> dict[str, float | None] | None:
+        """Same as `update` for already decoded arrays (e.g. the columnar transport)."""
+        return self._update(
+            key,
+            (int(arrays.ts[0]) if len(arrays) else None, len(arrays)),
+            lambda entry: self._tail_from_arrays(entry, arrays),
+            lambda: arrays,
+        )
+
+    def _update(
+        self,
+        key: StreamKey,
+        window: tuple[int | None, int],
+        tail_of: Callable[[_StreamEntry], tuple[Bar, list[tuple[int, Bar]]] | None],
+        arrays_of: Callable[[], OhlcvArrays | None],
+    ) -> dict[str, float | None] | None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+        first_ts, length = window
+        if entry is not None and first_ts != entry.first_ts and length < self.min_window:
+            # Keep the entry so later ticks of the same short window are skipped cheaply.
+            with self._lock:
+                self._entries.setdefault(key, entry)
+                self.skipped += 1
+            return None
+
+        updated: _StreamEntry | None = None
+        if entry is not None:
+            located = tail_of(entry)
+            updated = self._advance(entry, *located) if located is not None else None
+        incremental = updated is not None
+        if updated is None:
+            arrays = arrays_of()
+            updated = self._rebuild(arrays) if arrays is not None else None
+
+        with self._lock:
+            if updated is None:
+                self.skipped += 1
+                return None
+            self._entries[key] = updated
+            if incremental:
+                self.incremental_updates += 1
+            else:
+                self.full_recomputes += 1
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        return updated.state.values()
+
+    def _tail_from_bars(
+        self, entry: _StreamEntry, bars: Sequence[Any], fmt: list[str]
+    ) -> tuple[Bar, list[tuple[int, Bar]]] | None:
+        tail: list[tuple[int, Bar]] = []
+        floor = max(0, len(bars) - self.max_tail - 2)
+        for idx in range(len(bars) - 1, floor - 1, -1):
+            parsed = parse_ohlcv_bar(bars[idx], fmt)
+            ts = ts_to_ms(parsed["ts"]) if parsed else None
+            if parsed is None or ts is None:
+                return None
+            if ts > entry.last_ts:
+                tail.append((ts, _bar(parsed)))
+                continue
+            if ts != entry.last_ts or idx == 0:
+                return None
+            previous = parse_ohlcv_bar(bars[idx - 1], fmt)
+            if previous is None or ts_to_ms(previous["ts"]) != entry.prev_ts or _bar(previous) != entry.prev_bar:
+                return None
+            tail.reverse()
+            return _bar(parsed), tail
+        return None
+
+    def _tail_from_arrays(self, entry: _StreamEntry, arrays: OhlcvArrays) -> tuple[Bar, list[tuple[int, Bar]]] | None:
+        ts = arrays.ts
+        if ts.size == 0:
+            return None
+        idx = int(np.searchsorted(ts, entry.last_ts))
+        if idx == 0 or idx >= ts.size or int(ts[idx]) != entry.last_ts or len(arrays) - idx - 1 > self.max_tail:
+            return None
+        if int(ts[idx - 1]) != entry.prev_ts or tuple(arrays.values[idx - 1].tolist()) != entry.prev_bar:
+            return None
+        tail = [(int(stamp), tuple(row)) for stamp, row in zip(ts[idx + 1 :].tolist(), arrays.values[idx + 1 :].tolist())]
+        return tuple(arrays.values[idx].tolist()), tail  # type: ignore[return-value]
+
+    def _advance(self, entry: _StreamEntry, anchor: Bar, tail: list[tuple[int, Bar]]) -> _StreamEntry | None:
+        expected = entry.last_ts
+        for ts, _ in tail:
+            expected += entry.interval_ms
+            if ts != expected:
+                return None
+
+        chain: list[tuple[int, Bar]] = [(entry.prev_ts, entry.prev_bar), (entry.last_ts, anchor), *tail]
+        if anchor == entry.last_bar:
+            if not tail:
+                return entry
+            state = entry.state.copy()
+            pending = tail
+        else:
+            state = entry.prev_state.copy()
+            pending = chain[1:]
+
+        for _ts, bar in pending[:-1]:
+            state.push(bar[1], bar[2], bar[3])
+        prev_state = state.copy()
+        last = pending[-1][1]
+        state.push(last[1], last[2], last[3])
+        return _StreamEntry(
+            state=state,
+            prev_state=prev_state,
+            last_ts=chain[-1][0],
+            last_bar=chain[-1][1],
+            prev_ts=chain[-2][0],
+            prev_bar=chain[-2][1],
+            interval_ms=entry.interval_ms,
+            first_ts=entry.first_ts,
+        )
+
+    @staticmethod
+    def _rebuild(arrays: OhlcvArrays) -> _StreamEntry | None:
+        ts = arrays.ts
+        if len(arrays) < MIN_BARS or not bool(np.all(ts[1:] > ts[:-1])):
+            return None
+
+        state = IndicatorState()
+        for high, low, close in zip(arrays.high[:-1].tolist(), arrays.low[:-1].tolist(), arrays.close[:-1].tolist()):
+            state.push(high, low, close)
+        prev_state = state.copy()
+        last: Bar = tuple(arrays.values[-1].tolist())  # type: ignore[assignment]
+        state.push(last[1], last[2], last[3])
+        return _StreamEntry(
+            state=state,
+            prev_state=prev_state,
+            last_ts=int(ts[-1]),
+            last_bar=last,
+            prev_ts=int(ts[-2]),
+            prev_bar=tuple(arrays.values[-2].tolist()),  # type: ignore[arg-type]
+            interval_ms=int(ts[-1] - ts[-2]),
+            first_ts=int(ts[0]),
+        )
+
+
+STORE = IndicatorStore(
+    max_keys=env_int("PY_TA_STREAM_MAX_KEYS", 512, 1),
+    max_tail=env_int("PY_TA_STREAM_MAX_TAIL", 64, 1),
+    min_window=env_int("PY_TA_STREAM_MIN_WINDOW", 200, 1),
+)
+
+
+def stream_key(snapshot: dict[str, Any], context: RunContext, backend: str) -> StreamKey | None:
+    ohlcv = snapshot.get("ohlcvSeries")
+    ohlcv = ohlcv if isinstance(ohlcv, dict) else {}
+    exchange = str(context.exchange or "").strip().lower()
+    symbol = str(context.symbol or "").strip().upper()
+    timeframe = str(ohlcv.get("timeframe") or context.timeframe or "").strip()
+    if not exchange or not symbol or not timeframe:
+        return None
+    return (exchange, symbol, timeframe, backend)
+
+
+def compute_streaming_indicators(snapshot: dict[str, Any], context: RunContext | None) -> dict[str, Any] | None:
+    """Indicator values via the shared store, or None when the caller should compute from scratch."""
+    if context is None or not streaming_enabled():
+        return None
+    backend = active_backend()
+    if backend not in STREAMING_BACKENDS:
+        return None
+    key = stream_key(snapshot, context, backend)
+    ohlcv = snapshot.get("ohlcvSeries")
+    if key is None or not isinstance(ohlcv, dict):
+        return None
+    if is_columnar_ohlcv(ohlcv):
+        arrays, _error = extract_ohlcv_arrays(snapshot)
+        values = STORE.update_arrays(key, arrays) if arrays is not None else None
+        return {"backend": backend, **values} if values is not None else None
+    bars = ohlcv.get("bars")
+    if not isinstance(bars, list) or len(bars) < MIN_BARS:
+        return None
+    values = STORE.update(key, bars, ohlcv_format(ohlcv))
+    if values is None:
+        return None
+    return {"backend": backend, **values}
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from typing import Any
 
-from models import StrategyRunRequest, StrategyRunResponse
-from strategies.ta_backend import compute_ta_indicators, extract_ohlcv_frame
+from models import RunContext, StrategyRunRequest, StrategyRunResponse
+from strategies.ta_backend import compute_ta_indicators, extract_ohlcv_arrays
+from strategies.ta_stream import compute_streaming_indicators
 
 
 def _as_dict(value: Any) -> dict[str, Any]:
@@ -51,6 +52,35 @@ def _fallback_indicator(snapshot: dict[str, Any]) -> dict[str, float | None]:
     }
 
 
+def resolve_indicators(
+    snapshot: dict[str, Any], context: RunContext | None = None
+) -> tuple[dict[str, Any], str | None, str]:
+    streamed = compute_streaming_indicators(snapshot, context)
+    if streamed is not None:
+        return streamed, None, "ohlcv"
+
+    ohlcv, ohlcv_error = extract_ohlcv_arrays(snapshot)
+    ta_values: dict[str, Any] = {}
+    ta_error: str | None = None
+    indicator_source = "fallback"
+
+    if ohlcv is not None:
+        ta_values, ta_error = compute_ta_indicators(ohlcv)
+        if ta_error is None:
+            indicator_source = "ohlcv"
+
+    if ta_error is not None or ohlcv is None:
+        fallback = _fallback_indicator(snapshot)
+        ta_values = {
+            **ta_values,
+            **fallback,
+        }
+        if ta_error is None:
+            ta_error = ohlcv_error
+
+    return ta_values, ta_error, indicator_source
+
+
 def run(request: StrategyRunRequest) -> StrategyRunResponse:
     defaults = {
         "allowedStates": ["trend_up", "trend_down"],
@@ -91,24 +121,7 @@ def run(request: StrategyRunRequest) -> StrategyRunResponse:
     min_pass_score = min_pass_score if min_pass_score is not None else defaults["minPassScore"]
     allow_neutral = _as_bool(config.get("allowNeutralSignal"), False)
 
-    frame, frame_error = extract_ohlcv_frame(snapshot)
-    ta_values: dict[str, Any] = {}
-    ta_error: str | None = None
-    indicator_source = "fallback"
-
-    if frame is not None:
-        ta_values, ta_error = compute_ta_indicators(frame)
-        if ta_error is None:
-            indicator_source = "ohlcv"
-
-    if ta_error is not None or frame is None:
-        fallback = _fallback_indicator(snapshot)
-        ta_values = {
-            **ta_values,
-            **fallback,
-        }
-        if ta_error is None:
-            ta_error = frame_error
+    ta_values, ta_error, indicator_source = resolve_indicators(snapshot, request.context)
 
     rsi = _as_float(ta_values.get("rsi"))
     adx = _as_float(ta_values.get("adx"))
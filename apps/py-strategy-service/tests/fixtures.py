@@ -0,0 +1,456 @@
+"""Request and payload builders shared by the tests and scripts/bench.py.
+
+Callers put the service root on sys.path first, as the test modules do.
+"""
+from __future__ import annotations
+
+import importlib.util
+import math
+import os
+import pathlib
+import random
+from typing import TYPE_CHECKING, Any, Callable
+
+import numpy as np
+
+from grid import GridPlanRequest
+from models import StrategyRunRequest
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+RESEARCH_GATES = ROOT.parent / "quant-research" / "src" / "backtest" / "gates.py"
+SEED = int(os.getenv("PARITY_SEED", "20240611"))
+
+STATES = ["trend_up", "trend_down", "range", "transition", "unknown", " trend_up ", "", None, 7]
+STACKS = ["bull", "bear", "mixed", " bull", "", None]
+TAGS = ["trend_up", "trend_down", "Trend_Up ", "news_risk", "range_bound", "high_vol", "a", "b", 3]
+SIGNALS = ["up", "down", "neutral", None]
+TREND_LABELS = ["bullish", "bearish", "neutral", " Bullish ", "sideways", None]
+BAR_MS = 15 * 60 * 1000
+
+
+def _number(rng: random.Random, low: float, high: float, edges: tuple[Any, ...] = ()) -> Any:
+    roll = rng.random()
+    if roll < 0.08:
+        return None
+    if roll < 0.12:
+        return rng.choice(["nan", "inf", "abc", True, "12.5"])
+    if edges and roll < 0.35:
+        return rng.choice(edges)
+    return round(rng.uniform(low, high), rng.choice([0, 1, 2, 4]))
+
+
+def _maybe_bool(rng: random.Random, p_true: float = 0.5) -> Any:
+    roll = rng.random()
+    if roll < 0.05:
+        return rng.choice([None, 1, "true"])
+    return roll < p_true
+
+
+def _age(rng: random.Random) -> Any:
+    return rng.choice([None, 0, 1, 2, 3, 4, 5, 8, 9, 20, "3", -2, 4.7])
+
+
+def _vumanchu(rng: random.Random) -> dict[str, Any]:
+    if rng.random() < 0.1:
+        return {}
+    divergences = {
+        branch: {
+            "bullish": _maybe_bool(rng, 0.4),
+            "bullishAdd": _maybe_bool(rng, 0.2),
+            "bullishHidden": _maybe_bool(rng, 0.2),
+            "bearish": _maybe_bool(rng, 0.4),
+            "bearishAdd": _maybe_bool(rng, 0.2),
+            "bearishHidden": _maybe_bool(rng, 0.2),
+            "lastBullishAgeBars": _age(rng),
+            "lastBearishAgeBars": _age(rng),
+        }
+        for branch in ("wt", "rsi", "stoch")
+        if rng.random() < 0.85
+    }
+    return {
+        "dataGap": _maybe_bool(rng, 0.1),
+        "waveTrend": {
+            "crossUp": _maybe_bool(rng),
+            "crossDown": _maybe_bool(rng),
+            "oversold": _maybe_bool(rng),
+            "overbought": _maybe_bool(rng),
+        },
+        "signals": {
+            "buy": _maybe_bool(rng),
+            "sell": _maybe_bool(rng),
+            "buyDiv": _maybe_bool(rng, 0.3),
+            "sellDiv": _maybe_bool(rng, 0.3),
+            "goldNoBuyLong": _maybe_bool(rng, 0.15),
+            "ages": {key: _age(rng) for key in ("buy", "sell", "buyDiv", "sellDiv")},
+        },
+        "divergences": divergences,
+    }
+
+
+def _smart_money(rng: random.Random, last_ts: int, last_close: float) -> dict[str, Any]:
+    if rng.random() < 0.1:
+        return {}
+
+    def event() -> dict[str, Any]:
+        if rng.random() < 0.2:
+            return {}
+        return {
+            "direction": rng.choice(TREND_LABELS),
+            "ts": last_ts - rng.choice([0, 1, 3, 50, 119, 120, 121, 400]) * BAR_MS,
+        }
+
+    mid = last_close * rng.uniform(0.97, 1.03)
+    width = last_close * rng.uniform(0.005, 0.03)
+    return {
+        "dataGap": _maybe_bool(rng, 0.1),
+        "internal": {"trend": rng.choice(TREND_LABELS), "lastEvent": event()},
+        "swing": {"trend": rng.choice(TREND_LABELS), "lastEvent": event()},
+        "zones": {
+            "discountTop": mid - width,
+            "discountBottom": mid - 3 * width,
+            "equilibriumTop": mid + width,
+            "equilibriumBottom": mid - width,
+            "premiumTop": mid + 3 * width if rng.random() < 0.9 else None,
+            "premiumBottom": mid + width,
+        },
+        "orderBlocks": {
+            "internal": {"bullishCount": rng.choice([0, 1, 2, None]), "bearishCount": rng.choice([0, 1, "2"])},
+            "swing": {"bullishCount": rng.choice([0, 1, -1]), "bearishCount": rng.choice([0, 3, None])},
+        },
+        "fairValueGaps": {"bullishCount": rng.choice([0, 2, None]), "bearishCount": rng.choice([0, 1])},
+    }
+
+
+def _align(rng: random.Random, snapshot: dict[str, Any], signal: str) -> None:
+    # Uniform sampling rarely survives the early checks; bias some rows towards the signal so
+    # distance, volatility, zone and score-threshold branches are reached as well.
+    bullish = signal == "up"
+    sign = 1.0 if bullish else -1.0
+    history = snapshot["historyContext"]
+    history["reg"]["state"] = "trend_up" if bullish else "trend_down"
+    history["reg"]["conf"] = rng.choice([rng.uniform(50.0, 95.0), 55, 62.5, 70.8333])
+    history["ema"].update(
+        {
+            "stk": "bull" if bullish else "bear",
+            "d50": sign * rng.choice([rng.uniform(0.05, 1.5), 0.12]),
+            "d200": sign * rng.choice([rng.uniform(0.1, 2.5), 0.2]),
+            "sl50": sign * rng.choice([rng.uniform(0.0, 0.2), 0.0]),
+            "ema20": 105.0 if bullish else 95.0,
+            "ema50": 100.0,
+        }
+    )
+    history["vol"] = {"z": rng.uniform(-1.5, 3.0), "rv": rng.uniform(0.5, 2.2)}
+    snapshot["indicators"].update({"rsi_14": 50.0 + sign * rng.uniform(0.0, 15.0), "adx": {"adx_14": rng.uniform(12.0, 40.0)}})
+    smc = snapshot["advancedIndicators"]["smartMoneyConcepts"]
+    if smc:
+        label = "bullish" if bullish else "bearish"
+        smc["swing"]["trend"] = label
+        smc["swing"]["lastEvent"]["direction"] = label
+
+
+def random_snapshot(rng: random.Random, signal: str | None = None) -> dict[str, Any]:
+    """Build one featureSnapshot mixing realistic values, threshold edges and malformed inputs."""
+    last_ts = 1_700_000_000_000 + rng.randrange(0, 10_000) * BAR_MS
+    last_close = rng.uniform(50.0, 150.0)
+    ohlc = [
+        {"t": last_ts - offset * BAR_MS, "c": last_close if offset == 0 else last_close * rng.uniform(0.98, 1.02)}
+        for offset in (2, 1, 0)
+    ]
+    snapshot = {
+        "historyContext": {
+            "reg": {
+                "state": rng.choice(STATES),
+                "conf": _number(rng, 0.0, 100.0, (45, 50, 55, 60, 62.5, 70.8333, "80")),
+            },
+            "ema": {
+                "stk": rng.choice(STACKS),
+                "d50": _number(rng, -2.0, 2.0, (0.12, -0.12, 0.1, 0.0)),
+                "d200": _number(rng, -3.0, 3.0, (0.2, -0.2, 0.18)),
+                "sl50": _number(rng, -0.3, 0.3, (0.0, -0.0)),
+                "ema20": _number(rng, 90.0, 110.0),
+                "ema50": _number(rng, 90.0, 110.0),
+            },
+            "vol": {
+                "z": _number(rng, -3.0, 3.5, (2.5, -1.2, 0.0)),
+                "rv": _number(rng, 0.2, 2.5, (1.8, 0.6)),
+            },
+            "lastBars": {"ohlc": ohlc},
+        },
+        "tags": rng.sample(TAGS, rng.randint(0, 3)) if rng.random() < 0.9 else "trend_up",
+        "riskFlags": {"dataGap": _maybe_bool(rng, 0.1)},
+        "indicators": {
+            "rsi_14": _number(rng, 10.0, 90.0, (52, 48)),
+            "atr_pct": _number(rng, 0.1, 4.0, (2.0,)),
+            "adx": {"adx_14": _number(rng, 5.0, 50.0, (18,))},
+            "vumanchu": _vumanchu(rng),
+        },
+        "advancedIndicators": {"smartMoneyConcepts": _smart_money(rng, last_ts, last_close)},
+    }
+    if signal in ("up", "down") and rng.random() < 0.5:
+        _align(rng, snapshot, signal)
+    return snapshot
+
+
+def _cfg_number(rng: random.Random, low: float, high: float) -> Any:
+    return rng.choice([0, None, "5", rng.uniform(low, high), round(rng.uniform(low, high))])
+
+
+CONFIG_SPACE: dict[str, Callable[[random.Random], dict[str, Any]]] = {
+    "regime_gate": lambda rng: {
+        "allowStates": rng.sample(["trend_up", "trend_down", "range", " range "], rng.randint(0, 3)),
+        "minRegimeConfidencePct": _cfg_number(rng, 20, 80),
+        "requireStackAlignment": rng.choice([True, False, 0]),
+        "allowUnknownRegime": rng.choice([True, False]),
+    },
+    "signal_filter": lambda rng: {
+        "blockedTags": rng.sample(["news_risk", "High_Vol ", "range_bound"], rng.randint(0, 2)),
+        "requiredTags": rng.sample(["trend_up", "a", "b"], rng.randint(0, 2)),
+        "blockRangeStates": rng.sample(["range", "transition", " range"], rng.randint(0, 2)),
+        "allowRangeWhenTrendTag": rng.choice([True, False]),
+        "maxVolZ": _cfg_number(rng, 0.5, 3.5),
+    },
+    "trend_vol_gate": lambda rng: {
+        "allowedStates": rng.sample(["trend_up", "trend_down", "range", " trend_up "], rng.randint(0, 3)),
+        "minRegimeConf": _cfg_number(rng, 30, 80),
+        "requireStackAlignment": rng.choice([True, False, "yes"]),
+        "requireSlopeAlignment": rng.choice([True, False]),
+        "minAbsD50Pct": _cfg_number(rng, 0.0, 0.3),
+        "minAbsD200Pct": _cfg_number(rng, 0.0, 0.4),
+        "maxVolZ": _cfg_number(rng, 1.0, 3.0),
+        "maxRelVol": _cfg_number(rng, 1.0, 2.5),
+        "minVolZ": rng.choice([0, -0.0, None, -1.3, -1.1, "-1"]),
+        "minRelVol": _cfg_number(rng, 0.3, 0.8),
+        "minPassScore": _cfg_number(rng, 40, 90),
+        "allowNeutralSignal": rng.choice([True, False]),
+    },
+    "ta_trend_vol_gate_v2": lambda rng: {
+        "allowedStates": rng.sample(["trend_up", "trend_down", "range"], rng.randint(0, 3)),
+        "minRegimeConf": _cfg_number(rng, 30, 80),
+        "minAdx": _cfg_number(rng, 10, 30),
+        "maxAtrPct": _cfg_number(rng, 0.5, 3.0),
+        "rsiLongMin": _cfg_number(rng, 45, 60),
+        "rsiShortMax": _cfg_number(rng, 40, 55),
+        "requireEmaAlignment": rng.choice([True, False]),
+        "minPassScore": _cfg_number(rng, 40, 90),
+        "allowNeutralSignal": rng.choice([True, False]),
+    },
+    "smart_money_concept": lambda rng: {
+        "requireNonNeutralSignal": rng.choice([True, False]),
+        "blockOnDataGap": rng.choice([True, False]),
+        "requireTrendAlignment": rng.choice([True, False]),
+        "requireStructureAlignment": rng.choice([True, False]),
+        "requireZoneAlignment": rng.choice([True, False]),
+        "allowEquilibriumZone": rng.choice([True, False]),
+        "maxEventAgeBars": rng.choice([0, None, 3, 120, "60"]),
+        "minPassScore": _cfg_number(rng, 30, 90),
+    },
+    "vmc_cipher_gate": lambda rng: {
+        "requireNonNeutralSignal": rng.choice([True, False]),
+        "blockOnDataGap": rng.choice([True, False]),
+        "allowDivSignalAsPrimary": rng.choice([True, False]),
+        "maxSignalAgeBars": rng.choice([0, None, 2, 4, 8, "3"]),
+        "minPassScore": _cfg_number(rng, 30, 90),
+    },
+    "vmc_divergence_reversal": lambda rng: {
+        "requireNonNeutralSignal": rng.choice([True, False]),
+        "blockOnDataGap": rng.choice([True, False]),
+        "requireRegularDiv": rng.choice([True, False]),
+        "allowHiddenDiv": rng.choice([True, False]),
+        "requireCrossAlignment": rng.choice([True, False]),
+        "requireExtremeZone": rng.choice([True, False]),
+        "maxDivergenceAgeBars": rng.choice([0, None, 4, 8, "9"]),
+        "minPassScore": _cfg_number(rng, 30, 90),
+    },
+}
+
+
+def random_config(rng: random.Random, strategy_type: str) -> dict[str, Any]:
+    """Sample a sparse config: absent keys exercise handler defaults."""
+    full = CONFIG_SPACE[strategy_type](rng)
+    return {key: value for key, value in full.items() if rng.random() < 0.6}
+
+
+def generate_cases(strategy_type: str, samples: int, seed: int = SEED) -> list[tuple[dict[str, Any], str | None]]:
+    rng = random.Random(f"{seed}:{strategy_type}")
+    signals = [rng.choice(SIGNALS) for _ in range(samples)]
+    return [(random_snapshot(rng, signal), signal) for signal in signals]
+
+
+def load_research_gates() -> Any | None:
+    if not RESEARCH_GATES.exists():
+        return None
+    try:
+        import pandas  # noqa: F401
+    except Exception:
+        return None
+    spec = importlib.util.spec_from_file_location("quant_research_gates", RESEARCH_GATES)
+    if spec is None or spec.loader is None:
+        return None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_scalar(strategy_type: str, cases: list[tuple[dict[str, Any], str | None]], config: dict[str, Any]) -> list[Any]:
+    """Run `cases` through the registered scalar handler, one request per case."""
+    import main
+
+    handler = main.registry.get(strategy_type).handler  # type: ignore[union-attr]
+    return [
+        handler(
+            StrategyRunRequest(
+                strategyType=strategy_type,
+                featureSnapshot=snapshot,
+                context={"signal": signal},
+                config=config,
+            )
+        )
+        for snapshot, signal in cases
+    ]
+
+
+# Representative payloads for the JSON layer (tests/test_serialization.py).
+
+
+def serialization_plan_request() -> GridPlanRequest:
+    return GridPlanRequest(
+        instanceId="inst-bench",
+        mode="neutral",
+        gridMode="geometric",
+        lowerPrice=60000,
+        upperPrice=70000,
+        gridCount=120,
+        investUsd=5000,
+        leverage=3,
+        markPrice=65000,
+        venueConstraints={"minQty": 0.001, "qtyStep": 0.001, "priceTick": 0.1, "minNotional": 5},
+    )
+
+
+def serialization_strategy_request() -> StrategyRunRequest:
+    return StrategyRunRequest(
+        strategyType="trend_vol_gate",
+        featureSnapshot={
+            "historyContext": {
+                "reg": {"state": "trend_up", "conf": 78.0},
+                "ema": {"stk": "bull", "d50": 0.55, "d200": 1.2, "sl50": 0.08},
+                "vol": {"z": 0.9, "rv": 1.1},
+            }
+        },
+        context={"signal": "up", "exchange": "bitget", "symbol": "BTCUSDT", "timeframe": "15m"},
+    )
+
+
+# CPU-heavy requests for the worker pool (tests/test_workers.py).
+
+WORKER_BAR_MS = 15 * 60 * 1000
+
+
+def worker_ta_request(count: int = 400) -> StrategyRunRequest:
+    bars = [
+        [1_767_225_600_000 + idx * WORKER_BAR_MS, 100 + math.sin(idx / 7), 101 + math.sin(idx / 7), 99 + math.sin(idx / 7), 100.4 + math.sin(idx / 6), 1000 + idx]
+        for idx in range(count)
+    ]
+    return StrategyRunRequest(
+        strategyType="ta_trend_vol_gate_v2",
+        featureSnapshot={
+            "historyContext": {"reg": {"state": "trend_up", "conf": 80}},
+            "ohlcvSeries": {"timeframe": "15m", "bars": bars},
+        },
+        context={"signal": "up"},
+    )
+
+
+def worker_plan_request(grid_count: int = 500) -> GridPlanRequest:
+    return GridPlanRequest(
+        instanceId="inst-pool",
+        mode="neutral",
+        gridMode="geometric",
+        lowerPrice=60000,
+        upperPrice=70000,
+        gridCount=grid_count,
+        investUsd=50000,
+        leverage=3,
+        markPrice=65000,
+    )
+
+
+# Instances spread over three level grids (tests/test_grid_batch.py).
+
+
+def batch_plan_request(instance_id: str, symbol_range: tuple[float, float] = (60000, 70000), mark: float = 65000) -> GridPlanRequest:
+    return GridPlanRequest(
+        instanceId=instance_id,
+        mode="neutral",
+        gridMode="geometric",
+        lowerPrice=symbol_range[0],
+        upperPrice=symbol_range[1],
+        gridCount=200,
+        investUsd=5000,
+        leverage=3,
+        markPrice=mark,
+    )
+
+
+def batch_range(index: int) -> tuple[float, float]:
+    return [(60000, 70000), (3000, 4000), (140, 180)][index % 3]
+
+
+def batch_plan_requests(count: int) -> list[GridPlanRequest]:
+    return [batch_plan_request(f"inst-{idx}", batch_range(idx), mark=sum(batch_range(idx)) / 2 + idx) for idx in range(count)]
+
+
+# Random-walk 1m bars and a grid template for the replay simulator (tests/test_grid_simulator.py).
+
+MINUTE_MS = 60_000
+
+
+def simulator_bars(count: int, seed: int = 1, drift: float = 0.0, start: float = 65000.0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    close = start * np.exp(np.cumsum(rng.normal(drift, 0.0007, count)))
+    open_ = np.concatenate(([start], close[:-1]))
+    wick = np.abs(rng.normal(0, 0.0004, count)) * close
+    high = np.maximum(open_, close) + wick
+    low = np.minimum(open_, close) - wick
+    ts = 1_700_006_400_000 + np.arange(count, dtype=np.int64) * MINUTE_MS
+    return ts, np.column_stack([open_, high, low, close, np.ones(count)])
+
+
+def simulator_template(mode: str = "neutral", lower: float = 60000, upper: float = 70000, **overrides) -> GridPlanRequest:
+    payload = {
+        "instanceId": "sim",
+        "mode": mode,
+        "gridMode": "geometric",
+        "lowerPrice": lower,
+        "upperPrice": upper,
+        "gridCount": 200,
+        "investUsd": 10000,
+        "leverage": 3,
+        "markPrice": 65000,
+        "venueConstraints": {"minQty": 0.001, "qtyStep": 0.001, "minNotional": 5},
+    }
+    payload.update(overrides)
+    return GridPlanRequest(**payload)
+
+
+# OHLCV frames for the TA backends (tests/test_ta_backend.py).
+
+
+def random_ohlcv_frame(count: int, seed: int = 11) -> pd.DataFrame:
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    closes = 100.0 + np.cumsum(rng.normal(0.0, 1.0, count))
+    return pd.DataFrame(
+        {
+            "open": closes - rng.normal(0.0, 0.2, count),
+            "high": closes + rng.uniform(0.0, 1.0, count),
+            "low": closes - rng.uniform(0.0, 1.0, count),
+            "close": closes,
+            "volume": rng.uniform(900.0, 1100.0, count),
+        }
+    )
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import pathlib
+import sys
+import unittest
+
+import numpy as np
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import main
+from columnar import KERNELS, build_columns, run_columns, run_requests
+from models import StrategyRunBatchRequest, StrategyRunRequest
+
+
+def _history(state: str = "trend_up", conf: float | None = 78.0, stack: str = "bull", vol_z: float | None = 0.9) -> dict:
+    return {
+        "reg": {"state": state, "conf": conf},
+        "ema": {"stk": stack, "d50": 0.55, "d200": 1.2, "sl50": 0.08, "ema20": 110.0, "ema50": 100.0},
+        "vol": {"z": vol_z, "rv": 1.1},
+    }
+
+
+def _vmc(buy: bool = True, age: int | None = 1, gold: bool = False) -> dict:
+    return {
+        "indicators": {
+            "vumanchu": {
+                "waveTrend": {"crossUp": True, "crossDown": False, "oversold": True, "overbought": False},
+                "signals": {"buy": buy, "sell": False, "buyDiv": False, "goldNoBuyLong": gold, "ages": {"buy": age}},
+                "divergences": {"wt": {"bullish": buy, "lastBullishAgeBars": age}},
+            }
+        }
+    }
+
+
+CASES: dict[str, list[tuple[str | None, dict, dict]]] = {
+    "regime_gate": [
+        ("up", {"historyContext": _history()}, {}),
+        ("down", {"historyContext": _history(stack="bull")}, {}),
+        (None, {"historyContext": _history(state="unknown", conf=None)}, {"allowUnknownRegime": True}),
+        ("up", {"historyContext": _history(conf=20.0)}, {}),
+    ],
+    "signal_filter": [
+        ("up", {"tags": ["trend_up"], "historyContext": _history(state="range")}, {}),
+        ("up", {"tags": ["Trend_Up "], "historyContext": _history(state="range")}, {"allowRangeWhenTrendTag": True}),
+        ("up", {"tags": ["news_risk"], "historyContext": _history()}, {}),
+        ("up", {"historyContext": _history(vol_z=-3.1)}, {"requiredTags": []}),
+        ("up", {"tags": ["a"], "historyContext": _history()}, {"requiredTags": ["a", "b"]}),
+    ],
+    "trend_vol_gate": [
+        ("up", {"historyContext": _history()}, {}),
+        ("up", {"historyContext": _history(stack="bear")}, {}),
+        ("neutral", {"historyContext": _history()}, {"allowNeutralSignal": True}),
+        ("up", {"historyContext": _history(vol_z=None)}, {"minPassScore": 0}),
+    ],
+    "ta_trend_vol_gate_v2": [
+        ("up", {"historyContext": _history(), "indicators": {"rsi_14": 58.0, "atr_pct": 1.1, "adx": {"adx_14": 24.0}}}, {}),
+        ("down", {"historyContext": _history(state="trend_down"), "indicators": {"rsi_14": 58.0}}, {}),
+        ("up", {"historyContext": _history(), "indicators": {"rsi_14": 58.0, "atr_pct": 3.0, "adx": {"adx_14": 24.0}}}, {}),
+    ],
+    "smart_money_concept": [
+        ("up", {}, {}),
+        ("neutral", {}, {"requireNonNeutralSignal": False}),
+    ],
+    "vmc_cipher_gate": [
+        ("up", _vmc(), {}),
+        ("up", _vmc(gold=True), {}),
+        ("up", _vmc(age=9), {}),
+        ("down", _vmc(), {}),
+    ],
+    "vmc_divergence_reversal": [
+        ("up", _vmc(), {}),
+        ("up", _vmc(age=20), {}),
+        ("up", _vmc(buy=False), {"requireRegularDiv": False}),
+    ],
+}
+
+
+def _request(strategy_type: str, signal: str | None, snapshot: dict, config: dict) -> StrategyRunRequest:
+    return StrategyRunRequest(
+        strategyType=strategy_type,
+        featureSnapshot=snapshot,
+        context={"signal": signal},
+        config=config,
+    )
+
+
+class ColumnarEngineTests(unittest.TestCase):
+    def test_every_registered_strategy_has_a_kernel(self) -> None:
+        registered = {item.type for item in main.registry.list_public()}
+        self.assertEqual(registered, set(KERNELS.keys()))
+
+    def test_kernels_match_scalar_handlers(self) -> None:
+        for strategy_type, cases in CASES.items():
+            requests = [_request(strategy_type, *case) for case in cases]
+            columnar = run_requests(requests)
+            for request, fast in zip(requests, columnar):
+                scalar = main.registry.get(strategy_type).handler(request)  # type: ignore[union-attr]
+                with self.subTest(strategy=strategy_type, config=request.config, signal=request.context.signal):
+                    self.assertEqual(fast.allow, scalar.allow)
+                    self.assertEqual(fast.score, scalar.score)
+                    self.assertEqual(fast.reasonCodes, scalar.reasonCodes)
+
+    def test_run_columns_accepts_dataset_style_arrays(self) -> None:
+        columns = {
+            "signal": np.array(["up", "down", "neutral"]),
+            "reg_state": np.array(["trend_up", "trend_down", "trend_up"]),
+            "reg_conf": np.array([80.0, 40.0, 90.0]),
+            "ema_stk": np.array(["bull", "bear", "bull"]),
+            "ema_d50": np.array([0.5, -0.5, 0.5]),
+            "ema_d200": np.array([1.0, -1.0, 1.0]),
+            "ema_sl50": np.array([0.1, -0.1, 0.1]),
+            "vol_z": np.array([0.5, np.nan, 0.5]),
+            "vol_rv": np.array([1.0, 1.0, 1.0]),
+        }
+        result = run_columns("trend_vol_gate", columns, {"minRegimeConf": 50})
+        self.assertEqual(result.allow.tolist(), [True, False, False])
+        self.assertEqual(
+            result.reason_codes(),
+            [["trend_vol_gate_pass"], ["regime_confidence_low"], ["signal_missing_or_neutral"]],
+        )
+
+    def test_empty_columns(self) -> None:
+        for strategy_type in KERNELS:
+            result = run_columns(strategy_type, build_columns(strategy_type, [], []), {})
+            self.assertEqual(result.allow.shape, (0,))
+
+    def test_unknown_strategy_raises(self) -> None:
+        with self.assertRaises(ValueError):
+            run_columns("does_not_exist", {"signal": np.array([])}, {})
+
+    def test_batch_columnar_engine_matches_scalar_decisions(self) -> None:
+        items = [
+            _request(strategy_type, *case).model_dump()
+            for strategy_type, cases in CASES.items()
+            for case in cases
+        ]
+        items.append({"strategyType": "does_not_exist"})
+        scalar = main.run_strategy_batch(StrategyRunBatchRequest(items=items), None)
+        columnar = main.run_strategy_batch(StrategyRunBatchRequest(items=items, engine="columnar"), None)
+        self.assertEqual(columnar.errorCount, 1)
+        for left, right in zip(scalar.items, columnar.items):
+            self.assertEqual(left.ok, right.ok)
+            self.assertEqual(left.error, right.error)
+            if left.result and right.result:
+                self.assertEqual(left.result.allow, right.result.allow)
+                self.assertEqual(left.result.score, right.result.score)
+                self.assertEqual(left.result.reasonCodes, right.result.reasonCodes)
+                self.assertEqual(right.result.meta.get("kernel"), "columnar")
+                self.assertEqual(right.result.meta.get("strategyType"), left.result.meta.get("strategyType"))
+
+    def test_batch_columnar_failure_falls_back_per_group(self) -> None:
+        items = [_request(strategy_type, *cases[0]).model_dump() for strategy_type, cases in CASES.items()]
+        failing = items[0]["strategyType"]
+        original = KERNELS[failing]
+
+        def _boom(_columns, _config):
+            raise RuntimeError("boom")
+
+        scalar = main.run_strategy_batch(StrategyRunBatchRequest(items=items), None)
+        try:
+            KERNELS[failing] = _boom
+            columnar = main.run_strategy_batch(StrategyRunBatchRequest(items=items, engine="columnar"), None)
+        finally:
+            KERNELS[failing] = original
+        self.assertEqual(columnar.errorCount, scalar.errorCount)
+        self.assertEqual(columnar.items[0].result, scalar.items[0].result)
+        self.assertTrue(all(item.result.meta.get("kernel") == "columnar" for item in columnar.items[1:] if item.result))
+
+
+if __name__ == "__main__":
+    unittest.main()
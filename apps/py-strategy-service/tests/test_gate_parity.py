@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import random
+import sys
+import unittest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from columnar import build_columns, run_columns
+from tests.fixtures import SEED, generate_cases, load_research_gates, random_config, run_scalar
+
+SAMPLES = int(os.getenv("PARITY_SAMPLES", "400"))
+
+
+class GateParityTests(unittest.TestCase):
+    def _assert_columnar_parity(self, strategy_type: str) -> None:
+        rng = random.Random(f"{SEED}:{strategy_type}:config")
+        cases = generate_cases(strategy_type, SAMPLES)
+        # Several configs per strategy; each batch shares one config like a real sweep.
+        for chunk in range(4):
+            config = random_config(rng, strategy_type)
+            batch = cases[chunk::4]
+            scalar = run_scalar(strategy_type, batch, config)
+            fast = run_columns(
+                strategy_type,
+                build_columns(strategy_type, [snapshot for snapshot, _ in batch], [signal for _, signal in batch]),
+                config,
+            )
+            codes = fast.reason_codes()
+            for index, expected in enumerate(scalar):
+                with self.subTest(strategy=strategy_type, seed=SEED, chunk=chunk, index=index, config=config):
+                    self.assertEqual(bool(fast.allow[index]), expected.allow)
+                    self.assertEqual(float(fast.score[index]), expected.score)
+                    self.assertEqual(codes[index], expected.reasonCodes)
+
+    def test_regime_gate_parity(self) -> None:
+        self._assert_columnar_parity("regime_gate")
+
+    def test_signal_filter_parity(self) -> None:
+        self._assert_columnar_parity("signal_filter")
+
+    def test_trend_vol_gate_parity(self) -> None:
+        self._assert_columnar_parity("trend_vol_gate")
+
+    def test_ta_trend_vol_gate_v2_parity(self) -> None:
+        self._assert_columnar_parity("ta_trend_vol_gate_v2")
+
+    def test_smart_money_concept_parity(self) -> None:
+        self._assert_columnar_parity("smart_money_concept")
+
+    def test_vmc_cipher_gate_parity(self) -> None:
+        self._assert_columnar_parity("vmc_cipher_gate")
+
+    def test_vmc_divergence_reversal_parity(self) -> None:
+        self._assert_columnar_parity("vmc_divergence_reversal")
+
+    def test_research_gates_match_scalar_trend_vol_gate(self) -> None:
+        gates = load_research_gates()
+        if gates is None:
+            self.skipTest("quant-research gates not available")
+        import pandas as pd
+
+        rng = random.Random(f"{SEED}:research")
+        cases = generate_cases("trend_vol_gate", SAMPLES)
+        configs = [random_config(rng, "trend_vol_gate") for _ in range(3)]
+        # Regression: an explicit minVolZ of 0 must not fall back to the -1.2 default.
+        configs.append({"minVolZ": 0, "minRegimeConf": 0, "minPassScore": 0})
+        for config in configs:
+            scalar = run_scalar("trend_vol_gate", cases, config)
+            columns = build_columns("trend_vol_gate", [s for s, _ in cases], [sig for _, sig in cases])
+            frame = pd.DataFrame(columns)
+            allow, score = gates.strategy_gate(frame, config)
+            for index, expected in enumerate(scalar):
+                with self.subTest(seed=SEED, index=index, config=config):
+                    self.assertEqual(bool(allow[index]), expected.allow)
+                    self.assertEqual(float(score[index]), expected.score)
+                    self.assertEqual(gates.gate_row_by_params(frame.iloc[index], config), expected.allow)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+import main
+from grid.batch import batch_chunks, plan_batch_item, validate_batch_item
+from grid.models import GridPlanBatchItem, GridPlanBatchRequest, GridPlanRequest
+from grid.planner import plan
+from tests.fixtures import batch_plan_request, batch_plan_requests, batch_range
+
+
+def test_batch_route_matches_single_plans_and_reports_item_errors() -> None:
+    requests = batch_plan_requests(5)
+    raw = [item.model_dump(mode="json") for item in requests]
+    raw.insert(2, {"instanceId": "broken", "mode": "neutral"})
+    raw.append("not-an-object")
+
+    response = main.grid_plan_batch(GridPlanBatchRequest(items=raw), None)
+    assert (response.okCount, response.errorCount) == (5, 2)
+    assert [item.index for item in response.items] == list(range(7))
+    assert response.items[2] == GridPlanBatchItem(index=2, ok=False, instanceId="broken", error="invalid_request")
+    assert response.items[6].instanceId is None and response.items[6].error == "invalid_request"
+    ok_items = [item for item in response.items if item.ok]
+    assert [item.instanceId for item in ok_items] == [item.instanceId for item in requests]
+    for item, request in zip(ok_items, requests):
+        assert item.result == plan(request)
+
+
+def test_plan_batch_item_isolates_failures(monkeypatch) -> None:
+    import grid.batch as batch
+
+    def boom(_payload: GridPlanRequest):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(batch, "plan", boom)
+    item = plan_batch_item(3, batch_plan_request("inst-fail"))
+    assert item == GridPlanBatchItem(index=3, ok=False, instanceId="inst-fail", error="grid_plan_failed")
+    assert isinstance(validate_batch_item(0, batch_plan_request("inst-ok").model_dump()), GridPlanRequest)
+
+
+def test_batch_chunks_keep_level_groups_together_and_balance() -> None:
+    pending = {idx: request for idx, request in enumerate(batch_plan_requests(10))}
+    chunks = batch_chunks(pending, 2)
+    assert sorted(idx for chunk in chunks for idx in chunk) == list(range(10))
+    groups_per_chunk = [{batch_range(idx) for idx in chunk} for chunk in chunks]
+    assert not set.intersection(*groups_per_chunk)
+    assert max(len(chunk) for chunk in chunks) <= 7
+    wide = batch_chunks(pending, 8)
+    assert len(wide) == 6 and max(len(chunk) for chunk in wide) == 2
+    assert batch_chunks({}, 4) == []
+
+
+def test_batch_chunks_split_a_shared_range_across_workers() -> None:
+    pending = {idx: batch_plan_request(f"inst-{idx}", mark=65000 + idx) for idx in range(40)}
+    chunks = batch_chunks(pending, 4)
+    assert [len(chunk) for chunk in chunks] == [10, 10, 10, 10]
+    assert sorted(idx for chunk in chunks for idx in chunk) == list(range(40))
+    assert [len(chunk) for chunk in batch_chunks(dict(list(pending.items())[:5]), 4)] == [2, 2, 1]
+
+
+def test_batch_http_route() -> None:
+    client = TestClient(main.app)
+    body = {"items": [item.model_dump(mode="json") for item in batch_plan_requests(3)]}
+    response = client.post("/v1/grid/plan-batch", json=body)
+    assert response.status_code == 200
+    assert response.json()["okCount"] == 3
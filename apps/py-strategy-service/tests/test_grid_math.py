@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import math
+import random
+
+import pytest
+
+from grid.math import LevelCache, grid_level_array, grid_levels, nearest_level_indexes, round6
+
+
+def _scan_nearest(levels: list[float], price: float) -> tuple[int, int]:
+    # Reference: the original linear scan.
+    if not levels:
+        return (0, 0)
+    if price <= levels[0]:
+        return (0, 1 if len(levels) > 1 else 0)
+    if price >= levels[-1]:
+        idx = len(levels) - 1
+        return (idx - 1 if idx > 0 else idx, idx)
+    for idx in range(len(levels) - 1):
+        if levels[idx] <= price <= levels[idx + 1]:
+            return (idx, idx + 1)
+    return (0, len(levels) - 1)
+
+
+def test_grid_levels_match_closed_form() -> None:
+    lower, upper, count = 60000.0, 70000.0, 8
+    ratio = math.pow(upper / lower, 1.0 / count)
+    assert grid_levels(lower, upper, count, "geometric") == [round6(lower * math.pow(ratio, idx)) for idx in range(count + 1)]
+    assert grid_levels(100, 120, 10, "arithmetic") == [round6(100 + 2.0 * idx) for idx in range(11)]
+    assert grid_levels(100, 120, 1, "arithmetic") == [100.0, 120.0]
+
+
+def test_grid_levels_returns_independent_lists() -> None:
+    first = grid_levels(100, 120, 10, "arithmetic")
+    first.append(-1.0)
+    assert grid_levels(100, 120, 10, "arithmetic")[-1] == 120.0
+
+
+def test_grid_level_array_is_cached_and_read_only() -> None:
+    array = grid_level_array(100, 120, 10, "arithmetic")
+    assert array is grid_level_array(100, 120, 10, "arithmetic")
+    assert array.tolist() == grid_levels(100, 120, 10, "arithmetic")
+    with pytest.raises(ValueError):
+        array[0] = 1.0
+
+
+def test_level_cache_lru_eviction_and_counters() -> None:
+    cache = LevelCache(max_entries=2)
+    cache.levels(100, 120, 10, "arithmetic")
+    cache.levels(100, 130, 10, "arithmetic")
+    cache.levels(100, 120, 10, "arithmetic")
+    cache.levels(100, 140, 10, "arithmetic")
+    assert len(cache) == 2
+    cache.levels(100, 130, 10, "arithmetic")
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 4}
+
+
+def test_nearest_level_indexes_matches_linear_scan() -> None:
+    rng = random.Random(11)
+    for _ in range(500):
+        lower = rng.uniform(0.01, 1000)
+        upper = lower * rng.uniform(1.001, 3)
+        levels = grid_levels(lower, upper, rng.randint(2, 500), rng.choice(["arithmetic", "geometric"]))
+        prices = [rng.uniform(lower * 0.9, upper * 1.1) for _ in range(4)] + [rng.choice(levels)]
+        for price in prices:
+            assert nearest_level_indexes(levels, price) == _scan_nearest(levels, price)
+    duplicated = [1.0, 2.0, 2.0, 2.0, 3.0]
+    for price in (0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0):
+        assert nearest_level_indexes(duplicated, price) == _scan_nearest(duplicated, price)
+    assert nearest_level_indexes([], 1.0) == (0, 0)
+    assert nearest_level_indexes([5.0], 1.0) == (0, 0)
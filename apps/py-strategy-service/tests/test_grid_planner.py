@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+from unittest import mock
+
+from grid import planner
 from grid.models import GridPlanRequest, GridPreviewRequest
-from grid.planner import plan, preview
+from grid.planner import compute_sizing, plan, preview
+from grid.reconcile import apply_intents
 
 
 def test_preview_builds_levels_and_positive_qty() -> None:
@@ -140,6 +144,54 @@ def test_preview_neutral_ignores_budget_split_inputs() -> None:
     assert "split_ignored_for_mode" in custom_result.validationErrors
 
 
+def test_preview_weighted_near_price_peaks_at_mark_and_meets_constraints() -> None:
+    payload = GridPreviewRequest(
+        mode="cross",
+        gridMode="geometric",
+        allocationMode="WEIGHTED_NEAR_PRICE",
+        lowerPrice=100,
+        upperPrice=140,
+        gridCount=40,
+        investUsd=5000,
+        leverage=2,
+        markPrice=110,
+        venueConstraints={"minQty": 0.1, "qtyStep": 0.01, "minNotional": 10, "feeRate": 0.06},
+    )
+    result = preview(payload)
+    assert not any(code.endswith("not_implemented") for code in result.validationErrors)
+    qty_long = result.qtyModel["qtyPerLevelLong"]
+    assert len(qty_long) == len(result.levels)
+    prices = [level.price for level in result.levels]
+    center = min(range(len(prices)), key=lambda index: abs(prices[index] - 110))
+    assert max(qty_long) == qty_long[center]
+    assert qty_long[center] > qty_long[0] and qty_long[center] > qty_long[-1]
+    for price, qty in zip(prices, qty_long):
+        assert qty >= 0.1 and qty * price >= 10 - 1e-9
+        assert abs(qty / 0.01 - round(qty / 0.01)) < 1e-6
+
+
+def test_preview_dynamic_split_follows_mark_position_in_range() -> None:
+    payload = GridPreviewRequest(
+        mode="cross",
+        gridMode="arithmetic",
+        budgetSplitPolicy="DYNAMIC_BY_PRICE_POSITION",
+        lowerPrice=100,
+        upperPrice=200,
+        gridCount=10,
+        investUsd=5000,
+        leverage=2,
+        markPrice=125,
+        venueConstraints={"minQty": 0.1, "qtyStep": 0.01, "minNotional": 10, "feeRate": 0.06},
+    )
+    low = preview(payload)
+    high = preview(payload.model_copy(update={"markPrice": 199}))
+    assert low.allocationBreakdown.get("longBudgetPct") == 75
+    assert low.allocationBreakdown.get("shortBudgetPct") == 25
+    # Clamped so the short leg keeps a minimum share near the top of the range.
+    assert high.allocationBreakdown.get("longBudgetPct") == planner.DYNAMIC_SPLIT_MIN_PCT
+    assert not any(code.endswith("not_implemented") for code in high.validationErrors)
+
+
 def test_plan_is_deterministic_for_same_input() -> None:
     payload = GridPlanRequest(
         instanceId="inst-1",
@@ -292,3 +344,221 @@ def test_plan_neutral_flat_keeps_both_entry_sides_non_reduce() -> None:
     sell = next((intent for intent in result.intents if intent.side == "sell"), None)
     assert buy is not None and buy.reduceOnly is False
     assert sell is not None and sell.reduceOnly is False
+
+
+def test_plan_uses_sizing_core_without_building_a_preview() -> None:
+    payload = GridPlanRequest(
+        instanceId="inst-sizing-core",
+        mode="cross",
+        gridMode="geometric",
+        lowerPrice=60000,
+        upperPrice=70000,
+        gridCount=40,
+        investUsd=5000,
+        leverage=3,
+        markPrice=64000,
+        initialSeedEnabled=True,
+        initialSeedPct=20,
+    )
+    with mock.patch.object(planner, "preview", side_effect=AssertionError("plan must not call preview")):
+        result = plan(payload)
+
+    sizing = compute_sizing(payload)
+    preview_result = preview(GridPreviewRequest(**payload.model_dump(include=set(GridPreviewRequest.model_fields))))
+    assert [row.price for row in preview_result.levels] == sizing.levels
+    assert result.metricsDelta["qtyPerOrderRounded"] == preview_result.qtyPerOrderRounded == sizing.per_grid_qty
+    assert result.metricsDelta["minInvestmentUSDT"] == preview_result.minInvestmentUSDT
+    assert result.metricsDelta["allocationBreakdown"] == preview_result.allocationBreakdown
+    assert result.metricsDelta["initialSeed"] == preview_result.initialSeed
+
+
+def test_sizing_cache_reuses_static_sizing_across_mark_prices() -> None:
+    cache = planner.SizingCache(max_entries=2, ttl_sec=60)
+    base = dict(mode="long", gridMode="arithmetic", lowerPrice=100, upperPrice=120, gridCount=10, investUsd=500, leverage=2)
+    first = cache.get(GridPreviewRequest(**base, markPrice=105))
+    assert cache.get(GridPreviewRequest(**base, markPrice=111)) is first
+    cache.get(GridPreviewRequest(**{**base, "investUsd": 600}, markPrice=105))
+    cache.get(GridPreviewRequest(**{**base, "leverage": 3}, markPrice=105))
+    assert cache.stats() == {
+        "entries": 2,
+        "maxEntries": 2,
+        "ttlSec": 60,
+        "hits": 1,
+        "misses": 3,
+        "evictions": 1,
+        "expirations": 0,
+    }
+
+
+def test_sizing_cache_expires_entries_after_ttl() -> None:
+    cache = planner.SizingCache(max_entries=4, ttl_sec=5)
+    payload = GridPreviewRequest(mode="short", gridMode="geometric", lowerPrice=100, upperPrice=120, gridCount=10, investUsd=500, leverage=2)
+    with mock.patch.object(planner.time, "monotonic", return_value=1000.0):
+        first = cache.get(payload)
+    with mock.patch.object(planner.time, "monotonic", return_value=1006.0):
+        assert cache.get(payload) is not first
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_plan_looks_up_the_sizing_cache_once() -> None:
+    cache = planner.SizingCache(ttl_sec=60)
+    base = dict(
+        instanceId="inst-sizing-lookups",
+        mode="neutral",
+        gridMode="arithmetic",
+        lowerPrice=100,
+        upperPrice=120,
+        gridCount=10,
+        investUsd=500,
+        leverage=2,
+    )
+    with mock.patch.object(planner, "SIZING_CACHE", cache):
+        plan(GridPlanRequest(**base, markPrice=105))
+        assert (cache.stats()["hits"], cache.stats()["misses"]) == (0, 1)
+        plan(GridPlanRequest(**base, markPrice=111))
+        assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_cached_sizing_matches_uncached_for_each_tick() -> None:
+    base = dict(
+        instanceId="inst-sizing-cache",
+        mode="cross",
+        gridMode="geometric",
+        lowerPrice=60000,
+        upperPrice=70000,
+        gridCount=30,
+        investUsd=3000,
+        leverage=5,
+        venueConstraints={"minQty": 0.001, "qtyStep": 0.001, "minNotional": 5},
+    )
+    for mark in (59000.0, 64321.5, 71000.0):
+        payload = GridPlanRequest(**base, markPrice=mark)
+        cached = plan(payload).model_dump()
+        with mock.patch.object(planner, "SIZING_CACHE", planner.SizingCache(ttl_sec=0)):
+            assert plan(payload).model_dump() == cached
+
+
+def _seeded_window(mode: str = "neutral", **overrides):
+    payload = GridPlanRequest(
+        instanceId="inst-fill",
+        mode=mode,
+        gridMode="arithmetic",
+        lowerPrice=60000,
+        upperPrice=70000,
+        gridCount=200,
+        activeOrderWindowSize=40,
+        investUsd=20000,
+        leverage=3,
+        markPrice=65000,
+        **overrides,
+    )
+    seeded = plan(payload)
+    levels = compute_sizing(payload).levels
+    return payload, seeded, levels, seeded.nextStateJson["windowCenterIndex"]
+
+
+def test_fill_shifts_window_to_filled_level_with_counter_order() -> None:
+    payload, seeded, levels, center = _seeded_window()
+    orders = apply_intents([], seeded.intents)
+    filled = f"grid-inst-fill-long-{center - 1}"
+    # The mark bounced back and is now nearer the old center than the filled level.
+    tick = payload.model_copy(
+        update={
+            "markPrice": levels[center - 1] + 0.6 * (levels[center] - levels[center - 1]),
+            "openOrders": [order for order in orders if order.clientOrderId != filled],
+            "stateJson": seeded.nextStateJson,
+            "fillEvents": [{"clientOrderId": filled, "side": "buy", "fillQty": 0.01}],
+        }
+    )
+    result = plan(tick)
+    assert result.nextStateJson["windowCenterIndex"] == center - 1
+    assert result.windowMeta["fillCenterIdx"] == center - 1
+    assert "window_recentered:fill" in result.reasonCodes
+    assert sorted((intent.type, intent.clientOrderId) for intent in result.intents) == [
+        ("cancel_order", f"grid-inst-fill-short-{center + 20}"),
+        ("place_order", f"grid-inst-fill-long-{center - 21}"),
+        ("place_order", f"grid-inst-fill-short-{center}"),
+    ]
+
+
+def test_fill_far_from_mark_recenters_on_drift() -> None:
+    payload, seeded, levels, center = _seeded_window()
+    tick = payload.model_copy(
+        update={
+            "markPrice": levels[center - 6],
+            "openOrders": apply_intents([], seeded.intents),
+            "stateJson": seeded.nextStateJson,
+            "fillEvents": [{"gridIndex": center - 1, "side": "buy"}],
+        }
+    )
+    result = plan(tick)
+    assert result.nextStateJson["lastWindowRecenterReason"] == "drift"
+    assert result.nextStateJson["windowCenterIndex"] == center - 6
+
+
+def test_fill_without_grid_index_recenters_on_mark() -> None:
+    payload, seeded, levels, center = _seeded_window()
+    tick = payload.model_copy(
+        update={
+            "markPrice": levels[center + 1],
+            "stateJson": seeded.nextStateJson,
+            "fillEvents": [{"clientOrderId": "manual-order-1", "side": "sell"}],
+        }
+    )
+    result = plan(tick)
+    assert result.nextStateJson["lastWindowRecenterReason"] == "fill"
+    assert result.nextStateJson["windowCenterIndex"] == center + 1
+    assert result.windowMeta["fillCenterIdx"] is None
+
+
+def test_plan_weighted_near_price_places_per_level_qty() -> None:
+    payload, seeded, levels, center = _seeded_window(allocationMode="WEIGHTED_NEAR_PRICE")
+    qty_by_index = {intent.gridIndex: intent.qty for intent in seeded.intents if intent.gridLeg == "long"}
+    assert len(set(qty_by_index.values())) > 1
+    nearest = max(qty_by_index)
+    assert qty_by_index[nearest] > qty_by_index[min(qty_by_index)]
+    weighted = compute_sizing(payload).level_qty_long
+    assert all(qty == weighted[index] for index, qty in qty_by_index.items())
+
+
+def test_plan_weighted_qty_follows_the_window_not_the_mark() -> None:
+    payload, seeded, levels, center = _seeded_window(allocationMode="WEIGHTED_NEAR_PRICE")
+    orders = apply_intents([], seeded.intents)
+    state = seeded.nextStateJson
+    # Cross a level without a fill or recentre: the weights stay on the stored centre.
+    tick = payload.model_copy(update={"markPrice": levels[center + 1], "openOrders": orders, "stateJson": state})
+    with mock.patch.dict("os.environ", {"GRID_QTY_DRIFT_PCT": "1"}):
+        result = plan(tick)
+    assert "window_no_change" in result.reasonCodes
+    assert result.intents == []
+    assert "qtyPerLevelLong" not in result.metricsDelta["qtyModel"]
+
+
+def test_plan_weighted_dynamic_split_only_moves_on_recentre() -> None:
+    payload, seeded, levels, center = _seeded_window(
+        mode="cross", allocationMode="WEIGHTED_NEAR_PRICE", budgetSplitPolicy="DYNAMIC_BY_PRICE_POSITION"
+    )
+    static = planner.SIZING_CACHE.get(payload)
+    orders = apply_intents([], seeded.intents)
+    for offset in (0.2, 0.4, -0.3, 0.9):
+        mark = levels[center] + offset * (levels[center + 1] - levels[center])
+        tick = payload.model_copy(update={"markPrice": mark, "openOrders": orders, "stateJson": seeded.nextStateJson})
+        with mock.patch.dict("os.environ", {"GRID_QTY_DRIFT_PCT": "1"}):
+            result = plan(tick)
+        assert "window_no_change" in result.reasonCodes
+        assert result.intents == []
+    # The split is taken at the centre level, so every tick reuses one cached per-level qty.
+    assert list(static.weighted_qty) == [center]
+
+
+def test_plan_weighted_counter_orders_take_their_entry_qty() -> None:
+    payload, seeded, levels, center = _seeded_window(mode="long", allocationMode="WEIGHTED_NEAR_PRICE")
+    weighted = compute_sizing(payload, weight_center=center).level_qty_long
+    buys = {intent.gridIndex: intent.qty for intent in seeded.intents if intent.side == "buy"}
+    sells = {intent.gridIndex: intent for intent in seeded.intents if intent.side == "sell"}
+    assert sells and all(intent.reduceOnly for intent in sells.values())
+    assert all(qty == weighted[index] for index, qty in buys.items())
+    # Each reduce-only sell closes the buy one level below it, not its own level's qty.
+    assert all(intent.qty == weighted[index - 1] for index, intent in sells.items())
+    assert sells[center + 1].qty == weighted[center] != weighted[center + 1]
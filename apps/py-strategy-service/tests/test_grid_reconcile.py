@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from grid.models import GridIntent, GridOrderSnapshot, GridPlanRequest
+from grid.planner import plan
+from grid.reconcile import reconcile_orders
+
+
+def _desired(idx: int, price: float, qty: float = 0.01) -> GridIntent:
+    return GridIntent(
+        type="place_order",
+        side="buy",
+        price=price,
+        qty=qty,
+        reduceOnly=False,
+        clientOrderId=f"grid-x-long-{idx}",
+        gridLeg="long",
+        gridIndex=idx,
+    )
+
+
+def _open(idx: int, price: float, qty: float | None = 0.01) -> GridOrderSnapshot:
+    return GridOrderSnapshot(clientOrderId=f"grid-x-long-{idx}", exchangeOrderId=f"ex-{idx}", side="buy", price=price, qty=qty)
+
+
+def test_reconcile_builds_cancel_replace_place_sets_in_order() -> None:
+    desired = [_desired(1, 100.0), _desired(2, 101.0), _desired(3, 102.0)]
+    open_orders = [_open(9, 99.0), _open(2, 101.5), _open(1, 100.0), GridOrderSnapshot(clientOrderId=" ")]
+    result = reconcile_orders(desired, open_orders)
+    assert [(intent.type, intent.clientOrderId) for intent in result.intents] == [
+        ("cancel_order", "grid-x-long-9"),
+        ("replace_order", "grid-x-long-2"),
+        ("place_order", "grid-x-long-3"),
+    ]
+    assert result.intents[0].exchangeOrderId == "ex-9"
+    assert (result.intents[1].price, result.intents[1].gridIndex) == (101.0, 2)
+    assert (result.placed, result.cancelled, result.replaced, result.qty_drift_replaced) == (1, 1, 1, 0)
+
+
+def test_reconcile_detects_qty_drift_beyond_tolerance_and_step() -> None:
+    desired = [_desired(1, 100.0, qty=0.010), _desired(2, 101.0, qty=0.010), _desired(3, 102.0, qty=0.010)]
+    open_orders = [_open(1, 100.0, qty=0.012), _open(2, 101.0, qty=0.0104), _open(3, 102.0, qty=None)]
+    assert reconcile_orders(desired, open_orders).intents == []
+
+    result = reconcile_orders(desired, open_orders, qty_drift_pct=5.0)
+    assert [(intent.clientOrderId, intent.qty) for intent in result.intents] == [("grid-x-long-1", 0.01)]
+    assert (result.replaced, result.qty_drift_replaced) == (1, 1)
+    # One venue step of difference is rounding, not drift.
+    assert reconcile_orders(desired, open_orders, qty_drift_pct=5.0, qty_step=0.002).intents == []
+
+
+def test_plan_replaces_orders_with_drifted_qty(monkeypatch) -> None:
+    payload = dict(
+        instanceId="inst-drift",
+        mode="long",
+        gridMode="arithmetic",
+        lowerPrice=100,
+        upperPrice=120,
+        gridCount=40,
+        investUsd=1000,
+        leverage=2,
+        markPrice=110,
+        venueConstraints={"minQty": 0.001, "qtyStep": 0.001},
+    )
+    first = plan(GridPlanRequest(**payload))
+    placed = [intent for intent in first.intents if intent.type == "place_order"]
+    open_orders = [
+        GridOrderSnapshot(clientOrderId=intent.clientOrderId, side=intent.side, price=intent.price, qty=intent.qty)
+        for intent in placed
+    ]
+    open_orders[0] = open_orders[0].model_copy(update={"qty": (placed[0].qty or 0) * 2})
+    follow_up = GridPlanRequest(**payload, openOrders=open_orders, stateJson=first.nextStateJson)
+    # Off by default.
+    assert plan(follow_up).intents == []
+
+    monkeypatch.setenv("GRID_QTY_DRIFT_PCT", "5")
+    result = plan(follow_up)
+    assert [(intent.type, intent.clientOrderId) for intent in result.intents] == [("replace_order", placed[0].clientOrderId)]
+    assert result.metricsDelta["replacedOrders"] == 1
+    assert result.metricsDelta["qtyDriftReplacedOrders"] == 1
+
+    monkeypatch.setenv("GRID_QTY_DRIFT_PCT", "0")
+    assert plan(follow_up).intents == []
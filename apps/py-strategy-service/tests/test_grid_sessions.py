@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import json
+import threading
+from unittest import mock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from grid import sessions
+from grid.models import GridOrderSnapshot, GridPlanRequest, GridSessionDeltaRequest
+from grid.planner import plan
+from grid.reconcile import apply_intents
+from grid.sessions import GridSessionNotFound, GridSessionStore, GridSessionVersionMismatch
+
+
+def _request(**overrides) -> GridPlanRequest:
+    payload = dict(
+        instanceId="inst-session",
+        mode="neutral",
+        gridMode="arithmetic",
+        lowerPrice=60000,
+        upperPrice=70000,
+        gridCount=60,
+        investUsd=5000,
+        leverage=3,
+        markPrice=65000,
+        activeOrderWindowSize=40,
+        venueConstraints={"minQty": 0.001, "qtyStep": 0.001, "minNotional": 5},
+    )
+    payload.update(overrides)
+    return GridPlanRequest(**payload)
+
+
+def _executed(request: GridPlanRequest, intents) -> list[GridOrderSnapshot]:
+    # What a client's order book looks like after running the intents.
+    return apply_intents(request.openOrders, intents)
+
+
+def test_delta_ticks_match_full_requests() -> None:
+    store = GridSessionStore()
+    full = _request()
+    opened = store.open(full)
+    assert opened.sessionVersion == 1
+    assert opened.intents == plan(full).intents
+
+    state = {**full.stateJson, **opened.nextStateJson}
+    orders = _executed(full, opened.intents)
+    version = opened.sessionVersion
+    for mark in (65100.0, 66400.0, 64000.0, 64010.0):
+        full = _request(markPrice=mark, openOrders=orders, stateJson=state)
+        expected = plan(full)
+        response = store.plan_delta(full.instanceId, GridSessionDeltaRequest(baseVersion=version, markPrice=mark))
+        assert response.sessionVersion == version + 1
+        assert response.intents == expected.intents
+        assert response.nextStateJson == expected.nextStateJson
+        version = response.sessionVersion
+        state = {**state, **expected.nextStateJson}
+        orders = _executed(full, expected.intents)
+
+
+def test_fills_cancels_and_updates_are_applied_to_stored_orders() -> None:
+    store = GridSessionStore()
+    opened = store.open(_request())
+    placed = [intent for intent in opened.intents if intent.type == "place_order"]
+    full_fill, partial_fill, cancelled = placed[0], placed[1], placed[2]
+
+    store.plan_delta(
+        "inst-session",
+        GridSessionDeltaRequest(
+            baseVersion=1,
+            markPrice=65000,
+            fillEvents=[
+                {"clientOrderId": full_fill.clientOrderId, "fillQty": full_fill.qty},
+                {"clientOrderId": partial_fill.clientOrderId, "fillQty": (partial_fill.qty or 0) / 4},
+            ],
+            cancels=[cancelled.clientOrderId],
+            orderUpdates=[{"clientOrderId": placed[3].clientOrderId, "exchangeOrderId": "ex-3"}],
+            position={"side": "long", "qty": 0.01, "entryPrice": 64900},
+        ),
+    )
+    stored = store._sessions["inst-session"].request
+    assert stored.position is not None and stored.position.qty == 0.01
+    assert stored.fillEvents == []
+    by_id = {order.clientOrderId: order for order in stored.openOrders}
+    assert by_id[placed[3].clientOrderId].exchangeOrderId == "ex-3"
+    # Partial fills keep the order as placed and accumulate until it is fully filled.
+    assert by_id[partial_fill.clientOrderId].qty == partial_fill.qty
+    assert store._sessions["inst-session"].filled == {partial_fill.clientOrderId: pytest.approx((partial_fill.qty or 0) / 4)}
+    store.plan_delta(
+        "inst-session",
+        GridSessionDeltaRequest(
+            baseVersion=2,
+            markPrice=65000,
+            fillEvents=[{"clientOrderId": partial_fill.clientOrderId, "fillQty": (partial_fill.qty or 0) * 0.75}],
+        ),
+    )
+    assert store._sessions["inst-session"].filled == {}
+    # The filled level sits far from the mark, so the window recenters on the mark, not the fill.
+    assert stored.stateJson["lastWindowRecenterReason"] == "drift"
+
+
+def test_version_mismatch_and_missing_sessions_force_resync() -> None:
+    store = GridSessionStore(ttl_sec=10)
+    with pytest.raises(GridSessionNotFound):
+        store.plan_delta("inst-session", GridSessionDeltaRequest(baseVersion=1, markPrice=65000))
+    store.open(_request())
+    with pytest.raises(GridSessionVersionMismatch) as error:
+        store.plan_delta("inst-session", GridSessionDeltaRequest(baseVersion=3, markPrice=65000))
+    assert error.value.expected == 1
+    # A resync keeps counting, so the stale client still cannot match.
+    assert store.open(_request()).sessionVersion == 3
+    assert store.stats()["conflicts"] == 1
+
+    with mock.patch.object(sessions.time, "monotonic", return_value=sessions.time.monotonic() + 11):
+        with pytest.raises(GridSessionNotFound):
+            store.plan_delta("inst-session", GridSessionDeltaRequest(baseVersion=3, markPrice=65000))
+    assert store.stats()["expirations"] == 1
+
+
+class _PausingLock:
+    """Store lock that runs `after_release` once, right after the holder lets go."""
+
+    def __init__(self) -> None:
+        self._inner = threading.Lock()
+        self.after_release = None
+
+    def __enter__(self) -> "_PausingLock":
+        self._inner.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        callback, self.after_release = self.after_release, None
+        self._inner.release()
+        if callback is not None:
+            callback()
+
+
+def test_resync_rejects_deltas_racing_it() -> None:
+    store = GridSessionStore()
+    store.open(_request())
+    store._lock = _PausingLock()
+    outcome: dict = {}
+
+    def stale_tick() -> None:
+        try:
+            outcome["response"] = store.plan_delta("inst-session", GridSessionDeltaRequest(baseVersion=1, markPrice=65100))
+        except GridSessionVersionMismatch as exc:
+            outcome["error"] = exc
+
+    ticker = threading.Thread(target=stale_tick)
+    publish = store._store
+
+    def publish_then_tick(instance_id, session) -> None:
+        publish(instance_id, session)
+        # Runs the stale tick between publishing the session and planning it.
+        store._lock.after_release = lambda: (ticker.start(), ticker.join(0.2))
+
+    with mock.patch.object(store, "_store", side_effect=publish_then_tick):
+        resynced = store.open(_request(markPrice=64000))
+    ticker.join(5)
+    assert "response" not in outcome
+    assert outcome["error"].expected == resynced.sessionVersion
+    assert store.version("inst-session") == resynced.sessionVersion
+
+
+def test_store_evicts_least_recently_used_sessions() -> None:
+    store = GridSessionStore(max_entries=2)
+    for name in ("a", "b", "c"):
+        store.open(_request(instanceId=name))
+    assert store.version("a") is None
+    assert store.version("c") == 1
+    assert store.stats()["evictions"] == 1
+
+
+def test_snapshot_and_restore_round_trip(tmp_path) -> None:
+    path = str(tmp_path / "sessions" / "grid.json")
+    store = GridSessionStore(ttl_sec=60)
+    opened = store.open(_request())
+    store.open(_request(instanceId="stale"))
+    store._sessions["stale"].updated_at -= 120
+    assert store.snapshot(path) == 2
+
+    restored = GridSessionStore(ttl_sec=60)
+    assert restored.restore(path) == 1
+    assert restored.version("stale") is None
+    expected = store.plan_delta("inst-session", GridSessionDeltaRequest(baseVersion=opened.sessionVersion, markPrice=65500))
+    actual = restored.plan_delta("inst-session", GridSessionDeltaRequest(baseVersion=opened.sessionVersion, markPrice=65500))
+    assert actual == expected
+
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump({"format": 0, "sessions": []}, handle)
+    assert GridSessionStore().restore(path) == 0
+    assert GridSessionStore().restore(str(tmp_path / "missing.json")) == 0
+    assert sorted(item.name for item in (tmp_path / "sessions").iterdir()) == ["grid.json"]
+
+
+def test_snapshot_path_is_disabled_with_several_server_processes() -> None:
+    with mock.patch.dict("os.environ", {"PY_GRID_SESSION_SNAPSHOT_PATH": "/data/grid.json", "PY_UVICORN_WORKERS": "1"}):
+        assert sessions.snapshot_path() == "/data/grid.json"
+    with mock.patch.dict("os.environ", {"PY_GRID_SESSION_SNAPSHOT_PATH": "/data/grid.json", "PY_UVICORN_WORKERS": "4"}):
+        assert sessions.snapshot_path() is None
+
+
+def test_session_routes_map_errors_to_resync_statuses() -> None:
+    import main
+
+    client = TestClient(main.app)
+    body = _request(instanceId="inst-route").model_dump(mode="json")
+    opened = client.post("/v1/grid/sessions", json=body)
+    assert opened.status_code == 200
+    version = opened.json()["sessionVersion"]
+
+    tick = client.post("/v1/grid/sessions/inst-route/plan", json={"baseVersion": version, "markPrice": 65100})
+    assert tick.status_code == 200 and tick.json()["sessionVersion"] == version + 1
+    stale = client.post("/v1/grid/sessions/inst-route/plan", json={"baseVersion": version, "markPrice": 65100})
+    assert stale.status_code == 409
+    assert stale.json()["detail"] == f"grid_session_version_mismatch:{version + 1}"
+    assert client.delete("/v1/grid/sessions/inst-route").json() == {"instanceId": "inst-route", "dropped": True}
+    missing = client.post("/v1/grid/sessions/inst-route/plan", json={"baseVersion": version + 1, "markPrice": 65100})
+    assert missing.status_code == 404
+    assert client.get("/v1/grid/cache-stats").json()["sessions"]["opened"] >= 1
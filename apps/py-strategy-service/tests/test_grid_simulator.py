@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from grid.simulator import simulate_grid
+from tests.fixtures import MINUTE_MS, simulator_bars, simulator_template
+
+
+@pytest.mark.parametrize("allocation", ["EQUAL_NOTIONAL_PER_GRID", "WEIGHTED_NEAR_PRICE"])
+@pytest.mark.parametrize("mode", ["neutral", "long", "short"])
+def test_fast_engine_matches_planner_engine(mode: str, allocation: str) -> None:
+    ts, values = simulator_bars(1500, seed=3)
+    fast = simulate_grid(simulator_template(mode, allocationMode=allocation), ts, values, engine="fast")
+    slow = simulate_grid(simulator_template(mode, allocationMode=allocation), ts, values, engine="planner")
+    assert fast.fills
+    assert fast.fills == slow.fills
+    assert fast.recenters == slow.recenters
+    assert fast.plans == slow.plans
+    np.testing.assert_allclose(fast.equity, slow.equity)
+
+
+def test_equity_accounts_for_fees_funding_and_pnl() -> None:
+    ts, values = simulator_bars(3000, seed=5)
+    result = simulate_grid(simulator_template(), ts, values)
+    summary = result.summary()
+    assert summary["bars"] == 3000
+    assert summary["fills"] == len(result.fill_rows()) > 0
+    assert result.fees_usd > 0
+    assert result.turnover_usd == pytest.approx(sum(price * qty for _, _, _, price, qty, _ in result.fills))
+    assert result.fees_usd == pytest.approx(sum(fee for *_, fee in result.fills))
+    # Final equity is wallet plus the open position's unrealized PnL.
+    position = sum(qty if side > 0 else -qty for _, _, side, _, qty, _ in result.fills)
+    close = float(values[-1, 3])
+    cost = sum(price * (qty if side > 0 else -qty) for _, _, side, price, qty, _ in result.fills)
+    expected = result.invest_usd - result.fees_usd - result.funding_usd + position * close - cost
+    assert result.equity[-1] == pytest.approx(expected, rel=1e-9)
+    assert summary["recenters"]["seed"] == 1
+
+
+def test_funding_is_charged_per_interval_on_the_open_position() -> None:
+    ts, values = simulator_bars(2000, seed=7)
+    charged = simulate_grid(simulator_template("long"), ts, values, funding_rate_pct=0.05, funding_interval_ms=60 * MINUTE_MS)
+    free = simulate_grid(simulator_template("long"), ts, values, funding_rate_pct=0.0)
+    assert free.funding_usd == 0.0
+    assert charged.funding_usd > 0
+    assert charged.fills == free.fills
+    assert charged.equity[-1] == pytest.approx(free.equity[-1] - charged.funding_usd)
+
+
+def test_drift_recenters_without_fills() -> None:
+    # Long grid, no position: sells are reduce-only and never fill, so a rally only recenters on drift.
+    ts, values = simulator_bars(3000, seed=2, drift=0.0004)
+    result = simulate_grid(simulator_template("long", lower=50000, upper=90000), ts, values)
+    assert result.recenters["drift"] > 0
+
+
+def test_crash_liquidates_leveraged_long() -> None:
+    count = 600
+    ts = 1_700_006_400_000 + np.arange(count, dtype=np.int64) * MINUTE_MS
+    close = np.linspace(65000, 40000, count)
+    open_ = np.concatenate(([65000.0], close[:-1]))
+    values = np.column_stack([open_, np.maximum(open_, close) + 5, np.minimum(open_, close) - 5, close, np.ones(count)])
+    result = simulate_grid(simulator_template("long", lower=40000, upper=70000, leverage=20), ts, values)
+    assert result.liquidated_at is not None
+    assert result.fills[-1][1] == "liquidation"
+    after = np.searchsorted(ts, result.liquidated_at)
+    assert np.all(result.equity[after:] == result.equity[-1])
+    assert result.summary()["maxDrawdownPct"] > 50
+    assert result.worst_liq_distance_pct == 0.0
+
+
+def test_worst_liq_distance_tracks_the_closest_bar() -> None:
+    ts, values = simulator_bars(3000, seed=5)
+    result = simulate_grid(simulator_template(leverage=10), ts, values)
+    assert result.worst_liq_distance_pct is not None and result.worst_liq_distance_pct > 0
+    assert result.liquidated_at is None
+    assert simulate_grid(simulator_template(leverage=20), ts, values).worst_liq_distance_pct < result.worst_liq_distance_pct
+
+
+def test_rejects_unknown_engine_and_bad_shapes() -> None:
+    ts, values = simulator_bars(10)
+    with pytest.raises(ValueError):
+        simulate_grid(simulator_template(), ts, values, engine="gpu")
+    with pytest.raises(ValueError):
+        simulate_grid(simulator_template(), ts[:5], values)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import pathlib
+import sys
+import unittest
+from unittest import mock
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import main
+import serialization
+from grid import GridPlanResponse
+from models import StrategyRunResponse
+from tests.fixtures import serialization_plan_request, serialization_strategy_request
+
+
+def _client(mode: str) -> TestClient:
+    router = APIRouter(route_class=serialization.json_route_class(mode))
+    router.add_api_route("/v1/strategies/run", main.run_strategy, methods=["POST"], response_model=StrategyRunResponse)
+    router.add_api_route("/v1/grid/plan", main.grid_plan, methods=["POST"], response_model=GridPlanResponse)
+    app = FastAPI(default_response_class=serialization.json_response_class(mode))
+    app.include_router(router)
+    return TestClient(app)
+
+
+class SerializationTests(unittest.TestCase):
+    def test_resolve_json_mode(self) -> None:
+        with mock.patch.dict("os.environ", {}, clear=True):
+            self.assertEqual(serialization.resolve_json_mode(), "stdlib")
+        with mock.patch.dict("os.environ", {"PY_JSON_MODE": " Pydantic "}):
+            self.assertEqual(serialization.resolve_json_mode(), "pydantic")
+        with mock.patch.dict("os.environ", {"PY_JSON_MODE": "invalid"}):
+            self.assertEqual(serialization.resolve_json_mode(), "stdlib")
+        with mock.patch.dict("os.environ", {"PY_JSON_MODE": "orjson"}), mock.patch.object(serialization, "orjson", None):
+            with self.assertLogs(serialization.logger, "WARNING"):
+                self.assertEqual(serialization.resolve_json_mode(), "pydantic")
+
+    def test_modes_return_identical_payloads(self) -> None:
+        modes = ["stdlib", "pydantic"] + (["orjson"] if serialization.orjson is not None else [])
+        bodies = {
+            "/v1/grid/plan": serialization_plan_request().model_dump(mode="json"),
+            "/v1/strategies/run": serialization_strategy_request().model_dump(mode="json"),
+        }
+        for path, body in bodies.items():
+            expected = None
+            for mode in modes:
+                with self.subTest(path=path, mode=mode):
+                    response = _client(mode).post(path, json=body)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.headers["content-type"], "application/json")
+                    if expected is None:
+                        expected = response.json()
+                    self.assertEqual(response.json(), expected)
+
+    def test_malformed_body_is_a_validation_error_in_every_mode(self) -> None:
+        modes = ["stdlib", "pydantic"] + (["orjson"] if serialization.orjson is not None else [])
+        for mode in modes:
+            with self.subTest(mode=mode):
+                response = _client(mode).post(
+                    "/v1/strategies/run", content=b'{"strategyType": ', headers={"content-type": "application/json"}
+                )
+                self.assertEqual(response.status_code, 422)
+                self.assertEqual(response.json()["detail"][0]["type"], "json_invalid")
+
+    def test_route_functions_still_return_models(self) -> None:
+        _client("pydantic")
+        self.assertIsInstance(main.run_strategy(serialization_strategy_request(), None), StrategyRunResponse)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+import pathlib
+import subprocess
+import sys
+import unittest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import warmup
+
+HEAVY_MODULES = ("pandas", "talib", "pandas_ta", "columnar", "strategies.ta_backend")
+
+
+def _run_python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True, timeout=120
+    )
+
+
+class StartupTests(unittest.TestCase):
+    def test_importing_main_skips_heavy_modules(self) -> None:
+        code = (
+            "import json, sys, main; "
+            f"print(json.dumps([name for name in {list(HEAVY_MODULES)!r} if name in sys.modules]))"
+        )
+        self.assertEqual(json.loads(_run_python(code).stdout), [])
+
+    def test_grid_planner_import_skips_numpy(self) -> None:
+        code = (
+            "import json, sys, grid.planner; "
+            "print(json.dumps([name for name in ('numpy', 'grid.simulator') if name in sys.modules]))"
+        )
+        self.assertEqual(json.loads(_run_python(code).stdout), [])
+
+    def test_warm_backends_loads_ta_stack(self) -> None:
+        code = (
+            "import json, sys, main, warmup; timings = warmup.warm_backends(); "
+            "print(json.dumps({'timings': sorted(timings), 'loaded': "
+            "[name for name in ('columnar', 'strategies.ta_backend', 'strategies.ta_trend_vol_gate_v2') if name in sys.modules]}))"
+        )
+        result = json.loads(_run_python(code).stdout)
+        self.assertEqual(result["timings"], ["backend", "compute", "imports"])
+        self.assertEqual(len(result["loaded"]), 3)
+
+    def test_lazy_handler_runs_ta_strategy(self) -> None:
+        import main
+        from models import StrategyRunRequest
+
+        registration = main.registry.get("ta_trend_vol_gate_v2")
+        assert registration is not None
+        response = registration.handler(
+            StrategyRunRequest(
+                strategyType="ta_trend_vol_gate_v2",
+                featureSnapshot={"historyContext": {"reg": {"state": "trend_up", "conf": 80}}},
+                context={"signal": "up"},
+            )
+        )
+        self.assertIn("reasonCodes", response.model_dump())
+
+    def test_background_warmup_can_be_disabled(self) -> None:
+        from unittest import mock
+
+        with mock.patch.dict("os.environ", {"PY_WARMUP": "off"}):
+            self.assertIsNone(warmup.start_background_warmup())
+        with mock.patch.object(warmup, "warm_backends", side_effect=RuntimeError("boom")):
+            thread = warmup.start_background_warmup()
+            assert thread is not None
+            thread.join(timeout=30)
+            self.assertFalse(thread.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import pathlib
+import sys
+import unittest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import main
+from models import StrategyRunBatchRequest, StrategyRunRequest
+
+
+def _regime_item(signal: str = "up") -> dict:
+    return {
+        "strategyType": "regime_gate",
+        "featureSnapshot": {
+            "historyContext": {
+                "reg": {"state": "trend_up", "conf": 70},
+                "ema": {"stk": "bull"},
+            }
+        },
+        "context": {"signal": signal},
+    }
+
+
+class StrategyBatchTests(unittest.TestCase):
+    def test_batch_matches_single_runs_in_order(self) -> None:
+        items = [
+            _regime_item("up"),
+            {
+                "strategyType": "trend_vol_gate",
+                "featureSnapshot": {"historyContext": {"reg": {"state": "range", "conf": 40}}},
+                "context": {"signal": "down"},
+            },
+            _regime_item("down"),
+        ]
+        result = main.run_strategy_batch(StrategyRunBatchRequest(items=items), None)
+        self.assertEqual([item.index for item in result.items], [0, 1, 2])
+        self.assertEqual(result.okCount, 3)
+        self.assertEqual(result.errorCount, 0)
+        for raw, item in zip(items, result.items):
+            expected = main.run_strategy(StrategyRunRequest.model_validate(raw), None)
+            self.assertTrue(item.ok)
+            assert item.result is not None
+            self.assertEqual(item.result.model_dump(), expected.model_dump())
+
+    def test_batch_reports_per_item_errors(self) -> None:
+        items = [
+            _regime_item(),
+            {"strategyType": "does_not_exist"},
+            {"strategyType": ""},
+            "not-an-object",
+            _regime_item(),
+        ]
+        result = main.run_strategy_batch(StrategyRunBatchRequest(items=items), None)
+        self.assertEqual(result.okCount, 2)
+        self.assertEqual(result.errorCount, 3)
+        self.assertTrue(result.items[0].ok)
+        self.assertEqual(result.items[1].error, "strategy_not_found:does_not_exist")
+        self.assertEqual(result.items[2].error, "invalid_request")
+        self.assertEqual(result.items[3].error, "invalid_request")
+        self.assertTrue(result.items[4].ok)
+
+    def test_batch_isolates_handler_exceptions(self) -> None:
+        registration = main.registry.get("signal_filter")
+        assert registration is not None
+        original = registration.handler
+
+        def _boom(_payload: StrategyRunRequest):
+            raise RuntimeError("boom")
+
+        try:
+            registration.handler = _boom
+            result = main.run_strategy_batch(
+                StrategyRunBatchRequest(items=[{"strategyType": "signal_filter"}, _regime_item()]),
+                None,
+            )
+        finally:
+            registration.handler = original
+        self.assertEqual(result.items[0].error, "strategy_failed")
+        self.assertTrue(result.items[1].ok)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,9 @@ import os
 import pathlib
 import sys
 import unittest
+from unittest import mock
 
+import numpy as np
 import pandas as pd
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
@@ -12,6 +14,7 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from strategies import ta_backend
+from tests.fixtures import random_ohlcv_frame
 
 
 class TaBackendTests(unittest.TestCase):
@@ -46,6 +49,78 @@ class TaBackendTests(unittest.TestCase):
         assert frame is not None
         self.assertEqual(list(frame.columns), ["ts", "open", "high", "low", "close", "volume"])
 
+    def _assert_arrays_match_frame(self, snapshot: dict) -> None:
+        frame, frame_error = ta_backend.extract_ohlcv_frame(snapshot)
+        arrays, arrays_error = ta_backend.extract_ohlcv_arrays(snapshot)
+        self.assertEqual(arrays_error, frame_error)
+        if frame is None:
+            self.assertIsNone(arrays)
+            return
+        assert arrays is not None
+        np.testing.assert_array_equal(arrays.values, frame.loc[:, list(ta_backend.OHLCV_COLUMNS)].to_numpy())
+        self.assertTrue(arrays.values.flags["F_CONTIGUOUS"])
+
+    def test_extract_ohlcv_arrays_matches_frame_path(self) -> None:
+        numeric = [[1_767_225_600_000 + idx * 900_000, 100 + idx, 101 + idx, 99 + idx, 100.5 + idx, 1000] for idx in range(60)]
+        iso = [["2026-02-01T%02d:%02d:00Z" % (idx // 4, (idx % 4) * 15)] + row[1:] for idx, row in enumerate(numeric[:48])]
+        noisy = [list(row) for row in numeric]
+        noisy[3][4] = None
+        noisy[5][2] = "abc"
+        noisy[7][3] = "inf"
+        noisy[9] = noisy[9][:4]
+        noisy[11][0] = None
+        shuffled = list(reversed(numeric))
+        reordered = [[row[0], row[5], row[1], row[2], row[3], row[4]] for row in numeric]
+        cases = [
+            {"bars": numeric},
+            {"bars": iso},
+            {"bars": noisy},
+            {"bars": shuffled},
+            {"bars": reordered, "format": ["ts", "volume", "open", "high", "low", "close"]},
+            {"bars": [dict(zip(["ts", "open", "high", "low", "close", "volume"], row)) for row in numeric]},
+            {"bars": numeric[:20]},
+            {"bars": [row[:5] for row in numeric]},
+        ]
+        for ohlcv in cases:
+            with self.subTest(bars=len(ohlcv["bars"]), fmt=ohlcv.get("format")):
+                self._assert_arrays_match_frame({"ohlcvSeries": ohlcv})
+        self._assert_arrays_match_frame({})
+
+    def test_columnar_encoding_matches_tuple_bars(self) -> None:
+        bars = [[1_767_225_600_000 + idx * 900_000, 100 + idx, 101 + idx, 99 + idx, 100.5 + idx, 1000.0] for idx in range(60)]
+        matrix = np.array(bars, dtype=np.float64)
+        series = ta_backend.encode_columnar_ohlcv(matrix[:, 0].astype(np.int64), matrix[:, 1:], timeframe="15m")
+        columnar, error = ta_backend.extract_ohlcv_arrays({"ohlcvSeries": series})
+        expected, _ = ta_backend.extract_ohlcv_arrays({"ohlcvSeries": {"bars": bars}})
+        self.assertIsNone(error)
+        assert columnar is not None and expected is not None
+        np.testing.assert_array_equal(columnar.values, expected.values)
+        np.testing.assert_array_equal(columnar.ts, expected.ts)
+        self.assertTrue(columnar.values.flags["F_CONTIGUOUS"])
+        frame, frame_error = ta_backend.extract_ohlcv_frame({"ohlcvSeries": series})
+        self.assertIsNone(frame_error)
+        assert frame is not None
+        self.assertEqual(len(frame), 60)
+
+    def test_columnar_encoding_rejects_malformed_buffers(self) -> None:
+        matrix = random_ohlcv_frame(40).to_numpy()
+        ts = np.arange(40, dtype=np.int64) * 900_000
+        valid = ta_backend.encode_columnar_ohlcv(ts, matrix)
+        short = ta_backend.encode_columnar_ohlcv(ts[:39], matrix[:39])
+        cases = {
+            "bad_base64": {**valid, "columns": {**valid["columns"], "close": "not base64!"}},
+            "length_mismatch": {**valid, "columns": {**valid["columns"], "close": short["columns"]["close"]}},
+            "count_mismatch": {**valid, "count": 41},
+            "missing_column": {**valid, "columns": {k: v for k, v in valid["columns"].items() if k != "volume"}},
+            "too_short": ta_backend.encode_columnar_ohlcv(ts[:20], matrix[:20]),
+        }
+        for name, series in cases.items():
+            with self.subTest(case=name):
+                self.assertEqual(ta_backend.extract_ohlcv_arrays({"ohlcvSeries": series}), (None, "ta_input_missing"))
+        arrays, error = ta_backend.extract_ohlcv_arrays({"ohlcvSeries": valid})
+        self.assertIsNone(error)
+        self.assertEqual(len(arrays or []), 40)
+
     def test_compute_ta_indicators_handles_missing_backend(self) -> None:
         previous = os.getenv("PY_TA_BACKEND")
         try:
@@ -68,6 +143,45 @@ class TaBackendTests(unittest.TestCase):
             else:
                 os.environ["PY_TA_BACKEND"] = previous
 
+    def test_numpy_backend_is_selectable_and_auto_fallback(self) -> None:
+        frame = random_ohlcv_frame(120)
+        with mock.patch.dict(os.environ, {"PY_TA_BACKEND": "numpy"}):
+            values, error = ta_backend.compute_ta_indicators(frame)
+            self.assertIsNone(error)
+            self.assertEqual(values["backend"], "numpy")
+            self.assertEqual(ta_backend.active_backend(), "numpy")
+        with mock.patch.dict(os.environ, {"PY_TA_BACKEND": "auto"}), mock.patch.object(ta_backend, "talib", None):
+            values, error = ta_backend.compute_ta_indicators(frame)
+            self.assertIsNone(error)
+            self.assertEqual(values["backend"], "numpy")
+            for key in ("rsi", "adx", "atr_pct", "ema_fast", "ema_slow"):
+                self.assertIsNotNone(values[key], key)
+
+    def test_numpy_backend_short_series(self) -> None:
+        values = ta_backend._compute_with_numpy(ta_backend.OhlcvArrays.from_frame(random_ohlcv_frame(40)))
+        self.assertIsNotNone(values["adx"])
+        self.assertIsNone(values["ema_slow"])
+        flat = np.full(60, 100.0)
+        values = ta_backend.compute_numpy_indicators(flat, flat, flat)
+        self.assertEqual(values["rsi"], 0.0)
+        self.assertEqual(values["adx"], 0.0)
+
+    @unittest.skipUnless(ta_backend.talib is not None, "talib not installed")
+    def test_numpy_backend_matches_talib(self) -> None:
+        for count in (35, 49, 50, 200, 1500):
+            frame = random_ohlcv_frame(count, seed=count)
+            # Flat stretch exercises TA-Lib's zero-division guards.
+            frame.loc[10:16, ["high", "low", "close"]] = 100.0
+            arrays = ta_backend.OhlcvArrays.from_frame(frame)
+            expected = ta_backend._compute_with_talib(arrays)
+            actual = ta_backend._compute_with_numpy(arrays)
+            for key, value in expected.items():
+                with self.subTest(count=count, indicator=key):
+                    if value is None:
+                        self.assertIsNone(actual[key])
+                    else:
+                        self.assertAlmostEqual(actual[key], value, delta=1e-9 * max(1.0, abs(value)))
+
 
 if __name__ == "__main__":
     unittest.main()
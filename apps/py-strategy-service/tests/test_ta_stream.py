@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import math
+import os
+import pathlib
+import random
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from models import RunContext, StrategyRunRequest
+from strategies import ta_stream, ta_trend_vol_gate_v2
+from strategies.ta_backend import compute_numpy_indicators, encode_columnar_ohlcv
+from strategies.ta_stream import IndicatorState, IndicatorStore
+
+try:
+    import talib  # type: ignore
+except Exception:
+    talib = None
+
+FMT = ["ts", "open", "high", "low", "close", "volume"]
+BAR_MS = 15 * 60 * 1000
+START_MS = 1_767_225_600_000
+
+
+def _bars(count: int, seed: int = 7, start: int = 0) -> list[list[float]]:
+    rng = random.Random(seed)
+    rows: list[list[float]] = []
+    price = 100.0
+    for idx in range(start + count):
+        close = price + rng.uniform(-1.0, 1.0)
+        high = max(price, close) + rng.uniform(0.0, 0.6)
+        low = min(price, close) - rng.uniform(0.0, 0.6)
+        if idx >= start:
+            rows.append([START_MS + idx * BAR_MS, price, high, low, close, 1000.0 + idx])
+        price = close
+    return rows
+
+
+def _replay(rows: list[list[float]]) -> dict[str, float | None]:
+    state = IndicatorState()
+    for row in rows:
+        state.push(row[2], row[3], row[4])
+    return state.values()
+
+
+def _recompute(rows: list[list[float]]) -> dict[str, float | None]:
+    matrix = np.array(rows, dtype=np.float64)
+    return compute_numpy_indicators(matrix[:, 2], matrix[:, 3], matrix[:, 4])
+
+
+def _assert_values_close(case: unittest.TestCase, left: dict, right: dict, rel_tol: float | None = None) -> None:
+    case.assertEqual(set(left.keys()), set(right.keys()))
+    for key, value in left.items():
+        if value is None or right[key] is None:
+            case.assertEqual(value, right[key], key)
+        elif rel_tol is not None:
+            case.assertTrue(math.isclose(value, right[key], rel_tol=rel_tol, abs_tol=1e-3), f"{key}: {value} != {right[key]}")
+        else:
+            case.assertAlmostEqual(value, right[key], places=9, msg=key)
+
+
+class IndicatorStateTests(unittest.TestCase):
+    @unittest.skipUnless(talib is not None, "talib not installed")
+    def test_recursion_matches_talib(self) -> None:
+        for count in (35, 50, 120, 400):
+            rows = _bars(count, seed=count)
+            highs = np.array([row[2] for row in rows])
+            lows = np.array([row[3] for row in rows])
+            closes = np.array([row[4] for row in rows])
+            values = _replay(rows)
+            self.assertAlmostEqual(values["rsi"], float(talib.RSI(closes, timeperiod=14)[-1]), places=9)
+            self.assertAlmostEqual(values["adx"], float(talib.ADX(highs, lows, closes, timeperiod=14)[-1]), places=9)
+            atr = float(talib.ATR(highs, lows, closes, timeperiod=14)[-1])
+            self.assertAlmostEqual(values["atr_pct"], atr / closes[-1] * 100.0, places=9)
+            self.assertAlmostEqual(values["ema_fast"], float(talib.EMA(closes, timeperiod=20)[-1]), places=9)
+            ema_slow = talib.EMA(closes, timeperiod=50)[-1]
+            if np.isfinite(ema_slow):
+                self.assertAlmostEqual(values["ema_slow"], float(ema_slow), places=9)
+            else:
+                self.assertIsNone(values["ema_slow"])
+
+    def test_short_history_leaves_slow_ema_unset(self) -> None:
+        values = _replay(_bars(40))
+        self.assertIsNotNone(values["adx"])
+        self.assertIsNone(values["ema_slow"])
+
+
+class IndicatorStoreTests(unittest.TestCase):
+    KEY = ("bitget", "BTCUSDT", "15m", "talib")
+
+    def _seeded(self, rows: list[list[float]], **kwargs: int) -> IndicatorStore:
+        store = IndicatorStore(**kwargs)
+        self.assertIsNotNone(store.update(self.KEY, rows, FMT))
+        return store
+
+    def test_first_sighting_seeds_from_the_series(self) -> None:
+        store = IndicatorStore()
+        history = _bars(120)
+        values = store.update(self.KEY, history, FMT)
+        self.assertEqual(store.stats(), {"keys": 1, "incrementalUpdates": 0, "fullRecomputes": 1, "skipped": 0})
+        _assert_values_close(self, values or {}, _recompute(history))
+
+    def test_extension_is_incremental_and_matches_full_history(self) -> None:
+        history = _bars(160)
+        store = self._seeded(history[:120])
+        values = store.update(self.KEY, history[:123], FMT)
+        self.assertEqual(store.stats(), {"keys": 1, "incrementalUpdates": 1, "fullRecomputes": 1, "skipped": 0})
+        _assert_values_close(self, values or {}, _replay(history[:123]))
+
+    def test_sliding_window_streams_the_continuous_history(self) -> None:
+        history = _bars(400, seed=3)
+        store = IndicatorStore(min_window=100)
+        calls = 0
+        for end in range(100, len(history), 7):
+            values = store.update(self.KEY, history[end - 100 : end], FMT)
+            # Seeded from the first window, then extended bar by bar past its start.
+            _assert_values_close(self, values or {}, _replay(history[:end]))
+            calls += 1
+        self.assertEqual(store.stats(), {"keys": 1, "incrementalUpdates": calls - 1, "fullRecomputes": 1, "skipped": 0})
+
+    def test_short_sliding_window_is_left_to_the_caller(self) -> None:
+        history = _bars(200, seed=3)
+        store = self._seeded(history[:120], min_window=200)
+        for end in range(121, 131):
+            self.assertIsNone(store.update(self.KEY, history[end - 120 : end], FMT))
+        # A series growing from the seed's first bar still streams.
+        _assert_values_close(self, store.update(self.KEY, history[:125], FMT) or {}, _replay(history[:125]))
+        self.assertEqual(store.stats(), {"keys": 1, "incrementalUpdates": 1, "fullRecomputes": 1, "skipped": 10})
+
+    def test_long_sliding_window_agrees_with_a_recompute_of_the_window(self) -> None:
+        history = _bars(800, seed=11)
+        store = IndicatorStore(min_window=200)
+        for end in range(200, len(history), 3):
+            window = history[end - 200 : end]
+            _assert_values_close(self, store.update(self.KEY, window, FMT) or {}, _recompute(window), rel_tol=1e-4)
+        self.assertEqual((store.full_recomputes, store.skipped), (1, 0))
+
+    def test_window_jump_beyond_max_tail_reseeds_from_the_window(self) -> None:
+        history = _bars(200, seed=4)
+        store = self._seeded(history[:100], max_tail=8, min_window=50)
+        window = history[60:110]
+        values = store.update(self.KEY, window, FMT)
+        self.assertEqual(store.full_recomputes, 2)
+        _assert_values_close(self, values or {}, _recompute(window))
+
+    def test_revision_of_last_bar_replays_from_saved_state(self) -> None:
+        history = _bars(121)
+        store = self._seeded(history[:120])
+        revised = [list(row) for row in history[:120]]
+        revised[-1][2] += 0.75
+        revised[-1][4] += 0.5
+        values = store.update(self.KEY, revised, FMT)
+        self.assertEqual(store.incremental_updates, 1)
+        _assert_values_close(self, values or {}, _replay(revised))
+
+        extended = revised + [history[120]]
+        values = store.update(self.KEY, extended, FMT)
+        self.assertEqual(store.incremental_updates, 2)
+        _assert_values_close(self, values or {}, _replay(extended))
+
+    def test_unchanged_series_returns_cached_values(self) -> None:
+        rows = _bars(80)
+        store = self._seeded(rows)
+        first = store.update(self.KEY, rows, FMT)
+        second = store.update(self.KEY, rows, FMT)
+        self.assertEqual(first, second)
+        self.assertEqual(store.incremental_updates, 2)
+
+    def test_gap_triggers_full_recompute(self) -> None:
+        history = _bars(140)
+        store = self._seeded(history[:100])
+        gapped = history[:100] + history[102:110]
+        values = store.update(self.KEY, gapped, FMT)
+        self.assertEqual(store.full_recomputes, 2)
+        _assert_values_close(self, values or {}, _replay(gapped))
+
+    def test_deeper_revision_triggers_full_recompute(self) -> None:
+        rows = _bars(100)
+        store = self._seeded(rows)
+        revised = [list(row) for row in rows]
+        revised[-2][4] += 1.0
+        values = store.update(self.KEY, revised, FMT)
+        self.assertEqual(store.full_recomputes, 2)
+        _assert_values_close(self, values or {}, _replay(revised))
+
+    def test_unordered_series_reseed_and_short_ones_are_not_streamed(self) -> None:
+        store = IndicatorStore(min_window=1)
+        rows = _bars(60)
+        for series in (rows[:20], rows[:40] + rows[39:]):
+            self.assertIsNone(store.update(self.KEY, series, FMT))
+            self.assertIsNone(store.update(self.KEY, series, FMT))
+        self.assertEqual(store.full_recomputes, 0)
+        # Bars are sorted like the vectorized path sorts them, but never extend the state.
+        for _ in range(2):
+            values = store.update(self.KEY, list(reversed(rows)), FMT)
+            _assert_values_close(self, values or {}, _recompute(rows))
+        self.assertEqual((store.full_recomputes, store.incremental_updates), (2, 0))
+
+    def test_lru_eviction(self) -> None:
+        store = IndicatorStore(max_keys=2)
+        rows = _bars(60)
+        for symbol in ("A", "B", "C"):
+            store.update(("ex", symbol, "15m", "talib"), rows, FMT)
+        self.assertEqual(len(store), 2)
+        store.update(("ex", "A", "15m", "talib"), rows, FMT)
+        store.update(("ex", "C", "15m", "talib"), rows, FMT)
+        self.assertEqual((store.full_recomputes, store.incremental_updates), (4, 1))
+
+
+class StreamingWiringTests(unittest.TestCase):
+    def setUp(self) -> None:
+        ta_stream.STORE.clear()
+        env = mock.patch.dict("os.environ", {"PY_TA_STREAMING": "1"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def _request(self, bars: list[list[float]]) -> StrategyRunRequest:
+        return StrategyRunRequest(
+            strategyType="ta_trend_vol_gate_v2",
+            featureSnapshot={
+                "historyContext": {"reg": {"state": "trend_up", "conf": 80}},
+                "ohlcvSeries": {"timeframe": "15m", "format": FMT, "bars": bars},
+            },
+            context={"signal": "up", "exchange": "bitget", "symbol": "btcusdt"},
+        )
+
+    def test_gate_streams_when_backend_supports_it(self) -> None:
+        history = _bars(130)
+        with mock.patch.object(ta_stream, "active_backend", return_value="talib"):
+            ta_trend_vol_gate_v2.run(self._request(history[:120]))
+            response = ta_trend_vol_gate_v2.run(self._request(history[:121]))
+        self.assertEqual(ta_stream.STORE.stats()["incrementalUpdates"], 1)
+        self.assertEqual(response.meta.get("taBackend"), "talib")
+        self.assertEqual(response.meta.get("indicatorSource"), "ohlcv")
+
+    def test_columnar_encoding_streams_like_tuple_bars(self) -> None:
+        history = _bars(130)
+        context = RunContext(signal="up", exchange="bitget", symbol="BTCUSDT")
+
+        def snapshot(rows: list[list[float]]) -> dict:
+            matrix = np.array(rows, dtype=np.float64)
+            return {"ohlcvSeries": encode_columnar_ohlcv(matrix[:, 0].astype(np.int64), matrix[:, 1:], timeframe="15m")}
+
+        with mock.patch.object(ta_stream, "active_backend", return_value="numpy"):
+            seeded = ta_stream.compute_streaming_indicators(snapshot(history[:120]), context)
+            values = ta_stream.compute_streaming_indicators(snapshot(history[:123]), context)
+            revised = [list(row) for row in history[:123]]
+            revised[-1][4] += 0.5
+            revised_values = ta_stream.compute_streaming_indicators(snapshot(revised), context)
+        self.assertEqual(
+            ta_stream.STORE.stats(), {"keys": 1, "incrementalUpdates": 2, "fullRecomputes": 1, "skipped": 0}
+        )
+        assert seeded is not None and values is not None and revised_values is not None
+        seeded.pop("backend")
+        _assert_values_close(self, seeded, _recompute(history[:120]))
+        self.assertEqual(values.pop("backend"), "numpy")
+        _assert_values_close(self, values, _replay(history[:123]))
+        revised_values.pop("backend")
+        _assert_values_close(self, revised_values, _replay(history[:122] + revised[-1:]))
+
+    def test_short_sliding_window_gate_recomputes_the_window(self) -> None:
+        history = _bars(200, seed=5)
+        with mock.patch.object(ta_stream, "active_backend", return_value="numpy"):
+            for end in range(120, 130):
+                request = self._request(history[end - 120 : end])
+                values, error, source = ta_trend_vol_gate_v2.resolve_indicators(request.featureSnapshot, request.context)
+                self.assertIsNone(error)
+                self.assertEqual(source, "ohlcv")
+                expected = _recompute(history[end - 120 : end])
+                _assert_values_close(self, {**values, "backend": None}, {**expected, "backend": None})
+        self.assertEqual(ta_stream.STORE.stats(), {"keys": 1, "incrementalUpdates": 0, "fullRecomputes": 1, "skipped": 9})
+
+    def test_missing_key_parts_skip_the_store(self) -> None:
+        with mock.patch.object(ta_stream, "active_backend", return_value="talib"):
+            snapshot = self._request(_bars(60)).featureSnapshot
+            self.assertIsNone(ta_stream.compute_streaming_indicators(snapshot, RunContext(signal="up")))
+            self.assertIsNone(ta_stream.compute_streaming_indicators(snapshot, None))
+        self.assertEqual(len(ta_stream.STORE), 0)
+
+    def test_unsupported_backend_skips_the_store(self) -> None:
+        with mock.patch.object(ta_stream, "active_backend", return_value="pandas_ta"):
+            snapshot = self._request(_bars(60)).featureSnapshot
+            context = RunContext(signal="up", exchange="bitget", symbol="BTCUSDT")
+            self.assertIsNone(ta_stream.compute_streaming_indicators(snapshot, context))
+
+    def test_streaming_is_off_by_default(self) -> None:
+        with mock.patch.object(ta_stream, "active_backend", return_value="talib"), mock.patch.dict("os.environ"):
+            os.environ.pop("PY_TA_STREAMING", None)
+            snapshot = self._request(_bars(60)).featureSnapshot
+            context = RunContext(signal="up", exchange="bitget", symbol="BTCUSDT")
+            self.assertIsNone(ta_stream.compute_streaming_indicators(snapshot, context))
+
+
+if __name__ == "__main__":
+    unittest.main()
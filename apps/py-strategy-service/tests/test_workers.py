@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import signal
+import sys
+import threading
+import unittest
+from unittest import mock
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import main
+import workers
+from grid import GridPlanBatchRequest, GridPreviewRequest
+from tests.fixtures import worker_plan_request, worker_ta_request
+
+
+class WorkerPoolTests(unittest.TestCase):
+    def test_pool_disabled_by_default(self) -> None:
+        with mock.patch.dict("os.environ", {}, clear=True):
+            self.assertEqual(workers.configured_workers(), 0)
+            self.assertIsNone(workers.start_pool())
+        self.assertFalse(workers.pool_active())
+        self.assertFalse(workers.should_offload_strategy("ta_trend_vol_gate_v2"))
+
+    def test_tasks_match_inline_handlers(self) -> None:
+        # The worker tasks are plain functions; running them inline checks the dict round trip.
+        request = worker_ta_request(120)
+        self.assertEqual(workers.strategy_task(request.model_dump()), main.execute_strategy(request).model_dump())
+        plan = worker_plan_request(40)
+        self.assertEqual(workers.grid_plan_task(plan.model_dump()), main.plan_grid(plan).model_dump())
+        preview = GridPreviewRequest(
+            mode="long", gridMode="arithmetic", lowerPrice=100, upperPrice=120, gridCount=10, investUsd=500, leverage=2, markPrice=110
+        )
+        self.assertEqual(workers.grid_preview_task(preview.model_dump()), main.preview_grid(preview).model_dump())
+
+    def test_routes_offload_to_prewarmed_pool(self) -> None:
+        request = worker_ta_request(120)
+        plan = worker_plan_request(40)
+        inline_run = main.run_strategy(request, None)
+        inline_plan = main.grid_plan(plan, None)
+        workers.start_pool(1)
+        try:
+            self.assertTrue(workers.should_offload_strategy(" ta_trend_vol_gate_v2 "))
+            self.assertFalse(workers.should_offload_strategy("regime_gate"))
+            with mock.patch.dict("os.environ", {"PY_CPU_OFFLOAD_STRATEGIES": "regime_gate, "}):
+                self.assertTrue(workers.should_offload_strategy("regime_gate"))
+                self.assertFalse(workers.should_offload_strategy("ta_trend_vol_gate_v2"))
+            self.assertEqual(main.run_strategy(request, None), inline_run)
+            self.assertEqual(main.grid_plan(plan, None), inline_plan)
+            batch = GridPlanBatchRequest(items=[plan.model_dump()] * 3 + [{"instanceId": "bad"}])
+            with mock.patch.dict("os.environ", {"PY_GRID_BATCH_PARALLEL_MIN": "1"}):
+                offloaded = main.grid_plan_batch(batch, None)
+            self.assertEqual((offloaded.okCount, offloaded.errorCount), (3, 1))
+            self.assertEqual(offloaded.items[0].result, inline_plan)
+        finally:
+            workers.shutdown_pool()
+        self.assertFalse(workers.pool_active())
+
+    def test_pool_warms_in_background_and_serves_inline_meanwhile(self) -> None:
+        plan = worker_plan_request(40)
+        inline_plan = main.grid_plan(plan, None)
+        with mock.patch.dict("os.environ", {"PY_CPU_WORKERS": "0"}):
+            self.assertIsNone(workers.start_pool_in_background())
+        started = threading.Event()
+        release = threading.Event()
+        new_pool = workers._new_pool
+
+        def slow_new_pool(count: int):
+            started.set()
+            release.wait(30)
+            return new_pool(count)
+
+        with mock.patch.object(workers, "_new_pool", side_effect=slow_new_pool):
+            thread = workers.start_pool_in_background(1)
+            assert thread is not None
+            try:
+                self.assertTrue(started.wait(30))
+                self.assertFalse(workers.pool_active())
+                self.assertEqual(main.grid_plan(plan, None), inline_plan)
+            finally:
+                release.set()
+            thread.join(60)
+        try:
+            self.assertTrue(workers.pool_active())
+            self.assertEqual(main.grid_plan(plan, None), inline_plan)
+        finally:
+            workers.shutdown_pool()
+        self.assertFalse(workers.pool_active())
+
+    def test_dead_worker_is_replaced_and_request_retried(self) -> None:
+        plan = worker_plan_request(40)
+        inline_plan = main.grid_plan(plan, None)
+        broken = workers.start_pool(1)
+        try:
+            for process in list(broken._processes.values()):
+                os.kill(process.pid, signal.SIGKILL)
+                process.join()
+            self.assertEqual(main.grid_plan(plan, None), inline_plan)
+            self.assertTrue(workers.pool_active())
+            self.assertIsNot(workers.start_pool(1), broken)
+        finally:
+            workers.shutdown_pool()
+
+    def test_stream_backed_strategies_stay_inline_while_streaming(self) -> None:
+        with mock.patch.dict("os.environ", {"PY_TA_STREAMING": "1"}):
+            os.environ.pop("PY_CPU_OFFLOAD_STRATEGIES", None)
+            self.assertNotIn("ta_trend_vol_gate_v2", workers.offload_strategies())
+            with mock.patch.dict("os.environ", {"PY_CPU_OFFLOAD_STRATEGIES": "ta_trend_vol_gate_v2"}):
+                self.assertEqual(workers.offload_strategies(), {"ta_trend_vol_gate_v2"})
+        with mock.patch.dict("os.environ", {"PY_TA_STREAMING": "0"}):
+            os.environ.pop("PY_CPU_OFFLOAD_STRATEGIES", None)
+            self.assertIn("ta_trend_vol_gate_v2", workers.offload_strategies())
+            with mock.patch.dict("os.environ", {"PY_CPU_OFFLOAD_STRATEGIES": " "}):
+                self.assertIn("ta_trend_vol_gate_v2", workers.offload_strategies())
+
+
+if __name__ == "__main__":
+    unittest.main()
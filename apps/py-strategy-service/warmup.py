@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+
+def warmup_enabled() -> bool:
+    return str(os.getenv("PY_WARMUP", "1")).strip().lower() not in {"0", "false", "off", "no"}
+
+
+def warm_backends() -> dict[str, float]:
+    """Import the TA stack and run one indicator computation; returns milliseconds per step.
+
+    `main` imports neither pandas, TA-Lib nor the columnar engine; this pays those imports
+    (and the first-call costs of the active backend) ahead of the first TA request.
+    """
+    timings: dict[str, float] = {}
+
+    started = time.perf_counter()
+    import numpy as np
+
+    import columnar  # noqa: F401
+    from strategies import ta_backend, ta_trend_vol_gate_v2  # noqa: F401
+
+    timings["imports"] = (time.perf_counter() - started) * 1000.0
+
+    started = time.perf_counter()
+    ta_backend.active_backend()
+    try:
+        # Dict-shaped bars and the pandas_ta backend go through pandas.
+        import pandas  # noqa: F401
+    except Exception:
+        pass
+    timings["backend"] = (time.perf_counter() - started) * 1000.0
+
+    started = time.perf_counter()
+    count = ta_backend.MIN_TA_BARS * 2
+    closes = 100.0 + np.arange(count) * 0.1
+    values = np.column_stack([closes, closes + 0.5, closes - 0.5, closes, np.full(count, 1000.0)])
+    ta_backend.compute_ta_indicators(
+        ta_backend.OhlcvArrays(ts=np.arange(count, dtype=np.int64), values=np.asfortranarray(values))
+    )
+    timings["compute"] = (time.perf_counter() - started) * 1000.0
+    return timings
+
+
+def _warm_quietly() -> None:
+    try:
+        warm_backends()
+    except Exception:
+        # Best effort: anything not warmed here is imported by the first request instead.
+        pass
+
+
+def start_background_warmup() -> threading.Thread | None:
+    """Warm the TA stack on a daemon thread so startup (and /health) does not wait for it."""
+    if not warmup_enabled():
+        return None
+    thread = threading.Thread(target=_warm_quietly, name="ta-warmup", daemon=True)
+    thread.start()
+    return thread
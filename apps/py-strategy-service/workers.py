@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from env import env_int
+
+# Handlers that are CPU-bound enough to amortize the pickling round trip to a worker process.
+DEFAULT_OFFLOAD_STRATEGIES = ("ta_trend_vol_gate_v2",)
+# Strategies that keep TA streaming state (strategies.ta_stream) per process. Each pool worker
+# would hold its own store and a symbol's requests would land on any worker, so with
+# PY_TA_STREAMING on they stay in-process unless listed explicitly.
+STREAM_BACKED_STRATEGIES = frozenset({"ta_trend_vol_gate_v2"})
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+_POOL_STARTER: threading.Thread | None = None
+
+
+def configured_workers() -> int:
+    """PY_CPU_WORKERS: 0 keeps everything in-process (default); N spreads CPU-bound work over N processes."""
+    return env_int("PY_CPU_WORKERS", 0, 0)
+
+
+def offload_strategies() -> set[str]:
+    """PY_CPU_OFFLOAD_STRATEGIES: comma-separated strategy types sent to the pool; unset or blank uses the default list."""
+    raw = os.getenv("PY_CPU_OFFLOAD_STRATEGIES", "")
+    if raw.strip():
+        return {item.strip() for item in raw.split(",") if item.strip()}
+    from strategies.ta_stream import streaming_enabled
+
+    streaming = streaming_enabled()
+    return {item for item in DEFAULT_OFFLOAD_STRATEGIES if not (streaming and item in STREAM_BACKED_STRATEGIES)}
+
+
+def _warm_worker() -> None:
+    # Importing main registers every strategy; warm_backends loads the numeric stack so the
+    # first real request does not pay for imports.
+    import main  # noqa: F401
+    from warmup import warm_backends
+
+    warm_backends()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _new_pool(count: int) -> ProcessPoolExecutor:
+    # spawn: the server process runs threads, which fork would copy mid-flight.
+    pool = ProcessPoolExecutor(
+        max_workers=count,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_worker,
+    )
+    # Submitting one task per slot spawns every worker now instead of on first use.
+    for future in [pool.submit(_ping) for _ in range(count)]:
+        future.result()
+    return pool
+
+
+def start_pool(workers: int | None = None) -> ProcessPoolExecutor | None:
+    """Start and pre-warm the worker pool; returns None when offloading is disabled."""
+    global _POOL, _POOL_WORKERS
+    count = configured_workers() if workers is None else max(0, workers)
+    if count <= 0:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = _new_pool(count)
+            _POOL_WORKERS = count
+        return _POOL
+
+
+def _start_pool_quietly(count: int) -> None:
+    try:
+        start_pool(count)
+    except Exception:
+        # No pool: requests keep running inline, as with PY_CPU_WORKERS=0.
+        pass
+
+
+def start_pool_in_background(workers: int | None = None) -> threading.Thread | None:
+    """Spawn and warm the pool on a daemon thread; requests run inline until `pool_active()`."""
+    global _POOL_STARTER
+    count = configured_workers() if workers is None else max(0, workers)
+    if count <= 0:
+        return None
+    thread = threading.Thread(target=_start_pool_quietly, args=(count,), name="cpu-pool-warmup", daemon=True)
+    _POOL_STARTER = thread
+    thread.start()
+    return thread
+
+
+def _replace_broken_pool(broken: ProcessPoolExecutor) -> ProcessPoolExecutor | None:
+    """Swap a pool that lost a worker for a fresh one; None (run inline) when that fails too."""
+    global _POOL
+    with _POOL_LOCK:
+        # Every request that was waiting on the dead pool lands here; only the first restarts it.
+        if _POOL is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            try:
+                _POOL = _new_pool(_POOL_WORKERS)
+            except Exception:
+                _POOL = None
+        return _POOL
+
+
+def shutdown_pool() -> None:
+    global _POOL, _POOL_STARTER
+    starter, _POOL_STARTER = _POOL_STARTER, None
+    if starter is not None:
+        # A pool still warming would otherwise be published after shutdown and never closed.
+        starter.join()
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def pool_active() -> bool:
+    return _POOL is not None
+
+
+def pool_workers() -> int:
+    return _POOL_WORKERS if _POOL is not None else 0
+
+
+def should_offload_strategy(strategy_type: str) -> bool:
+    return _POOL is not None and strategy_type.strip() in offload_strategies()
+
+
+_BROKEN = object()
+
+
+def _run_in_pool(
+    pool: ProcessPoolExecutor, task: Callable[[dict[str, Any]], dict[str, Any]], payloads: list[dict[str, Any]]
+) -> list[Any]:
+    # In order; _BROKEN marks payloads lost to a dead worker (a broken pool also fails every
+    # pending future and refuses new submissions).
+    futures = []
+    for payload in payloads:
+        try:
+            futures.append(pool.submit(task, payload))
+        except BrokenProcessPool:
+            futures.append(None)
+    results: list[Any] = []
+    for future in futures:
+        try:
+            results.append(future.result() if future is not None else _BROKEN)
+        except BrokenProcessPool:
+            results.append(_BROKEN)
+    return results
+
+
+def run_offloaded(task: Callable[[dict[str, Any]], dict[str, Any]], payload: dict[str, Any]) -> dict[str, Any]:
+    """Run `task(payload)` in the pool when it is running, otherwise inline."""
+    return run_offloaded_many(task, [payload])[0]
+
+
+def run_offloaded_many(
+    task: Callable[[dict[str, Any]], dict[str, Any]], payloads: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """Run `task` over `payloads` concurrently in the pool (inline when it is not running); keeps order.
+
+    When a worker dies the pool is replaced and the lost payloads run once more in the new
+    pool, or inline if it cannot start. A payload that breaks the new pool as well raises
+    BrokenProcessPool rather than taking the server process down with it.
+    """
+    pool = _POOL
+    if pool is None:
+        return [task(payload) for payload in payloads]
+    results = _run_in_pool(pool, task, payloads)
+    lost = [index for index, result in enumerate(results) if result is _BROKEN]
+    if not lost:
+        return results
+    pool = _replace_broken_pool(pool)
+    if pool is None:
+        retried = [task(payloads[index]) for index in lost]
+    else:
+        retried = _run_in_pool(pool, task, [payloads[index] for index in lost])
+        if any(result is _BROKEN for result in retried):
+            _replace_broken_pool(pool)
+            raise BrokenProcessPool("a pool worker died twice on the same request")
+    for index, result in zip(lost, retried):
+        results[index] = result
+    return results
+
+
+# Worker-side tasks take and return plain dicts so only JSON-shaped data crosses the process boundary.
+
+
+def strategy_task(payload: dict[str, Any]) -> dict[str, Any]:
+    import main
+    from models import StrategyRunRequest
+
+    return main.execute_strategy(StrategyRunRequest.model_validate(payload)).model_dump()
+
+
+def grid_preview_task(payload: dict[str, Any]) -> dict[str, Any]:
+    from grid import GridPreviewRequest, preview
+
+    return preview(GridPreviewRequest.model_validate(payload)).model_dump()
+
+
+def grid_plan_task(payload: dict[str, Any]) -> dict[str, Any]:
+    from grid import GridPlanRequest, plan
+
+    return plan(GridPlanRequest.model_validate(payload)).model_dump()
+
+
+def grid_plan_batch_task(payload: dict[str, Any]) -> dict[str, Any]:
+    from grid import GridPlanRequest
+    from grid.batch import plan_batch_item
+
+    return {
+        "items": [
+            plan_batch_item(index, GridPlanRequest.model_validate(item)).model_dump()
+            for index, item in payload["items"]
+        ]
+    }
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Mirrors apps/py-strategy-service/strategies/trend_vol_gate.py. The parity suite in
+# apps/py-strategy-service/tests/test_gate_parity.py keeps both copies in lockstep.
+TREND_VOL_DEFAULTS: dict[str, Any] = {
+    "allowedStates": ["trend_up", "trend_down"],
+    "minRegimeConf": 55.0,
+    "requireStackAlignment": True,
+    "requireSlopeAlignment": True,
+    "minAbsD50Pct": 0.12,
+    "minAbsD200Pct": 0.20,
+    "maxVolZ": 2.5,
+    "maxRelVol": 1.8,
+    "minVolZ": -1.2,
+    "minRelVol": 0.6,
+    "minPassScore": 70.0,
+    "allowNeutralSignal": False,
+}
+
+DATASET_DIR = Path(__file__).resolve().parents[1] / "dataset"
+
+NUMERIC_PARAMS = (
+    "minRegimeConf",
+    "minAbsD50Pct",
+    "minAbsD200Pct",
+    "maxVolZ",
+    "maxRelVol",
+    "minVolZ",
+    "minRelVol",
+    "minPassScore",
+)
+
+
+def to_float(value: Any) -> float | None:
+    try:
+        parsed = float(value)
+    except Exception:
+        return None
+    if parsed != parsed or parsed in (float("inf"), float("-inf")):
+        return None
+    return parsed
+
+
+def resolve_params(params: dict[str, Any]) -> dict[str, Any]:
+    """Merge params over the handler defaults; explicit zeros are kept (no `or` fallback)."""
+    merged = {**TREND_VOL_DEFAULTS, **params}
+    resolved: dict[str, Any] = {}
+    for key in NUMERIC_PARAMS:
+        parsed = to_float(merged.get(key))
+        resolved[key] = parsed if parsed is not None else float(TREND_VOL_DEFAULTS[key])
+    for key in ("requireStackAlignment", "requireSlopeAlignment", "allowNeutralSignal"):
+        value = merged.get(key)
+        resolved[key] = value if isinstance(value, bool) else TREND_VOL_DEFAULTS[key]
+    states = merged.get("allowedStates")
+    states = states if isinstance(states, (list, tuple)) else []
+    resolved["allowedStates"] = [str(item).strip() for item in states if isinstance(item, str)]
+    return resolved
+
+
+def strategy_gate(frame: pd.DataFrame, params: dict[str, Any]) -> tuple[np.ndarray, np.ndarray]:
+    cfg = resolve_params(params)
+    signal = frame["signal"].to_numpy()
+    state = frame["reg_state"].to_numpy()
+    conf = frame["reg_conf"].to_numpy(dtype=float)
+    stack = frame["ema_stk"].to_numpy()
+    d50 = frame["ema_d50"].to_numpy(dtype=float)
+    d200 = frame["ema_d200"].to_numpy(dtype=float)
+    sl50 = frame["ema_sl50"].to_numpy(dtype=float)
+    vol_z = frame["vol_z"].to_numpy(dtype=float)
+    rel_vol = frame["vol_rv"].to_numpy(dtype=float)
+
+    up = signal == "up"
+    down = signal == "down"
+    signal_ok = (signal != "neutral") | cfg["allowNeutralSignal"]
+    allowed_states = np.isin(state, cfg["allowedStates"])
+    conf_ok = np.isfinite(conf) & (conf >= cfg["minRegimeConf"])
+
+    stack_aligned = (up & (stack == "bull")) | (down & (stack == "bear"))
+    slope_aligned = (up & np.isfinite(sl50) & (sl50 >= 0.0)) | (down & np.isfinite(sl50) & (sl50 <= 0.0))
+    distance_ok = np.isfinite(d50) & np.isfinite(d200) & (np.abs(d50) >= cfg["minAbsD50Pct"]) & (
+        np.abs(d200) >= cfg["minAbsD200Pct"]
+    )
+
+    vol_spike = np.isfinite(vol_z) & np.isfinite(rel_vol) & (vol_z >= cfg["maxVolZ"]) & (rel_vol >= cfg["maxRelVol"])
+    low_liquidity = (np.isfinite(vol_z) & (vol_z <= cfg["minVolZ"])) | (
+        np.isfinite(rel_vol) & (rel_vol <= cfg["minRelVol"])
+    )
+    vol_ok = (~vol_spike) & (~low_liquidity) & np.isfinite(vol_z) & np.isfinite(rel_vol)
+
+    # The live handler rounds before comparing against minPassScore.
+    score = np.round(
+        np.clip(
+            0.6 * np.where(np.isfinite(conf), conf, 0.0)
+            + 20.0 * stack_aligned.astype(float)
+            + 10.0 * slope_aligned.astype(float)
+            + 10.0 * distance_ok.astype(float)
+            + 10.0 * vol_ok.astype(float),
+            0.0,
+            100.0,
+        )
+    )
+
+    allow = signal_ok & allowed_states & conf_ok & distance_ok & (~vol_spike) & (~low_liquidity)
+    if cfg["requireStackAlignment"]:
+        allow = allow & stack_aligned
+    if cfg["requireSlopeAlignment"]:
+        allow = allow & slope_aligned
+    allow = allow & (score >= cfg["minPassScore"])
+    return allow, score
+
+
+def gate_row_by_params(row: pd.Series, params: dict[str, Any]) -> bool:
+    cfg = resolve_params(params)
+    signal = str(row.get("signal") or "neutral")
+    state = str(row.get("reg_state") or "unknown")
+    conf = to_float(row.get("reg_conf"))
+    stack = str(row.get("ema_stk") or "unknown")
+    d50 = to_float(row.get("ema_d50"))
+    d200 = to_float(row.get("ema_d200"))
+    sl50 = to_float(row.get("ema_sl50"))
+    vol_z = to_float(row.get("vol_z"))
+    rel_vol = to_float(row.get("vol_rv"))
+
+    if signal == "neutral" and not cfg["allowNeutralSignal"]:
+        return False
+    if state not in cfg["allowedStates"]:
+        return False
+    if conf is None or conf < cfg["minRegimeConf"]:
+        return False
+
+    stack_aligned = (signal == "up" and stack == "bull") or (signal == "down" and stack == "bear")
+    slope_aligned = (signal == "up" and sl50 is not None and sl50 >= 0.0) or (signal == "down" and sl50 is not None and sl50 <= 0.0)
+    distance_ok = d50 is not None and d200 is not None and abs(d50) >= cfg["minAbsD50Pct"] and abs(d200) >= cfg["minAbsD200Pct"]
+
+    vol_spike = vol_z is not None and rel_vol is not None and vol_z >= cfg["maxVolZ"] and rel_vol >= cfg["maxRelVol"]
+    low_liquidity = (vol_z is not None and vol_z <= cfg["minVolZ"]) or (rel_vol is not None and rel_vol <= cfg["minRelVol"])
+    vol_ok = not vol_spike and not low_liquidity and vol_z is not None and rel_vol is not None
+
+    score = round(
+        max(
+            0.0,
+            min(
+                100.0,
+                0.6 * conf
+                + 20.0 * (1.0 if stack_aligned else 0.0)
+                + 10.0 * (1.0 if slope_aligned else 0.0)
+                + 10.0 * (1.0 if distance_ok else 0.0)
+                + 10.0 * (1.0 if vol_ok else 0.0),
+            ),
+        )
+    )
+
+    if cfg["requireStackAlignment"] and not stack_aligned:
+        return False
+    if cfg["requireSlopeAlignment"] and not slope_aligned:
+        return False
+    return distance_ok and (not vol_spike) and (not low_liquidity) and score >= cfg["minPassScore"]
+
+
+def read_partitioned_dataset(source: Path) -> pd.DataFrame:
+    """Read a hive-partitioned dataset written by build_from_predictions.py --incremental.
+
+    An interrupted build or the watermark lookback can append a row twice, so the last copy
+    per prediction_id wins.
+    Partitioned datasets carry no split column; it is assigned here over the whole history,
+    with the builder's default ratios.
+    """
+    if str(DATASET_DIR) not in sys.path:
+        sys.path.insert(0, str(DATASET_DIR))
+    from build_from_predictions import DEFAULT_TRAIN_RATIO, DEFAULT_VALID_RATIO, assign_splits
+
+    frame = pd.read_parquet(source)
+    for col in ("symbol", "timeframe", "date"):
+        if col in frame.columns:
+            frame[col] = frame[col].astype(str)
+    frame = frame.drop_duplicates("prediction_id", keep="last")
+    frame = frame.sort_values(["ts_created", "prediction_id"], kind="stable").reset_index(drop=True)
+    if "split" not in frame.columns:
+        frame["split"] = assign_splits(frame, DEFAULT_TRAIN_RATIO, DEFAULT_VALID_RATIO)
+    return frame
@@ -10,11 +10,18 @@ import backtrader as bt
 import numpy as np
 import pandas as pd
 
+from gates import gate_row_by_params, read_partitioned_dataset
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Validate vectorbt top candidates with backtrader episodic replay.")
-    parser.add_argument("--dataset", required=True, help="Path to csv/parquet dataset from build_from_predictions.py")
+    parser.add_argument("--dataset", required=True, help="Path to csv/parquet dataset (or --incremental dataset dir) from build_from_predictions.py")
     parser.add_argument("--vectorbt-report", required=True, help="Path to report.json from run_vectorbt.py")
+    parser.add_argument(
+        "--candle-store",
+        default=None,
+        help="Candle store of a --candle-store dataset. Defaults to <dataset>_candles (or <dataset dir>/_candles).",
+    )
     parser.add_argument("--top-k", type=int, default=10)
     parser.add_argument("--min-trades", type=int, default=30)
     parser.add_argument("--max-drawdown-pct", type=float, default=25.0)
@@ -43,7 +50,9 @@ def load_dataset(path: str) -> pd.DataFrame:
     if not source.exists():
         raise SystemExit(f"Dataset not found: {source}")
 
-    if source.suffix.lower() == ".parquet":
+    if source.is_dir():
+        frame = read_partitioned_dataset(source)
+    elif source.suffix.lower() == ".parquet":
         frame = pd.read_parquet(source)
     elif source.suffix.lower() == ".csv":
         frame = pd.read_csv(source)
@@ -52,10 +61,47 @@ def load_dataset(path: str) -> pd.DataFrame:
 
     if "ohlcv_series_json" not in frame.columns:
         raise SystemExit("Dataset missing ohlcv_series_json column. Rebuild dataset with updated builder.")
+    if "ohlcv_ts_start" not in frame.columns:
+        frame["ohlcv_ts_start"] = None
+        frame["ohlcv_ts_end"] = None
+        frame["ohlcv_last_bar_json"] = None
 
     return frame.reset_index(drop=True)
 
 
+class CandleStore:
+    """Read side of build_from_predictions.CandleStore: memory-mapped (n, 6) float64 series per
+    (symbol, marketType, timeframe), columns ts, open, high, low, close, volume, sorted by ts."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._series: dict[tuple[str, str, str], np.ndarray | None] = {}
+
+    def series(self, symbol: str, market_type: str, timeframe: str) -> np.ndarray | None:
+        key = (symbol, market_type, timeframe)
+        if key not in self._series:
+            path = self.root / f"{symbol.replace('/', '-')}__{market_type}__{timeframe}.npy"
+            self._series[key] = np.load(path, mmap_mode="r") if path.exists() else None
+        return self._series[key]
+
+    def window(self, symbol: str, market_type: str, timeframe: str, ts_start: int, ts_end: int) -> np.ndarray | None:
+        """Candles with ts in [ts_start, ts_end), as a view into the memory map."""
+        data = self.series(symbol, market_type, timeframe)
+        if data is None:
+            return None
+        ts = data[:, 0]
+        lo = int(np.searchsorted(ts, ts_start, side="left"))
+        hi = int(np.searchsorted(ts, ts_end, side="left"))
+        return data[lo:hi]
+
+
+def default_candle_store_path(dataset_path: str) -> Path:
+    source = Path(dataset_path)
+    if source.is_dir():
+        return source / "_candles"
+    return source.with_name(f"{source.stem}_candles")
+
+
 def load_vectorbt_candidates(report_path: str, top_k: int) -> tuple[str, list[dict[str, Any]]]:
     report_file = Path(report_path)
     if not report_file.exists():
@@ -153,55 +199,40 @@ def bars_to_dataframe(ohlcv_payload: dict[str, Any]) -> pd.DataFrame | None:
     return frame
 
 
-def gate_row_by_params(row: pd.Series, params: dict[str, Any]) -> bool:
-    signal = str(row.get("signal") or "neutral")
-    state = str(row.get("reg_state") or "unknown")
-    conf = to_float(row.get("reg_conf"))
-    stack = str(row.get("ema_stk") or "unknown")
-    d50 = to_float(row.get("ema_d50"))
-    d200 = to_float(row.get("ema_d200"))
-    sl50 = to_float(row.get("ema_sl50"))
-    vol_z = to_float(row.get("vol_z"))
-    rel_vol = to_float(row.get("vol_rv"))
-
-    min_regime_conf = to_float(params.get("minRegimeConf")) or 55.0
-    min_abs_d50 = to_float(params.get("minAbsD50Pct")) or 0.12
-    min_abs_d200 = to_float(params.get("minAbsD200Pct")) or 0.20
-    max_vol_z = to_float(params.get("maxVolZ")) or 2.5
-    max_rel_vol = to_float(params.get("maxRelVol")) or 1.8
-    min_vol_z = to_float(params.get("minVolZ")) or -1.2
-    min_rel_vol = to_float(params.get("minRelVol")) or 0.6
-    min_pass_score = to_float(params.get("minPassScore")) or 70.0
-
-    if signal not in {"up", "down"}:
-        return False
-    if state not in {"trend_up", "trend_down"}:
-        return False
-    if conf is None or conf < min_regime_conf:
-        return False
-
-    stack_aligned = (signal == "up" and stack == "bull") or (signal == "down" and stack == "bear")
-    slope_aligned = (signal == "up" and sl50 is not None and sl50 >= 0.0) or (signal == "down" and sl50 is not None and sl50 <= 0.0)
-    distance_ok = d50 is not None and d200 is not None and abs(d50) >= min_abs_d50 and abs(d200) >= min_abs_d200
-
-    vol_spike = vol_z is not None and rel_vol is not None and vol_z >= max_vol_z and rel_vol >= max_rel_vol
-    low_liquidity = (vol_z is not None and vol_z <= min_vol_z) or (rel_vol is not None and rel_vol <= min_rel_vol)
-    vol_ok = not vol_spike and not low_liquidity and vol_z is not None and rel_vol is not None
-
-    score = max(
-        0.0,
-        min(
-            100.0,
-            0.6 * conf
-            + 20.0 * (1.0 if stack_aligned else 0.0)
-            + 10.0 * (1.0 if slope_aligned else 0.0)
-            + 10.0 * (1.0 if distance_ok else 0.0)
-            + 10.0 * (1.0 if vol_ok else 0.0),
-        ),
-    )
+def store_bars_to_dataframe(row: pd.Series, store: CandleStore | None) -> pd.DataFrame | None:
+    """Same frame as bars_to_dataframe for a row whose series was moved into the candle store."""
+    ts_start = to_float(row.get("ohlcv_ts_start"))
+    ts_end = to_float(row.get("ohlcv_ts_end"))
+    try:
+        last_bar = json.loads(str(row.get("ohlcv_last_bar_json")))
+    except Exception:
+        return None
+    if store is None or ts_start is None or ts_end is None or not isinstance(last_bar, list) or len(last_bar) != 6:
+        return None
+    timeframe = str(row.get("ohlcv_timeframe") or row.get("timeframe"))
+    market_type = row.get("market_type")
+    market_type = market_type if isinstance(market_type, str) and market_type else "none"
+    closed = store.window(str(row.get("symbol")), market_type, timeframe, int(ts_start), int(ts_end))
+    if closed is None:
+        return None
 
-    allow = stack_aligned and slope_aligned and distance_ok and (not vol_spike) and (not low_liquidity) and score >= min_pass_score
-    return allow
+    bars = np.concatenate([closed, np.asarray(last_bar, dtype=np.float64).reshape(1, 6)])
+    # The window must match the row exactly; a candle added later inside the range would shift it.
+    if len(bars) != int(to_float(row.get("ohlcv_bars_count")) or 0) or len(bars) < 35:
+        return None
+
+    frame = pd.DataFrame(
+        {
+            "datetime": pd.to_datetime(bars[:, 0].astype(np.int64), utc=True, errors="coerce"),
+            "open": bars[:, 1],
+            "high": bars[:, 2],
+            "low": bars[:, 3],
+            "close": bars[:, 4],
+            "volume": bars[:, 5],
+        }
+    ).dropna(subset=["datetime"])
+    frame = frame.sort_values("datetime").drop_duplicates(subset=["datetime"], keep="last")
+    return frame.set_index("datetime")
 
 
 class EpisodeValidationStrategy(bt.Strategy):
@@ -327,7 +358,9 @@ def compute_max_drawdown_pct(returns_pct: list[float]) -> float:
     return float(abs(np.min(dd)) * 100.0)
 
 
-def evaluate_candidate(frame: pd.DataFrame, candidate: dict[str, Any], args: argparse.Namespace) -> dict[str, Any]:
+def evaluate_candidate(
+    frame: pd.DataFrame, candidate: dict[str, Any], args: argparse.Namespace, store: CandleStore | None = None
+) -> dict[str, Any]:
     params = candidate["params"]
     trade_returns: list[float] = []
     skipped_rows = 0
@@ -344,12 +377,14 @@ def evaluate_candidate(frame: pd.DataFrame, candidate: dict[str, Any], args: arg
             skipped_rows += 1
             continue
 
-        ohlcv_payload = parse_ohlcv_payload(row.get("ohlcv_series_json"))
-        if not isinstance(ohlcv_payload, dict):
-            skipped_rows += 1
-            continue
-
-        bars_frame = bars_to_dataframe(ohlcv_payload)
+        if pd.notna(row.get("ohlcv_ts_start")):
+            bars_frame = store_bars_to_dataframe(row, store)
+        else:
+            ohlcv_payload = parse_ohlcv_payload(row.get("ohlcv_series_json"))
+            if not isinstance(ohlcv_payload, dict):
+                skipped_rows += 1
+                continue
+            bars_frame = bars_to_dataframe(ohlcv_payload)
         if bars_frame is None or bars_frame.empty:
             skipped_rows += 1
             continue
@@ -408,7 +443,12 @@ def main() -> None:
     frame = load_dataset(args.dataset)
     strategy_type, candidates = load_vectorbt_candidates(args.vectorbt_report, args.top_k)
 
-    evaluated = [evaluate_candidate(frame, candidate, args) for candidate in candidates]
+    store_path = Path(args.candle_store) if args.candle_store else default_candle_store_path(args.dataset)
+    store = CandleStore(store_path) if store_path.is_dir() else None
+    if store is None and frame["ohlcv_ts_start"].notna().any():
+        raise SystemExit(f"Dataset references a candle store that was not found: {store_path}")
+
+    evaluated = [evaluate_candidate(frame, candidate, args, store) for candidate in candidates]
     passed = [item for item in evaluated if item["pass"] is True]
 
     best_passed = None
@@ -422,6 +462,7 @@ def main() -> None:
         "source": {
             "dataset": str(Path(args.dataset).resolve()),
             "vectorbtReport": str(Path(args.vectorbt_report).resolve()),
+            "candleStore": str(store_path.resolve()) if store is not None else None,
         },
         "constraints": {
             "minTrades": args.min_trades,
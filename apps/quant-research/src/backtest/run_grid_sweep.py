@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# The replay runs the live planner code, so the service package must be importable.
+DEFAULT_SERVICE_ROOT = Path(__file__).resolve().parents[3] / "py-strategy-service"
+
+DEFAULT_GRID: dict[str, list[float]] = {
+    "gridCount": [50, 100, 200],
+    "rangeWidthPct": [5, 10, 20],
+    "activeOrderWindowSize": [40, 80, 120],
+    "initialSeedPct": [0, 30],
+    "leverage": [2, 5, 10],
+}
+INT_PARAMS = ("gridCount", "activeOrderWindowSize")
+
+# Set per worker by init_worker: the candle block is memory-mapped once and shared through the page cache.
+_WORKER: dict[str, Any] = {}
+
+
+@dataclass
+class EvalResult:
+    params: dict[str, float]
+    metrics: dict[str, Any]
+    objective: float
+    liq_distance: float
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a parallel futures grid parameter sweep on historical candles.")
+    parser.add_argument("--candles", required=True, help="Path to parquet/csv OHLCV candles (ts, open, high, low, close[, volume])")
+    parser.add_argument("--strategy-type", default="futures_grid")
+    parser.add_argument("--mode", choices=["long", "short", "neutral"], default="neutral")
+    parser.add_argument("--grid-mode", choices=["arithmetic", "geometric"], default="geometric")
+    parser.add_argument("--invest-usd", type=float, default=1000.0)
+    parser.add_argument("--fee-pct", type=float, default=0.06, help="Taker fee per fill in percent.")
+    parser.add_argument("--funding-rate-pct", type=float, default=0.01, help="Funding per 8h interval in percent.")
+    parser.add_argument("--min-qty", type=float, default=None)
+    parser.add_argument("--qty-step", type=float, default=None)
+    parser.add_argument("--min-notional", type=float, default=None)
+    parser.add_argument("--min-liq-distance-pct", type=float, default=8.0)
+    parser.add_argument("--max-drawdown-pct", type=float, default=25.0)
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (0 = one per CPU, 1 = inline).")
+    parser.add_argument("--artifact-root", default="apps/quant-research/artifacts/futures_grid")
+    parser.add_argument("--service-root", default=str(DEFAULT_SERVICE_ROOT))
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument(
+        "--allow-unconstrained-fallback",
+        choices=["true", "false"],
+        default="true",
+        help="If no candidate passes constraints, pick best unconstrained candidate.",
+    )
+    return parser.parse_args()
+
+
+def load_candles(path: str) -> tuple[np.ndarray, np.ndarray]:
+    source = Path(path)
+    if not source.exists():
+        raise SystemExit(f"Candles not found: {source}")
+
+    if source.suffix.lower() == ".parquet":
+        frame = pd.read_parquet(source)
+    elif source.suffix.lower() == ".csv":
+        frame = pd.read_csv(source)
+    else:
+        raise SystemExit("Unsupported candles format. Use parquet or csv.")
+
+    ts_col = next((col for col in ("ts", "timestamp", "open_time", "time") if col in frame.columns), None)
+    missing = sorted({"open", "high", "low", "close"}.difference(frame.columns))
+    if ts_col is None or missing:
+        raise SystemExit(f"Candles missing required columns: {missing or ['ts']}")
+
+    raw_ts = frame[ts_col]
+    if pd.api.types.is_numeric_dtype(raw_ts):
+        ts = raw_ts.to_numpy(dtype=np.int64)
+    else:
+        ts = pd.to_datetime(raw_ts, utc=True).astype("int64").to_numpy() // 1_000_000
+    volume = frame["volume"] if "volume" in frame.columns else pd.Series(0.0, index=frame.index)
+    values = np.column_stack(
+        [frame[col].to_numpy(dtype=float) for col in ("open", "high", "low", "close")] + [volume.to_numpy(dtype=float)]
+    )
+    order = np.argsort(ts, kind="stable")
+    ts, values = ts[order], values[order]
+    keep = np.isfinite(values[:, :4]).all(axis=1) & (values[:, :4] > 0).all(axis=1)
+    if not keep.any():
+        raise SystemExit("Candles have no valid OHLC rows.")
+    return ts[keep], values[keep]
+
+
+def write_shared_block(directory: Path, ts: np.ndarray, values: np.ndarray) -> tuple[str, str]:
+    # Column-major on disk: every OHLC column is one contiguous run, so workers slice it without copies.
+    ts_path = directory / "ts.npy"
+    values_path = directory / "ohlcv.npy"
+    np.save(ts_path, np.ascontiguousarray(ts, dtype=np.int64))
+    np.save(values_path, np.ascontiguousarray(values.T, dtype=np.float64))
+    return str(ts_path), str(values_path)
+
+
+def init_worker(service_root: str, ts_path: str, values_path: str, base: dict[str, Any]) -> None:
+    if service_root not in sys.path:
+        sys.path.insert(0, service_root)
+    from grid.models import GridPlanRequest
+    from grid.simulator import simulate_grid
+
+    _WORKER["ts"] = np.load(ts_path, mmap_mode="r")
+    _WORKER["values"] = np.load(values_path, mmap_mode="r").T
+    _WORKER["base"] = base
+    _WORKER["request"] = GridPlanRequest
+    _WORKER["simulate"] = simulate_grid
+
+
+def build_template(base: dict[str, Any], params: dict[str, float], first_open: float) -> dict[str, Any]:
+    width = params["rangeWidthPct"] / 100.0
+    return {
+        **base,
+        "instanceId": "sweep",
+        "lowerPrice": first_open * (1.0 - width),
+        "upperPrice": first_open * (1.0 + width),
+        "gridCount": int(params["gridCount"]),
+        "activeOrderWindowSize": int(params["activeOrderWindowSize"]),
+        "initialSeedEnabled": params["initialSeedPct"] > 0,
+        "initialSeedPct": params["initialSeedPct"],
+        "leverage": params["leverage"],
+        "markPrice": first_open,
+    }
+
+
+def evaluate_candidate(params: dict[str, float]) -> EvalResult:
+    values = _WORKER["values"]
+    base = dict(_WORKER["base"])
+    funding_rate_pct = base.pop("fundingRatePct")
+    template = _WORKER["request"](**build_template(base, params, float(values[0, 0])))
+    result = _WORKER["simulate"](template, _WORKER["ts"], values, funding_rate_pct=funding_rate_pct)
+    summary = result.summary()
+
+    net_profit = summary["finalEquityUsd"] - result.invest_usd
+    # Never holding a position means the grid could not have been liquidated.
+    liq_distance = 100.0 if summary["worstLiqDistancePct"] is None else float(summary["worstLiqDistancePct"])
+    metrics = {
+        **summary,
+        "netProfitUsd": net_profit,
+        "netProfitPerGridUsd": net_profit / int(params["gridCount"]),
+    }
+    return EvalResult(params=params, metrics=metrics, objective=metrics["netProfitPerGridUsd"], liq_distance=liq_distance)
+
+
+def candidate_is_valid(result: EvalResult, min_liq_distance_pct: float, max_drawdown_pct: float) -> bool:
+    not_liquidated = not result.metrics["liquidated"]
+    liq_ok = result.liq_distance >= min_liq_distance_pct
+    dd_ok = result.metrics["maxDrawdownPct"] <= max_drawdown_pct
+    return bool(not_liquidated and liq_ok and dd_ok)
+
+
+def pareto_front(results: list[EvalResult]) -> set[int]:
+    """Indexes of candidates no other candidate beats on both profit per grid and liquidation distance."""
+    order = sorted(range(len(results)), key=lambda idx: (-results[idx].objective, -results[idx].liq_distance))
+    front: set[int] = set()
+    best_distance = float("-inf")
+    for idx in order:
+        if results[idx].liq_distance > best_distance:
+            front.add(idx)
+            best_distance = results[idx].liq_distance
+    return front
+
+
+def get_grid() -> list[dict[str, float]]:
+    keys = list(DEFAULT_GRID.keys())
+    values = [DEFAULT_GRID[key] for key in keys]
+    combinations: list[dict[str, float]] = []
+    for combo in itertools.product(*values):
+        combinations.append({key: int(value) if key in INT_PARAMS else float(value) for key, value in zip(keys, combo)})
+    return combinations
+
+
+def run_sweep(grid: list[dict[str, float]], workers: int, init_args: tuple[Any, ...]) -> list[EvalResult]:
+    if workers <= 1:
+        init_worker(*init_args)
+        return [evaluate_candidate(params) for params in grid]
+    chunksize = max(1, len(grid) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=init_args) as pool:
+        return list(pool.map(evaluate_candidate, grid, chunksize=chunksize))
+
+
+def main() -> None:
+    args = parse_args()
+    ts, values = load_candles(args.candles)
+    service_root = str(Path(args.service_root).resolve())
+    if not (Path(service_root) / "grid" / "simulator.py").exists():
+        raise SystemExit(f"py-strategy-service not found at {service_root} (set --service-root).")
+
+    venue = {
+        key: value
+        for key, value in (("minQty", args.min_qty), ("qtyStep", args.qty_step), ("minNotional", args.min_notional))
+        if value is not None
+    }
+    base = {
+        "mode": args.mode,
+        "gridMode": args.grid_mode,
+        "investUsd": args.invest_usd,
+        "feeModel": {"takerPct": args.fee_pct},
+        "venueConstraints": venue or None,
+        "fundingRatePct": args.funding_rate_pct,
+    }
+
+    grid = get_grid()
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    fallback_enabled = args.allow_unconstrained_fallback == "true"
+    with tempfile.TemporaryDirectory(prefix="grid-sweep-") as shared_dir:
+        ts_path, values_path = write_shared_block(Path(shared_dir), ts, values)
+        all_results = run_sweep(grid, min(workers, len(grid)), (service_root, ts_path, values_path, base))
+
+    if not all_results:
+        raise SystemExit("No candidates were evaluated.")
+
+    front = pareto_front(all_results)
+    on_front = {id(all_results[idx]) for idx in front}
+    constrained_results = [
+        result for result in all_results if candidate_is_valid(result, args.min_liq_distance_pct, args.max_drawdown_pct)
+    ]
+
+    selected_pool = constrained_results
+    constraints_relaxed = False
+    if not selected_pool:
+        if not fallback_enabled:
+            raise SystemExit("No candidate passed constraints. Loosen min-liq-distance-pct or max-drawdown-pct.")
+        selected_pool = list(all_results)
+        constraints_relaxed = True
+
+    selected_pool.sort(key=lambda row: (row.objective, row.liq_distance), reverse=True)
+    best = selected_pool[0]
+
+    top = selected_pool[: max(1, args.top_k)]
+
+    stamp = pd.Timestamp.utcnow().strftime("%Y%m%d-%H%M%S")
+    artifact_dir = Path(args.artifact_root) / stamp
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+
+    selected_params = {
+        "mode": args.mode,
+        "gridMode": args.grid_mode,
+        **best.params,
+    }
+
+    config_payload = {
+        "strategyType": args.strategy_type,
+        "strategyVersion": f"{stamp}",
+        "generatedAt": pd.Timestamp.utcnow().isoformat(),
+        "gridSize": len(grid),
+        "selectedParams": selected_params,
+        "constraints": {
+            "minLiqDistancePct": args.min_liq_distance_pct,
+            "maxDrawdownPct": args.max_drawdown_pct,
+            "relaxed": constraints_relaxed,
+        },
+        "candles": {
+            "path": str(Path(args.candles).resolve()),
+            "rows": int(len(ts)),
+            "from": pd.Timestamp(int(ts[0]), unit="ms", tz="UTC").isoformat(),
+            "to": pd.Timestamp(int(ts[-1]), unit="ms", tz="UTC").isoformat(),
+        },
+    }
+
+    report_payload = {
+        "strategyType": args.strategy_type,
+        "generatedAt": pd.Timestamp.utcnow().isoformat(),
+        "objective": "net_profit_usd / gridCount, ties by worst liquidation distance",
+        "simulation": {
+            "investUsd": args.invest_usd,
+            "feePct": args.fee_pct,
+            "fundingRatePct": args.funding_rate_pct,
+            "workers": min(workers, len(grid)),
+        },
+        "best": {
+            "params": best.params,
+            "objective": best.objective,
+            "worstLiqDistancePct": best.liq_distance,
+            "metrics": best.metrics,
+        },
+        "topCandidates": [
+            {
+                "rank": idx + 1,
+                "params": item.params,
+                "objective": item.objective,
+                "worstLiqDistancePct": item.liq_distance,
+                "paretoFront": id(item) in on_front,
+                "metrics": item.metrics,
+            }
+            for idx, item in enumerate(top)
+        ],
+        "paretoFront": [
+            {"params": all_results[idx].params, "objective": all_results[idx].objective, "worstLiqDistancePct": all_results[idx].liq_distance}
+            for idx in sorted(front, key=lambda idx: -all_results[idx].objective)
+        ],
+    }
+
+    config_path = artifact_dir / "config.json"
+    report_path = artifact_dir / "report.json"
+
+    config_path.write_text(json.dumps(config_payload, indent=2), encoding="utf-8")
+    report_path.write_text(json.dumps(report_payload, indent=2), encoding="utf-8")
+
+    print("grid_sweep_complete")
+    print(f"artifact_dir={artifact_dir}")
+    print(f"config={config_path}")
+    print(f"report={report_path}")
+    print(f"best_objective={best.objective:.4f}")
+    print(f"best_params={json.dumps(best.params)}")
+    print(f"constraints_relaxed={constraints_relaxed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,8 @@ import numpy as np
 import pandas as pd
 import vectorbt as vbt
 
+from gates import read_partitioned_dataset, strategy_gate
+
 
 DEFAULT_GRID: dict[str, list[float]] = {
     "minRegimeConf": [50, 55, 60],
@@ -36,7 +38,7 @@ class EvalResult:
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run vectorbt-based parameter sweep for trend_vol_gate.")
-    parser.add_argument("--dataset", required=True, help="Path to parquet/csv dataset produced by build_from_predictions.py")
+    parser.add_argument("--dataset", required=True, help="Path to parquet/csv dataset (or --incremental dataset dir) from build_from_predictions.py")
     parser.add_argument("--strategy-type", default="trend_vol_gate")
     parser.add_argument("--min-trades", type=int, default=30)
     parser.add_argument("--max-drawdown-pct", type=float, default=25.0)
@@ -66,7 +68,9 @@ def load_dataset(path: str) -> pd.DataFrame:
     if not source.exists():
         raise SystemExit(f"Dataset not found: {source}")
 
-    if source.suffix.lower() == ".parquet":
+    if source.is_dir():
+        frame = read_partitioned_dataset(source)
+    elif source.suffix.lower() == ".parquet":
         frame = pd.read_parquet(source)
     elif source.suffix.lower() == ".csv":
         frame = pd.read_csv(source)
@@ -106,50 +110,6 @@ def load_dataset(path: str) -> pd.DataFrame:
     return frame.reset_index(drop=True)
 
 
-def strategy_gate(frame: pd.DataFrame, params: dict[str, float]) -> tuple[np.ndarray, np.ndarray]:
-    signal = frame["signal"].to_numpy()
-    state = frame["reg_state"].to_numpy()
-    conf = frame["reg_conf"].to_numpy(dtype=float)
-    stack = frame["ema_stk"].to_numpy()
-    d50 = frame["ema_d50"].to_numpy(dtype=float)
-    d200 = frame["ema_d200"].to_numpy(dtype=float)
-    sl50 = frame["ema_sl50"].to_numpy(dtype=float)
-    vol_z = frame["vol_z"].to_numpy(dtype=float)
-    rel_vol = frame["vol_rv"].to_numpy(dtype=float)
-
-    allowed_states = np.isin(state, ["trend_up", "trend_down"])
-    signal_ok = np.isin(signal, ["up", "down"])
-    conf_ok = np.isfinite(conf) & (conf >= params["minRegimeConf"])
-
-    stack_aligned = ((signal == "up") & (stack == "bull")) | ((signal == "down") & (stack == "bear"))
-    slope_aligned = ((signal == "up") & np.isfinite(sl50) & (sl50 >= 0.0)) | (
-        (signal == "down") & np.isfinite(sl50) & (sl50 <= 0.0)
-    )
-    distance_ok = np.isfinite(d50) & np.isfinite(d200) & (np.abs(d50) >= params["minAbsD50Pct"]) & (
-        np.abs(d200) >= params["minAbsD200Pct"]
-    )
-
-    vol_spike = np.isfinite(vol_z) & np.isfinite(rel_vol) & (vol_z >= params["maxVolZ"]) & (rel_vol >= params["maxRelVol"])
-    low_liquidity = (np.isfinite(vol_z) & (vol_z <= params["minVolZ"])) | (
-        np.isfinite(rel_vol) & (rel_vol <= params["minRelVol"])
-    )
-    vol_ok = (~vol_spike) & (~low_liquidity) & np.isfinite(vol_z) & np.isfinite(rel_vol)
-
-    score = np.clip(
-        0.6 * np.where(np.isfinite(conf), conf, 0.0)
-        + 20.0 * stack_aligned.astype(float)
-        + 10.0 * slope_aligned.astype(float)
-        + 10.0 * distance_ok.astype(float)
-        + 10.0 * vol_ok.astype(float),
-        0.0,
-        100.0,
-    )
-
-    allow = signal_ok & allowed_states & conf_ok & stack_aligned & slope_aligned & distance_ok & (~vol_spike) & (~low_liquidity)
-    allow = allow & (score >= params["minPassScore"])
-    return allow, score
-
-
 def split_metrics(frame: pd.DataFrame, allow: np.ndarray) -> dict[str, float]:
     returns = np.where(allow, frame["outcome_pnl_pct"].fillna(0.0).to_numpy(dtype=float) / 100.0, 0.0)
     trades = int(allow.sum())
@@ -2,16 +2,49 @@
 from __future__ import annotations
 
 import argparse
+import io
 import json
 import os
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from uuid import uuid4
 
+import numpy as np
 import pandas as pd
 from sqlalchemy import create_engine, text
 
+try:
+    import orjson
+except ImportError:  # optional, see --json-decoder
+    orjson = None
+
+# Decoder for JSON text columns, set by --json-decoder (see use_json_decoder).
+JSON_DECODER = "json"
+
+
+# Scalar featuresSnapshot paths used by the dataset, by output name.
+FEATURE_PATHS: dict[str, tuple[str, ...]] = {
+    "signal": ("localPrediction", "signal"),
+    "reg_state": ("historyContext", "reg", "state"),
+    "reg_conf": ("historyContext", "reg", "conf"),
+    "ema_stk": ("historyContext", "ema", "stk"),
+    "ema_d50": ("historyContext", "ema", "d50"),
+    "ema_d200": ("historyContext", "ema", "d200"),
+    "ema_sl50": ("historyContext", "ema", "sl50"),
+    "vol_z": ("historyContext", "vol", "z"),
+    "vol_rv": ("historyContext", "vol", "rv"),
+    "risk_data_gap": ("riskFlags", "dataGap"),
+}
+
+# Chronological split by tsCreated; partitioned datasets get it on read (backtest/gates.py).
+DEFAULT_TRAIN_RATIO = 0.6
+DEFAULT_VALID_RATIO = 0.2
+
 
 @dataclass
 class QueryScope:
@@ -21,6 +54,12 @@ class QueryScope:
     ts_from: str | None
     ts_to: str | None
     limit: int | None
+    # (symbol, timeframe, marketType) -> (outcomeEvaluatedAt, id) of the last row already built.
+    watermarks: dict[tuple[str, str, str], tuple[datetime, str]] = field(default_factory=dict)
+    # --incremental: only rows with an outcomeEvaluatedAt, fetched in watermark order.
+    incremental: bool = False
+    # --watermark-lookback-sec: also re-read rows evaluated this long before each watermark.
+    watermark_lookback_sec: float = 0.0
 
 
 def parse_args() -> argparse.Namespace:
@@ -40,9 +79,75 @@ def parse_args() -> argparse.Namespace:
         help="Output directory for parquet/csv datasets.",
     )
     parser.add_argument("--out-name", default="predictions_dataset", help="Output file prefix.")
-    parser.add_argument("--train-ratio", type=float, default=0.6)
-    parser.add_argument("--valid-ratio", type=float, default=0.2)
+    parser.add_argument("--train-ratio", type=float, default=DEFAULT_TRAIN_RATIO)
+    parser.add_argument("--valid-ratio", type=float, default=DEFAULT_VALID_RATIO)
     parser.add_argument("--min-rows", type=int, default=200)
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream rows with a server-side cursor and write parquet row groups per chunk (requires pyarrow).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Append only rows evaluated since the last run to a hive-partitioned parquet dataset "
+            "at <out-dir>/<out-name> (requires pyarrow)."
+        ),
+    )
+    parser.add_argument(
+        "--watermark-lookback-sec",
+        type=float,
+        default=300.0,
+        help=(
+            "With --incremental: re-read rows evaluated up to this many seconds before each watermark, so rows "
+            "committed after a later-stamped row are not skipped. Readers drop the re-read copies. 0 disables it."
+        ),
+    )
+    parser.add_argument(
+        "--json-pushdown",
+        action="store_true",
+        help="Extract the scalar featuresSnapshot fields in Postgres (jsonb #>) instead of fetching the whole snapshot.",
+    )
+    parser.add_argument(
+        "--without-ohlcv",
+        action="store_true",
+        help="With --json-pushdown: skip ohlcvSeries (ohlcv_* columns stay empty; not usable for backtrader validation).",
+    )
+    parser.add_argument(
+        "--candle-store",
+        action="store_true",
+        help=(
+            "Keep OHLCV candles once per (symbol, marketType, timeframe) in a .npy store next to the dataset; "
+            "rows then hold ts references instead of ohlcv_series_json."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes for JSON decode and row extraction. Output is identical to --workers 1.",
+    )
+    parser.add_argument(
+        "--json-decoder",
+        choices=("json", "orjson"),
+        default="json",
+        help="Decoder for featuresSnapshot/ohlcvSeries text. orjson is faster and needs `pip install orjson`.",
+    )
+    parser.add_argument(
+        "--check-extraction",
+        action="store_true",
+        help=(
+            "Extract the selected rows serially, with --workers (at least 2) and with orjson when installed, "
+            "and fail unless all outputs are identical. Writes no dataset."
+        ),
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=5000,
+        help="Rows per extraction task, and per fetch and parquet row group in --stream/--incremental mode.",
+    )
     return parser.parse_args()
 
 
@@ -62,27 +167,35 @@ def normalize_database_url(raw: str) -> str:
     return urlunsplit((parsed.scheme, parsed.netloc, parsed.path, normalized_query, parsed.fragment))
 
 
+def use_json_decoder(name: str) -> None:
+    """Select the decoder used by loads_json; also the process pool initializer."""
+    global JSON_DECODER
+    if name == "orjson" and orjson is None:
+        raise SystemExit("--json-decoder orjson requires orjson. Install it with `pip install orjson`.")
+    JSON_DECODER = name
+
+
+def loads_json(raw: str) -> Any:
+    if JSON_DECODER == "orjson":
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # e.g. integers beyond 64 bits, which json accepts
+    return json.loads(raw)
+
+
 def as_record(value: Any) -> dict[str, Any]:
     if isinstance(value, dict):
         return value
     if isinstance(value, str):
         try:
-            parsed = json.loads(value)
+            parsed = loads_json(value)
             return parsed if isinstance(parsed, dict) else {}
         except Exception:
             return {}
     return {}
 
 
-def deep_get(obj: dict[str, Any], path: list[str], default: Any = None) -> Any:
-    cur: Any = obj
-    for segment in path:
-        if not isinstance(cur, dict):
-            return default
-        cur = cur.get(segment)
-    return default if cur is None else cur
-
-
 def to_float(value: Any) -> float | None:
     try:
         parsed = float(value)
@@ -149,7 +262,7 @@ def normalize_ohlcv_series(value: Any) -> dict[str, Any] | None:
     }
 
 
-def build_sql(scope: QueryScope) -> tuple[str, dict[str, Any]]:
+def build_where(scope: QueryScope) -> tuple[str, dict[str, Any]]:
     clauses = ['"outcomePnlPct" IS NOT NULL']
     params: dict[str, Any] = {}
 
@@ -168,12 +281,54 @@ def build_sql(scope: QueryScope) -> tuple[str, dict[str, Any]]:
     if scope.ts_to:
         clauses.append('"tsCreated" <= :ts_to')
         params["ts_to"] = scope.ts_to
-
-    where_sql = " AND ".join(clauses)
+    if scope.incremental:
+        # A row without outcomeEvaluatedAt has no place in the watermark order: NOT (... <= ...)
+        # would be NULL for it on every run but the first. Leave such rows out explicitly.
+        clauses.append('"outcomeEvaluatedAt" IS NOT NULL')
+    # outcomeEvaluatedAt is stamped before the row commits, so a row stamped earlier than the
+    # watermark can still become visible after it. The lookback re-reads that window.
+    lookback = timedelta(seconds=max(0.0, scope.watermark_lookback_sec))
+    for idx, ((symbol, timeframe, market_type), (evaluated_at, prediction_id)) in enumerate(sorted(scope.watermarks.items())):
+        key_sql = f'symbol = :wm_symbol_{idx} AND timeframe = :wm_timeframe_{idx} AND "marketType" = :wm_market_type_{idx}'
+        params[f"wm_symbol_{idx}"] = symbol
+        params[f"wm_timeframe_{idx}"] = timeframe
+        params[f"wm_market_type_{idx}"] = market_type
+        if lookback:
+            clauses.append(f'NOT ({key_sql} AND "outcomeEvaluatedAt" <= :wm_evaluated_at_{idx})')
+            params[f"wm_evaluated_at_{idx}"] = evaluated_at - lookback
+        else:
+            clauses.append(f'NOT ({key_sql} AND ("outcomeEvaluatedAt", id) <= (:wm_evaluated_at_{idx}, :wm_id_{idx}))')
+            params[f"wm_evaluated_at_{idx}"] = evaluated_at
+            params[f"wm_id_{idx}"] = prediction_id
+
+    return " AND ".join(clauses), params
+
+
+def feature_columns_sql(*, project_features: bool, with_ohlcv: bool, json_as_text: bool) -> str:
+    # json_as_text ships the large JSON values as text, so they are decoded in extract_row
+    # (orjson when installed, across --workers) instead of by the driver in the main process.
+    if not project_features:
+        return 'CAST("featuresSnapshot" AS text) AS "featuresSnapshot"' if json_as_text else '"featuresSnapshot"'
+    # `#>` returns jsonb, which the driver decodes to the same Python scalars as the full snapshot.
+    columns = [
+        f'"featuresSnapshot" #> \'{{{",".join(path)}}}\' AS "f_{name}"' for name, path in FEATURE_PATHS.items()
+    ]
+    if with_ohlcv:
+        ohlcv_sql = '"featuresSnapshot" -> \'ohlcvSeries\''
+        columns.append(f'CAST({ohlcv_sql} AS text) AS "ohlcvSeries"' if json_as_text else f'{ohlcv_sql} AS "ohlcvSeries"')
+    return ",\n  ".join(columns)
+
+
+def build_sql(
+    scope: QueryScope, *, project_features: bool = False, with_ohlcv: bool = True, json_as_text: bool = False
+) -> tuple[str, dict[str, Any]]:
+    where_sql, params = build_where(scope)
     limit_sql = ""
     if scope.limit and scope.limit > 0:
         limit_sql = " LIMIT :limit"
         params["limit"] = scope.limit
+    # Incremental runs advance the watermarks per fetched row, so rows arrive in that order.
+    order_sql = '"outcomeEvaluatedAt" ASC, id ASC' if scope.incremental else '"tsCreated" ASC, id ASC'
 
     sql = f'''
 SELECT
@@ -182,21 +337,39 @@ SELECT
   timeframe,
   "marketType",
   "tsCreated",
-  "featuresSnapshot",
+  {feature_columns_sql(project_features=project_features, with_ohlcv=with_ohlcv, json_as_text=json_as_text)},
   "outcomeStatus",
   "outcomeResult",
-  "outcomePnlPct"
+  "outcomePnlPct",
+  "outcomeEvaluatedAt"
 FROM "Prediction"
 WHERE {where_sql}
-ORDER BY "tsCreated" ASC{limit_sql}
+ORDER BY {order_sql}{limit_sql}
 '''
     return sql, params
 
 
+def build_count_sql(scope: QueryScope) -> tuple[str, dict[str, Any]]:
+    where_sql, params = build_where(scope)
+    limit_sql = ""
+    if scope.limit and scope.limit > 0:
+        limit_sql = " LIMIT :limit"
+        params["limit"] = scope.limit
+    sql = f'''
+SELECT COUNT(*) FROM (
+  SELECT 1 FROM "Prediction"
+  WHERE {where_sql}{limit_sql}
+) AS scoped
+'''
+    return sql, params
+
+
+def split_bounds(n_rows: int, train_ratio: float, valid_ratio: float) -> tuple[int, int]:
+    return int(n_rows * train_ratio), int(n_rows * (train_ratio + valid_ratio))
+
+
 def assign_splits(frame: pd.DataFrame, train_ratio: float, valid_ratio: float) -> pd.Series:
-    n_rows = len(frame)
-    train_end = int(n_rows * train_ratio)
-    valid_end = int(n_rows * (train_ratio + valid_ratio))
+    train_end, valid_end = split_bounds(len(frame), train_ratio, valid_ratio)
     out = pd.Series(index=frame.index, dtype="string")
     out.iloc[:train_end] = "train"
     out.iloc[train_end:valid_end] = "valid"
@@ -204,19 +377,49 @@ def assign_splits(frame: pd.DataFrame, train_ratio: float, valid_ratio: float) -
     return out
 
 
-def extract_row(row: dict[str, Any]) -> dict[str, Any]:
+def read_features(row: dict[str, Any]) -> tuple[dict[str, Any], Any]:
+    """FEATURE_PATHS values and the raw ohlcvSeries of a row, from either query shape."""
+    if "featuresSnapshot" not in row:
+        # build_sql(project_features=True) already resolved each path in Postgres.
+        return {name: row.get(f"f_{name}") for name in FEATURE_PATHS}, row.get("ohlcvSeries")
+
     features = as_record(row.get("featuresSnapshot"))
-    history = as_record(features.get("historyContext"))
-    reg = as_record(history.get("reg"))
-    ema = as_record(history.get("ema"))
-    vol = as_record(history.get("vol"))
-    risk = as_record(features.get("riskFlags"))
-    local_prediction = as_record(features.get("localPrediction"))
-    ohlcv_series = normalize_ohlcv_series(features.get("ohlcvSeries"))
+    values: dict[str, Any] = {}
+    for name, path in FEATURE_PATHS.items():
+        parent = features
+        for segment in path[:-1]:
+            parent = as_record(parent.get(segment))
+        values[name] = parent.get(path[-1])
+    return values, features.get("ohlcvSeries")
+
+
+def split_candle_window(ohlcv_series: dict[str, Any]) -> tuple[np.ndarray, int, int, str] | None:
+    """(closed candles as (n, 6) float64 rows, ts start, ts end, last bar JSON) of a window.
+
+    None when the window cannot be referenced exactly: another format, non-integer or
+    unevenly spaced timestamps (a gap could later be filled by another window). The last
+    bar is the still-forming candle; it stays with the row and is never stored.
+    """
+    if ohlcv_series.get("format") != OHLCV_FORMAT:
+        return None
+    bars = ohlcv_series["bars"]
+    ts_values = [bar[0] for bar in bars]
+    if not all(isinstance(ts, int) and not isinstance(ts, bool) for ts in ts_values):
+        return None
+    steps = {later - earlier for earlier, later in zip(ts_values, ts_values[1:])}
+    if len(steps) != 1 or steps.pop() <= 0:
+        return None
+    closed = np.asarray(bars[:-1], dtype=np.float64)
+    return closed, ts_values[0], ts_values[-1], json.dumps(bars[-1], separators=(",", ":"))
+
+
+def extract_row(row: dict[str, Any], split_candles: bool = False) -> dict[str, Any]:
+    values, raw_ohlcv = read_features(row)
+    ohlcv_series = normalize_ohlcv_series(raw_ohlcv)
 
     outcome_pnl_pct = to_float(row.get("outcomePnlPct"))
 
-    return {
+    out = {
         "prediction_id": row.get("id"),
         "ts_created": row.get("tsCreated"),
         "symbol": row.get("symbol"),
@@ -226,23 +429,436 @@ def extract_row(row: dict[str, Any]) -> dict[str, Any]:
         "outcome_result": row.get("outcomeResult"),
         "outcome_pnl_pct": outcome_pnl_pct,
         "target_win": bool(outcome_pnl_pct is not None and outcome_pnl_pct > 0),
-        "signal": normalize_signal(local_prediction.get("signal")),
-        "reg_state": str(deep_get(reg, ["state"], "unknown") or "unknown"),
-        "reg_conf": to_float(deep_get(reg, ["conf"])),
-        "ema_stk": str(deep_get(ema, ["stk"], "unknown") or "unknown"),
-        "ema_d50": to_float(deep_get(ema, ["d50"])),
-        "ema_d200": to_float(deep_get(ema, ["d200"])),
-        "ema_sl50": to_float(deep_get(ema, ["sl50"])),
-        "vol_z": to_float(deep_get(vol, ["z"])),
-        "vol_rv": to_float(deep_get(vol, ["rv"])),
-        "risk_data_gap": deep_get(risk, ["dataGap"], False) is True,
+        "signal": normalize_signal(values["signal"]),
+        "reg_state": str(values["reg_state"] or "unknown").strip() or "unknown",
+        "reg_conf": to_float(values["reg_conf"]),
+        "ema_stk": str(values["ema_stk"] or "unknown").strip() or "unknown",
+        "ema_d50": to_float(values["ema_d50"]),
+        "ema_d200": to_float(values["ema_d200"]),
+        "ema_sl50": to_float(values["ema_sl50"]),
+        "vol_z": to_float(values["vol_z"]),
+        "vol_rv": to_float(values["vol_rv"]),
+        "risk_data_gap": values["risk_data_gap"] is True,
         "ohlcv_timeframe": ohlcv_series.get("timeframe") if isinstance(ohlcv_series, dict) else None,
         "ohlcv_bars_count": len(ohlcv_series.get("bars", [])) if isinstance(ohlcv_series, dict) else 0,
         "ohlcv_series_json": json.dumps(ohlcv_series, separators=(",", ":")) if isinstance(ohlcv_series, dict) else None,
         "ohlcv_missing": not isinstance(ohlcv_series, dict),
+        # Set by attach_candle_refs when the series lives in a CandleStore.
+        "ohlcv_ts_start": None,
+        "ohlcv_ts_end": None,
+        "ohlcv_last_bar_json": None,
+    }
+    if split_candles and isinstance(ohlcv_series, dict):
+        # Split here, in the --workers process, so the main process never decodes the JSON again.
+        out[CANDLE_WINDOW_KEY] = split_candle_window(ohlcv_series)
+    return out
+
+
+OHLCV_FORMAT = ["ts", "open", "high", "low", "close", "volume"]
+CANDLE_STORE_DIR_SUFFIX = "_candles"
+# Transient key for split_candle_window's result; attach_candle_refs pops it before rows are written.
+CANDLE_WINDOW_KEY = "_candle_window"
+
+
+class CandleStore:
+    """Closed candles kept once per (symbol, marketType, timeframe), keyed by ts.
+
+    Each series is a row-major (n, 6) float64 .npy (ts, open, high, low, close, volume;
+    sorted by ts) that readers memory-map and slice by ts. Closed candles do not change, so
+    the first copy of a ts is kept. Saved series are checked through a memory map and only
+    new candles are held in memory; a save appends them unless one is older than the
+    stored end (a backfilled gap), which rewrites that series.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._stored: dict[tuple[str, str, str], np.ndarray | None] = {}
+        self._pending: dict[tuple[str, str, str], dict[int, np.ndarray]] = {}
+
+    def path(self, symbol: str, market_type: str, timeframe: str) -> Path:
+        return self.root / f"{symbol.replace('/', '-')}__{market_type}__{timeframe}.npy"
+
+    def _stored_series(self, key: tuple[str, str, str]) -> np.ndarray | None:
+        if key not in self._stored:
+            path = self.path(*key)
+            self._stored[key] = np.load(path, mmap_mode="r") if path.exists() else None
+        return self._stored[key]
+
+    def add_window(self, symbol: str, market_type: str, timeframe: str, closed: np.ndarray) -> bool:
+        """Store a window's closed candles ((n, 6) rows); False when one disagrees with a stored candle."""
+        key = (symbol, market_type, timeframe)
+        stored = self._stored_series(key)
+        fresh = closed
+        if stored is not None and len(stored):
+            stored_ts = stored[:, 0]
+            positions = np.minimum(np.searchsorted(stored_ts, closed[:, 0]), len(stored_ts) - 1)
+            known = stored_ts[positions] == closed[:, 0]
+            if not np.array_equal(stored[positions[known]], closed[known]):
+                return False
+            fresh = closed[~known]
+        pending = self._pending.setdefault(key, {})
+        for candle in fresh:
+            existing = pending.get(int(candle[0]))
+            if existing is not None and not np.array_equal(existing, candle):
+                return False
+        for candle in fresh:
+            pending.setdefault(int(candle[0]), candle)
+        return True
+
+    def save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        for key in sorted(self._pending):
+            pending = self._pending[key]
+            if not pending:
+                continue
+            new = np.stack([pending[ts] for ts in sorted(pending)])
+            path = self.path(*key)
+            stored = self._stored.pop(key, None)
+            if stored is None or not len(stored) or new[0, 0] > stored[-1, 0]:
+                count = len(stored) if stored is not None else 0
+                del stored
+                if count and _append_npy_rows(path, count, new):
+                    continue
+                data = new if not count else np.concatenate([np.load(path), new])
+            else:
+                data = np.concatenate([stored, new])
+                del stored
+                data = data[np.argsort(data[:, 0], kind="stable")]
+            tmp_path = path.with_suffix(".tmp.npy")
+            np.save(tmp_path, data)
+            tmp_path.replace(path)
+        self._pending.clear()
+
+
+def _append_npy_rows(path: Path, count: int, rows: np.ndarray) -> bool:
+    """Append rows to a C-order (count, 6) float64 .npy in place; False if its header cannot grow."""
+    with path.open("r+b") as handle:
+        version = np.lib.format.read_magic(handle)
+        if version != (1, 0):
+            return False
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(handle)
+        offset = handle.tell()
+        if fortran_order or dtype != np.dtype("<f8") or shape != (count, rows.shape[1]):
+            return False
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(
+            header, {"descr": "<f8", "fortran_order": False, "shape": (count + len(rows), rows.shape[1])}
+        )
+        # np.save pads the header for a growing first axis, so the new one fits in place.
+        if header.tell() != offset:
+            return False
+        # Rows first, header last: an interrupted append leaves the old array readable.
+        handle.seek(offset + count * rows.shape[1] * 8)
+        handle.write(np.ascontiguousarray(rows, dtype="<f8").tobytes())
+        handle.truncate()
+        handle.flush()
+        handle.seek(0)
+        handle.write(header.getvalue())
+    return True
+
+
+def attach_candle_refs(extracted: list[dict[str, Any]], store: CandleStore | None) -> None:
+    """Move each row's closed OHLCV candles into `store`, leaving a ts range plus its last bar.
+
+    The windows were split by extract_row in the workers. A window whose candles disagree
+    with the store keeps its inline series.
+    """
+    for row in extracted:
+        window = row.pop(CANDLE_WINDOW_KEY, None)
+        if store is None or window is None:
+            continue
+        closed, ts_start, ts_end, last_bar_json = window
+        timeframe = str(row.get("ohlcv_timeframe") or row.get("timeframe"))
+        if not store.add_window(str(row.get("symbol")), str(row.get("market_type") or "none"), timeframe, closed):
+            continue
+        row["ohlcv_ts_start"], row["ohlcv_ts_end"] = ts_start, ts_end
+        row["ohlcv_last_bar_json"] = last_bar_json
+        row["ohlcv_series_json"] = None
+
+
+def query_shape(args: argparse.Namespace) -> dict[str, bool]:
+    return {
+        "project_features": bool(args.json_pushdown),
+        "with_ohlcv": not args.without_ohlcv,
+        "json_as_text": args.workers > 1 or args.json_decoder == "orjson",
     }
 
 
+def extract_rows(rows: list[dict[str, Any]], split_candles: bool = False) -> list[dict[str, Any]]:
+    return [extract_row(row, split_candles) for row in rows]
+
+
+def extract_chunks(
+    chunks: Iterable[list[dict[str, Any]]], workers: int, split_candles: bool = False
+) -> Iterator[tuple[list[dict[str, Any]], list[dict[str, Any]]]]:
+    """Yield (rows, extracted rows) per chunk, in input order.
+
+    With workers > 1 chunks are extracted in a process pool. At most 2 * workers chunks are
+    in flight, so streaming keeps flat memory, and results come back in submission order,
+    so the output matches a serial run exactly. Workers use the current JSON_DECODER.
+    """
+    if workers <= 1:
+        for rows in chunks:
+            yield rows, extract_rows(rows, split_candles)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=use_json_decoder, initargs=(JSON_DECODER,)) as pool:
+        pending: deque[tuple[list[dict[str, Any]], Future]] = deque()
+        for rows in chunks:
+            pending.append((rows, pool.submit(extract_rows, rows, split_candles)))
+            if len(pending) >= 2 * workers:
+                done_rows, future = pending.popleft()
+                yield done_rows, future.result()
+        while pending:
+            done_rows, future = pending.popleft()
+            yield done_rows, future.result()
+
+
+def dataset_schema(*, split: bool = True) -> Any:
+    # Fixed schema so every row group matches, even when a chunk has only nulls in a column.
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("prediction_id", pa.string()),
+            ("ts_created", pa.timestamp("us")),
+            ("symbol", pa.string()),
+            ("timeframe", pa.string()),
+            ("market_type", pa.string()),
+            ("outcome_status", pa.string()),
+            ("outcome_result", pa.string()),
+            ("outcome_pnl_pct", pa.float64()),
+            ("target_win", pa.bool_()),
+            ("signal", pa.string()),
+            ("reg_state", pa.string()),
+            ("reg_conf", pa.float64()),
+            ("ema_stk", pa.string()),
+            ("ema_d50", pa.float64()),
+            ("ema_d200", pa.float64()),
+            ("ema_sl50", pa.float64()),
+            ("vol_z", pa.float64()),
+            ("vol_rv", pa.float64()),
+            ("risk_data_gap", pa.bool_()),
+            ("ohlcv_timeframe", pa.string()),
+            ("ohlcv_bars_count", pa.int64()),
+            ("ohlcv_series_json", pa.string()),
+            ("ohlcv_missing", pa.bool_()),
+            ("ohlcv_ts_start", pa.int64()),
+            ("ohlcv_ts_end", pa.int64()),
+            ("ohlcv_last_bar_json", pa.string()),
+        ]
+        + ([("split", pa.string())] if split else [])
+    )
+
+
+def iter_row_chunks(conn: Any, sql: str, params: dict[str, Any], chunk_size: int) -> Iterator[list[dict[str, Any]]]:
+    """Yield result rows in chunks from a server-side cursor, so only one chunk is held in memory."""
+    result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(text(sql), params)
+    for partition in result.mappings().partitions(chunk_size):
+        yield [dict(row) for row in partition]
+
+
+def stream_dataset(
+    engine: Any, scope: QueryScope, args: argparse.Namespace, parquet_path: Path, store: CandleStore | None
+) -> dict[str, Any]:
+    """Extract rows chunk by chunk and append each chunk to `parquet_path` as a row group.
+
+    Splits need the total row count up front, so it is counted first in the same
+    REPEATABLE READ snapshot the rows are streamed from. Rows arrive ordered by tsCreated,
+    which is the order the in-memory build sorts into.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except Exception as exc:
+        raise SystemExit("--stream requires pyarrow. Install it with `pip install pyarrow`.") from exc
+
+    chunk_size = max(1, int(args.chunk_size))
+    sql, params = build_sql(scope, **query_shape(args))
+    count_sql, count_params = build_count_sql(scope)
+    schema = dataset_schema()
+    summary: dict[str, Any] = {"rows": 0, "symbols": set(), "timeframes": set(), "splits": {}}
+
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="REPEATABLE READ")
+        with conn.begin():
+            n_rows = int(conn.execute(text(count_sql), count_params).scalar() or 0)
+            if n_rows == 0:
+                raise SystemExit("No rows found with current filters.")
+            if n_rows < args.min_rows:
+                raise SystemExit(f"Insufficient rows ({n_rows}). Need at least {args.min_rows}.")
+            train_end, valid_end = split_bounds(n_rows, args.train_ratio, args.valid_ratio)
+
+            parquet_path.parent.mkdir(parents=True, exist_ok=True)
+            with pq.ParquetWriter(parquet_path, schema) as writer:
+                for _, extracted in extract_chunks(
+                    iter_row_chunks(conn, sql, params, chunk_size), args.workers, store is not None
+                ):
+                    attach_candle_refs(extracted, store)
+                    frame = pd.DataFrame(extracted)
+                    frame["ts_created"] = pd.to_datetime(frame["ts_created"])
+                    offset = summary["rows"]
+                    position = pd.RangeIndex(offset, offset + len(frame))
+                    frame["split"] = ["train" if idx < train_end else "valid" if idx < valid_end else "test" for idx in position]
+                    writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+
+                    summary["rows"] += len(frame)
+                    summary["symbols"].update(frame["symbol"].dropna().unique().tolist())
+                    summary["timeframes"].update(frame["timeframe"].dropna().unique().tolist())
+                    for split, count in frame["split"].value_counts().items():
+                        summary["splits"][split] = summary["splits"].get(split, 0) + int(count)
+    if store is not None:
+        store.save()
+    return summary
+
+
+def check_extraction(engine: Any, scope: QueryScope, args: argparse.Namespace) -> dict[str, int]:
+    """Extract the scope in each decode mode and compare with the default (serial, driver-decoded json).
+
+    Returns the row count per mode; raises SystemExit on the first mode whose output differs.
+    """
+    base = {"project_features": bool(args.json_pushdown), "with_ohlcv": not args.without_ohlcv}
+    workers = max(2, args.workers)
+    chunk_size = max(1, int(args.chunk_size))
+    modes = [("serial", False, 1, "json"), (f"workers_{workers}", True, workers, "json")]
+    if orjson is not None:
+        modes.append(("orjson", True, 1, "orjson"))
+        modes.append((f"orjson_workers_{workers}", True, workers, "orjson"))
+
+    outputs: dict[bool, list[dict[str, Any]]] = {}
+    with engine.connect() as conn:
+        for json_as_text in sorted({mode[1] for mode in modes}):
+            sql, params = build_sql(scope, **base, json_as_text=json_as_text)
+            outputs[json_as_text] = [dict(row) for row in conn.execute(text(sql), params).mappings().all()]
+
+    counts: dict[str, int] = {}
+    reference: pd.DataFrame | None = None
+    try:
+        for name, json_as_text, mode_workers, decoder in modes:
+            use_json_decoder(decoder)
+            rows = outputs[json_as_text]
+            chunks = (rows[start : start + chunk_size] for start in range(0, len(rows), chunk_size))
+            frame = pd.DataFrame([item for _, part in extract_chunks(chunks, mode_workers) for item in part])
+            counts[name] = len(frame)
+            if reference is None:
+                reference = frame
+            elif not frame.equals(reference):
+                raise SystemExit(f"Extraction mismatch: {name} differs from serial.")
+    finally:
+        use_json_decoder(args.json_decoder)
+    return counts
+
+
+WATERMARK_FILE = "_watermarks.json"
+WATERMARK_FORMAT_VERSION = 1
+
+
+def load_watermarks(dataset_dir: Path) -> dict[tuple[str, str, str], tuple[datetime, str]]:
+    path = dataset_dir / WATERMARK_FILE
+    if not path.exists():
+        return {}
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(payload, dict) or payload.get("format") != WATERMARK_FORMAT_VERSION:
+        raise SystemExit(f"Unsupported watermark file: {path}")
+    out: dict[tuple[str, str, str], tuple[datetime, str]] = {}
+    for item in payload.get("watermarks") or []:
+        key = (str(item["symbol"]), str(item["timeframe"]), str(item["marketType"]))
+        out[key] = (datetime.fromisoformat(str(item["outcomeEvaluatedAt"])), str(item["id"]))
+    return out
+
+
+def save_watermarks(dataset_dir: Path, watermarks: dict[tuple[str, str, str], tuple[datetime, str]]) -> None:
+    rows = [
+        {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "marketType": market_type,
+            "outcomeEvaluatedAt": evaluated_at.isoformat(),
+            "id": prediction_id,
+        }
+        for (symbol, timeframe, market_type), (evaluated_at, prediction_id) in sorted(watermarks.items())
+    ]
+    path = dataset_dir / WATERMARK_FILE
+    tmp_path = path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps({"format": WATERMARK_FORMAT_VERSION, "watermarks": rows}, indent=2), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def advance_watermarks(
+    watermarks: dict[tuple[str, str, str], tuple[datetime, str]], rows: list[dict[str, Any]]
+) -> None:
+    for row in rows:
+        evaluated_at = row.get("outcomeEvaluatedAt")
+        if evaluated_at is None:
+            continue
+        if not isinstance(evaluated_at, datetime):
+            evaluated_at = datetime.fromisoformat(str(evaluated_at))
+        key = (str(row.get("symbol")), str(row.get("timeframe")), str(row.get("marketType")))
+        mark = (evaluated_at, str(row.get("id")))
+        current = watermarks.get(key)
+        if current is None or mark > current:
+            watermarks[key] = mark
+
+
+def build_incremental(engine: Any, scope: QueryScope, args: argparse.Namespace, dataset_dir: Path) -> dict[str, Any]:
+    """Append rows evaluated after the stored watermarks to the hive-partitioned dataset at `dataset_dir`.
+
+    Partitions are symbol=/timeframe=/date= (tsCreated day). Each run writes new files
+    named with a per-run token and never rewrites old ones. The watermarks are saved last, so an interrupted run
+    re-appends its rows on the next run; readers keep the last copy per prediction_id. The same dedupe
+    absorbs the rows re-read by --watermark-lookback-sec.
+    Rows carry no split column: splits depend on the whole history and are assigned on read.
+    Rows without outcomeEvaluatedAt are skipped (see build_where), unlike full builds.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except Exception as exc:
+        raise SystemExit("--incremental requires pyarrow. Install it with `pip install pyarrow`.") from exc
+
+    chunk_size = max(1, int(args.chunk_size))
+    watermarks = load_watermarks(dataset_dir)
+    # One store per dataset, extended by every run; the "_" prefix hides it from parquet readers.
+    store = CandleStore(dataset_dir / CANDLE_STORE_DIR_SUFFIX) if args.candle_store else None
+    scope.watermarks = dict(watermarks)
+    sql, params = build_sql(scope, **query_shape(args))
+    schema = dataset_schema(split=False).append(pa.field("date", pa.string()))
+    run_token = f"{pd.Timestamp.utcnow().strftime('%Y%m%d-%H%M%S')}-{uuid4().hex}"
+    summary: dict[str, Any] = {"rows": 0, "symbols": set(), "timeframes": set(), "dates": set()}
+
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+    # existing_data_behavior="error" rejects any non-empty root, so appends must allow existing
+    # files; a clash with an earlier run's part file would silently replace its rows instead.
+    if next(dataset_dir.rglob(f"part-{run_token}-*"), None) is not None:
+        raise SystemExit(f"Part files for run {run_token} already exist in {dataset_dir}.")
+    with engine.connect() as conn:
+        chunks = extract_chunks(iter_row_chunks(conn, sql, params, chunk_size), args.workers, store is not None)
+        for chunk_index, (rows, extracted) in enumerate(chunks):
+            attach_candle_refs(extracted, store)
+            frame = pd.DataFrame(extracted)
+            frame["ts_created"] = pd.to_datetime(frame["ts_created"])
+            frame["date"] = frame["ts_created"].dt.strftime("%Y-%m-%d")
+            pq.write_to_dataset(
+                pa.Table.from_pandas(frame, schema=schema, preserve_index=False),
+                root_path=dataset_dir,
+                partition_cols=["symbol", "timeframe", "date"],
+                basename_template=f"part-{run_token}-{chunk_index:05d}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+            advance_watermarks(watermarks, rows)
+
+            summary["rows"] += len(frame)
+            summary["symbols"].update(frame["symbol"].dropna().unique().tolist())
+            summary["timeframes"].update(frame["timeframe"].dropna().unique().tolist())
+            summary["dates"].update(frame["date"].dropna().unique().tolist())
+
+    if summary["rows"]:
+        if store is not None:
+            store.save()
+        save_watermarks(dataset_dir, watermarks)
+    return summary
+
+
 def main() -> None:
     args = parse_args()
     if not args.database_url:
@@ -251,6 +867,17 @@ def main() -> None:
     if args.train_ratio <= 0 or args.valid_ratio <= 0 or args.train_ratio + args.valid_ratio >= 1:
         raise SystemExit("Invalid split ratios. Require train_ratio > 0, valid_ratio > 0 and train+valid < 1.")
 
+    if args.workers < 1:
+        raise SystemExit("--workers must be >= 1.")
+    use_json_decoder(args.json_decoder)
+    if args.without_ohlcv and not args.json_pushdown:
+        raise SystemExit("--without-ohlcv requires --json-pushdown.")
+    if args.incremental and (args.limit or args.ts_from or args.ts_to):
+        # The watermarks would move past rows these filters left out, and no later run would fetch them.
+        raise SystemExit("--incremental cannot be combined with --limit, --from or --to.")
+    if args.watermark_lookback_sec < 0:
+        raise SystemExit("--watermark-lookback-sec must be >= 0.")
+
     market_type = args.market_type.strip() if isinstance(args.market_type, str) else None
     if market_type == "":
         market_type = None
@@ -262,15 +889,56 @@ def main() -> None:
         ts_from=args.ts_from,
         ts_to=args.ts_to,
         limit=args.limit,
+        incremental=args.incremental,
+        watermark_lookback_sec=args.watermark_lookback_sec,
     )
 
-    sql, params = build_sql(scope)
     engine = create_engine(normalize_database_url(args.database_url))
+    out_dir = Path(args.out_dir)
+    stamp = pd.Timestamp.utcnow().strftime("%Y%m%d-%H%M%S")
 
+    if args.check_extraction:
+        counts = check_extraction(engine, scope, args)
+        print("extraction_identical")
+        for name, count in counts.items():
+            print(f"{name}={count}")
+        return
+
+    if args.incremental:
+        dataset_dir = out_dir / args.out_name
+        summary = build_incremental(engine, scope, args, dataset_dir)
+        print("dataset_appended")
+        print(f"rows={summary['rows']}")
+        print(f"symbols={sorted(summary['symbols'])}")
+        print(f"timeframes={sorted(summary['timeframes'])}")
+        print(f"dates={len(summary['dates'])}")
+        print(f"dataset={dataset_dir}")
+        return
+
+    store_dir = out_dir / f"{args.out_name}_{stamp}{CANDLE_STORE_DIR_SUFFIX}"
+    store = CandleStore(store_dir) if args.candle_store else None
+
+    if args.stream:
+        parquet_path = out_dir / f"{args.out_name}_{stamp}.parquet"
+        summary = stream_dataset(engine, scope, args, parquet_path, store)
+        print("dataset_built")
+        print(f"rows={summary['rows']}")
+        print(f"symbols={sorted(summary['symbols'])}")
+        print(f"timeframes={sorted(summary['timeframes'])}")
+        print(f"splits={summary['splits']}")
+        print(f"parquet={parquet_path}")
+        if store is not None:
+            print(f"candle_store={store_dir}")
+        return
+
+    sql, params = build_sql(scope, **query_shape(args))
     with engine.connect() as conn:
         rows = conn.execute(text(sql), params).mappings().all()
 
-    extracted = [extract_row(dict(row)) for row in rows]
+    chunk_size = max(1, int(args.chunk_size))
+    chunks = ([dict(row) for row in rows[start : start + chunk_size]] for start in range(0, len(rows), chunk_size))
+    extracted = [item for _, part in extract_chunks(chunks, args.workers, store is not None) for item in part]
+    attach_candle_refs(extracted, store)
     frame = pd.DataFrame(extracted)
     if frame.empty:
         raise SystemExit("No rows found with current filters.")
@@ -281,10 +949,8 @@ def main() -> None:
     if len(frame) < args.min_rows:
         raise SystemExit(f"Insufficient rows ({len(frame)}). Need at least {args.min_rows}.")
 
-    out_dir = Path(args.out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    stamp = pd.Timestamp.utcnow().strftime("%Y%m%d-%H%M%S")
     csv_path = out_dir / f"{args.out_name}_{stamp}.csv"
     parquet_path = out_dir / f"{args.out_name}_{stamp}.parquet"
 
@@ -296,6 +962,8 @@ def main() -> None:
         parquet_written = False
 
     frame.to_csv(csv_path, index=False)
+    if store is not None:
+        store.save()
 
     split_counts = frame["split"].value_counts(dropna=False).to_dict()
 
@@ -306,6 +974,8 @@ def main() -> None:
     print(f"splits={split_counts}")
     print(f"parquet={parquet_path if parquet_written else 'not_written (install pyarrow for parquet support)'}")
     print(f"csv={csv_path}")
+    if store is not None:
+        print(f"candle_store={store_dir}")
 
 
 if __name__ == "__main__":
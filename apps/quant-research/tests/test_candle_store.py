@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+import pathlib
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+SRC = pathlib.Path(__file__).resolve().parents[1] / "src"
+for path in (SRC / "dataset", SRC / "backtest"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import build_from_predictions
+from build_from_predictions import CandleStore, _append_npy_rows, attach_candle_refs, extract_row
+
+try:
+    import run_backtrader_validation  # needs backtrader
+except Exception:
+    run_backtrader_validation = None
+
+BAR_MS = 15 * 60 * 1000
+START_MS = 1_767_225_600_000
+KEY = ("BTCUSDT", "perp", "15m")
+
+
+def _candles(start: int, count: int) -> np.ndarray:
+    """Closed candles for bar indexes [start, start + count); the values only depend on the index."""
+    index = np.arange(start, start + count, dtype=np.float64)
+    close = 100.0 + np.sin(index / 7.0)
+    return np.column_stack([START_MS + index * BAR_MS, close - 0.1, close + 0.5, close - 0.5, close, 1000.0 + index])
+
+
+def _prediction(prediction_id: str, start: int, count: int) -> dict:
+    """A Prediction row whose snapshot carries `count` closed candles plus a still-forming last bar."""
+    bars = [[int(row[0]), *row[1:].tolist()] for row in _candles(start, count + 1)]
+    bars[-1][4] += 0.25
+    return {
+        "id": prediction_id,
+        "tsCreated": "2026-01-02T00:00:00+00:00",
+        "symbol": "BTCUSDT",
+        "timeframe": "15m",
+        "marketType": "perp",
+        "featuresSnapshot": {
+            "localPrediction": {"signal": "up"},
+            "ohlcvSeries": {"timeframe": "15m", "format": ["ts", "open", "high", "low", "close", "volume"], "bars": bars},
+        },
+        "outcomeStatus": "evaluated",
+        "outcomeResult": "win",
+        "outcomePnlPct": 1.0,
+        "outcomeEvaluatedAt": "2026-01-02T01:00:00+00:00",
+    }
+
+
+class CandleStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = pathlib.Path(tmp.name) / "_candles"
+
+    def _load(self) -> np.ndarray:
+        return np.load(CandleStore(self.root).path(*KEY))
+
+    def test_overlapping_windows_append_in_place_across_many_saves(self) -> None:
+        appends: list[bool] = []
+
+        def record(*args: object) -> bool:
+            appended = _append_npy_rows(*args)
+            appends.append(appended)
+            return appended
+
+        with mock.patch.object(build_from_predictions, "_append_npy_rows", side_effect=record):
+            # One store per run, like --incremental; each run's window overlaps the last one.
+            for run in range(40):
+                store = CandleStore(self.root)
+                self.assertTrue(store.add_window(*KEY, _candles(run * 3, 60)))
+                store.save()
+                np.testing.assert_array_equal(self._load(), _candles(0, run * 3 + 60))
+        self.assertEqual(appends, [True] * 39)
+
+    def test_append_grows_the_header_across_digit_boundaries(self) -> None:
+        path = self.root.with_suffix(".npy")
+        np.save(path, _candles(0, 9))
+        count = 9
+        for size in (1, 90, 900, 9000):
+            self.assertTrue(_append_npy_rows(path, count, _candles(count, size)))
+            count += size
+            np.testing.assert_array_equal(np.load(path), _candles(0, count))
+
+    def test_append_refuses_arrays_it_cannot_extend(self) -> None:
+        path = self.root.with_suffix(".npy")
+        np.save(path, np.asfortranarray(_candles(0, 10)))
+        self.assertFalse(_append_npy_rows(path, 10, _candles(10, 5)))
+        np.save(path, _candles(0, 10).astype(np.float32))
+        self.assertFalse(_append_npy_rows(path, 10, _candles(10, 5)))
+        np.save(path, _candles(0, 10))
+        self.assertFalse(_append_npy_rows(path, 9, _candles(10, 5)))
+        np.testing.assert_array_equal(np.load(path), _candles(0, 10))
+
+    def test_backfilled_gap_rewrites_the_series_in_order(self) -> None:
+        store = CandleStore(self.root)
+        store.add_window(*KEY, _candles(0, 10))
+        store.add_window(*KEY, _candles(20, 10))
+        store.save()
+        np.testing.assert_array_equal(self._load(), np.concatenate([_candles(0, 10), _candles(20, 10)]))
+
+        store = CandleStore(self.root)
+        self.assertTrue(store.add_window(*KEY, _candles(5, 20)))
+        with mock.patch.object(build_from_predictions, "_append_npy_rows") as append:
+            store.save()
+        append.assert_not_called()
+        np.testing.assert_array_equal(self._load(), _candles(0, 30))
+
+    def test_conflicting_candle_keeps_the_rows_inline_series(self) -> None:
+        store = CandleStore(self.root)
+        store.add_window(*KEY, _candles(0, 50))
+        store.save()
+
+        row = _prediction("p1", 10, 50)
+        row["featuresSnapshot"]["ohlcvSeries"]["bars"][3][4] += 1.0
+        extracted = [extract_row(row, split_candles=True), extract_row(_prediction("p2", 20, 50), split_candles=True)]
+        inline = extracted[0]["ohlcv_series_json"]
+        store = CandleStore(self.root)
+        attach_candle_refs(extracted, store)
+        store.save()
+
+        conflicting, clean = extracted
+        self.assertEqual(conflicting["ohlcv_series_json"], inline)
+        self.assertIsNone(conflicting["ohlcv_ts_start"])
+        self.assertIsNone(conflicting["ohlcv_last_bar_json"])
+        self.assertIsNone(clean["ohlcv_series_json"])
+        self.assertEqual(clean["ohlcv_ts_start"], START_MS + 20 * BAR_MS)
+        self.assertNotIn(build_from_predictions.CANDLE_WINDOW_KEY, conflicting)
+        # The stored candles are untouched; only the clean row's new candles were added.
+        np.testing.assert_array_equal(self._load(), _candles(0, 70))
+
+    @unittest.skipUnless(run_backtrader_validation is not None, "backtrader not installed")
+    def test_store_round_trip_matches_the_inline_series(self) -> None:
+        predictions = [_prediction(f"p{idx}", idx * 7, 60) for idx in range(6)]
+        extracted = [extract_row(row, split_candles=True) for row in predictions]
+        inline = [row["ohlcv_series_json"] for row in extracted]
+        store = CandleStore(self.root)
+        attach_candle_refs(extracted, store)
+        store.save()
+
+        reader = run_backtrader_validation.CandleStore(self.root)
+        frame = pd.DataFrame(extracted)
+        self.assertTrue(frame["ohlcv_series_json"].isna().all())
+        for (_, row), series_json in zip(frame.iterrows(), inline):
+            expected = run_backtrader_validation.bars_to_dataframe(json.loads(series_json))
+            pd.testing.assert_frame_equal(run_backtrader_validation.store_bars_to_dataframe(row, reader), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import pathlib
+import sys
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+DATASET_DIR = pathlib.Path(__file__).resolve().parents[1] / "src" / "dataset"
+if str(DATASET_DIR) not in sys.path:
+    sys.path.insert(0, str(DATASET_DIR))
+
+from build_from_predictions import QueryScope, advance_watermarks, build_sql, build_where
+
+KEY = ("BTCUSDT", "15m", "perp")
+MARK = (datetime(2026, 1, 2, 0, 10), "p010")
+
+
+def _scope(lookback_sec: float = 0.0) -> QueryScope:
+    return QueryScope(
+        symbol=None,
+        timeframe=None,
+        market_type="perp",
+        ts_from=None,
+        ts_to=None,
+        limit=None,
+        watermarks={KEY: MARK},
+        incremental=True,
+        watermark_lookback_sec=lookback_sec,
+    )
+
+
+def _row(prediction_id: str, evaluated_at: object, symbol: str = "BTCUSDT") -> dict:
+    return {"id": prediction_id, "symbol": symbol, "timeframe": "15m", "marketType": "perp", "outcomeEvaluatedAt": evaluated_at}
+
+
+class BuildWhereTests(unittest.TestCase):
+    def test_without_lookback_the_watermark_is_exclusive_on_evaluated_at_and_id(self) -> None:
+        where_sql, params = build_where(_scope())
+        self.assertIn('("outcomeEvaluatedAt", id) <= (:wm_evaluated_at_0, :wm_id_0)', where_sql)
+        self.assertEqual((params["wm_evaluated_at_0"], params["wm_id_0"]), MARK)
+        self.assertEqual(
+            (params["wm_symbol_0"], params["wm_timeframe_0"], params["wm_market_type_0"]),
+            KEY,
+        )
+
+    def test_lookback_moves_the_bound_back_and_drops_the_id(self) -> None:
+        where_sql, params = build_where(_scope(lookback_sec=90))
+        self.assertIn('"outcomeEvaluatedAt" <= :wm_evaluated_at_0)', where_sql)
+        self.assertNotIn("wm_id_0", where_sql)
+        self.assertNotIn("wm_id_0", params)
+        self.assertEqual(params["wm_evaluated_at_0"], MARK[0] - timedelta(seconds=90))
+
+    def test_lookback_picks_up_a_row_committed_after_the_watermark(self) -> None:
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    'CREATE TABLE "Prediction" (id TEXT, symbol TEXT, timeframe TEXT, "marketType" TEXT, '
+                    '"tsCreated" TEXT, "featuresSnapshot" TEXT, "outcomeStatus" TEXT, "outcomeResult" TEXT, '
+                    '"outcomePnlPct" REAL, "outcomeEvaluatedAt" TEXT)'
+                )
+            )
+            rows = [
+                ("p001", "2026-01-02 00:01:00"),
+                ("p010", "2026-01-02 00:10:00"),
+                # Stamped before the watermark, committed after the run that set it.
+                ("p009", "2026-01-02 00:09:30"),
+                ("p011", "2026-01-02 00:11:00"),
+            ]
+            for prediction_id, evaluated_at in rows:
+                conn.execute(
+                    text(
+                        'INSERT INTO "Prediction" VALUES (:id, \'BTCUSDT\', \'15m\', \'perp\', \'2026-01-02 00:00:00\', '
+                        "'{}', 'evaluated', 'win', 1.0, :evaluated_at)"
+                    ),
+                    {"id": prediction_id, "evaluated_at": evaluated_at},
+                )
+
+        def fetch(lookback_sec: float) -> list[str]:
+            sql, params = build_sql(_scope(lookback_sec))
+            # sqlite stores the timestamps as text; compare them in the same format.
+            params = {name: value.isoformat(" ") if isinstance(value, datetime) else value for name, value in params.items()}
+            with engine.connect() as conn:
+                return [row.id for row in conn.execute(text(sql), params)]
+
+        self.assertEqual(fetch(0), ["p011"])
+        self.assertEqual(fetch(60), ["p009", "p010", "p011"])
+
+
+class AdvanceWatermarksTests(unittest.TestCase):
+    def test_keeps_the_largest_mark_per_key(self) -> None:
+        watermarks: dict = {}
+        advance_watermarks(
+            watermarks,
+            [
+                _row("p002", datetime(2026, 1, 2, 0, 5)),
+                _row("p001", datetime(2026, 1, 2, 0, 5)),
+                _row("p003", "2026-01-02T00:04:00"),
+                _row("e001", datetime(2026, 1, 2, 0, 1), symbol="ETHUSDT"),
+                _row("p004", None),
+            ],
+        )
+        self.assertEqual(
+            watermarks,
+            {
+                KEY: (datetime(2026, 1, 2, 0, 5), "p002"),
+                ("ETHUSDT", "15m", "perp"): (datetime(2026, 1, 2, 0, 1), "e001"),
+            },
+        )
+
+    def test_rows_reread_behind_the_watermark_do_not_move_it_back(self) -> None:
+        watermarks = {KEY: MARK}
+        advance_watermarks(watermarks, [_row("p009", datetime(2026, 1, 2, 0, 9, 30)), _row("p010", MARK[0])])
+        self.assertEqual(watermarks, {KEY: MARK})
+        advance_watermarks(watermarks, [_row("p011", "2026-01-02T00:11:00")])
+        self.assertEqual(watermarks, {KEY: (datetime(2026, 1, 2, 0, 11), "p011")})
+
+
+if __name__ == "__main__":
+    unittest.main()